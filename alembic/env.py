@@ -52,7 +52,9 @@ except ImportError:
 # Skills OS models
 from lyo_app.skills.models import Skill, SkillEdge, SkillTag  # noqa: F401
 from lyo_app.evolution.goals_models import UserGoal, GoalSkillMapping, GoalProgressSnapshot  # noqa: F401
-from lyo_app.events.models import LearningEvent  # noqa: F401
+from lyo_app.events.models import LearningEvent, OutboxEvent  # noqa: F401
+from lyo_app.models.enhanced import SweepCheckpoint  # noqa: F401
+from lyo_app.personalization.models import MemoryInsight, MemorySynthesisState  # noqa: F401
 
 target_metadata = Base.metadata
 
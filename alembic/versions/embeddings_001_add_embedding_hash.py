@@ -0,0 +1,40 @@
+"""Record the content hash each stored embedding was built from.
+
+Revision ID: embeddings_001
+Revises: community_map_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "embeddings_001"
+down_revision = "community_map_001"
+branch_labels = None
+depends_on = None
+
+TABLES = ("courses", "lessons", "memory_insights")
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _columns(table: str) -> set[str]:
+    if not _has_table(table):
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    # The embedding backfill compares this against the hash of the row's
+    # current text and only re-embeds rows whose text changed.
+    for table in TABLES:
+        if _has_table(table) and "embedding_hash" not in _columns(table):
+            op.add_column(table, sa.Column("embedding_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if "embedding_hash" in _columns(table):
+            op.drop_column(table, "embedding_hash")
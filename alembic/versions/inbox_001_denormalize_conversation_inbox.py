@@ -0,0 +1,104 @@
+"""Denormalized inbox: last-message pointer on conversations, unread counters on participants.
+
+Revision ID: inbox_001
+Revises: memory_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "inbox_001"
+down_revision = "memory_001"
+branch_labels = None
+depends_on = None
+
+CONVERSATION_COLUMNS = (
+    ("last_message_id", sa.Integer()),
+    ("last_message_at", sa.DateTime()),
+    ("last_message_preview", sa.String(200)),
+)
+
+INDEXES = (
+    ("ix_conversations_updated_at_id", "conversations", ["updated_at", "id"]),
+    ("ix_conversation_participants_user_conversation", "conversation_participants", ["user_id", "conversation_id"]),
+    ("ix_messages_conversation_created", "messages", ["conversation_id", "created_at"]),
+)
+
+# Same rules as lyo_app.services.messaging_inbox.reconcile_inbox
+BACKFILL = (
+    """
+    UPDATE conversations SET last_message_id = (
+        SELECT m.id FROM messages m WHERE m.conversation_id = conversations.id
+        ORDER BY m.created_at DESC, m.id DESC LIMIT 1
+    )
+    """,
+    """
+    UPDATE conversations SET
+        last_message_at = (SELECT m.created_at FROM messages m WHERE m.id = conversations.last_message_id),
+        last_message_preview = (
+            SELECT CASE WHEN m.is_deleted = true THEN NULL ELSE substr(m.content, 1, 200) END
+            FROM messages m WHERE m.id = conversations.last_message_id
+        )
+    """,
+    """
+    UPDATE conversation_participants SET unread_count = (
+        SELECT count(m.id) FROM messages m
+        WHERE m.conversation_id = conversation_participants.conversation_id
+          AND m.sender_id != conversation_participants.user_id
+          AND m.is_deleted = false
+          AND (conversation_participants.last_read_at IS NULL
+               OR m.created_at > conversation_participants.last_read_at)
+    )
+    """,
+)
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _columns(table: str) -> set[str]:
+    if not _has_table(table):
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table: str) -> set[str]:
+    if not _has_table(table):
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not all(_has_table(t) for t in ("conversations", "conversation_participants", "messages")):
+        return
+
+    existing = _columns("conversations")
+    for name, type_ in CONVERSATION_COLUMNS:
+        if name not in existing:
+            op.add_column("conversations", sa.Column(name, type_, nullable=True))
+    if "unread_count" not in _columns("conversation_participants"):
+        op.add_column(
+            "conversation_participants",
+            sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    for name, table, columns in INDEXES:
+        if name not in _indexes(table):
+            op.create_index(name, table, columns)
+
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        if name in _indexes(table):
+            op.drop_index(name, table_name=table)
+    if "unread_count" in _columns("conversation_participants"):
+        op.drop_column("conversation_participants", "unread_count")
+    existing = _columns("conversations")
+    for name, _ in CONVERSATION_COLUMNS:
+        if name in existing:
+            op.drop_column("conversations", name)
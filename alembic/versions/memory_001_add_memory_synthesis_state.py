@@ -0,0 +1,34 @@
+"""High-water marks for incremental memory synthesis.
+
+Revision ID: memory_001
+Revises: sweep_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "memory_001"
+down_revision = "sweep_001"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("memory_synthesis_state"):
+        return
+    op.create_table(
+        "memory_synthesis_state",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("last_interaction_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("synthesized_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    if _has_table("memory_synthesis_state"):
+        op.drop_table("memory_synthesis_state")
@@ -0,0 +1,45 @@
+"""Transactional outbox for learning events.
+
+Revision ID: outbox_001
+Revises: embeddings_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "outbox_001"
+down_revision = "embeddings_001"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("event_outbox"):
+        return
+    op.create_table(
+        "event_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.String(64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_event_outbox_user_id", "event_outbox", ["user_id"])
+    # The dispatcher polls pending rows in id order
+    op.create_index("ix_event_outbox_status_id", "event_outbox", ["status", "id"])
+
+
+def downgrade() -> None:
+    if _has_table("event_outbox"):
+        op.drop_index("ix_event_outbox_status_id", table_name="event_outbox")
+        op.drop_index("ix_event_outbox_user_id", table_name="event_outbox")
+        op.drop_table("event_outbox")
@@ -0,0 +1,34 @@
+"""Retry backoff for the event outbox.
+
+Revision ID: outbox_002
+Revises: resources_001
+Create Date: 2026-10-19
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "outbox_002"
+down_revision = "resources_001"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    # The dispatcher leaves a failed event (and its user's later ones) alone
+    # until this time; NULL means due now.
+    columns = _columns("event_outbox")
+    if columns and "next_attempt_at" not in columns:
+        op.add_column("event_outbox", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    if "next_attempt_at" in _columns("event_outbox"):
+        op.drop_column("event_outbox", "next_attempt_at")
@@ -0,0 +1,62 @@
+"""Unique keys for the bulk resource upsert.
+
+ResourceAggregationService inserts provider results with
+INSERT ... ON CONFLICT DO NOTHING, which needs a unique index on
+(provider, external_id) for resources and (resource_id, tag) for tags.
+Duplicates left behind by the old check-then-insert path are removed first,
+keeping the oldest row.
+
+Revision ID: resources_001
+Revises: search_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "resources_001"
+down_revision = "search_001"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table("educational_resources"):
+        return
+    # Repoint links at the surviving row, then drop the duplicates
+    survivor = (
+        "(SELECT MIN(k.id) FROM educational_resources k, educational_resources d "
+        "WHERE d.id = {col} AND k.provider = d.provider AND k.external_id = d.external_id)"
+    )
+    for table in ("resource_tags", "course_resources"):
+        if _has_table(table):
+            column = f"{table}.resource_id"
+            op.execute(f"UPDATE {table} SET resource_id = COALESCE({survivor.format(col=column)}, resource_id)")
+    op.execute(
+        "DELETE FROM educational_resources WHERE id NOT IN ("
+        "SELECT MIN(id) FROM educational_resources GROUP BY provider, external_id) "
+        "AND external_id IS NOT NULL"
+    )
+    op.create_index(
+        "uq_educational_resources_provider_external_id",
+        "educational_resources",
+        ["provider", "external_id"],
+        unique=True,
+    )
+    if _has_table("resource_tags"):
+        op.execute(
+            "DELETE FROM resource_tags WHERE id NOT IN ("
+            "SELECT MIN(id) FROM resource_tags GROUP BY resource_id, tag)"
+        )
+        op.create_index("uq_resource_tags_resource_id_tag", "resource_tags", ["resource_id", "tag"], unique=True)
+
+
+def downgrade() -> None:
+    if _has_table("resource_tags"):
+        op.drop_index("uq_resource_tags_resource_id_tag", table_name="resource_tags")
+    if _has_table("educational_resources"):
+        op.drop_index("uq_educational_resources_provider_external_id", table_name="educational_resources")
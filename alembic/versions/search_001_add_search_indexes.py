@@ -0,0 +1,56 @@
+"""Trigram, full-text and prefix indexes for the global search router.
+
+PostgreSQL only; SQLite deployments use the in-process index in
+lyo_app.services.search_index.
+
+Revision ID: search_001
+Revises: inbox_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "search_001"
+down_revision = "inbox_001"
+branch_labels = None
+depends_on = None
+
+# (index name, table, indexed expression, access method)
+INDEXES = (
+    ("ix_users_username_trgm", "users", "username gin_trgm_ops", "gin"),
+    ("ix_users_first_name_trgm", "users", "first_name gin_trgm_ops", "gin"),
+    ("ix_users_last_name_trgm", "users", "last_name gin_trgm_ops", "gin"),
+    ("ix_study_groups_name_trgm", "study_groups", "name gin_trgm_ops", "gin"),
+    ("ix_study_groups_description_trgm", "study_groups", "description gin_trgm_ops", "gin"),
+    ("ix_community_events_title_trgm", "community_events", "title gin_trgm_ops", "gin"),
+    ("ix_community_events_description_trgm", "community_events", "description gin_trgm_ops", "gin"),
+    ("ix_community_posts_content_fts", "community_posts", "to_tsvector('simple', coalesce(content, ''))", "gin"),
+    # Autocomplete: lower(name) LIKE 'prefix%'
+    ("ix_users_username_lower_prefix", "users", "lower(username) text_pattern_ops", "btree"),
+    ("ix_study_groups_name_lower_prefix", "study_groups", "lower(name) text_pattern_ops", "btree"),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, expression, method in INDEXES:
+        if _has_table(table):
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING {method} ({expression})")
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        return
+    for name, _, _, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
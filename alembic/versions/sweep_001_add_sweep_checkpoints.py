@@ -0,0 +1,38 @@
+"""Checkpoints for chunked engagement sweeps.
+
+Revision ID: sweep_001
+Revises: outbox_001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "sweep_001"
+down_revision = "outbox_001"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("sweep_checkpoints"):
+        return
+    op.create_table(
+        "sweep_checkpoints",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("run_started_at", sa.DateTime(), nullable=False),
+        sa.Column("last_key", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    if _has_table("sweep_checkpoints"):
+        op.drop_table("sweep_checkpoints")
@@ -13,8 +13,11 @@ os.makedirs(prometheus_dir, exist_ok=True)
 bind = "0.0.0.0:8000"
 backlog = 2048
 
-# Worker processes
-workers = 1  # Single worker for memory-intensive startup
+# Worker processes. WEB_CONCURRENCY > 1 is meant to be paired with
+# GUNICORN_PRELOAD=1 (below) so workers share one import of the app. For
+# single-worker scale-to-zero deployments use LAZY_ROUTERS=1 instead, which
+# defers router imports to first use (see lyo_app.core.lazy_routes).
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
 timeout = 600  # High timeout for slow AI dependency loading
@@ -34,8 +37,10 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 # Process naming
 proc_name = "lyoapp-backend"
 
-# Preload app for better memory usage (disabled for Cloud Run async startup)
-preload_app = False
+# Preload the app in the master and fork workers from it, sharing imported
+# modules copy-on-write. Per-process state (DB pools, psutil handles) is reset
+# in each worker by the hooks in lyo_app.core.forksafe.
+preload_app = os.getenv("GUNICORN_PRELOAD", "").lower() in ("1", "true", "yes")
 
 # Security
 limit_request_line = 4096
@@ -65,6 +70,12 @@ def when_ready(server):
         shutil.rmtree(prometheus_dir)
     os.makedirs(prometheus_dir, exist_ok=True)
 
+    if preload_app:
+        # Move everything imported so far out of the collector's reach, so
+        # GC passes in the workers don't write to (and un-share) those pages
+        import gc
+        gc.freeze()
+
 def worker_int(worker):
     """Called just after a worker exited on SIGINT or SIGQUIT."""
     worker.log.info("worker received INT or QUIT signal")
@@ -113,3 +124,8 @@ def post_worker_init(worker):
 def worker_exit(server, worker):
     """Called just after a worker has been exited."""
     worker.log.info("Worker exited (pid: %s)", worker.pid)
+
+def child_exit(server, worker):
+    """Called in the master after a worker exits; drop its live gauges."""
+    from lyo_app.core.prometheus_metrics import mark_process_dead
+    mark_process_dead(worker.pid, prometheus_dir)
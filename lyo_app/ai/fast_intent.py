@@ -0,0 +1,173 @@
+"""
+Local fast-path intent routing for Lyo 2.0 chat.
+
+``MultimodalRouter.route`` is a full LLM call (seconds) that every chat turn
+waits on before anything streams. Most turns are unambiguous: "explain
+photosynthesis", "make me a course on linear algebra", "quiz me on
+fractions", "hi". ``FastIntentRouter`` recognises those locally and returns
+a ``RouterDecision`` straight away; anything it is not sure about returns
+None and goes to the LLM router as before.
+
+The rules are the AI Classroom ``INTENT_PATTERNS`` (so there is one rule
+table), restricted to intents that need no conversation context, anchored
+at the start of the message and compiled into a single alternation: one
+``match()`` call classifies a message, and the first alternative that
+matches is the highest-priority rule.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from lyo_app.ai.schemas.lyo2 import Intent, RouterDecision, RouterEntity, RouterRequest
+from lyo_app.ai_classroom.intent_detector import COMPILED_INTENT_PATTERNS, IntentType
+from lyo_app.core.prometheus_metrics import PROMETHEUS_AVAILABLE
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import Counter as PromCounter
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_CONFIDENCE = 0.9
+MAX_FAST_PATH_CHARS = 300
+
+# Classroom intent -> (Lyo 2.0 intent, suggested tier). Intents that lean on
+# conversation history ("more", "give me an example", feedback) are left to
+# the LLM router.
+FAST_PATH_INTENTS: Dict[IntentType, Tuple[Intent, str]] = {
+    IntentType.FULL_COURSE: (Intent.COURSE, "LARGE"),
+    IntentType.TEST_PREP: (Intent.TEST_PREP, "MEDIUM"),
+    IntentType.STUDY_PLAN: (Intent.STUDY_PLAN, "MEDIUM"),
+    IntentType.QUIZ_REQUEST: (Intent.QUIZ, "MEDIUM"),
+    IntentType.DEEP_DIVE: (Intent.EXPLAIN, "MEDIUM"),
+    IntentType.QUICK_EXPLANATION: (Intent.EXPLAIN, "MEDIUM"),
+    IntentType.DEFINITION: (Intent.EXPLAIN, "TINY"),
+}
+
+GREETING_PATTERN = (
+    r"(?:hi|hello|hey|hiya|howdy|yo|good\s+(?:morning|afternoon|evening))"
+    r"(?:\s+(?:there|lyo|again))?[\s!.,]*$"
+)
+
+# A topic that names another artifact ("explain how to make a quiz") or a
+# second sentence means the message is not a single unambiguous request.
+_CROSS_INTENT = re.compile(r"\b(?:course|curriculum|quiz|flash\s*cards?|exam|test|study\s+plan|schedule|remind)", re.I)
+_SECOND_SENTENCE = re.compile(r"[.?!;]\s+\S")
+
+# A topic has to name a subject: "what is up", "what is the weather today"
+# are chit-chat, and "a course for my kid" leans on context the rules don't
+# have. Such turns go to the LLM router.
+_TOPIC_WORD = re.compile(r"[a-z0-9+#']+")
+_FILLER_WORDS = frozenset(
+    "a an the some any this that these those it its up on going happening new so just really please "
+    "stuff thing things something anything everything today tonight tomorrow yesterday now "
+    "weather time date day news".split()
+)
+_PERSONAL_WORDS = frozenset(
+    "i i'm me my mine myself we us our ours you your yours yourself he him his she her hers "
+    "they them their theirs someone somebody".split()
+)
+
+
+def _is_topic(topic: str) -> bool:
+    words = _TOPIC_WORD.findall(topic.lower())
+    if any(word in _PERSONAL_WORDS for word in words):
+        return False
+    return any(word not in _FILLER_WORDS for word in words)
+
+
+def _build_rules() -> Tuple["re.Pattern[str]", List[Tuple[str, Intent, str, Optional[int]]]]:
+    """One anchored alternation; returns it with (group, intent, tier, topic group) per rule."""
+    alternatives = [f"(?P<greeting>{GREETING_PATTERN})"]
+    rules: List[Tuple[str, Intent, str, Optional[int]]] = [("greeting", Intent.GREETING, "TINY", None)]
+    group = 1  # the greeting group itself; GREETING_PATTERN has no capturing groups
+    for i, (intent_type, pattern, _confidence) in enumerate(COMPILED_INTENT_PATTERNS):
+        if intent_type not in FAST_PATH_INTENTS:
+            continue
+        name = f"r{i}"
+        alternatives.append(f"(?P<{name}>{pattern.pattern})")
+        intent, tier = FAST_PATH_INTENTS[intent_type]
+        outer = group + 1
+        rules.append((name, intent, tier, outer + 1 if pattern.groups else None))
+        group = outer + pattern.groups
+    return re.compile(r"\s*(?:" + "|".join(alternatives) + ")", re.IGNORECASE), rules
+
+
+class FastIntentRouter:
+    """
+    Local classifier in front of the LLM router, plus routing-path counters.
+
+    Set ``CHAT_FAST_ROUTING=0`` to send every turn to the LLM router.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = os.getenv("CHAT_FAST_ROUTING", "1") != "0" if enabled is None else enabled
+        self._pattern, rules = _build_rules()
+        self._rules = {name: (intent, tier, topic_group) for name, intent, tier, topic_group in rules}
+        self.counts: Counter = Counter()
+        self._prom = None
+        if PROMETHEUS_AVAILABLE:
+            try:
+                self._prom = PromCounter(
+                    "lyo_chat_routing",
+                    "Chat turns by routing path (fast = local classifier, llm, forced)",
+                    ["path", "intent"],
+                )
+            except ValueError:
+                logger.debug("Prometheus chat routing metric already registered")
+
+    def classify_text(self, text: str) -> Optional[Tuple[Intent, str, Optional[str]]]:
+        """(intent, tier, topic) for an unambiguous message, else None."""
+        text = (text or "").strip()
+        if not text or len(text) > MAX_FAST_PATH_CHARS or _SECOND_SENTENCE.search(text):
+            return None
+        match = self._pattern.match(text)
+        if match is None:
+            return None
+        intent, tier, topic_group = self._rules[match.lastgroup]
+        topic = match.group(topic_group) if topic_group else None
+        topic = re.sub(r"^(?:me|us)\s+", "", topic.strip().rstrip("?.!")) if topic else None
+        if intent == Intent.EXPLAIN and (not topic or _CROSS_INTENT.search(topic)):
+            return None
+        if topic is not None and not _is_topic(topic):
+            return None
+        return intent, tier, topic
+
+    def classify(self, request: RouterRequest) -> Optional[RouterDecision]:
+        """
+        A routing decision for ``request`` without an LLM call, or None.
+
+        Turns with media or an active artifact always go to the LLM router:
+        they need image understanding or follow-up resolution.
+        """
+        if not self.enabled or request.media or request.active_artifact:
+            return None
+        result = self.classify_text(request.text)
+        if result is None:
+            return None
+        intent, tier, topic = result
+        return RouterDecision(
+            intent=intent,
+            confidence=FAST_PATH_CONFIDENCE,
+            entities=RouterEntity(topic=topic),
+            needs_clarification=False,
+            suggested_tier=tier,
+        )
+
+    def record(self, path: str, intent: Optional[Intent]) -> None:
+        """Count one routed turn; ``path`` is fast, llm or forced."""
+        self.counts[path] += 1
+        if self._prom is not None:
+            self._prom.labels(path=path, intent=intent.value if intent else "UNKNOWN").inc()
+
+    def stats(self) -> Dict[str, float]:
+        routed = self.counts["fast"] + self.counts["llm"]
+        return {
+            **{path: self.counts[path] for path in ("fast", "llm", "forced")},
+            "fast_path_ratio": round(self.counts["fast"] / routed, 4) if routed else 0.0,
+        }
+
+
+fast_intent_router = FastIntentRouter()
@@ -76,6 +76,7 @@ from .orchestrator import (
     PhaseResult,
     get_orchestrator,
 )
+from .scheduler import PhaseNode, PhaseScheduler, SchedulerReport
 
 # Routes
 print("8", flush=True)
@@ -124,6 +125,9 @@ __all__ = [
     "PhaseStatus",
     "PhaseResult",
     "get_orchestrator",
+    "PhaseNode",
+    "PhaseScheduler",
+    "SchedulerReport",
     
     # Routes
     "a2a_router",
@@ -44,6 +44,7 @@ from .qa_checker_agent import QACheckerAgent, QAOutput
 from .visual_director_agent import VisualDirectorAgent, VisualDirectorOutput
 from .voice_agent import VoiceAgent, VoiceAgentOutput
 from .researcher_agent import ResearcherAgent, ResearcherOutput
+from .scheduler import PhaseNode, PhaseScheduler, SchedulerReport
 
 
 # ============================================================
@@ -87,6 +88,9 @@ class PipelineConfig(BaseModel):
     
     # Parallelization
     parallel_visual_voice: bool = True
+    # Start visual/voice on the cinematic draft while its QA gate runs;
+    # work is cancelled and redone if QA requests a revision
+    speculative_execution: bool = True
     
     # Timeouts (seconds)
     phase_timeout: float = 300.0
@@ -130,6 +134,9 @@ class PipelineState(BaseModel):
     # Final output
     final_output: Optional[Dict[str, Any]] = None
     final_status: TaskStatus = TaskStatus.PENDING
+    
+    # Scheduler timing (critical path, speculative/wasted work)
+    timing_report: Optional[Dict[str, Any]] = None
 
 
 class AgentHandoff(BaseModel):
@@ -159,6 +166,9 @@ class A2AOrchestrator:
     6. QA_CHECK - Quality validation
     7. ASSEMBLY - Combine all artifacts
     8. FINALIZATION - Final packaging
+    
+    Phases run as a dependency graph (see ``_build_phase_graph``), so each
+    starts as soon as the artifacts it reads are available.
     """
     
     def __init__(self, config: Optional[PipelineConfig] = None):
@@ -321,120 +331,152 @@ class A2AOrchestrator:
     # ========================
     
     async def _run_pipeline(self) -> None:
-        """Execute the full pipeline synchronously."""
+        """Execute the full pipeline as a dependency graph."""
         state = self._current_state
         
-        # Phase 1: Initialization
-        await self._run_phase(PipelinePhase.INITIALIZATION, self._initialize)
+        await self._run_phase_graph(self._build_phase_graph(self._run_phase))
         
-        # Phase 1.5: Research
-        await self._run_phase(PipelinePhase.RESEARCH, self._run_research)
+        state.final_status = TaskStatus.COMPLETED
+    
+    async def _run_pipeline_streaming(self) -> AsyncGenerator[StreamingEvent, None]:
+        """Execute the phase graph, merging events from concurrent phases."""
+        state = self._current_state
+        events: asyncio.Queue = asyncio.Queue()
         
-        # Phase 2: Pedagogy
-        if self.config.enable_pedagogy:
-            await self._run_phase(PipelinePhase.PEDAGOGY, self._run_pedagogy)
+        async def run_streaming(phase: PipelinePhase, executor: Callable) -> None:
+            async for event in self._run_phase_streaming(phase, executor):
+                await events.put(event)
         
-        # Phase 3: Cinematic
-        if self.config.enable_cinematic:
-            await self._run_phase(PipelinePhase.CINEMATIC, self._run_cinematic)
+        # Quality Gate for Cinematic (Phase 22)
+        cinematic_gate = None
+        if self.config.enable_qa and state.request.quality_tier != "fast":
+            async def cinematic_gate():
+                return await self._cinematic_quality_gate(run_streaming, events)
         
-        # Phase 4 & 5: Visual + Voice (parallel if enabled)
-        if self.config.parallel_visual_voice:
-            await self._run_parallel_phases()
-        else:
-            if self.config.enable_visual:
-                await self._run_phase(PipelinePhase.VISUAL, self._run_visual)
-            if self.config.enable_voice:
-                await self._run_phase(PipelinePhase.VOICE, self._run_voice)
+        nodes = self._build_phase_graph(run_streaming, cinematic_gate=cinematic_gate)
+        graph_task = asyncio.create_task(self._run_phase_graph(nodes))
         
-        # Phase 6: QA Check
-        if self.config.enable_qa:
-            await self._run_phase(PipelinePhase.QA_CHECK, self._run_qa)
+        try:
+            while True:
+                next_event = asyncio.create_task(events.get())
+                done, _ = await asyncio.wait(
+                    {next_event, graph_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_event in done:
+                    yield next_event.result()
+                    continue
+                next_event.cancel()
+                break
+            
+            while not events.empty():
+                yield events.get_nowait()
+            
+            # Re-raise phase failures after flushing their ERROR events
+            graph_task.result()
+        finally:
+            if not graph_task.done():
+                graph_task.cancel()
         
-        # Phase 7: Assembly
-        await self._run_phase(PipelinePhase.ASSEMBLY, self._assemble)
+        state.final_status = TaskStatus.COMPLETED
+    
+    def _build_phase_graph(
+        self,
+        run_phase: Callable,
+        cinematic_gate: Optional[Callable] = None,
+    ) -> List[PhaseNode]:
+        """
+        Declare each phase and the phase outputs it reads.
         
-        # Phase 8: Finalization
-        await self._run_phase(PipelinePhase.FINALIZATION, self._finalize)
+        Research and pedagogy only need the request, so they overlap.
+        Visual and voice read the cinematic and pedagogy artifacts and may
+        start speculatively while the cinematic quality gate is running.
+        """
+        P = PipelinePhase
+        cfg = self.config
+        
+        def node(phase, executor, depends_on=(), **kwargs) -> PhaseNode:
+            return PhaseNode(
+                name=phase.value,
+                run=lambda: run_phase(phase, executor),
+                depends_on=tuple(d.value for d in depends_on),
+                **kwargs
+            )
         
-        state.final_status = TaskStatus.COMPLETED
+        nodes = [
+            node(P.INITIALIZATION, self._initialize),
+            node(P.RESEARCH, self._run_research, [P.INITIALIZATION]),
+        ]
+        if cfg.enable_pedagogy:
+            nodes.append(node(P.PEDAGOGY, self._run_pedagogy, [P.INITIALIZATION]))
+        if cfg.enable_cinematic:
+            nodes.append(node(
+                P.CINEMATIC, self._run_cinematic, [P.INITIALIZATION, P.PEDAGOGY],
+                gate=cinematic_gate
+            ))
+        
+        media_inputs = [P.INITIALIZATION, P.PEDAGOGY, P.CINEMATIC]
+        if cfg.enable_visual:
+            nodes.append(node(P.VISUAL, self._run_visual, media_inputs, speculative=True))
+        if cfg.enable_voice:
+            voice_inputs = media_inputs if cfg.parallel_visual_voice else media_inputs + [P.VISUAL]
+            nodes.append(node(P.VOICE, self._run_voice, voice_inputs, speculative=True))
+        
+        content = [P.INITIALIZATION, P.RESEARCH, P.PEDAGOGY, P.CINEMATIC, P.VISUAL, P.VOICE]
+        if cfg.enable_qa:
+            nodes.append(node(P.QA_CHECK, self._run_qa, content))
+        nodes.append(node(P.ASSEMBLY, self._assemble, content + [P.QA_CHECK]))
+        nodes.append(node(P.FINALIZATION, self._finalize, [P.ASSEMBLY]))
+        return nodes
     
-    async def _run_pipeline_streaming(self) -> AsyncGenerator[StreamingEvent, None]:
-        """Execute pipeline with streaming events."""
+    async def _run_phase_graph(self, nodes: List[PhaseNode]) -> SchedulerReport:
+        """Run the phase graph and record critical-path timing on the state."""
         state = self._current_state
-        # Phases to execute sequentially
-        phases = [
-            (PipelinePhase.INITIALIZATION, self._initialize, True),
-            (PipelinePhase.RESEARCH, self._run_research, True),
-            (PipelinePhase.PEDAGOGY, self._run_pedagogy, self.config.enable_pedagogy),
-        ]
+        scheduler = PhaseScheduler(nodes, speculative=self.config.speculative_execution)
+        report = await asyncio.wait_for(scheduler.run(), timeout=self.config.total_timeout)
+        
+        state.timing_report = report.to_dict()
+        logger.info(
+            f"⏱️ [ORCHESTRATOR] {state.pipeline_id}: wall={report.wall_ms}ms "
+            f"serial={report.serial_ms}ms critical_path={' -> '.join(report.critical_path)} "
+            f"invalidated={report.invalidated_runs} ({report.wasted_ms}ms)"
+        )
+        return report
+    
+    async def _cinematic_quality_gate(
+        self,
+        run_phase: Callable,
+        events: asyncio.Queue,
+    ) -> Optional[Callable]:
+        """QA the cinematic draft; return a rerun with feedback if rejected."""
+        state = self._current_state
+        await events.put(StreamingEvent(
+            type=EventType.PHASE_PROGRESS,
+            task_id=state.pipeline_id,
+            phase=PipelinePhase.QA_CHECK.value,
+            agent_name="qa_checker",
+            message="Performing quality assurance on cinematic structure..."
+        ))
         
-        # Sequential phases first
-        for phase, executor, enabled in phases:
-            if enabled:
-                async for event in self._run_phase_streaming(phase, executor):
-                    yield event
-                    
-        # Cinematic with Quality Gate (Phase 22)
-        if self.config.enable_cinematic:
-            async for event in self._run_phase_streaming(PipelinePhase.CINEMATIC, self._run_cinematic):
-                yield event
-            
-            # Quality Gate for Cinematic
-            if self.config.enable_qa and state.request.quality_tier != "fast":
-                yield StreamingEvent(
-                    type=EventType.PHASE_PROGRESS,
-                    task_id=state.pipeline_id,
-                    phase=PipelinePhase.QA_CHECK.value,
-                    agent_name="qa_checker",
-                    message="Performing quality assurance on cinematic structure..."
-                )
-                
-                qa_result = await self._run_qa_for_phase(PipelinePhase.CINEMATIC)
-                if qa_result.get("approval_status") == "needs_revision":
-                    critical_issues = qa_result.get("issues", [])
-                    feedback_str = "; ".join([i.get("description", "") for i in critical_issues])
-                    
-                    yield StreamingEvent(
-                        type=EventType.PHASE_PROGRESS,
-                        task_id=state.pipeline_id,
-                        phase=PipelinePhase.CINEMATIC.value,
-                        agent_name="orchestrator",
-                        message=f"QA requested revisions: {feedback_str}. Regenerating..."
-                    )
-                    
-                    # Rerun with feedback
-                    async for event in self._run_phase_streaming(
-                        PipelinePhase.CINEMATIC, 
-                        lambda: self._run_cinematic(feedback=feedback_str)
-                    ):
-                        yield event
-        
-        # Parallel visual + voice
-        if self.config.parallel_visual_voice and (self.config.enable_visual or self.config.enable_voice):
-            async for event in self._run_parallel_streaming():
-                yield event
-        else:
-            if self.config.enable_visual:
-                async for event in self._run_phase_streaming(PipelinePhase.VISUAL, self._run_visual):
-                    yield event
-            if self.config.enable_voice:
-                async for event in self._run_phase_streaming(PipelinePhase.VOICE, self._run_voice):
-                    yield event
-        
-        # QA
-        if self.config.enable_qa:
-            async for event in self._run_phase_streaming(PipelinePhase.QA_CHECK, self._run_qa):
-                yield event
+        qa_result = await self._run_qa_for_phase(PipelinePhase.CINEMATIC)
+        if qa_result.get("approval_status") != "needs_revision":
+            return None
         
-        # Assembly and finalization
-        async for event in self._run_phase_streaming(PipelinePhase.ASSEMBLY, self._assemble):
-            yield event
-        async for event in self._run_phase_streaming(PipelinePhase.FINALIZATION, self._finalize):
-            yield event
+        critical_issues = qa_result.get("issues", [])
+        feedback_str = "; ".join([i.get("description", "") for i in critical_issues])
         
-        state = self._current_state
-        state.final_status = TaskStatus.COMPLETED
+        await events.put(StreamingEvent(
+            type=EventType.PHASE_PROGRESS,
+            task_id=state.pipeline_id,
+            phase=PipelinePhase.CINEMATIC.value,
+            agent_name="orchestrator",
+            message=f"QA requested revisions: {feedback_str}. Regenerating..."
+        ))
+        
+        # Rerun with feedback
+        return lambda: run_phase(
+            PipelinePhase.CINEMATIC,
+            lambda: self._run_cinematic(feedback=feedback_str)
+        )
     
     async def _run_phase(
         self,
@@ -570,76 +612,6 @@ class A2AOrchestrator:
             )
             raise
     
-    async def _run_parallel_phases(self) -> None:
-        """Run visual and voice phases in parallel."""
-        tasks = []
-        
-        if self.config.enable_visual:
-            tasks.append(self._run_phase(PipelinePhase.VISUAL, self._run_visual))
-        if self.config.enable_voice:
-            tasks.append(self._run_phase(PipelinePhase.VOICE, self._run_voice))
-        
-        if tasks:
-            await asyncio.gather(*tasks)
-    
-    async def _run_parallel_streaming(self) -> AsyncGenerator[StreamingEvent, None]:
-        """Run visual and voice in parallel with merged streaming."""
-        state = self._current_state
-        
-        yield StreamingEvent(
-            type=EventType.PHASE_PROGRESS,
-            task_id=state.pipeline_id,
-            agent_name="orchestrator",
-            progress_percent=int(state.overall_progress * 100),
-            message="Running visual and voice generation in parallel..."
-        )
-        
-        # Create tasks
-        visual_task = None
-        voice_task = None
-        
-        if self.config.enable_visual:
-            visual_task = asyncio.create_task(self._run_visual())
-        if self.config.enable_voice:
-            voice_task = asyncio.create_task(self._run_voice())
-        
-        # Wait for both
-        if visual_task and voice_task:
-            visual_out, voice_out = await asyncio.gather(visual_task, voice_task)
-        elif visual_task:
-            visual_out = await visual_task
-        elif voice_task:
-            voice_out = await voice_task
-        
-        # Record results
-        if visual_task:
-            state.phase_results[PipelinePhase.VISUAL.value] = PhaseResult(
-                phase=PipelinePhase.VISUAL,
-                status=PhaseStatus.COMPLETED,
-                agent_name="visual_director",
-                started_at=datetime.utcnow(),
-                completed_at=datetime.utcnow()
-            )
-        if voice_task:
-            state.phase_results[PipelinePhase.VOICE.value] = PhaseResult(
-                phase=PipelinePhase.VOICE,
-                status=PhaseStatus.COMPLETED,
-                agent_name="voice_agent",
-                started_at=datetime.utcnow(),
-                completed_at=datetime.utcnow()
-            )
-        
-        self._update_progress(PipelinePhase.VISUAL)
-        self._update_progress(PipelinePhase.VOICE)
-        
-        yield StreamingEvent(
-            type=EventType.PHASE_PROGRESS,
-            task_id=state.pipeline_id,
-            agent_name="orchestrator",
-            progress_percent=int(state.overall_progress * 100),
-            message="Visual and voice generation complete!"
-        )
-    
     # ========================
     # PHASE EXECUTORS
     # ========================
@@ -0,0 +1,306 @@
+"""
+A2A Phase Scheduler - DAG execution for the course pipeline.
+
+Each pipeline phase declares the phases whose artifacts it consumes. The
+scheduler starts a phase as soon as its inputs exist instead of walking a
+fixed sequence, so independent phases (research/pedagogy, visual/voice)
+overlap automatically.
+
+Speculation:
+    A phase may carry a quality gate (e.g. QA on the cinematic script).
+    Dependents marked ``speculative`` start on the ungated artifact while the
+    gate runs. If the gate requests a revision, every run that consumed the
+    old artifact is cancelled (or discarded if already finished) and
+    rescheduled once the revised artifact lands.
+
+Timing:
+    Every run is recorded, and ``SchedulerReport`` exposes the critical path
+    (the chain of phases that determined wall-clock time) plus the time spent
+    on invalidated speculative work.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+
+# A gate returns None when the artifact is accepted, or a zero-arg coroutine
+# factory that regenerates the phase (e.g. with QA feedback applied).
+GateFn = Callable[[], Awaitable[Optional[Callable[[], Awaitable[Any]]]]]
+
+
+@dataclass
+class PhaseNode:
+    """A pipeline phase and the phases whose output it consumes."""
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    depends_on: Sequence[str] = ()
+    gate: Optional[GateFn] = None
+    speculative: bool = False
+
+
+@dataclass
+class PhaseRun:
+    """One execution of a phase (or of its gate)."""
+    name: str
+    version: int
+    started_at: float
+    finished_at: Optional[float] = None
+    speculative: bool = False
+    invalidated: bool = False
+    kind: str = "run"  # "run" | "gate"
+
+    @property
+    def duration_ms(self) -> int:
+        if self.finished_at is None:
+            return 0
+        return int((self.finished_at - self.started_at) * 1000)
+
+
+@dataclass
+class SchedulerReport:
+    """Timing summary for one pipeline run."""
+    wall_ms: int
+    serial_ms: int
+    critical_path: List[str]
+    critical_path_ms: int
+    phase_ms: Dict[str, int]
+    speculative_runs: int
+    invalidated_runs: int
+    wasted_ms: int
+    runs: List[PhaseRun] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_ms": self.wall_ms,
+            "serial_ms": self.serial_ms,
+            "critical_path": self.critical_path,
+            "critical_path_ms": self.critical_path_ms,
+            "phase_ms": self.phase_ms,
+            "speculative_runs": self.speculative_runs,
+            "invalidated_runs": self.invalidated_runs,
+            "wasted_ms": self.wasted_ms,
+        }
+
+
+class _NodeState:
+    __slots__ = (
+        "node", "version", "gated", "task", "task_kind",
+        "consumed", "current_run", "finished_at", "runner",
+    )
+
+    def __init__(self, node: PhaseNode):
+        self.node = node
+        self.version = 0            # completed executions
+        self.gated = node.gate is None
+        self.task: Optional[asyncio.Task] = None
+        self.task_kind = ""
+        self.consumed: Dict[str, int] = {}
+        self.current_run: Optional[PhaseRun] = None
+        self.finished_at = 0.0      # when the accepted artifact became final
+        self.runner = node.run
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None
+
+
+class PhaseScheduler:
+    """Run a DAG of ``PhaseNode`` objects with optional speculation."""
+
+    def __init__(self, nodes: Sequence[PhaseNode], speculative: bool = True):
+        names = {n.name for n in nodes}
+        self.speculative = speculative
+        self._states: Dict[str, _NodeState] = {}
+        for node in nodes:
+            # Dependencies on disabled phases are treated as satisfied
+            node.depends_on = tuple(d for d in node.depends_on if d in names)
+            self._states[node.name] = _NodeState(node)
+        self._dependents: Dict[str, List[str]] = {n.name: [] for n in nodes}
+        for node in nodes:
+            for dep in node.depends_on:
+                self._dependents[dep].append(node.name)
+        self._runs: List[PhaseRun] = []
+        self._started_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+
+    def _dep_usable(self, dep: _NodeState, speculative: bool) -> bool:
+        if dep.version == 0 or (dep.running and dep.task_kind == "run"):
+            return False
+        return dep.gated or (speculative and self.speculative)
+
+    def _is_current(self, st: _NodeState) -> bool:
+        return st.version > 0 and all(
+            st.consumed.get(d) == self._states[d].version
+            for d in st.node.depends_on
+        )
+
+    def _is_complete(self, st: _NodeState) -> bool:
+        return not st.running and st.gated and self._is_current(st)
+
+    def _is_ready(self, st: _NodeState) -> bool:
+        if st.running or self._is_current(st):
+            return False
+        return all(
+            self._dep_usable(self._states[d], st.node.speculative)
+            for d in st.node.depends_on
+        )
+
+    # ------------------------------------------------------------------
+    # Task management
+    # ------------------------------------------------------------------
+
+    def _start_run(self, st: _NodeState) -> None:
+        deps = [self._states[d] for d in st.node.depends_on]
+        speculative = any(not d.gated for d in deps)
+        st.consumed = {d.node.name: d.version for d in deps}
+        st.current_run = PhaseRun(
+            name=st.node.name,
+            version=st.version + 1,
+            started_at=time.perf_counter(),
+            speculative=speculative,
+        )
+        self._runs.append(st.current_run)
+        st.task = asyncio.create_task(st.runner())
+        st.task_kind = "run"
+        if speculative:
+            logger.info(f"⚡ [SCHEDULER] Speculatively starting {st.node.name}")
+
+    def _start_gate(self, st: _NodeState) -> None:
+        st.current_run = PhaseRun(
+            name=st.node.name,
+            version=st.version,
+            started_at=time.perf_counter(),
+            kind="gate",
+        )
+        self._runs.append(st.current_run)
+        st.task = asyncio.create_task(st.node.gate())
+        st.task_kind = "gate"
+
+    def _invalidate_dependents(self, name: str) -> None:
+        """Cancel or discard downstream work built on ``name``'s artifact."""
+        for child in self._dependents[name]:
+            st = self._states[child]
+            if st.running and st.task_kind == "run":
+                st.task.cancel()
+                st.task = None
+                st.current_run.invalidated = True
+                st.current_run.finished_at = time.perf_counter()
+            elif st.version > 0:
+                for run in self._runs:
+                    if run.name == child and run.version == st.version:
+                        run.invalidated = True
+            st.consumed = {}
+            self._invalidate_dependents(child)
+
+    def _handle_done(self, st: _NodeState, task: asyncio.Task) -> None:
+        run = st.current_run
+        run.finished_at = time.perf_counter()
+        kind = st.task_kind
+        st.task = None
+        result = task.result()  # propagates phase failures
+
+        if kind == "run":
+            st.version += 1
+            if st.gated:
+                st.finished_at = run.finished_at
+            else:
+                self._start_gate(st)
+            return
+
+        # Gate finished
+        if result is None:
+            st.gated = True
+            st.finished_at = run.finished_at
+            return
+
+        logger.info(f"🔁 [SCHEDULER] Gate rejected {st.node.name}; rerunning and invalidating dependents")
+        self._invalidate_dependents(st.node.name)
+        # One revision round: the regenerated artifact is accepted as-is
+        st.runner = result
+        st.gated = True
+        self._start_run(st)
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    async def run(self) -> SchedulerReport:
+        self._started_at = time.perf_counter()
+        states = list(self._states.values())
+        try:
+            while True:
+                for st in states:
+                    if self._is_ready(st):
+                        self._start_run(st)
+
+                running = {st.task: st for st in states if st.running}
+                if not running:
+                    if all(self._is_complete(st) for st in states):
+                        break
+                    pending = [st.node.name for st in states if not self._is_complete(st)]
+                    raise RuntimeError(f"Phase graph cannot make progress: {pending}")
+
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    st = running[task]
+                    # Task may have been cancelled by an invalidation this round
+                    if st.task is task:
+                        self._handle_done(st, task)
+        except BaseException:
+            pending = [st.task for st in states if st.task is not None]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        return self._build_report()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _build_report(self) -> SchedulerReport:
+        end = time.perf_counter()
+        wall_ms = int((end - self._started_at) * 1000)
+
+        valid = [r for r in self._runs if not r.invalidated and r.finished_at]
+        phase_ms: Dict[str, int] = {}
+        for run in valid:
+            phase_ms[run.name] = phase_ms.get(run.name, 0) + run.duration_ms
+
+        wasted = [r for r in self._runs if r.invalidated]
+
+        # Walk back from the last phase to finish, always following the
+        # dependency whose accepted artifact arrived last.
+        path: List[str] = []
+        if self._states:
+            current = max(self._states.values(), key=lambda s: s.finished_at)
+            seen: Set[str] = set()
+            while current and current.node.name not in seen:
+                seen.add(current.node.name)
+                path.append(current.node.name)
+                deps = [self._states[d] for d in current.node.depends_on]
+                current = max(deps, key=lambda s: s.finished_at) if deps else None
+            path.reverse()
+
+        return SchedulerReport(
+            wall_ms=wall_ms,
+            serial_ms=sum(phase_ms.values()),
+            critical_path=path,
+            critical_path_ms=sum(phase_ms.get(p, 0) for p in path),
+            phase_ms=phase_ms,
+            speculative_runs=sum(1 for r in self._runs if r.speculative),
+            invalidated_runs=len(wasted),
+            wasted_ms=sum(r.duration_ms for r in wasted),
+            runs=list(self._runs),
+        )
@@ -28,6 +28,12 @@ from tenacity import (
 )
 
 from lyo_app.core.config import settings
+from lyo_app.ai_agents.multi_agent_v2.agents.prompt_cache import (
+    CompiledPrompt,
+    estimate_tokens,
+    extract_json_object,
+    prompt_template_cache
+)
 from lyo_app.ai_agents.multi_agent_v2.model_manager import (
     ModelManager, 
     ModelConfig,
@@ -225,79 +231,30 @@ class BaseAgent(ABC, Generic[T]):
     
     def get_schema_prompt(self) -> str:
         """Generate prompt section describing expected output schema"""
-        schema = self.output_schema.model_json_schema()
-        
-        # Simplify schema for readability
-        def simplify_schema(s: dict, depth: int = 0) -> dict:
-            if depth > 3:
-                return {"...": "nested"}
-            result = {}
-            for key, value in s.items():
-                if key in ["title", "description", "examples"]:
-                    continue
-                if isinstance(value, dict):
-                    result[key] = simplify_schema(value, depth + 1)
-                else:
-                    result[key] = value
-            return result
-        
-        simplified = simplify_schema(schema)
-        schema_str = json.dumps(simplified, indent=2)
+        return prompt_template_cache.schema_prompt(self.output_schema)
+    
+    def get_compiled_prompt(self) -> CompiledPrompt:
+        """
+        Return the compiled system + schema prefix for this agent.
         
-        return f"""
-## Output Format Requirements
-
-You MUST respond with valid JSON that conforms to this schema:
-
-```json
-{schema_str}
-```
-
-CRITICAL RULES:
-1. Return ONLY the JSON object - no markdown formatting, no code fences
-2. Ensure all required fields are present
-3. Follow all field constraints (min/max lengths, patterns, etc.)
-4. Use proper JSON escaping for special characters
-5. Arrays must have the minimum required items
-6. String patterns (like "les_1_1" for lesson IDs) must be followed exactly
-"""
+        Cached per agent class/schema/system prompt, so the prefix is
+        byte-identical across calls and retries (prefix-cache friendly).
+        """
+        return prompt_template_cache.get(
+            type(self), self.output_schema, self.get_system_prompt()
+        )
     
     def _clean_response(self, response: str) -> str:
         """Clean AI response to extract valid JSON"""
-        cleaned = response.strip()
-        
-        # Remove markdown code fences
-        if cleaned.startswith("```"):
-            # Find the content between fences
-            lines = cleaned.split("\n")
-            start_idx = 1  # Skip first line with ```
-            end_idx = len(lines)
-            
-            for i, line in enumerate(lines[1:], 1):
-                if line.strip().startswith("```"):
-                    end_idx = i
-                    break
-            
-            cleaned = "\n".join(lines[start_idx:end_idx])
-        
-        # Remove "json" prefix if present
-        if cleaned.lower().startswith("json"):
-            cleaned = cleaned[4:].strip()
-        
-        # Try to find JSON object boundaries
-        if not cleaned.startswith("{"):
-            start = cleaned.find("{")
-            if start != -1:
-                cleaned = cleaned[start:]
-        
-        if not cleaned.endswith("}"):
-            end = cleaned.rfind("}")
-            if end != -1:
-                cleaned = cleaned[:end + 1]
-        
-        return cleaned
+        return extract_json_object(response)
     
-    async def _call_model(self, prompt: str, attempt: int = 1, media_attachments: List[Dict[str, Any]] = None) -> str:
+    async def _call_model(
+        self,
+        prompt: str,
+        attempt: int = 1,
+        media_attachments: List[Dict[str, Any]] = None,
+        prefix_key: Optional[str] = None
+    ) -> str:
         """Call the model with retry logic"""
         if not self._available:
             raise RuntimeError(f"Agent {self.name} is not available (no API key)")
@@ -323,7 +280,8 @@ CRITICAL RULES:
                     messages=messages,
                     temperature=self.temperature,
                     max_tokens=self.max_tokens,
-                    provider_order=[self.model_name, "gemini-2.5-flash", "gpt-4o-mini"]
+                    provider_order=[self.model_name, "gemini-2.5-flash", "gpt-4o-mini"],
+                    prompt_cache_key=prefix_key
                 ),
                 timeout=self.timeout_seconds
             )
@@ -363,12 +321,14 @@ CRITICAL RULES:
         last_error = None
         raw_response = None
         
-        # Build prompts
-        system_prompt = self.get_system_prompt()
-        user_prompt = self.build_prompt(**kwargs)
-        schema_prompt = self.get_schema_prompt()
+        # Build prompts on top of the cached system + schema prefix
+        compiled = self.get_compiled_prompt()
+        full_prompt = compiled.render(self.build_prompt(**kwargs))
+        prompt_tokens = estimate_tokens(full_prompt)
+        fallback_prompt = None
         
-        full_prompt = f"{system_prompt}\n\n{schema_prompt}\n\n{user_prompt}"
+        # Support passing media (images/audio) to the model if provided
+        media_attachments = kwargs.get("media_attachments", [])
         
         for attempt in range(1, self.max_retries + 1):
             try:
@@ -377,16 +337,17 @@ CRITICAL RULES:
                 # Use fallback prompt on later attempts if available
                 current_prompt = full_prompt
                 if attempt > 1:
-                    fallback = self.get_fallback_prompt(**kwargs)
-                    if fallback:
-                        current_prompt = f"{system_prompt}\n\n{schema_prompt}\n\n{fallback}"
+                    if fallback_prompt is None:
+                        fallback = self.get_fallback_prompt(**kwargs)
+                        fallback_prompt = compiled.render(fallback) if fallback else ""
+                    if fallback_prompt:
+                        current_prompt = fallback_prompt
                         logger.info(f"Agent {self.name}: Using fallback prompt")
                 
-                # Support passing media (images/audio) to the model if provided
-                media_attachments = kwargs.get("media_attachments", [])
-                
                 # Call model
-                raw_response = await self._call_model(current_prompt, attempt, media_attachments)
+                raw_response = await self._call_model(
+                    current_prompt, attempt, media_attachments, prefix_key=compiled.prefix_key
+                )
                 
                 # Clean and parse response
                 cleaned = self._clean_response(raw_response)
@@ -397,7 +358,7 @@ CRITICAL RULES:
                 
                 # Success!
                 elapsed = (datetime.utcnow() - start_time).total_seconds()
-                tokens = len(full_prompt.split()) + len(raw_response.split())
+                tokens = prompt_tokens + estimate_tokens(raw_response)
                 
                 self.metrics.record_call(
                     success=True,
@@ -450,7 +411,7 @@ CRITICAL RULES:
         elapsed = (datetime.utcnow() - start_time).total_seconds()
         self.metrics.record_call(
             success=False,
-            tokens=len(full_prompt.split()),
+            tokens=prompt_tokens,
             time_seconds=elapsed,
             retried=True,
             error=last_error
@@ -11,7 +11,7 @@ from sqlalchemy import select, delete
 
 from .base import BaseTool, ToolResult
 from lyo_app.personalization.models import MemoryInsight
-from lyo_app.services.embedding_service import embedding_service
+from lyo_app.services.embedding_backfill import embed_row
 from lyo_app.core.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
@@ -54,16 +54,14 @@ class MemoryManagementTool(BaseTool):
             return ToolResult(success=False, output=None, message="Text is required for adding an insight.")
         
         try:
-            # Generate embedding
-            vector = await embedding_service.embed_text(text)
-            
             new_insight = MemoryInsight(
                 user_id=user_id,
                 insight_text=text,
                 category=category,
                 confidence=confidence,
-                embedding=vector
             )
+            # Generate embedding
+            await embed_row(new_insight)
             
             db.add(new_insight)
             await db.commit()
@@ -94,7 +92,7 @@ class MemoryManagementTool(BaseTool):
             if text:
                 insight.insight_text = text
                 # Regenerate embedding if text changed
-                insight.embedding = await embedding_service.embed_text(text)
+                await embed_row(insight)
             
             if category:
                 insight.category = category
@@ -4,6 +4,7 @@ User behavior analysis, preference learning, and dynamic content adaptation.
 """
 
 import asyncio
+import importlib.util
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
@@ -14,19 +15,9 @@ import hashlib
 
 import structlog
 
-# Optional sklearn imports
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.decomposition import PCA
-    from sklearn.cluster import KMeans
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-    TfidfVectorizer = None
-    cosine_similarity = None
-    PCA = None
-    KMeans = None
+# Optional sklearn; imported where used (_ensure_models, find_similar_users)
+# because it adds ~0.5s to start-up
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
 
 # Optional pandas import
 try:
@@ -331,10 +322,11 @@ class UserEmbeddingModel:
         """Find users similar to the given user."""
         if user_id not in self.user_embeddings:
             return []
-        
+        from sklearn.metrics.pairwise import cosine_similarity
+
         user_embedding = self.user_embeddings[user_id]
         similarities = []
-        
+
         for other_user_id, other_embedding in self.user_embeddings.items():
             if other_user_id != user_id:
                 similarity = cosine_similarity(
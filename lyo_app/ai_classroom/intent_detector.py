@@ -97,7 +97,7 @@ class ChatIntent:
 # Intent pattern matching rules
 INTENT_PATTERNS = {
     IntentType.FULL_COURSE: [
-        r"(?:create|make|build|generate|design)\s+(?:a\s+)?(?:full\s+)?course\s+(?:on|about|for)\s+(.+)",
+        r"(?:create|make|build|generate|design)\s+(?:me\s+)?(?:a\s+)?(?:full\s+)?course\s+(?:on|about|for)\s+(.+)",
         r"(?:teach|learn|study)\s+(.+)\s+(?:from\s+scratch|completely|fully|in-depth)",
         r"(?:i\s+want|need)\s+(?:a\s+)?(?:complete|full|comprehensive)\s+course\s+(?:on|about)\s+(.+)",
         r"(?:course|curriculum)\s+(?:on|for|about)\s+(.+)",
@@ -202,6 +202,31 @@ INTENT_PATTERNS = {
     ],
 }
 
+
+def _pattern_confidence(pattern: str) -> float:
+    """Higher confidence for longer, more specific patterns"""
+    return min(0.7 + (len(pattern) / 200), 0.95)
+
+
+# Compiled once, best first: highest confidence, then declaration order
+# (the stable sort keeps ties in the order INTENT_PATTERNS lists them), so
+# the first pattern that matches is the one the detector would pick.
+COMPILED_INTENT_PATTERNS: List[Tuple[IntentType, "re.Pattern[str]", float]] = sorted(
+    (
+        (intent_type, re.compile(pattern, re.IGNORECASE), _pattern_confidence(pattern))
+        for intent_type, patterns in INTENT_PATTERNS.items()
+        for pattern in patterns
+    ),
+    key=lambda rule: -rule[2],
+)
+
+# One alternation over every rule: messages that match nothing (most chit-chat)
+# are rejected in a single scan instead of one scan per pattern.
+_ANY_INTENT_PATTERN = re.compile(
+    "|".join(f"(?:{pattern})" for patterns in INTENT_PATTERNS.values() for pattern in patterns),
+    re.IGNORECASE,
+)
+
 # Keywords that indicate course-level complexity
 COURSE_KEYWORDS = {
     "comprehensive", "complete", "full", "from scratch", "in-depth",
@@ -290,24 +315,18 @@ class IntentDetector:
         
     def _match_patterns(self, message: str) -> Tuple[IntentType, Optional[str], float]:
         """Match message against intent patterns"""
-        best_match = (IntentType.UNKNOWN, None, 0.3)
-        
-        for intent_type, patterns in INTENT_PATTERNS.items():
-            for pattern in patterns:
-                match = re.search(pattern, message, re.IGNORECASE)
-                if match:
-                    topic = match.group(1) if match.groups() else None
-                    if topic:
-                        topic = topic.strip().rstrip("?.!")
-                    
-                    # Higher confidence for longer, more specific patterns
-                    confidence = 0.7 + (len(pattern) / 200)
-                    confidence = min(confidence, 0.95)
-                    
-                    if confidence > best_match[2]:
-                        best_match = (intent_type, topic, confidence)
-                        
-        return best_match
+        if not _ANY_INTENT_PATTERN.search(message):
+            return (IntentType.UNKNOWN, None, 0.3)
+
+        for intent_type, pattern, confidence in COMPILED_INTENT_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                topic = match.group(1) if match.groups() else None
+                if topic:
+                    topic = topic.strip().rstrip("?.!")
+                return (intent_type, topic, confidence)
+
+        return (IntentType.UNKNOWN, None, 0.3)
         
     def _analyze_complexity(
         self,
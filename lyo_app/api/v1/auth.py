@@ -14,7 +14,7 @@ from lyo_app.core.database import get_db
 from lyo_app.core.database import engine
 from lyo_app.auth.models import User
 from lyo_app.auth.jwt_auth import create_access_token as jwt_create_access_token
-from lyo_app.auth.security import verify_password, hash_password
+from lyo_app.auth.password_hashing import password_hasher
 
 router = APIRouter()
 
@@ -62,7 +62,7 @@ async def register_user(
         )
     
     # Create new user
-    hashed_password = hash_password(payload.password)
+    hashed_password = await password_hasher.hash(payload.password)
     derived_username = payload.email.split("@", 1)[0][:50]
     user = User(
         email=payload.email,
@@ -89,6 +89,15 @@ async def register_user(
     return {"message": "User created successfully", "user_id": user.id}
 
 
+async def _check_password(db: AsyncSession, user: User, password: str) -> bool:
+    """Verify off the event loop, storing a fresh hash if the old one is outdated."""
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if verified and new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    return verified
+
+
 @router.post("/login")
 async def login_json(
     payload: LoginPayload,
@@ -100,7 +109,7 @@ async def login_json(
     except Exception as e:
         await _ensure_user_table_if_missing(e)
         user = (await db.execute(select(User).where(User.email == payload.email))).scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user or not await _check_password(db, user, payload.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -117,7 +126,7 @@ async def login_for_access_token(
     """Authenticate user and return access token"""
     user = (await db.execute(select(User).where(User.email == form_data.username))).scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await _check_password(db, user, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -16,6 +16,7 @@ from lyo_app.auth.production import (
 )
 from lyo_app.auth.models import User
 from lyo_app.core.errors import AuthenticationError, ValidationError
+from lyo_app.core.problems import ProblemDetail
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +90,8 @@ async def login(
     except AuthenticationError as e:
         logger.warning(f"Login failed for {request.email}: {e}")
         raise HTTPException(status_code=401, detail=str(e))
+    except ProblemDetail:
+        raise
     except Exception as e:
         logger.error(f"Login error for {request.email}: {e}")
         raise HTTPException(status_code=500, detail="Login failed")
@@ -143,7 +146,7 @@ async def register(
             is_verified=user.is_verified
         )
         
-    except HTTPException:
+    except (HTTPException, ProblemDetail):
         raise
     except Exception as e:
         logger.error(f"Registration error for {request.email}: {e}")
@@ -199,6 +202,8 @@ async def change_password(
         
     except AuthenticationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ProblemDetail:
+        raise
     except Exception as e:
         logger.error(f"Password change error for {current_user.email}: {e}")
         raise HTTPException(status_code=500, detail="Password change failed")
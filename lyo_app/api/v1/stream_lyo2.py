@@ -1,6 +1,5 @@
 import logging
 import asyncio
-import json
 import uuid
 import time
 from datetime import datetime
@@ -14,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from lyo_app.auth.dependencies import get_current_user_or_guest, get_db
 from lyo_app.auth.schemas import UserRead
 from lyo_app.ai.router import MultimodalRouter
+from lyo_app.ai.fast_intent import fast_intent_router
 from lyo_app.ai.planner import LyoPlanner
 from lyo_app.ai.executor import LyoExecutor
 from lyo_app.ai.schemas.lyo2 import RouterRequest, ConversationTurn, UIBlock, UIBlockType, UnifiedChatResponse, ActionType, PlannedAction, Intent, RouterDecision, LyoPlan
@@ -51,6 +51,7 @@ from lyo_app.services.proactive_engagement import proactive_engagement_service
 from lyo_app.ai_agents.optimization.performance_optimizer import ai_performance_optimizer, OptimizationLevel
 from lyo_app.chat.models import ChatMode
 from lyo_app.chat.stores import conversation_store
+from lyo_app.streaming.sse_writer import DONE_FRAME, SSEWriter, encode_event
 
 # Simple response builder to fix missing import
 class LyoResponseBuilder:
@@ -78,10 +79,9 @@ def safe_json_serialize(data: Any, event_type: str = "unknown") -> str:
     """
     Safely serialize data to JSON string with comprehensive error handling.
 
-    This prevents iOS crashes from __SwiftValue serialization errors by:
-    1. Using default=str to handle non-serializable types
-    2. Double-encoding to ensure final output is JSON-safe
-    3. Providing detailed error logging for debugging
+    This prevents iOS crashes from __SwiftValue serialization errors by
+    coercing non-JSON types to strings in the same (single) encoding pass.
+    See ``lyo_app.streaming.sse_writer``.
 
     Args:
         data: The data to serialize
@@ -89,38 +89,8 @@ def safe_json_serialize(data: Any, event_type: str = "unknown") -> str:
 
     Returns:
         JSON string that is guaranteed to be iOS-safe
-
-    Raises:
-        ValueError: If data cannot be made JSON-safe even with fallbacks
     """
-    try:
-        # First pass: Convert problematic types to strings
-        intermediate = json.loads(json.dumps(data, default=str))
-
-        # Second pass: Final JSON serialization
-        result = json.dumps(intermediate)
-
-        logger.debug(f"✅ Safe JSON serialization successful for {event_type}")
-        return result
-
-    except (TypeError, ValueError, OverflowError) as e:
-        logger.error(f"❌ JSON serialization failed for {event_type}: {e}")
-        logger.error(f"Problematic data type: {type(data)}")
-        logger.error(f"Problematic data sample: {str(data)[:200]}")
-
-        # Ultimate fallback: return a safe error message
-        fallback = {
-            "type": "serialization_error",
-            "message": f"Data serialization failed for {event_type}",
-            "error": str(e),
-            "timestamp": time.time()
-        }
-
-        try:
-            return json.dumps(fallback)
-        except Exception as fallback_error:
-            logger.critical(f"💥 Even fallback serialization failed: {fallback_error}")
-            raise ValueError(f"Complete JSON serialization failure: {fallback_error}")
+    return encode_event(data, event_type)
 
 def yield_safe_sse_event(event_type: str, data: Dict[str, Any]) -> str:
     """
@@ -133,17 +103,7 @@ def yield_safe_sse_event(event_type: str, data: Dict[str, Any]) -> str:
     Returns:
         SSE-formatted string ready for streaming
     """
-    try:
-        safe_json = safe_json_serialize(data, event_type)
-        return f"data: {safe_json}\n\n"
-    except ValueError as e:
-        logger.error(f"Failed to create safe SSE event for {event_type}: {e}")
-        # Return a safe error event
-        error_data = {
-            "type": "error",
-            "message": f"Event serialization failed: {event_type}"
-        }
-        return f"data: {json.dumps(error_data)}\n\n"
+    return f"data: {encode_event(data, event_type)}\n\n"
 
 import re as _re
 
@@ -304,6 +264,22 @@ def _extract_course_topic(user_text: str) -> str:
     ).strip()
     return topic or user_text.strip()
 
+
+async def _load_proactive_context(user_id: Any, db: AsyncSession) -> str:
+    """Pending proactive nudges rendered for the planner, or "" on none/failure."""
+    try:
+        nudges = await proactive_engagement_service.get_pending_nudges_for_user(user_id, db)
+    except Exception as ne:
+        logger.warning(f"Failed to fetch proactive nudges: {ne}")
+        return ""
+    if not nudges:
+        return ""
+    proactive_context = "\n**Proactive System Nudges (Incorporate these into your greeting if relevant):**\n"
+    for n in nudges:
+        proactive_context += f"- [{n.nudge_type}] {n.title}: {n.message}\n"
+    return proactive_context
+
+
 router = APIRouter()
 
 router_agent = MultimodalRouter()
@@ -726,8 +702,9 @@ async def stream_lyo2_chat(
     trace_id = str(uuid.uuid4())
     logger.info(f"🚀 [STREAM] Starting session {trace_id} for user {current_user.id}")
     
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         start_time = time.time()
+        sse = SSEWriter()
         
         try:
             display_content = canonical_message_content(request.text, request.media)
@@ -802,7 +779,7 @@ async def stream_lyo2_chat(
                         mode_used=ChatMode.GENERAL.value,
                         client_message_id=request.client_message_id,
                     )
-                yield yield_safe_sse_event(
+                yield sse.emit(
                     "conversation",
                     {
                         "type": "conversation",
@@ -810,7 +787,7 @@ async def stream_lyo2_chat(
                     },
                 )
                 if replayed_assistant:
-                    yield yield_safe_sse_event(
+                    yield sse.emit(
                         "answer",
                         {
                             "type": "answer",
@@ -822,7 +799,7 @@ async def stream_lyo2_chat(
                             "replayed": True,
                         },
                     )
-                    yield "data: [DONE]\n\n"
+                    yield DONE_FRAME
                     return
 
             if not media_attachments:
@@ -831,11 +808,8 @@ async def stream_lyo2_chat(
                     historical_media, missing_ok=True
                 )
 
-            collected_bricks = []
-            
             skeleton_brick = {"type": "skeleton", "blocks": ["answer", "artifact"]}
-            collected_bricks.append(skeleton_brick)
-            yield yield_safe_sse_event("skeleton", skeleton_brick)
+            yield sse.emit("skeleton", skeleton_brick)
             await asyncio.sleep(0.01) # Yield to event loop
             
             # 2. Performance & Cache Layer (New for Phase 17)
@@ -848,22 +822,6 @@ async def stream_lyo2_chat(
                 request_data=request.model_dump()
             )
             
-            # Check for cached full response (Skip remaining layers if hit)
-            cache_key = opt_data.get("cache_key")
-            # Personalized/multi-turn answers must never be served from the
-            # global prompt cache: the cache key does not encode user history.
-            cached_full_resp = None
-            if not authenticated_user_id:
-                cached_full_resp = await ai_performance_optimizer.cache_manager.get(
-                    "full_response", key=cache_key
-                )
-            if cached_full_resp:
-                logger.info(f"✨ [STREAM][{trace_id}] Full cache hit! Yielding optimized response.")
-                for brick in cached_full_resp:
-                    yield f"data: {json.dumps(brick)}\n\n"
-                yield "data: [DONE]\n\n"
-                return
-
             # Apply optimized config (e.g. reduced tokens if memory is high)
             opt_config = opt_data.get("processing_config", {})
             
@@ -879,38 +837,43 @@ async def stream_lyo2_chat(
                     needs_clarification=False,
                     suggested_tier="MEDIUM"
                 )
+                routing_path = "forced"
             else:
+                # 2b. Fetch Proactive Nudges (New for Phase 16) while routing:
+                # they only feed the planner/executor, and the router does not
+                # touch the DB session, so the two can overlap.
+                nudge_task = asyncio.create_task(
+                    _load_proactive_context(current_user.id, db)
+                )
                 try:
-                    # 2b. Fetch Proactive Nudges (New for Phase 16)
-                    proactive_context = ""
-                    try:
-                        nudges = await proactive_engagement_service.get_pending_nudges_for_user(current_user.id, db)
-                        if nudges:
-                            proactive_context = "\n**Proactive System Nudges (Incorporate these into your greeting if relevant):**\n"
-                            for n in nudges:
-                                proactive_context += f"- [{n.nudge_type}] {n.title}: {n.message}\n"
-                            # Append to request text for the router/planner/executor to see
-                            request.text = f"[Proactive Context: {proactive_context}]\n" + (request.text or "")
-                    except Exception as ne:
-                        logger.warning(f"Failed to fetch proactive nudges: {ne}")
-
-                    routing_response = await asyncio.wait_for(
-                        router_agent.route(
-                            request,
-                            media_attachments=media_attachments,
-                        ),
-                        timeout=35.0,
-                    )
-                    decision = routing_response.decision
+                    decision = fast_intent_router.classify(request)
+                    routing_path = "fast" if decision else "llm"
+                    if decision is None:
+                        routing_response = await asyncio.wait_for(
+                            router_agent.route(
+                                request,
+                                media_attachments=media_attachments,
+                            ),
+                            timeout=35.0,
+                        )
+                        decision = routing_response.decision
+                    proactive_context = await nudge_task
                 except asyncio.TimeoutError:
                     logger.error(f"❌ [STREAM][{trace_id}] Routing timed out after 35s")
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'My magical circuits got a little crossed while thinking about that. Could we try again?'})}\n\n"
+                    yield sse.emit("error", {'type': 'error', 'message': 'My magical circuits got a little crossed while thinking about that. Could we try again?'})
                     return
-                
-            logger.info(f"✅ [STREAM][{trace_id}] Routing complete ({time.time()-r_start:.2f}s): {decision.intent} (confidence={decision.confidence})")
+                finally:
+                    if not nudge_task.done():
+                        nudge_task.cancel()
+                if proactive_context:
+                    # Append to request text for the planner/executor to see
+                    request.text = f"[Proactive Context: {proactive_context}]\n" + (request.text or "")
+
+            fast_intent_router.record(routing_path, decision.intent)
+            logger.info(f"✅ [STREAM][{trace_id}] Routing complete ({time.time()-r_start:.2f}s, {routing_path}): {decision.intent} (confidence={decision.confidence})")
             
             if decision.intent == Intent.COURSE:
-                _topic = _extract_course_topic(request.text or "")
+                _topic = decision.entities.topic or _extract_course_topic(request.text or "")
                 _preview_oc = {
                     "course": {
                         "id": str(uuid.uuid4()),
@@ -926,15 +889,14 @@ async def stream_lyo2_chat(
                     }
                 }
                 oc_event_data = {'type': 'open_classroom', 'block': {'type': 'OpenClassroomBlock', 'content': {'type': 'OPEN_CLASSROOM', **_preview_oc}}}
-                yield yield_safe_sse_event("open_classroom_preview", oc_event_data)
+                yield sse.emit("open_classroom_preview", oc_event_data)
                 
                 # v2: emit lyo_command for iOS v2 pipeline
                 try:
                     cmd = lyo_response_builder.build_command("open_classroom", _preview_oc)
                     lyo_resp = lyo_response_builder.build(command=cmd, request_id=trace_id, conversation_id=trace_id)
                     brick_data = {"type": "lyo_command", "response": lyo_resp}
-                    collected_bricks.append(brick_data)
-                    yield yield_safe_sse_event("lyo_command", brick_data)
+                    yield sse.emit("lyo_command", brick_data)
                 except (TypeError, ValueError) as e:
                     logger.error(f"JSON serialization error for lyo_command: {e}")
                     # Continue without this brick
@@ -955,7 +917,7 @@ async def stream_lyo2_chat(
                         mode_used=ChatMode.GENERAL.value,
                         client_message_id=assistant_client_message_id,
                     )
-                yield f"data: {json.dumps({'type': 'clarification', 'text': decision.clarification_question})}\n\n"
+                yield sse.emit("clarification", {'type': 'clarification', 'text': decision.clarification_question})
                 return
                 
             # Intercept TEST_PREP intent to gather structured details
@@ -976,7 +938,7 @@ async def stream_lyo2_chat(
                                 mode_used=ChatMode.TEST_PREP.value,
                                 client_message_id=assistant_client_message_id,
                             )
-                        yield f"data: {json.dumps({'type': 'clarification', 'text': data.follow_up_question})}\n\n"
+                        yield sse.emit("clarification", {'type': 'clarification', 'text': data.follow_up_question})
                         return
                     # Optionally attach extracted data back to the request for the planner
                     request.text += f"\n[System: Extracted Test details: Subject={data.subject}, Topics={data.topics}, Date={data.test_date}]"
@@ -1002,9 +964,8 @@ async def stream_lyo2_chat(
                             "priority": 0,
                         },
                     }
-                    collected_bricks.append(answer_brick)
-                    yield yield_safe_sse_event("answer", answer_brick)
-                    yield yield_safe_sse_event(
+                    yield sse.emit("answer", answer_brick)
+                    yield sse.emit(
                         "smart_blocks", {"type": "smart_blocks", "blocks": lesson_blocks}
                     )
 
@@ -1017,8 +978,7 @@ async def stream_lyo2_chat(
                                 "priority": 0,
                             }],
                         }
-                        collected_bricks.append(actions_brick)
-                        yield yield_safe_sse_event("actions", actions_brick)
+                        yield sse.emit("actions", actions_brick)
 
                     if persistent_conversation:
                         # Blocks are persisted so the check stays gradeable and
@@ -1033,7 +993,7 @@ async def stream_lyo2_chat(
                             blocks=lesson_blocks,
                         )
 
-                    yield "data: [DONE]\n\n"
+                    yield DONE_FRAME
                     logger.info(
                         f"📚 [STREAM][{trace_id}] Served composed lesson "
                         f"(skill={lesson.skill_id}, probe={lesson.is_probe}, "
@@ -1116,7 +1076,7 @@ async def stream_lyo2_chat(
                 )
             except asyncio.TimeoutError:
                 logger.error(f"❌ [STREAM][{trace_id}] Execution timed out after 60s")
-                yield f"data: {json.dumps({'type': 'error', 'message': 'My magical circuits got a little crossed while thinking about that. Could we try again?'})}\n\n"
+                yield sse.emit("error", {'type': 'error', 'message': 'My magical circuits got a little crossed while thinking about that. Could we try again?'})
                 return
                 
             logger.info(f"✅ [STREAM][{trace_id}] Execution complete ({time.time()-e_start:.2f}s)")
@@ -1144,8 +1104,7 @@ async def stream_lyo2_chat(
                         "priority": 0
                     }
                 }
-                collected_bricks.append(answer_brick)
-                yield yield_safe_sse_event("answer", answer_brick)
+                yield sse.emit("answer", answer_brick)
                 logger.info(f"📝 [STREAM][{trace_id}] Emitted answer event ({len(raw_llm_text)} chars)")
             
             if execution_response.artifact_block:
@@ -1173,7 +1132,7 @@ async def stream_lyo2_chat(
 
                 # Safe JSON serialization using the new helper
                 artifact_event_data = {'type': 'artifact', 'block': tagged_artifact.model_dump()}
-                yield yield_safe_sse_event("artifact", artifact_event_data)
+                yield sse.emit("artifact", artifact_event_data)
 
             # Unified SmartBlock emission: same content as the legacy
             # answer/artifact events above, in the versioned block vocabulary
@@ -1182,7 +1141,7 @@ async def stream_lyo2_chat(
                 raw_llm_text, execution_response.artifact_block
             )
             if smart_blocks:
-                yield yield_safe_sse_event(
+                yield sse.emit(
                     "smart_blocks", {"type": "smart_blocks", "blocks": smart_blocks}
                 )
 
@@ -1250,8 +1209,7 @@ async def stream_lyo2_chat(
                         "priority": 0
                     }
                 }
-                collected_bricks.append(oc_brick)
-                yield f"data: {json.dumps(oc_brick)}\n\n"
+                yield sse.emit("open_classroom", oc_brick)
                 
             # Emit v1 actions event
             action_labels = []
@@ -1263,27 +1221,8 @@ async def stream_lyo2_chat(
                     "type": "actions",
                     "blocks": [{"type": "CTARow", "content": {"actions": action_labels}, "priority": 0}]
                 }
-                collected_bricks.append(actions_brick)
-                yield f"data: {json.dumps(actions_brick)}\n\n"
+                yield sse.emit("actions", actions_brick)
             
-            # --- Cache the full response (Phase 17) ---
-            if (
-                not authenticated_user_id
-                and 'cache_key' in locals()
-                and cache_key
-                and collected_bricks
-            ):
-                try:
-                    await ai_performance_optimizer.cache_manager.set(
-                        "full_response", 
-                        key=cache_key, 
-                        value=collected_bricks,
-                        expire=3600 * 12 # Cache for 12 hours
-                    )
-                    logger.info(f"💾 [STREAM][{trace_id}] Persisted full response to cache.")
-                except Exception as e:
-                    logger.warning(f"⚠️ Cache save failed: {e}")
-
             if persistent_conversation and raw_llm_text:
                 await conversation_store.add_message(
                     db,
@@ -1295,13 +1234,13 @@ async def stream_lyo2_chat(
                 )
 
             # Completion signal
-            yield "data: [DONE]\n\n"
+            yield DONE_FRAME
             logger.info(f"🏁 [STREAM][{trace_id}] Total session time: {time.time()-start_time:.2f}s")
 
         except Exception as e:
             logger.error(f"💥 [STREAM][{trace_id}] Critical failure: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse.emit("error", {'type': 'error', 'message': str(e)})
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -64,6 +64,8 @@ async def lifespan(app: FastAPI):
         ai_components['feed_algorithm'] = None
         ai_components['ai_orchestrator'] = None
         yield
+        from .core.batch_writer import batch_writer
+        await batch_writer.stop()
         logging.info("👋 Lyo Backend shutdown complete (lightweight)")
         return
 
@@ -137,11 +139,22 @@ async def lifespan(app: FastAPI):
         logging.info("✅ Database initialized successfully")
     except Exception as e:
         logging.error(f"❌ Database initialization failed: {e}")
+
+    # Learning events are processed off the request path
+    from .events.bus import outbox_dispatcher
+    from .events import processor  # noqa: F401 - registers the learning event handler
+    outbox_dispatcher.start()
     
     yield
     
     # Shutdown
     logging.info("🔄 Shutting down Lyo Backend...")
+
+    await outbox_dispatcher.stop()
+
+    # Drain buffered usage/telemetry rows
+    from .core.batch_writer import batch_writer
+    await batch_writer.stop()
     
     if ai_components.get('redis'):
         await ai_components['redis'].close()
@@ -136,7 +136,7 @@ async def get_api_key_org(
     client_id = f"org:{api_key_obj.organization_id}"
     limit = api_key_obj.organization.rate_limit_per_minute
     
-    is_allowed, rate_info = rate_limiter.is_allowed(
+    is_allowed, rate_info = await rate_limiter.is_allowed(
         client_id=client_id,
         endpoint="api",  # Generic endpoint for API key usage
         limit_override=limit
@@ -13,7 +13,7 @@ from sqlalchemy import select
 from lyo_app.core.database import get_async_session
 from lyo_app.models.enhanced import User
 from lyo_app.auth.email_service import EmailService
-from lyo_app.auth.security import hash_password, verify_password
+from lyo_app.auth.password_hashing import password_hasher
 from lyo_app.auth.schemas import (
     EmailVerificationRequest,
     EmailVerificationResponse,
@@ -22,6 +22,7 @@ from lyo_app.auth.schemas import (
     MessageResponse
 )
 from lyo_app.core.logging import get_logger
+from lyo_app.core.problems import ProblemDetail
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/v1/auth", tags=["Email Verification"])
@@ -174,7 +175,7 @@ async def confirm_password_reset(
             )
         
         # Update user password
-        user.hashed_password = hash_password(reset_data.new_password)
+        user.hashed_password = await password_hasher.hash(reset_data.new_password)
         user.updated_at = datetime.utcnow()
         
         # Mark token as used
@@ -188,7 +189,7 @@ async def confirm_password_reset(
             message="Password reset successfully"
         )
         
-    except HTTPException:
+    except (HTTPException, ProblemDetail):
         raise
     except Exception as e:
         logger.error(f"Password reset confirmation failed: {e}")
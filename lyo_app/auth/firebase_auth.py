@@ -216,7 +216,8 @@ class FirebaseAuthService:
             Tuple of (user, token)
         """
         from lyo_app.auth.models import User
-        from lyo_app.auth.security import create_access_token, hash_password
+        from lyo_app.auth.password_hashing import password_hasher
+        from lyo_app.auth.security import create_access_token
         from lyo_app.auth.schemas import Token
         import secrets
         
@@ -265,7 +266,7 @@ class FirebaseAuthService:
             user = User(
                 email=email or f"{firebase_uid}@firebase.local",
                 username=username,
-                hashed_password=hash_password(secrets.token_urlsafe(32)),
+                hashed_password=await password_hasher.hash(secrets.token_urlsafe(32)),
                 first_name=first_name,
                 last_name=last_name,
                 firebase_uid=firebase_uid,
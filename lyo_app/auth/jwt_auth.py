@@ -2,19 +2,22 @@
 
 import jwt
 import json
+import os
 import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from lyo_app.core.settings import settings
 from lyo_app.core.problems import AuthenticationProblem, AuthorizationProblem
 from lyo_app.core.database import get_db
 from lyo_app.auth.models import User
-from lyo_app.auth.jwt_cache import JWTCache
+from lyo_app.auth.jwt_cache import JWTCache, RedisRevocationBus, RevocationBus, revoke_event, revoke_user_event
+from lyo_app.auth.password_hashing import password_hasher
+from lyo_app.auth.principal import Principal, principal_cache
 from lyo_app.core.logging import logger
 
 # Lazy import for redis_manager to avoid startup issues
@@ -36,14 +39,62 @@ def _get_redis_manager():
     return _redis_manager
 
 
-# Password hashing - Using pbkdf2_sha256 for better platform compatibility
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+# Password hashing - pbkdf2_sha256, run off the event loop by password_hasher
+pwd_context = password_hasher.context
 
 # JWT bearer token extraction
 security = HTTPBearer(auto_error=False)
 
-# Initialize JWT Cache
-jwt_cache = JWTCache(ttl=300)  # 5 minutes cache
+# Verified access-token payloads: 5 minutes at most, bounded in size
+jwt_cache = JWTCache(
+    ttl=300,
+    max_entries=int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000")),
+    max_token_lifetime=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+# In-process until start_revocation_bus() swaps in Redis fan-out
+revocation_bus: RevocationBus = RevocationBus()
+revocation_bus.subscribe(jwt_cache)
+revocation_bus.subscribe(principal_cache)
+principal_cache.bus = revocation_bus
+
+
+async def start_revocation_bus(redis_url: Optional[str]) -> None:
+    """Receive logout/password-change revocations from every worker over Redis."""
+    global revocation_bus
+    if not redis_url or isinstance(revocation_bus, RedisRevocationBus):
+        return
+    bus = RedisRevocationBus(redis_url)
+    bus.subscribe(jwt_cache)
+    bus.subscribe(principal_cache)
+    try:
+        await bus.start()
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"JWT revocation fan-out unavailable, revoking in this worker only: {e}")
+        await bus.stop()
+        return
+    revocation_bus = principal_cache.bus = bus
+
+
+async def stop_revocation_bus() -> None:
+    await revocation_bus.stop()
+
+
+async def revoke_token(token: str) -> None:
+    """Revoke one access token (logout) in every worker until it expires."""
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM], options={"verify_exp": False}
+        )
+    except jwt.InvalidTokenError:
+        return
+    await revocation_bus.publish(revoke_event(token, payload.get("exp")))
+
+
+async def revoke_user_tokens(user_id: Any) -> None:
+    """Revoke every access token issued to ``user_id`` so far (password change)."""
+    await revocation_bus.publish(revoke_user_event(user_id, float(int(time.time()))))
+
 
 class TokenData:
     """Token payload data structure."""
@@ -56,13 +107,13 @@ class TokenData:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a plain password against its hash (blocking; see password_hasher)."""
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash."""
-    return pwd_context.hash(password)
+    """Generate password hash (blocking; see password_hasher)."""
+    return password_hasher.hash_sync(password)
 
 
 def create_access_token(user_id: str, additional_claims: Optional[Dict[str, Any]] = None) -> str:
@@ -162,6 +213,8 @@ async def verify_token_async(token: str, expected_type: str = "access") -> Token
         
         # Cache successful validation for access tokens
         if expected_type == "access":
+            if jwt_cache.is_revoked(token, payload):
+                raise AuthenticationProblem("Token has been revoked")
             jwt_cache.set(token, payload)
         
         return TokenData(
@@ -233,7 +286,8 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     if not user.is_active:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
         # DISABLED: login_attempts column does not exist in production DB
         # user.login_attempts += 1
         
@@ -249,6 +303,9 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     #     user.login_attempts = 0
     #     user.locked_until = None
     
+    if new_hash:
+        user.hashed_password = new_hash  # stored with outdated parameters
+    
     # Model field is 'last_login' in auth/models.py, but code used 'last_login_at'
     user.last_login = datetime.utcnow()
     await db.commit()
@@ -264,16 +321,17 @@ def check_account_locked(user: User) -> bool:
     return False
 
 
-async def get_current_user(
+async def get_current_principal(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
-    Dependency to get current authenticated user.
+    Dependency to get the current authenticated principal.
+    
+    Served from ``principal_cache``, so a warm request makes no database
+    query. Use this instead of ``get_current_user`` when the handler only
+    needs the id and account flags.
     
-    Returns:
-        User object for authenticated user
-        
     Raises:
         AuthenticationProblem: If no valid token provided
         AuthorizationProblem: If user not found or inactive
@@ -286,19 +344,45 @@ async def get_current_user(
     token_data = await verify_token_async(token, "access")
     
     # Convert user_id from string (JWT) to int (database)
-    user_id_int = int(token_data.user_id)
-    result = await db.execute(select(User).where(User.id == user_id_int))
-    user = result.scalars().first()
+    principal = await principal_cache.get(db, int(token_data.user_id))
     
-    if not user:
+    if not principal:
         raise AuthorizationProblem("User not found")
     
-    if not user.is_active:
+    if not principal.is_active:
         raise AuthorizationProblem("Account is inactive")
     
-    if check_account_locked(user):
+    if check_account_locked(principal):
         raise AuthorizationProblem("Account is temporarily locked due to failed login attempts")
     
+    return principal
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Dependency to get current authenticated user.
+    
+    Returns:
+        User object for authenticated user
+        
+    Raises:
+        AuthenticationProblem: If no valid token provided
+        AuthorizationProblem: If user not found or inactive
+    """
+    principal = await get_current_principal(credentials, db)
+    user = await principal.load(db)
+    
+    if not user:
+        raise AuthorizationProblem("User not found")
+    
+    # The cached principal can be stale (see lyo_app.auth.principal); the row is not
+    if not user.is_active:
+        await principal_cache.invalidate(user.id)
+        raise AuthorizationProblem("Account is inactive")
+    
     return user
 
 
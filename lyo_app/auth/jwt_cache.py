@@ -1,28 +1,229 @@
+"""
+Verified-JWT cache with revocation fan-out.
+
+``JWTCache`` remembers decoded access-token payloads so repeat requests skip
+signature verification. Entries are keyed by a SHA-256 digest of the token
+(32 bytes instead of the whole token string), bounded by ``max_entries``
+with LRU eviction, and live for ``min(ttl, token exp)`` so a payload is
+never served after its token has expired.
+
+Revocations (logout, password change) go through a ``RevocationBus``. Every
+worker subscribes its cache to the bus and applies each event locally: the
+cached entry is dropped, and a tombstone makes later verifications of the
+same token (or, for a user event, of that user's older tokens) fail until
+the token would have expired anyway. ``RevocationBus`` itself delivers
+in-process only, which is what tests and single-worker runs need;
+``RedisRevocationBus`` fans events out to every worker over Redis pub/sub.
+Tombstones live in memory, so a worker started after an event does not see it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "auth:jwt_revocations"
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 
 class JWTCache:
-    """Simple in-memory cache for JWT tokens."""
-    
-    def __init__(self, ttl: int = 300):
+    """Size-bounded, expiry-aware LRU of verified token payloads."""
+
+    def __init__(
+        self,
+        ttl: int = 300,
+        max_entries: int = 10_000,
+        max_token_lifetime: int = 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
         self.ttl = ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        
+        self.max_entries = max_entries
+        self.max_token_lifetime = max_token_lifetime  # how long a user cutoff can matter
+        self.clock = clock
+        self._cache: "OrderedDict[bytes, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._revoked: "OrderedDict[bytes, float]" = OrderedDict()  # digest -> token exp
+        self._user_cutoffs: Dict[str, float] = {}  # user_id -> tokens issued before are revoked
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
     def get(self, token: str) -> Optional[Dict[str, Any]]:
-        if token in self._cache:
-            entry = self._cache[token]
-            if time.time() < entry["expires"]:
-                return entry["data"]
-            else:
-                del self._cache[token]
-        return None
-        
-    def set(self, token: str, data: Dict[str, Any]):
-        self._cache[token] = {
-            "data": data,
-            "expires": time.time() + self.ttl
+        digest = token_digest(token)
+        entry = self._cache.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.clock() >= entry[0]:
+            del self._cache[digest]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._cache.move_to_end(digest)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        expires = self.clock() + self.ttl
+        if payload.get("exp") is not None:
+            expires = min(expires, float(payload["exp"]))
+        digest = token_digest(token)
+        self._cache[digest] = (expires, str(payload.get("user_id")), payload)
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, token: str) -> None:
+        self._cache.pop(token_digest(token), None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._revoked.clear()
+        self._user_cutoffs.clear()
+
+    def is_revoked(self, token: str, payload: Dict[str, Any]) -> bool:
+        """Whether a (validly signed) token was revoked by an event this worker has seen."""
+        if self._revoked and token_digest(token) in self._revoked:
+            return True
+        cutoff = self._user_cutoffs.get(str(payload.get("user_id")))
+        return cutoff is not None and float(payload.get("iat") or 0) < cutoff
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Apply a revocation event (see ``revoke_event`` / ``revoke_user_event``)."""
+        now = self.clock()
+        if event.get("kind") == "token":
+            digest = bytes.fromhex(event["digest"])
+            self._cache.pop(digest, None)
+            self._revoked[digest] = float(event.get("exp") or now + self.max_token_lifetime)
+            self._revoked.move_to_end(digest)
+            while self._revoked and (len(self._revoked) > self.max_entries or next(iter(self._revoked.values())) <= now):
+                self._revoked.popitem(last=False)
+        elif event.get("kind") == "user":
+            user_id = str(event["user_id"])
+            self._user_cutoffs[user_id] = max(self._user_cutoffs.get(user_id, 0.0), float(event["before"]))
+            for digest in [d for d, entry in self._cache.items() if entry[1] == user_id]:
+                del self._cache[digest]
+            stale = now - self.max_token_lifetime
+            for uid in [u for u, cutoff in self._user_cutoffs.items() if cutoff < stale]:
+                del self._user_cutoffs[uid]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "revoked_tokens": len(self._revoked),
+            "revoked_users": len(self._user_cutoffs),
         }
-        
-    def invalidate(self, token: str):
-        if token in self._cache:
-            del self._cache[token]
+
+
+def revoke_event(token: str, exp: Optional[float]) -> Dict[str, Any]:
+    return {"kind": "token", "digest": token_digest(token).hex(), "exp": exp}
+
+
+def revoke_user_event(user_id: Any, before: float) -> Dict[str, Any]:
+    return {"kind": "user", "user_id": str(user_id), "before": before}
+
+
+class RevocationBus:
+    """In-process revocation delivery: ``publish`` applies to every subscribed cache."""
+
+    def __init__(self):
+        self._caches: List[JWTCache] = []
+
+    def subscribe(self, cache: JWTCache) -> None:
+        if cache not in self._caches:
+            self._caches.append(cache)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for cache in self._caches:
+            cache.apply(event)
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        self._deliver(event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class RedisRevocationBus(RevocationBus):
+    """
+    Revocation delivery to every worker over a Redis pub/sub channel.
+
+    Events are applied locally before publishing, so the revoking worker
+    never depends on Redis; the echo it receives back is a no-op.
+    """
+
+    def __init__(self, redis_url: str, channel: str = REVOCATION_CHANNEL):
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel = channel
+        self._redis = None
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.redis_url)
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(), name="jwt_revocation_listener")
+        logger.info(f"JWT revocations subscribed on {self.channel}")
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        self._deliver(event)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, json.dumps(event))
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Failed to publish JWT revocation: {e}")
+
+    async def _listen(self) -> None:
+        try:
+            async for message in self._pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    self._deliver(json.loads(message["data"]))
+                except Exception as e:  # noqa: BLE001
+                    logger.error(f"Bad JWT revocation message: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"JWT revocation listener stopped: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.close()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
@@ -0,0 +1,140 @@
+"""
+Off-loop password hashing.
+
+pbkdf2/bcrypt take tens of milliseconds per call by design. Run inline in
+an async handler they stall the event loop, and with it every other request
+on the worker (streaming responses included) for the length of each login.
+
+``password_hasher`` runs the KDF in a dedicated thread pool instead (both
+hashlib's pbkdf2 and bcrypt release the GIL while they work, so threads
+give real parallelism without a process pool's fork/pickle costs):
+
+* ``PASSWORD_HASH_WORKERS`` threads (default: CPU count, at most 4) and at
+  most ``PASSWORD_HASH_QUEUE`` calls waiting behind them. Past that a call
+  fails at once with ``ServiceOverloadedProblem`` (503 + Retry-After)
+  instead of queueing work the client will have given up on.
+* ``verify_and_update`` also reports a replacement hash when the stored one
+  uses a deprecated scheme (bcrypt) or fewer pbkdf2 rounds than the current
+  ``PASSWORD_PBKDF2_ROUNDS``; login handlers store it, so raising the cost
+  upgrades existing users as they sign in.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from lyo_app.core.forksafe import register_after_fork
+from lyo_app.core.problems import ServiceOverloadedProblem
+
+logger = logging.getLogger(__name__)
+
+PBKDF2_ROUNDS = int(os.getenv("PASSWORD_PBKDF2_ROUNDS", "29000"))
+
+
+def build_context(rounds: int = PBKDF2_ROUNDS) -> CryptContext:
+    # bcrypt stays verifiable for older accounts but is deprecated, as are
+    # pbkdf2 hashes below the current round count
+    return CryptContext(
+        schemes=["pbkdf2_sha256", "bcrypt"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+    )
+
+
+def _bcrypt_safe(password: str) -> str:
+    """bcrypt only reads the first 72 bytes (newer versions raise instead)."""
+    return password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
+
+
+class PasswordHashingService:
+    """Bounded thread pool for KDF work; see module docstring."""
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int, retry_after: int = 1):
+        self.context = context
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.completed = 0
+        self.shed = 0
+        self.rehashed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-kdf")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool, or shed with a 503 when it is saturated."""
+        if self._pending >= self.max_pending:
+            self.shed += 1
+            raise ServiceOverloadedProblem("Too many sign-ins in progress", retry_after=self.retry_after)
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def hash_sync(self, password: str) -> str:
+        return self.context.hash(password)
+
+    def verify_and_update_sync(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        if not hashed:
+            return False, None
+        try:
+            if hashed.startswith("$2"):
+                password = _bcrypt_safe(password)
+            ok, new_hash = self.context.verify_and_update(password, hashed)
+            if not ok and len(password.encode("utf-8")) > 72:
+                # Hashes made by the old hash_password, which truncated for every scheme
+                ok, new_hash = self.context.verify_and_update(_bcrypt_safe(password), hashed)
+                new_hash = new_hash or (self.context.hash(password) if ok else None)
+        except ValueError as e:  # unknown or malformed stored hash
+            logger.warning(f"Unverifiable password hash: {e}")
+            return False, None
+        return ok, new_hash
+
+    def verify_sync(self, password: str, hashed: Optional[str]) -> bool:
+        return self.verify_and_update_sync(password, hashed)[0]
+
+    async def hash(self, password: str) -> str:
+        return await self.run(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        return (await self.run(self.verify_and_update_sync, password, hashed))[0]
+
+    async def verify_and_update(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """``(matches, new_hash)``; ``new_hash`` is set when the stored hash should be replaced."""
+        ok, new_hash = await self.run(self.verify_and_update_sync, password, hashed)
+        if new_hash:
+            self.rehashed += 1
+        return ok, new_hash
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "shed": self.shed,
+            "rehashed": self.rehashed,
+        }
+
+    def reset_after_fork(self) -> None:
+        self._executor = None  # the parent's threads do not exist in the child
+        self._pending = 0
+
+
+password_hasher = PasswordHashingService(
+    build_context(),
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PASSWORD_HASH_QUEUE", "32")),
+)
+register_after_fork(password_hasher.reset_after_fork)
@@ -0,0 +1,213 @@
+"""
+Cached principal resolution for authenticated requests.
+
+``get_current_user`` used to load the full ``User`` row on every request
+just to check ``is_active``. Most handlers only read ``current_user.id``.
+A ``Principal`` is a frozen snapshot of the fields authorization needs,
+served from ``principal_cache``:
+
+* L1: a per-process LRU with a short TTL (``PRINCIPAL_CACHE_TTL``, 30s).
+* L2: Redis (``principal:<id>``, ``PRINCIPAL_SHARED_TTL``, 300s) when
+  ``redis_client`` is connected, so one worker's load serves the others.
+
+A miss costs one slim column query, not a full ORM load. Handlers that
+need the ORM object call ``await principal.load(db)``.
+
+Committed changes to a snapshotted field (deactivation, verification,
+superuser flag, email, username) and to the password hash are detected by
+a session hook. Deletes are detected too. The hook drops the user from
+this process's L1 at once, then deletes the L2 key and publishes a
+``principal`` event on the revocation bus, so every worker drops its L1 entry.
+
+The hook only sees ORM objects flushed through a session. Bulk
+``update(User)``/``delete(User)`` statements and raw SQL bypass it: call
+``principal_cache.invalidate(user_id)`` after them, or the old snapshot is
+served until its TTL runs out. ``get_current_user`` re-checks ``is_active``
+on the row it loads and drops a stale principal itself.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from lyo_app.auth.models import User
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATING = ("is_active", "is_verified", "is_superuser", "email", "username", "hashed_password")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as authorization sees it."""
+
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_verified: bool
+    is_superuser: bool
+
+    COLUMNS = (User.id, User.email, User.username, User.is_active, User.is_verified, User.is_superuser)
+
+    async def load(self, db: AsyncSession) -> Optional[User]:
+        """The full ``User`` row, for handlers that need more than the snapshot."""
+        return await db.get(User, self.id)
+
+
+class PrincipalCache:
+    """Two-level ``Principal`` cache keyed by user id (see module docstring)."""
+
+    def __init__(
+        self,
+        ttl: float = 30,
+        shared_ttl: int = 300,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.shared_ttl = shared_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.bus = None  # RevocationBus; set by lyo_app.auth.jwt_auth
+        self._l1: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = {"l1": 0, "l2": 0}
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._l1)
+
+    def _redis(self):
+        try:
+            from lyo_app.core.redis_client import redis_client
+        except ImportError:
+            return None
+        return redis_client.client
+
+    def _remember(self, principal: Principal) -> None:
+        self._l1[principal.id] = (self.clock() + self.ttl, principal)
+        self._l1.move_to_end(principal.id)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """The user's principal, or None if the user does not exist."""
+        entry = self._l1.get(user_id)
+        if entry is not None and self.clock() < entry[0]:
+            self._l1.move_to_end(user_id)
+            self.hits["l1"] += 1
+            return entry[1]
+
+        principal = await self._l2_get(user_id)
+        if principal is not None:
+            self.hits["l2"] += 1
+            self._remember(principal)
+            return principal
+
+        self.misses += 1
+        row = (await db.execute(select(*Principal.COLUMNS).where(User.id == user_id))).first()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        self._remember(principal)
+        await self._l2_set(principal)
+        return principal
+
+    async def _l2_get(self, user_id: int) -> Optional[Principal]:
+        redis = self._redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(f"principal:{user_id}")
+            return Principal(**json.loads(raw)) if raw else None
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Principal cache read failed: {e}")
+            return None
+
+    async def _l2_set(self, principal: Principal) -> None:
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(f"principal:{principal.id}", json.dumps(asdict(principal)), ex=self.shared_ttl)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Principal cache write failed: {e}")
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Revocation-bus events: drop the affected user's L1 entry."""
+        if event.get("kind") in ("principal", "user"):
+            self._l1.pop(int(event["user_id"]), None)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Forget ``user_id`` in every worker and in the shared tier."""
+        self._l1.pop(user_id, None)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.delete(f"principal:{user_id}")
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Principal cache delete failed: {e}")
+        if self.bus is not None:
+            await self.bus.publish({"kind": "principal", "user_id": str(user_id)})
+
+    def invalidate_soon(self, user_ids: Set[int]) -> None:
+        """``invalidate`` from synchronous code: L1 now, the rest on the running loop."""
+        for user_id in user_ids:
+            self._l1.pop(user_id, None)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for user_id in user_ids:
+            task = loop.create_task(self.invalidate(user_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def clear(self) -> None:
+        self._l1.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._l1), "l1_hits": self.hits["l1"], "l2_hits": self.hits["l2"], "misses": self.misses}
+
+
+principal_cache = PrincipalCache(
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "30")),
+    shared_ttl=int(os.getenv("PRINCIPAL_SHARED_TTL", "300")),
+)
+
+_PENDING_KEY = "principal_cache_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_principal_changes(session: Session, flush_context) -> None:
+    changed = set()
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _INVALIDATING):
+                changed.add(obj.id)
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_changes(session: Session) -> None:
+    changed = session.info.pop(_PENDING_KEY, None)
+    if changed:
+        principal_cache.invalidate_soon(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -16,6 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from lyo_app.core.database import get_db
 from lyo_app.auth.models import User
+from lyo_app.auth.password_hashing import password_hasher
 from lyo_app.core.errors import AuthenticationError, AuthorizationError
 from lyo_app.core.config import settings
 
@@ -130,7 +131,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     if not user:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.run(verify_password, password, user.hashed_password):
         return None
     
     if not user.is_active:
@@ -233,7 +234,7 @@ class AuthService:
                 raise HTTPException(status_code=409, detail="Username already taken")
         
         # Create user
-        hashed_password = hash_password(password)
+        hashed_password = await password_hasher.run(hash_password, password)
         user = User(
             email=email,
             username=username,
@@ -323,10 +324,10 @@ class AuthService:
     
     async def change_password(self, user: User, old_password: str, new_password: str) -> bool:
         """Change user password."""
-        if not verify_password(old_password, user.hashed_password):
+        if not await password_hasher.run(verify_password, old_password, user.hashed_password):
             raise AuthenticationError("Current password is incorrect")
         
-        user.hashed_password = hash_password(new_password)
+        user.hashed_password = await password_hasher.run(hash_password, new_password)
         user.updated_at = datetime.utcnow()
         
         await self.db.commit()
@@ -17,6 +17,7 @@ from lyo_app.auth.schemas import UserCreate, UserLogin, UserRead, Token, LoginRe
 from lyo_app.auth.service import AuthService
 from lyo_app.auth.security import verify_token
 from lyo_app.core.database import get_db
+from lyo_app.core.problems import ProblemDetail
 from lyo_app.core.rate_limiter import RedisRateLimiter
 
 # Security scheme for API Key
@@ -123,7 +124,7 @@ async def get_current_user(
             
             # User not found - auto-create from Firebase data
             from lyo_app.models.enhanced import User
-            from lyo_app.auth.security import hash_password
+            from lyo_app.auth.password_hashing import password_hasher
             import secrets
             import logging
             logger = logging.getLogger(__name__)
@@ -148,7 +149,7 @@ async def get_current_user(
             new_user = User(
                 email=email or f"{firebase_uid}@firebase.local",
                 username=username,
-                hashed_password=hash_password(secrets.token_urlsafe(32)),
+                hashed_password=await password_hasher.hash(secrets.token_urlsafe(32)),
                 first_name=first_name,
                 last_name=last_name,
                 firebase_uid=firebase_uid,
@@ -162,6 +163,8 @@ async def get_current_user(
             logger.info(f"Created user id={new_user.id} for Firebase uid={firebase_uid}")
             return UserRead.model_validate(new_user)
             
+    except ProblemDetail:
+        raise  # e.g. password hashing overloaded: a 503, not bad credentials
     except ValueError as e:
         # Firebase token verification failed
         import logging
@@ -205,7 +208,7 @@ async def register_user(
     """
     # Apply rate limiting
     client_id = auth_rate_limiter.get_secure_client_id(request)
-    is_allowed, rate_info = auth_rate_limiter.is_allowed(client_id, "auth:register")
+    is_allowed, rate_info = await auth_rate_limiter.is_allowed(client_id, "auth:register")
     if not is_allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -231,6 +234,8 @@ async def register_user(
             is_new_user=True,
             tenant_id=str(user.id)
         )
+    except ProblemDetail:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -270,7 +275,7 @@ async def login_user(
     """
     # Apply rate limiting
     client_id = auth_rate_limiter.get_secure_client_id(request)
-    is_allowed, rate_info = auth_rate_limiter.is_allowed(client_id, "auth:login")
+    is_allowed, rate_info = await auth_rate_limiter.is_allowed(client_id, "auth:login")
     if not is_allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -372,7 +377,7 @@ async def get_user(
 # ============================================================================
 
 from pydantic import BaseModel, Field
-from lyo_app.auth.security import verify_password, hash_password
+from lyo_app.auth.password_hashing import password_hasher
 
 
 class ChangePasswordRequest(BaseModel):
@@ -425,15 +430,20 @@ async def change_password(
         )
     
     # Verify current password
-    if not verify_password(request.current_password, user.hashed_password):
+    if not await password_hasher.verify(request.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
-    # Update password
-    user.hashed_password = hash_password(request.new_password)
+    # Update password; refresh tokens issued before the change go with it
+    user.hashed_password = await password_hasher.hash(request.new_password)
+    await auth_service.revoke_refresh_tokens(db, user.id)
     await db.commit()
+
+    # Access tokens issued before the change are rejected in every worker
+    from lyo_app.auth.jwt_auth import revoke_user_tokens
+    await revoke_user_tokens(user.id)
     
     return {"message": "Password changed successfully"}
 
@@ -459,7 +469,7 @@ async def delete_account(
         )
     
     # Verify password
-    if not verify_password(request.password, user.hashed_password):
+    if not await password_hasher.verify(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Password is incorrect"
@@ -522,18 +532,17 @@ async def update_profile(
 
 @router.post("/logout")
 async def logout(
-    current_user: Annotated[UserRead, Depends(get_current_user)]
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
 ):
     """
     Log out the current user.
     
-    Note: Since we use JWT tokens, logout is primarily client-side.
-    This endpoint can be used to invalidate refresh tokens in the future.
+    Revokes the presented access token in every worker; the client should
+    still delete its tokens.
     """
-    # In a production system, you would:
-    # 1. Add the token to a blacklist
-    # 2. Invalidate refresh tokens
-    # For now, return success (client should delete tokens)
+    from lyo_app.auth.jwt_auth import revoke_token
+    await revoke_token(credentials.credentials)
     return {"message": "Logged out successfully"}
 
 
@@ -587,7 +596,7 @@ async def authenticate_with_firebase(
     
     # Apply rate limiting
     client_id = auth_rate_limiter.get_secure_client_id(request)
-    is_allowed, rate_info = auth_rate_limiter.is_allowed(client_id, "auth:firebase")
+    is_allowed, rate_info = await auth_rate_limiter.is_allowed(client_id, "auth:firebase")
     if not is_allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -622,6 +631,8 @@ async def authenticate_with_firebase(
             tenant_id=str(user.id)  # User's tenant for SaaS isolation
         )
         
+    except ProblemDetail:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
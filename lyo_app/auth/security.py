@@ -7,28 +7,17 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-
+from lyo_app.auth.password_hashing import password_hasher
 from lyo_app.core.config import settings
 
 
-# Password hashing context
-# Must accept every scheme jwt_auth.pwd_context produces: registration hashes
-# with pbkdf2_sha256 there, and a bcrypt-only context raises UnknownHashError
-# on login for those users.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
-
-
-def _bcrypt_safe(password: str) -> str:
-    """bcrypt only reads the first 72 bytes; newer bcrypt versions raise instead
-    of truncating. Truncate explicitly (standard practice) so hashing and
-    verification stay consistent."""
-    return password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
+# Password hashing context, shared with jwt_auth and the off-loop hasher
+pwd_context = password_hasher.context
 
 
 def hash_password(password: str) -> str:
     """
-    Hash a password using bcrypt.
+    Hash a password (blocking; async code should use ``password_hasher.hash``).
     
     Args:
         password: Plain text password to hash
@@ -36,12 +25,13 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return pwd_context.hash(_bcrypt_safe(password))
+    return password_hasher.hash_sync(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verify a password against its hash.
+    Verify a password against its hash (blocking; async code should use
+    ``password_hasher.verify``).
     
     Args:
         plain_password: Plain text password to verify
@@ -50,7 +40,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(_bcrypt_safe(plain_password), hashed_password)
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -6,7 +6,7 @@ Handles user registration, login, and user management operations with RBAC integ
 from datetime import datetime, timedelta
 from typing import Optional
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
@@ -15,7 +15,8 @@ from lyo_app.models.enhanced import User
 from lyo_app.auth.rbac import Role, RoleType
 from lyo_app.auth.models import RefreshToken as RefreshTokenModel
 from lyo_app.auth.schemas import UserCreate, UserLogin, Token
-from lyo_app.auth.jwt_auth import create_access_token, create_refresh_token, verify_token_async, get_password_hash, verify_password
+from lyo_app.auth.jwt_auth import create_access_token, create_refresh_token, verify_token_async
+from lyo_app.auth.password_hashing import password_hasher
 from lyo_app.auth.rbac_service import RBACService
 from lyo_app.auth.security_middleware import InputValidator
 from lyo_app.core.config import settings
@@ -61,7 +62,7 @@ class AuthService:
             raise ValueError("Username already taken")
         
         # Hash the password
-        hashed_password = get_password_hash(password)
+        hashed_password = await password_hasher.hash(password)
         
         # Create user with validated data
         user = User(
@@ -132,8 +133,11 @@ class AuthService:
             raise ValueError("Invalid credentials")
         
         # Verify password
-        if not verify_password(login_data.password, user.hashed_password):
+        verified, new_hash = await password_hasher.verify_and_update(login_data.password, user.hashed_password)
+        if not verified:
             raise ValueError("Invalid credentials")
+        if new_hash:
+            user.hashed_password = new_hash  # stored with outdated parameters; committed below
         
         # Check if user is active
         if not user.is_active:
@@ -243,6 +247,20 @@ class AuthService:
             expires_in=jwt_settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
 
+    async def revoke_refresh_tokens(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Revoke every stored refresh token of a user (committed by the caller).
+        
+        Args:
+            db: Database session
+            user_id: User whose refresh tokens are revoked
+        """
+        await db.execute(
+            update(RefreshTokenModel)
+            .where(RefreshTokenModel.user_id == user_id, RefreshTokenModel.is_revoked == False)
+            .values(is_revoked=True)
+        )
+
     async def get_user_by_id(self, db: AsyncSession, user_id: int, include_roles: bool = True) -> Optional[User]:
         """
         Get user by ID with optional role loading.
@@ -25,7 +25,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from lyo_app.core.database import get_db
+from lyo_app.core.database import get_analytics_db, get_db
 from lyo_app.auth.jwt_auth import get_current_user, get_optional_current_user
 from lyo_app.models.enhanced import User
 from lyo_app.chat.models import ChatMode, ChatMessage, ChatConversation
@@ -1450,7 +1450,7 @@ async def track_cta_click(
 async def get_telemetry_stats(
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
     days: int = Query(7, ge=1, le=90, description="Number of days to include"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_analytics_db)
 ):
     """
     Get telemetry statistics.
@@ -1491,7 +1491,7 @@ async def get_telemetry_stats(
 
 @router.get("/telemetry/summary")
 async def get_telemetry_summary(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_analytics_db)
 ):
     """
     Get a quick telemetry summary for the last 24 hours.
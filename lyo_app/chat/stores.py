@@ -22,6 +22,7 @@ from lyo_app.chat.models import (
     ChatCourse, ChatNote, ChatConversation, ChatMessage,
     ChatTelemetry, ChatMode, ChipAction, ChatHighlight
 )
+from lyo_app.core.batch_writer import batch_writer
 from lyo_app.core.cache_manager import IntelligentCacheManager, CacheConfig, CacheStrategy
 
 logger = logging.getLogger(__name__)
@@ -753,10 +754,6 @@ class ResponseCache:
 class TelemetryStore:
     """Store for recording and querying telemetry events"""
     
-    def __init__(self):
-        self._buffer: List[Dict] = []
-        self._buffer_size = 100
-    
     async def record(
         self,
         db: AsyncSession,
@@ -773,8 +770,13 @@ class TelemetryStore:
         latency_ms: Optional[int] = None,
         metadata: Optional[Dict] = None
     ) -> ChatTelemetry:
-        """Record a telemetry event"""
-        event = ChatTelemetry(
+        """
+        Record a telemetry event.
+
+        The row is queued on the write-behind ``batch_writer`` rather than
+        committed on ``db``; the returned event is transient.
+        """
+        values = dict(
             id=str(uuid4()),
             event_type=event_type,
             user_id=user_id,
@@ -787,13 +789,10 @@ class TelemetryStore:
             cta_clicked=cta_clicked,
             chip_action_used=chip_action_used,
             latency_ms=latency_ms,
-            metadata=metadata
+            extra_data=metadata
         )
-        
-        db.add(event)
-        await db.commit()
-        
-        return event
+        batch_writer.submit(ChatTelemetry, **values)
+        return ChatTelemetry(**values)
     
     async def get_stats(
         self,
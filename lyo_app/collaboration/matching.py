@@ -0,0 +1,253 @@
+"""
+Study-group matching over cached per-subject candidate snapshots.
+
+``find_suitable_groups`` used to load every active public group in a
+subject with all of its memberships, score the groups one by one and keep
+the top 10 after sorting everything. Here:
+
+* ``GroupCandidates.load`` is one query: active, public groups in the
+  subject with their active-member count from a grouped subquery, full
+  groups dropped in SQL, memberships never loaded. The result is kept as
+  arrays: member counts, capacities, clamped activity and effectiveness,
+  and each group's target skills as a packed bitset over the snapshot's
+  skill vocabulary.
+* The user-independent part of the score is precomputed per snapshot, so
+  a request first prunes the groups that cannot clear the threshold even
+  with the best overlap they could reach, then scores the rest in one
+  vectorized pass (AND + popcount over the bitsets), and takes the top k
+  with a bounded heap.
+* ``group_match_cache`` keeps a snapshot per subject for
+  ``GROUP_MATCH_SNAPSHOT_TTL`` seconds (60). A session hook drops a
+  subject's snapshot when a committed change can move its results: a
+  membership joining or leaving, or a group created, deleted or edited in
+  a scored or filtered column. A membership whose group's subject is not
+  known in the session drops every snapshot.
+
+The score is the weighted sum the engine has always used: skill alignment
+0.4, activity 0.2, closeness to 60% of capacity 0.2, learning
+effectiveness 0.2 (0.7 when unknown).
+"""
+
+import heapq
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from lyo_app.collaboration.models import (
+    CollaborativeGroupMembership as GroupMembership,
+    CollaborativeStudyGroup as StudyGroup,
+)
+
+logger = logging.getLogger(__name__)
+
+SKILL_WEIGHT, ACTIVITY_WEIGHT, SIZE_WEIGHT, EFFECTIVENESS_WEIGHT = 0.4, 0.2, 0.2, 0.2
+DEFAULT_EFFECTIVENESS = 0.7
+IDEAL_FILL = 0.6
+
+# StudyGroup columns a snapshot filters or scores on
+_SNAPSHOT_COLUMNS = (
+    "subject_area", "is_active", "is_public", "max_members",
+    "target_skills", "activity_score", "learning_effectiveness",
+)
+
+
+@dataclass(frozen=True)
+class GroupMatch:
+    group_id: int
+    score: float
+    members: int
+    skill_overlap: Tuple[str, ...]
+    components: Dict[str, float]
+
+
+class GroupCandidates:
+    """Immutable snapshot of the joinable groups in one subject."""
+
+    def __init__(self, rows: Sequence[Tuple[int, Any, int, Optional[float], Optional[float], int]]):
+        self.ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.skills: List[Tuple[str, ...]] = [tuple(dict.fromkeys(r[1] or ())) for r in rows]
+        capacity = np.array([r[2] for r in rows], dtype=np.float64)
+        self.members = np.array([r[5] for r in rows], dtype=np.int64)
+        self.activity = np.minimum(np.array([r[3] or 0.0 for r in rows], dtype=np.float64), 1.0)
+        # ``or``: a recorded 0.0 counts as unknown too, as it always has
+        self.effectiveness = np.array([r[4] or DEFAULT_EFFECTIVENESS for r in rows], dtype=np.float64)
+        ideal = capacity * IDEAL_FILL
+        self.size = 1.0 - np.abs(self.members - ideal) / ideal
+        self.base = ACTIVITY_WEIGHT * self.activity + SIZE_WEIGHT * self.size + EFFECTIVENESS_WEIGHT * self.effectiveness
+
+        self.vocabulary: Dict[str, int] = {}
+        for skills in self.skills:
+            for skill in skills:
+                self.vocabulary.setdefault(skill, len(self.vocabulary))
+        matrix = np.zeros((len(rows), max(len(self.vocabulary), 1)), dtype=bool)
+        for row, skills in enumerate(self.skills):
+            matrix[row, [self.vocabulary[s] for s in skills]] = True
+        self.bitsets = np.packbits(matrix, axis=1)
+        self.skill_counts = matrix.sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    async def load(cls, db: AsyncSession, subject_area: str) -> "GroupCandidates":
+        members = (
+            select(GroupMembership.group_id, func.count().label("members"))
+            .where(GroupMembership.is_active == True)  # noqa: E712
+            .group_by(GroupMembership.group_id)
+            .subquery()
+        )
+        count = func.coalesce(members.c.members, 0)
+        rows = await db.execute(
+            select(
+                StudyGroup.id, StudyGroup.target_skills, StudyGroup.max_members,
+                StudyGroup.activity_score, StudyGroup.learning_effectiveness, count,
+            )
+            .outerjoin(members, members.c.group_id == StudyGroup.id)
+            .where(
+                StudyGroup.is_active == True,  # noqa: E712
+                StudyGroup.is_public == True,  # noqa: E712
+                StudyGroup.subject_area == subject_area,
+                count < StudyGroup.max_members,  # full groups never leave the database
+            )
+            .order_by(StudyGroup.id)
+        )
+        return cls(rows.all())
+
+    def top_matches(self, skill_interests: Sequence[str], k: int = 10, threshold: float = 0.5) -> List[GroupMatch]:
+        """The ``k`` best groups scoring above ``threshold``, best first (lower id on ties)."""
+        denominator = max(len(skill_interests), 1)
+        wanted = [self.vocabulary[s] for s in set(skill_interests) if s in self.vocabulary]
+
+        # Best case for each group: every one of its skills is wanted
+        reachable = self.base + SKILL_WEIGHT * np.minimum(self.skill_counts, len(wanted)) / denominator
+        rows = np.flatnonzero(reachable > threshold)
+        if not len(rows):
+            return []
+
+        mask = np.zeros(self.bitsets.shape[1] * 8, dtype=bool)
+        mask[wanted] = True
+        overlap = np.unpackbits(self.bitsets[rows] & np.packbits(mask), axis=1).sum(axis=1)
+        skill = overlap / denominator
+        scores = np.minimum(self.base[rows] + SKILL_WEIGHT * skill, 1.0)
+
+        passing = np.flatnonzero(scores > threshold)
+        ids = self.ids[rows]
+        best = heapq.nlargest(k, passing.tolist(), key=lambda i: (scores[i], -ids[i]))
+        interests = set(skill_interests)
+        matches = []
+        for i in best:
+            row = rows[i]
+            matches.append(GroupMatch(
+                group_id=int(ids[i]),
+                score=float(scores[i]),
+                members=int(self.members[row]),
+                skill_overlap=tuple(s for s in self.skills[row] if s in interests),
+                components={
+                    "skill_alignment": float(skill[i]),
+                    "activity_level": float(self.activity[row]),
+                    "group_size": float(self.size[row]),
+                    "effectiveness": float(self.effectiveness[row]),
+                },
+            ))
+        return matches
+
+
+class GroupMatchCache:
+    """Per-subject ``GroupCandidates`` with TTL expiry and commit-time invalidation."""
+
+    def __init__(self, ttl: float = 60, max_subjects: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_subjects = max_subjects
+        self.clock = clock
+        self._snapshots: "OrderedDict[str, Tuple[float, GroupCandidates]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    async def get(self, db: AsyncSession, subject_area: str) -> GroupCandidates:
+        entry = self._snapshots.get(subject_area)
+        if entry is not None and self.clock() < entry[0]:
+            self._snapshots.move_to_end(subject_area)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        candidates = await GroupCandidates.load(db, subject_area)
+        self._snapshots[subject_area] = (self.clock() + self.ttl, candidates)
+        self._snapshots.move_to_end(subject_area)
+        while len(self._snapshots) > self.max_subjects:
+            self._snapshots.popitem(last=False)
+        return candidates
+
+    def invalidate(self, subjects: Optional[Set[str]] = None) -> None:
+        """Drop the snapshots of ``subjects``, or all of them for ``None``."""
+        self.invalidations += 1
+        if subjects is None:
+            self._snapshots.clear()
+            return
+        for subject in subjects:
+            self._snapshots.pop(subject, None)
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subjects": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+group_match_cache = GroupMatchCache(ttl=float(os.getenv("GROUP_MATCH_SNAPSHOT_TTL", "60")))
+
+_PENDING_KEY = "group_match_pending"
+_ALL = "*"  # a membership changed in a group whose subject the session did not have
+
+
+def _group_subjects(group: StudyGroup, changed_only: bool) -> Set[str]:
+    state = inspect(group)
+    if changed_only and not any(state.attrs[name].history.has_changes() for name in _SNAPSHOT_COLUMNS):
+        return set()
+    history = state.attrs.subject_area.history
+    return {s for s in (*history.deleted, group.subject_area) if s}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_group_changes(session: Session, flush_context) -> None:
+    subjects: Set[str] = set()
+    for objects, changed_only in ((session.new, False), (session.dirty, True), (session.deleted, False)):
+        for obj in objects:
+            if isinstance(obj, StudyGroup):
+                subjects |= _group_subjects(obj, changed_only)
+            elif isinstance(obj, GroupMembership):
+                if changed_only and not inspect(obj).attrs.is_active.history.has_changes():
+                    continue
+                group = session.identity_map.get(identity_key(StudyGroup, obj.group_id))
+                subjects.add(group.subject_area if group is not None and group.subject_area else _ALL)
+    if subjects:
+        session.info.setdefault(_PENDING_KEY, set()).update(subjects)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_group_changes(session: Session) -> None:
+    subjects = session.info.pop(_PENDING_KEY, None)
+    if subjects:
+        group_match_cache.invalidate(None if _ALL in subjects else subjects)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_group_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -8,7 +8,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
 
 from lyo_app.collaboration.models import (
     CollaborativeStudyGroup as StudyGroup, CollaborativeGroupMembership as GroupMembership, 
@@ -17,6 +16,7 @@ from lyo_app.collaboration.models import (
     PeerMentorship, CollaborationAnalytics,
     CollaborationType, GroupRole, InteractionType
 )
+from lyo_app.collaboration.matching import GroupMatch, group_match_cache
 from lyo_app.personalization.service import personalization_engine
 
 logger = logging.getLogger(__name__)
@@ -104,45 +104,32 @@ class CollaborativeLearningEngine:
         logger.info(f"Finding suitable groups for user {user_id}")
         
         try:
-            # Get user's learning profile
-            user_profile = await personalization_engine.get_mastery_profile(user_id)
-            
-            # Query available groups
-            query = select(StudyGroup).where(
-                and_(
-                    StudyGroup.is_active == True,
-                    StudyGroup.is_public == True,
-                    StudyGroup.subject_area == subject_area
-                )
-            ).options(selectinload(StudyGroup.memberships))
-            
-            result = await db.execute(query)
-            available_groups = result.scalars().all()
-            
-            # Score and rank groups
-            group_recommendations = []
-            for group in available_groups:
-                if group.current_member_count >= group.max_members:
-                    continue  # Skip full groups
-                
-                match_score = await self._calculate_group_match_score(
-                    user_profile, group, skill_interests
-                )
-                
-                if match_score > 0.5:  # Minimum match threshold
-                    group_recommendations.append({
-                        "group": group,
-                        "match_score": match_score,
-                        "reasons": self._explain_match_reasons(user_profile, group),
-                        "current_members": group.current_member_count,
-                        "activity_level": group.activity_score
-                    })
-            
-            # Sort by match score
-            group_recommendations.sort(key=lambda x: x["match_score"], reverse=True)
+            # Score the subject's joinable groups (cached snapshot, see matching.py)
+            candidates = await group_match_cache.get(db, subject_area)
+            matches = candidates.top_matches(skill_interests, k=10, threshold=0.5)
+            if not matches:
+                return []
+            
+            # Load only the groups being returned, without their memberships
+            result = await db.execute(
+                select(StudyGroup).where(StudyGroup.id.in_([m.group_id for m in matches]))
+            )
+            groups = {group.id: group for group in result.scalars().all()}
+            
+            group_recommendations = [
+                {
+                    "group": groups[match.group_id],
+                    "match_score": match.score,
+                    "reasons": self._explain_match_reasons(match),
+                    "current_members": match.members,
+                    "activity_level": groups[match.group_id].activity_score
+                }
+                for match in matches
+                if match.group_id in groups
+            ]
             
             logger.info(f"Found {len(group_recommendations)} suitable groups")
-            return group_recommendations[:10]  # Return top 10
+            return group_recommendations
             
         except Exception as e:
             logger.error(f"Error finding suitable groups: {e}")
@@ -476,38 +463,19 @@ class CollaborativeLearningEngine:
         
         return config
     
-    async def _calculate_group_match_score(
-        self,
-        user_profile: Any,
-        group: StudyGroup,
-        skill_interests: List[str]
-    ) -> float:
-        """Calculate how well a group matches a user"""
-        
-        score_components = []
-        
-        # Skill alignment
-        skill_overlap = set(skill_interests) & set(group.target_skills or [])
-        skill_score = len(skill_overlap) / max(len(skill_interests), 1)
-        score_components.append(("skill_alignment", skill_score, 0.4))
-        
-        # Group activity level
-        activity_score = min(group.activity_score or 0.0, 1.0)
-        score_components.append(("activity_level", activity_score, 0.2))
-        
-        # Group size (not too empty, not too full)
-        ideal_size = group.max_members * 0.6
-        size_score = 1.0 - abs(group.current_member_count - ideal_size) / ideal_size
-        score_components.append(("group_size", size_score, 0.2))
-        
-        # Learning effectiveness
-        effectiveness = group.learning_effectiveness or 0.7
-        score_components.append(("effectiveness", effectiveness, 0.2))
-        
-        # Calculate weighted score
-        total_score = sum(score * weight for _, score, weight in score_components)
+    def _explain_match_reasons(self, match: GroupMatch) -> List[str]:
+        """Human-readable reasons behind a group's match score"""
         
-        return min(total_score, 1.0)
+        reasons = []
+        if match.skill_overlap:
+            reasons.append(f"Focuses on {', '.join(match.skill_overlap[:3])}")
+        if match.components["activity_level"] >= 0.6:
+            reasons.append("Very active group")
+        if match.components["group_size"] >= 0.7:
+            reasons.append("Good group size for collaboration")
+        if match.components["effectiveness"] >= 0.8:
+            reasons.append("Strong learning outcomes")
+        return reasons
     
     async def _ai_assisted_assessment(
         self,
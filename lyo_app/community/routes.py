@@ -10,7 +10,7 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Path, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from lyo_app.core.database import get_db
+from lyo_app.core.database import get_db, get_read_db
 from lyo_app.auth.routes import get_current_user
 from lyo_app.models.enhanced import User
 from lyo_app.community.service import CommunityService
@@ -184,7 +184,7 @@ async def list_study_groups(
     course_id: Optional[int] = Query(None),
     q: Optional[str] = Query(None, max_length=200, description="Text search over name/description"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List study groups with filtering options."""
     try:
@@ -458,7 +458,7 @@ async def list_community_events(
     upcoming_only: bool = Query(True),
     q: Optional[str] = Query(None, max_length=200, description="Text search over title/description/location"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List community events with filtering options."""
     try:
@@ -951,7 +951,7 @@ async def list_posts(
     tag: Optional[str] = Query(None),
     author_id: Optional[int] = Query(None),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List posts with filtering, pagination, and sorting."""
     try:
@@ -9,9 +9,12 @@ from typing import Dict, List, Optional, Any, Callable, Tuple, AsyncGenerator
 from enum import Enum
 from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
-from openai import AsyncOpenAI
+from typing import TYPE_CHECKING
 from lyo_app.core.config import settings
 
+if TYPE_CHECKING:  # the SDK is imported on first initialize(), not at start-up
+    from openai import AsyncOpenAI
+
 try:
     from lyo_app.integrations.gcp_secrets import get_secret
 except Exception:  # pragma: no cover
@@ -117,7 +120,7 @@ class AIResilienceManager:
         self.cache_ttl = 300
         self.daily_costs: Dict[str, float] = {}
         self.daily_usage_reset = time.time()
-        self.openai_client: Optional[AsyncOpenAI] = None
+        self.openai_client: Optional["AsyncOpenAI"] = None
 
     async def initialize(self):
         """Initialize models and network session once."""
@@ -146,6 +149,8 @@ class AIResilienceManager:
             print(f"    - Final OPENAI_KEY present: {bool(openai_key)}", flush=True)
 
             if openai_key:
+                from openai import AsyncOpenAI
+
                 self.openai_client = AsyncOpenAI(api_key=openai_key)
             
             # VALIDATE that API keys are NOT placeholder keys
@@ -333,9 +338,16 @@ class AIResilienceManager:
         provider_order: List[str] = None,
         use_cache: bool = True,
         response_format: Optional[Dict[str, Any]] = None,
+        prompt_cache_key: Optional[str] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Get chat completion with fallback across providers."""
+        """
+        Get chat completion with fallback across providers.
+
+        ``prompt_cache_key`` identifies a shared static prompt prefix; OpenAI
+        uses it to route requests to its prompt cache. Gemini has no such
+        parameter and caches repeated prefixes implicitly.
+        """
         # Lazy initialization if lifespan failed
         if not self._initialized:
             print(f">>> [PID {os.getpid()}] AI Resilience: Triggering Lazy Init", flush=True)
@@ -405,6 +417,9 @@ class AIResilienceManager:
                         }
                         if response_format:
                             call_kwargs["response_format"] = response_format
+                        if prompt_cache_key:
+                            # extra_body: SDKs older than the parameter still send it
+                            call_kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key}
                         return await self.openai_client.chat.completions.create(**call_kwargs)
 
                     res = await cb.call(_openai_call)
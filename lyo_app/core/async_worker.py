@@ -0,0 +1,197 @@
+"""
+Persistent event loop for async code in Celery workers.
+
+Celery tasks used to run their coroutines with a ``run_async`` helper that
+created and closed a new event loop per task. Nothing async could outlive a
+task: pooled asyncpg connections were bound to a dead loop, and every task
+paid for new DB connections, HTTP clients and AI clients.
+
+``worker_loop`` keeps one event loop per worker process, running on a
+daemon thread started on first use (so after the prefork pool has forked).
+Tasks submit coroutines to it and block on the result:
+
+* ``run_async(coro)`` replaces the per-module helpers.
+* ``@on_worker_loop`` turns an ``async def`` into a sync function Celery can
+  register::
+
+      @celery_app.task(name="...", autoretry_for=(Exception,))
+      @on_worker_loop
+      async def my_task(user_id): ...
+
+* ``await worker_loop.resource(key, factory, close)`` returns an object
+  created once per process and closed on worker shutdown;
+  ``shared_http_client()`` is the shared ``httpx.AsyncClient``. Async engines
+  created at import time register their ``dispose`` with ``on_shutdown``.
+
+Because coroutines from every pool thread run on the same loop, a worker
+started with the thread pool (``-P threads -c 64``) serves I/O-bound queues
+such as ``notifications`` and ``engagement`` fully asynchronously: tasks
+waiting on the network or the database interleave on one loop and share one
+connection pool instead of holding a process each.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from lyo_app.core.forksafe import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerLoop:
+    """One long-lived event loop, on its own thread, per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._resources: Dict[str, Tuple[Any, Optional[Callable[[Any], Any]]]] = {}
+        self._resource_lock: Optional[asyncio.Lock] = None
+        self._shutdown_hooks: List[Callable[[], Any]] = []
+        self.tasks_run = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._loop = loop
+                self._resource_lock = None
+                self._thread = threading.Thread(target=serve, name="worker-event-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+                logger.info("🔁 Worker event loop started")
+            return self._loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the worker loop and block until it finishes."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("worker_loop.run() called from the worker loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeouts and Celery's soft time limit land here: stop the coroutine too
+            future.cancel()
+            raise
+        finally:
+            self.tasks_run += 1
+
+    async def resource(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Return the process-wide resource ``key``, creating it on first use.
+
+        ``factory`` may be sync or async; ``close(resource)`` (sync or async)
+        runs on shutdown.
+        """
+        entry = self._resources.get(key)
+        if entry is not None:
+            return entry[0]
+        if self._resource_lock is None:
+            self._resource_lock = asyncio.Lock()
+        async with self._resource_lock:
+            entry = self._resources.get(key)
+            if entry is None:
+                value = factory()
+                if inspect.isawaitable(value):
+                    value = await value
+                entry = self._resources[key] = (value, close)
+        return entry[0]
+
+    def on_shutdown(self, hook: Callable[[], Any]) -> Callable[[], Any]:
+        """Call ``hook()`` (sync or async) on the loop when the worker shuts down."""
+        self._shutdown_hooks.append(hook)
+        return hook
+
+    async def _close_all(self) -> None:
+        resources, self._resources = self._resources, {}
+        closers = [functools.partial(close, value) for value, close in resources.values() if close is not None]
+        for close in closers + self._shutdown_hooks:
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:  # noqa: BLE001 - close what we can
+                logger.warning(f"Worker resource cleanup failed: {e}")
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Close shared resources, then stop the loop and its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_all(), loop).result(timeout)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Worker loop cleanup did not finish: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info(f"🔁 Worker event loop stopped after {self.tasks_run} tasks")
+
+    def reset_after_fork(self) -> None:
+        """The parent's loop thread does not exist in the child."""
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._resources = {}
+        self._resource_lock = None
+        self.tasks_run = 0
+
+
+worker_loop = WorkerLoop()
+register_after_fork(worker_loop.reset_after_fork)
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run async code from a sync Celery task on the persistent worker loop."""
+    return worker_loop.run(coro)
+
+
+def on_worker_loop(func: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+    """
+    Wrap an ``async def`` task body so it runs on the worker loop.
+
+    Celery's ``self.request`` is thread-local and empty on the loop's thread,
+    so bound tasks should retry with ``autoretry_for`` rather than
+    ``self.retry()`` inside the coroutine.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return worker_loop.run(func(*args, **kwargs))
+
+    return wrapper
+
+
+async def shared_http_client():
+    """The worker's shared ``httpx.AsyncClient`` (keep-alive connections across tasks)."""
+    import httpx
+
+    return await worker_loop.resource(
+        "httpx",
+        lambda: httpx.AsyncClient(timeout=30.0),
+        lambda client: client.aclose(),
+    )
@@ -0,0 +1,210 @@
+"""
+Write-behind batch writer for high-volume append-only tables.
+
+Usage logs and chat telemetry used to open a session and commit one row per
+request. ``BatchWriter`` buffers rows per table instead and writes each
+buffer as one multi-row ``INSERT`` (SQLAlchemy's insertmanyvalues, on both
+Postgres and SQLite) when it reaches ``max_batch`` rows or every
+``flush_interval`` seconds, on the background-worker connection pool.
+
+* Bounded: at most ``max_pending`` rows are held. ``submit`` (for
+  fire-and-forget callers on the request path) drops and counts rows past
+  that; ``put`` applies backpressure by flushing before it enqueues.
+* Timestamps are taken when a row is submitted, not when it is written.
+* Rows are written on a best-effort basis, like the per-row commits they
+  replace: a failed batch is logged and counted, not retried.
+* ``stop()`` drains everything still buffered; the app lifespans call it on
+  shutdown.
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import DateTime, insert
+
+from lyo_app.core.forksafe import register_after_fork
+from lyo_app.core.prometheus_metrics import PROMETHEUS_AVAILABLE
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import Counter as PromCounter
+
+logger = logging.getLogger(__name__)
+
+
+def _default_session_factory():
+    from lyo_app.core.database import background_session
+
+    return background_session()
+
+
+class BatchWriter:
+    """
+    Buffers ORM rows (as column dicts) per model and bulk-inserts them.
+
+    Args:
+        session_factory: Returns an ``async with`` session context
+            (default: ``background_session``)
+        max_batch: Rows per INSERT; a table reaching this flushes immediately
+        flush_interval: Seconds between background flushes
+        max_pending: Rows buffered across all tables before ``submit`` drops
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+    ):
+        self._session_factory = session_factory or _default_session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffers: Dict[Any, List[Dict[str, Any]]] = {}
+        self._pending = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self.counts: Counter = Counter()
+        self._prom = None
+        if PROMETHEUS_AVAILABLE:
+            try:
+                self._prom = PromCounter(
+                    "lyo_batch_writer_rows",
+                    "Rows handled by the write-behind batch writer",
+                    ["table", "outcome"],
+                )
+            except ValueError:
+                logger.debug("Prometheus batch writer metric already registered")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _count(self, table: str, outcome: str, n: int = 1) -> None:
+        self.counts[(table, outcome)] += n
+        if self._prom is not None:
+            self._prom.labels(table=table, outcome=outcome).inc(n)
+
+    def submit(self, model: Any, **values: Any) -> bool:
+        """
+        Buffer one row for ``model``; never blocks.
+
+        Returns False (and counts a drop) when the writer is full.
+        """
+        table = model.__tablename__
+        if self._pending >= self.max_pending:
+            self._count(table, "dropped")
+            return False
+        created_at = model.__table__.c.get("created_at")
+        if created_at is not None and values.get("created_at") is None and isinstance(created_at.type, DateTime):
+            values["created_at"] = datetime.now(timezone.utc) if created_at.type.timezone else datetime.utcnow()
+        buffer = self._buffers.setdefault(model, [])
+        buffer.append(values)
+        self._pending += 1
+        self._count(table, "submitted")
+        self._ensure_running()
+        if len(buffer) >= self.max_batch and self._loop is not None:
+            task = self._loop.create_task(self.flush(model))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        return True
+
+    async def put(self, model: Any, **values: Any) -> None:
+        """Buffer one row, flushing first while the writer is full (backpressure)."""
+        while self._pending >= self.max_pending:
+            await self.flush()
+        self.submit(model, **values)
+
+    async def flush(self, model: Any = None) -> int:
+        """Write buffered rows (of ``model``, or of every table); returns rows written."""
+        models = [model] if model is not None else list(self._buffers)
+        batches = []
+        for m in models:
+            rows = self._buffers.pop(m, None)
+            if rows:
+                self._pending -= len(rows)
+                batches.append((m, rows))
+
+        written = 0
+        for m, rows in batches:
+            for start in range(0, len(rows), self.max_batch):
+                chunk = rows[start:start + self.max_batch]
+                try:
+                    async with self._session_factory() as db:
+                        await db.execute(insert(m), chunk)
+                        await db.commit()
+                except Exception as e:  # noqa: BLE001
+                    logger.warning(f"Batch insert of {len(chunk)} {m.__tablename__} rows failed: {e}")
+                    self._count(m.__tablename__, "failed", len(chunk))
+                    continue
+                written += len(chunk)
+                self._count(m.__tablename__, "written", len(chunk))
+        return written
+
+    def _ensure_running(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._task = loop.create_task(self._run(), name="batch_writer")
+
+    def start(self) -> None:
+        """Start the background flush task on the running loop."""
+        self._ensure_running()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Batch writer flush failed: {e}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the background task and drain every buffered row."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Batch writer drain timed out; {self._pending} rows lost")
+        self._loop = None
+
+    async def _drain(self) -> None:
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        tables: Dict[str, Dict[str, int]] = {}
+        for (table, outcome), n in self.counts.items():
+            tables.setdefault(table, {})[outcome] = n
+        return {"pending": self._pending, "tables": tables}
+
+    def reset_after_fork(self) -> None:
+        """The parent's buffered rows are the parent's to write."""
+        self._buffers.clear()
+        self._pending = 0
+        self._task = None
+        self._loop = None
+        self._flushes = set()
+
+
+batch_writer = BatchWriter(
+    max_batch=int(os.getenv("BATCH_WRITER_MAX_BATCH", "500")),
+    flush_interval=float(os.getenv("BATCH_WRITER_FLUSH_SECONDS", "1.0")),
+    max_pending=int(os.getenv("BATCH_WRITER_MAX_PENDING", "10000")),
+)
+register_after_fork(batch_writer.reset_after_fork)
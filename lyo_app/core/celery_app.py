@@ -2,16 +2,23 @@
 Production Celery worker configuration for async task processing.
 Handles course generation and other background tasks with Redis pub/sub.
 Includes Celery Beat for scheduled proactive engagement tasks.
+
+Async task code runs on one persistent event loop per worker process
+(``lyo_app.core.async_worker``). I/O-bound queues can be served by a
+thread-pool worker, whose tasks all share that loop and its connection pools:
+
+    celery -A lyo_app.core.celery_app worker -P threads -c 64 -Q notifications,engagement
 """
 
 import os
 import logging
 from typing import Callable, Optional, Dict, Any
 from celery import Celery
-from celery.signals import worker_ready, worker_shutting_down
+from celery.signals import worker_process_shutdown, worker_ready, worker_shutdown, worker_shutting_down
 from celery.schedules import crontab
 from kombu import Queue
 
+from lyo_app.core.async_worker import worker_loop
 from lyo_app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -44,6 +51,7 @@ celery_app.conf.update(
         "lyo_app.tasks.notifications.*": {"queue": "notifications"},
         "lyo_app.tasks.feeds.*": {"queue": "feeds"},
         "lyo_app.tasks.memory_synthesis.*": {"queue": "memory"},
+        "lyo_app.tasks.embeddings.*": {"queue": "memory"},
         "lyo_app.tasks.proactive_engagement.*": {"queue": "engagement"},
         "lyo_app.tasks.calendar_sync.*": {"queue": "calendar"},
         "lyo_app.evolution.intervention_worker.*": {"queue": "engagement"},
@@ -104,6 +112,20 @@ celery_app.conf.update(
             "options": {"queue": "memory"}
         },
 
+        # Re-embed changed courses/lessons/insights - nightly at 4 AM
+        "backfill-embeddings-nightly": {
+            "task": "lyo_app.tasks.embeddings.backfill_embeddings",
+            "schedule": crontab(hour=4, minute=0),  # 4 AM UTC
+            "options": {"queue": "memory"}
+        },
+
+        # Repair inbox last-message / unread counter drift - nightly at 5 AM
+        "reconcile-inbox-nightly": {
+            "task": "lyo_app.tasks.messaging.reconcile_inbox",
+            "schedule": crontab(hour=5, minute=0),  # 5 AM UTC
+            "options": {"queue": "lyo_tasks"}
+        },
+
         # Autonomous Intervention - daily at 2 AM
         "check-trajectory-drops-daily": {
             "task": "lyo_app.evolution.intervention_worker.check_trajectory_drops",
@@ -127,3 +149,10 @@ def worker_ready_handler(sender=None, **kwargs):
 def worker_shutting_down_handler(sender=None, **kwargs):
     """Handle worker shutdown event."""
     logger.info(f"Celery worker shutting down: {sender}")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_worker_loop(**kwargs):
+    """Close shared async resources (prefork children, then the main process)."""
+    worker_loop.shutdown()
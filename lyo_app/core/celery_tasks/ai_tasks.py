@@ -1,4 +1,4 @@
-import asyncio
+from lyo_app.core.async_worker import run_async
 from lyo_app.core.celery_app import celery_app
 from lyo_app.ai_agents.sentiment_agent import sentiment_engagement_agent
 from lyo_app.ai_agents.mentor_agent import AIMentor
@@ -32,7 +32,7 @@ def analyze_user_activity_task(user_id: int, action: str, metadata: dict, user_m
             except Exception as e:
                 # Log mentor errors but do not fail the task
                 print(f"Error in proactive_check_in for user {user_id}: {e}")
-    asyncio.run(run())
+    run_async(run())
 
 
 @celery_app.task(name="ai.generate_course_outline")
@@ -59,7 +59,7 @@ def generate_course_outline_task(
                 user_id=user_id
             )
             return result
-    return asyncio.run(run())
+    return run_async(run())
 
 
 @celery_app.task(name="ai.generate_lesson_content")
@@ -86,7 +86,7 @@ def generate_lesson_content_task(
                 user_id=user_id
             )
             return result
-    return asyncio.run(run())
+    return run_async(run())
 
 
 @celery_app.task(name="ai.evaluate_content_quality")
@@ -109,7 +109,7 @@ def evaluate_content_quality_task(
                 db=db
             )
             return result
-    return asyncio.run(run())
+    return run_async(run())
 
 
 @celery_app.task(name="ai.tag_and_categorize_content")
@@ -128,7 +128,7 @@ def tag_content_task(
                 db=db
             )
             return result
-    return asyncio.run(run())
+    return run_async(run())
 
 
 @celery_app.task(name="ai.identify_content_gaps")
@@ -141,4 +141,4 @@ def identify_content_gaps_task(course_id: int):
                 db=db
             )
             return result
-    return asyncio.run(run())
+    return run_async(run())
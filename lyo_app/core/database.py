@@ -11,47 +11,31 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from sqlalchemy import MetaData, event, inspect, text
-from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool
 
 from .config import settings
+from .db_router import ANALYTICS, BACKGROUND, INTERACTIVE, DatabaseRouter, default_workloads, engine_kwargs
+from .forksafe import register_after_fork
+from .query_accounting import record_query
 
 logger = logging.getLogger(__name__)
 
 # Database connection configuration
 def get_engine_config():
-    """Get database engine configuration based on database type."""
-    config = {
-        "echo": settings.database_echo,
-        "future": True,
-        "pool_pre_ping": True,  # Verify connections before use
-        "pool_recycle": 300,    # Recycle connections every 5 minutes
-    }
-    
-    # SQLite-specific configuration
-    if "sqlite" in settings.database_url:
-        config.update({
-            "poolclass": NullPool,  # SQLite doesn't support connection pooling
-            "connect_args": {"check_same_thread": False}
-        })
-    else:
-        # PostgreSQL/MySQL configuration
-        # Force a minimum of 20 to prevent QueuePool overflow crashes regardless of environment variables
-        logger.info("🔧 FORCING Database Pool: size=20, overflow=20, timeout=30s")
-        config.update({
-            "pool_size": 20,
-            "max_overflow": 20,
-            "pool_timeout": 30.0,
-        })
-        # Add connection timeout to asyncpg args
-        connect_args = config.get("connect_args", {})
-        connect_args["timeout"] = 30.0
-        config["connect_args"] = connect_args
-    
-    # Apply stabilization hijack to ensure 20/20 limits regardless of config files
+    """Get configuration for the interactive (request-serving) pool.
+
+    Sizes come from ``DB_POOL_INTERACTIVE_*`` (see ``lyo_app.core.db_router``);
+    background and analytics workloads get their own engines there.
+    """
+    config = engine_kwargs(
+        settings.database_url, default_workloads()[INTERACTIVE], settings.database_echo
+    )
+
+    # Fill in async-safe pool defaults for anything the workload left unset
     from .pool_stabilizer import get_stabilized_engine_config
     config = get_stabilized_engine_config(config)
     
@@ -80,7 +64,6 @@ engine_config = get_engine_config()
 engine = create_async_engine(db_url, **engine_config)
 
 # Add connection event listeners for better debugging
-@event.listens_for(engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """Set SQLite pragmas for better performance and consistency."""
     if "sqlite" in settings.database_url:
@@ -92,13 +75,23 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 
-@event.listens_for(engine.sync_engine, "before_cursor_execute")
+
+def _configure_engine(async_engine) -> None:
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+
+
+_configure_engine(engine)
+
+# Registered on the Engine class so every engine (test engines included)
+# feeds per-request query accounting.
+@event.listens_for(Engine, "before_cursor_execute")
 def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    conn.info.setdefault('query_start_time', []).append(time.time())
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
 
-@event.listens_for(engine.sync_engine, "after_cursor_execute")
+@event.listens_for(Engine, "after_cursor_execute")
 def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    total = time.time() - conn.info['query_start_time'].pop(-1)
+    total = time.perf_counter() - conn.info['query_start_time'].pop(-1)
+    record_query(statement, total)
     if total > 0.5:  # Log queries taking longer than 500ms
         logger.warning(f"Slow Query: {total:.4f}s\n{statement}\nParameters: {parameters}")
 
@@ -127,6 +120,19 @@ class Base(DeclarativeBase):
     )
 
 
+# Replica routing and per-workload pools; the engine above is the
+# interactive pool on the primary.
+db_router = DatabaseRouter(
+    db_url,
+    replica_urls=[u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()],
+    max_replica_lag=float(os.getenv("DATABASE_MAX_REPLICA_LAG_SECONDS", "5")),
+    echo=settings.database_echo,
+    configure_engine=_configure_engine,
+)
+db_router.adopt_engine(engine)
+register_after_fork(db_router.reset_after_fork)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency that provides a database session.
@@ -145,6 +151,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 get_async_session = get_db
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only request handlers (feeds, listings).
+    Served by a replica when one is within the lag budget; flushing raises.
+    """
+    async with db_router.session(INTERACTIVE, read_only=True) as session:
+        yield session
+
+
+async def get_analytics_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only dependency for heavy aggregations, on the analytics pool."""
+    async with db_router.session(ANALYTICS, read_only=True) as session:
+        yield session
+
+
+def background_session(read_only: bool = False):
+    """Session on the background-worker pool: ``async with background_session() as db``."""
+    return db_router.session(BACKGROUND, read_only=read_only)
+
+
 async def get_db_session() -> AsyncSession:
     """
     Get a database session for direct use (not as dependency).
@@ -165,7 +191,7 @@ async def init_db() -> None:
         # Import all models here to ensure they are registered
         from lyo_app.auth.models import User  # noqa: F401
         from lyo_app.auth.rbac import Role, Permission, user_roles, role_permissions  # noqa: F401
-        from lyo_app.models.enhanced import Task, PushDevice, GamificationProfile  # noqa: F401
+        from lyo_app.models.enhanced import Task, PushDevice, GamificationProfile, SweepCheckpoint  # noqa: F401
         from lyo_app.models.clips import Clip, ClipLike, ClipView  # noqa: F401
         from lyo_app.learning.models import Course, Lesson, CourseEnrollment, LessonCompletion  # noqa: F401
         from lyo_app.community.models import StudyGroup, GroupMembership, CommunityEvent, EventAttendance  # noqa: F401
@@ -174,7 +200,7 @@ async def init_db() -> None:
         from lyo_app.stack.models import StackItem  # noqa: F401
         from lyo_app.ai_study.models import StudySession, GeneratedQuiz, QuizAttempt, StudySessionAnalytics  # noqa: F401
         from lyo_app.ai_agents.models import UserEngagementState, MentorInteraction  # noqa: F401
-        from lyo_app.personalization.models import LearnerState, LearnerMastery, AffectSample, SpacedRepetitionSchedule  # noqa: F401
+        from lyo_app.personalization.models import LearnerState, LearnerMastery, AffectSample, SpacedRepetitionSchedule, MemorySynthesisState  # noqa: F401
         # Chat module models (for session continuity + notes/courses)
         from lyo_app.chat.models import ChatConversation, ChatMessage, ChatNote, ChatCourse, ChatTelemetry  # noqa: F401
         # Import new mentor chat models
@@ -194,6 +220,9 @@ async def init_db() -> None:
 
         # Friend challenges — shareable quiz duels
         from lyo_app.challenges.models import Challenge, ChallengeAttempt  # noqa: F401
+
+        # Learning event log and its transactional outbox
+        from lyo_app.events.models import LearningEvent, OutboxEvent  # noqa: F401
         
         # Enable automatic schema updates to ensure all tables exist
         logger.info("Synchronizing database schema...")
@@ -597,5 +626,5 @@ async def _ensure_lessons_schema(conn) -> None:
 
 async def close_db() -> None:
     """Close database connections."""
-    await engine.dispose()
+    await db_router.dispose()
     logger.info("Database connections closed")
@@ -0,0 +1,419 @@
+"""
+Read-replica routing and per-workload connection pools.
+
+Each workload (``interactive`` request handling, ``background`` workers,
+``analytics`` aggregations) gets its own engine per database node, so a burst
+of analytics scans cannot exhaust the pool that serves user requests. Pool
+sizes come from ``DB_POOL_<WORKLOAD>_SIZE`` / ``_OVERFLOW`` / ``_TIMEOUT``.
+
+Read-only sessions go to a replica from ``DATABASE_REPLICA_URLS`` (comma
+separated) when one is healthy and its replication lag is below
+``DATABASE_MAX_REPLICA_LAG_SECONDS``; otherwise, or when the replica can't be
+reached, they fall back to the primary. Lag is measured in the background by
+``DatabaseRouter.start_lag_monitor``.
+
+Connection checkout time (pool wait + connect) is recorded per workload and
+node, and exported to Prometheus alongside checked-out gauges.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from lyo_app.core.prometheus_metrics import PROMETHEUS_AVAILABLE
+from lyo_app.core.request_metrics import LatencyHistogram
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+ANALYTICS = "analytics"
+PRIMARY = "primary"
+
+# Checkout waits are short; finer buckets than request latency
+CHECKOUT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 30000)
+
+
+class ReadOnlySessionError(RuntimeError):
+    """A read-only (replica) session tried to flush writes."""
+
+
+@dataclass(frozen=True)
+class WorkloadPool:
+    """Pool sizing for one workload."""
+
+    name: str
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+
+    @classmethod
+    def from_env(cls, name: str, pool_size: int, max_overflow: int, pool_timeout: float) -> "WorkloadPool":
+        prefix = f"DB_POOL_{name.upper()}_"
+        return cls(
+            name=name,
+            pool_size=int(os.getenv(prefix + "SIZE", pool_size)),
+            max_overflow=int(os.getenv(prefix + "OVERFLOW", max_overflow)),
+            pool_timeout=float(os.getenv(prefix + "TIMEOUT", pool_timeout)),
+        )
+
+
+def default_workloads() -> Dict[str, WorkloadPool]:
+    return {
+        INTERACTIVE: WorkloadPool.from_env(INTERACTIVE, 20, 20, 30.0),
+        BACKGROUND: WorkloadPool.from_env(BACKGROUND, 5, 5, 60.0),
+        ANALYTICS: WorkloadPool.from_env(ANALYTICS, 3, 2, 60.0),
+    }
+
+
+def normalize_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def engine_kwargs(url: str, workload: WorkloadPool, echo: bool = False) -> Dict[str, Any]:
+    """``create_async_engine`` keyword arguments for ``url`` sized for ``workload``."""
+    config: Dict[str, Any] = {
+        "echo": echo,
+        "future": True,
+        "pool_pre_ping": True,  # Verify connections before use
+        "pool_recycle": 300,    # Recycle connections every 5 minutes
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        config.update({
+            "poolclass": NullPool,  # SQLite doesn't support connection pooling
+            "connect_args": {"check_same_thread": False},
+        })
+    else:
+        config.update({
+            "pool_size": workload.pool_size,
+            "max_overflow": workload.max_overflow,
+            "pool_timeout": workload.pool_timeout,
+            "connect_args": {"timeout": 30.0, "command_timeout": 30.0},
+        })
+    return config
+
+
+@dataclass
+class ReplicaState:
+    url: str
+    name: str
+    healthy: bool = True
+    lag_seconds: float = 0.0
+    checked_at: float = 0.0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    checked_out: int = 0
+    failures: int = 0
+    wait: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(CHECKOUT_BUCKETS_MS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "checked_out": self.checked_out,
+            "failures": self.failures,
+            "wait_p50_ms": round(self.wait.quantile(0.50), 3),
+            "wait_p99_ms": round(self.wait.quantile(0.99), 3),
+            "wait_max_ms": round(self.wait.max, 3),
+        }
+
+
+# Replica sessions are tagged in ``Session.info``; refuse to flush from them.
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise ReadOnlySessionError("Attempted to write through a read-only (replica) session")
+
+
+class DatabaseRouter:
+    """Engines per (node, workload), replica selection and pool metrics."""
+
+    def __init__(
+        self,
+        primary_url: str,
+        replica_urls: Optional[List[str]] = None,
+        workloads: Optional[Dict[str, WorkloadPool]] = None,
+        max_replica_lag: float = 5.0,
+        echo: bool = False,
+        configure_engine: Optional[Callable[[AsyncEngine], None]] = None,
+    ):
+        self.primary_url = normalize_url(primary_url)
+        self.replicas = [
+            ReplicaState(url=normalize_url(url), name=f"replica{i}")
+            for i, url in enumerate(replica_urls or [])
+        ]
+        self.workloads = workloads or default_workloads()
+        self.max_replica_lag = max_replica_lag
+        self.echo = echo
+        self.configure_engine = configure_engine
+        self.replica_fallbacks = 0
+        self._engines: Dict[Tuple[str, str], AsyncEngine] = {}
+        self._sessionmakers: Dict[Tuple[str, str], async_sessionmaker] = {}
+        self._stats: Dict[Tuple[str, str], PoolStats] = {}
+        self._rr = itertools.count()
+        self._lag_task: Optional[asyncio.Task] = None
+        self._prom = None
+        if PROMETHEUS_AVAILABLE:
+            self._init_prometheus()
+
+    def _init_prometheus(self) -> None:
+        try:
+            self._prom = (
+                Histogram(
+                    "lyo_db_pool_checkout_seconds",
+                    "Time to obtain a pooled DB connection",
+                    ["workload", "node"],
+                    buckets=[b / 1000 for b in CHECKOUT_BUCKETS_MS],
+                ),
+                Gauge(
+                    "lyo_db_pool_checked_out",
+                    "DB connections currently checked out",
+                    ["workload", "node"],
+                    multiprocess_mode="livesum",
+                ),
+                Counter(
+                    "lyo_db_replica_fallbacks",
+                    "Read-only sessions served by the primary instead of a replica",
+                ),
+            )
+        except ValueError:
+            logger.debug("Prometheus DB pool metrics already registered")
+
+    # -- engines -----------------------------------------------------------
+
+    def adopt_engine(self, engine: AsyncEngine, workload: str = INTERACTIVE, node: str = PRIMARY) -> None:
+        """Register an engine created elsewhere (the module-level primary engine)."""
+        self._engines[(node, workload)] = engine
+        self._instrument(engine, workload, node)
+
+    def engine(self, workload: str = INTERACTIVE, node: str = PRIMARY) -> AsyncEngine:
+        key = (node, workload)
+        engine = self._engines.get(key)
+        if engine is None:
+            url = self.primary_url if node == PRIMARY else self._replica(node).url
+            engine = create_async_engine(url, **engine_kwargs(url, self.workloads[workload], self.echo))
+            if self.configure_engine is not None:
+                self.configure_engine(engine)
+            self._engines[key] = engine
+            self._instrument(engine, workload, node)
+            logger.info(f"🔌 Created {workload} engine for {node}")
+        return engine
+
+    def _replica(self, name: str) -> ReplicaState:
+        for replica in self.replicas:
+            if replica.name == name:
+                return replica
+        raise KeyError(name)
+
+    def _instrument(self, engine: AsyncEngine, workload: str, node: str) -> None:
+        stats = self._stats.setdefault((workload, node), PoolStats())
+        gauge = self._prom[1].labels(workload, node) if self._prom else None
+
+        @event.listens_for(engine.sync_engine.pool, "checkout")
+        def _on_checkout(dbapi_conn, record, proxy):
+            stats.checked_out += 1
+            if gauge is not None:
+                gauge.inc()
+
+        @event.listens_for(engine.sync_engine.pool, "checkin")
+        def _on_checkin(dbapi_conn, record):
+            stats.checked_out -= 1
+            if gauge is not None:
+                gauge.dec()
+
+    # -- routing -----------------------------------------------------------
+
+    def pick_node(self, read_only: bool) -> str:
+        """A healthy replica within the lag budget (round robin), else the primary."""
+        if read_only and self.replicas:
+            candidates = [
+                r for r in self.replicas
+                if r.healthy and r.lag_seconds <= self.max_replica_lag
+            ]
+            if candidates:
+                return candidates[next(self._rr) % len(candidates)].name
+            self._count_fallback()
+        return PRIMARY
+
+    def _count_fallback(self) -> None:
+        self.replica_fallbacks += 1
+        if self._prom:
+            self._prom[2].inc()
+
+    def sessionmaker(self, workload: str = INTERACTIVE, node: str = PRIMARY) -> async_sessionmaker:
+        key = (node, workload)
+        factory = self._sessionmakers.get(key)
+        if factory is None:
+            factory = self._sessionmakers[key] = async_sessionmaker(
+                self.engine(workload, node),
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False,
+                autocommit=False,
+            )
+        return factory
+
+    @asynccontextmanager
+    async def session(
+        self, workload: str = INTERACTIVE, read_only: bool = False
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Session for ``workload``. Read-only sessions prefer a replica and
+        refuse to flush; if the replica can't hand out a connection the
+        session is opened on the primary instead.
+        """
+        node = self.pick_node(read_only)
+        session = await self._open(workload, node)
+        if session is None:
+            self._mark_unhealthy(node)
+            self._count_fallback()
+            node = PRIMARY
+            session = await self._open(workload, node, raise_errors=True)
+        session.info["read_only"] = read_only
+        session.info["node"] = node
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def _open(self, workload: str, node: str, raise_errors: bool = False) -> Optional[AsyncSession]:
+        session = self.sessionmaker(workload, node)()
+        stats = self._stats.setdefault((workload, node), PoolStats())
+        start = time.perf_counter()
+        try:
+            # Check out eagerly so the wait is measured and replica failures
+            # surface here rather than on the first query
+            await session.connection()
+        except (OperationalError, DBAPIError, OSError) as e:
+            stats.failures += 1
+            await session.close()
+            if raise_errors or node == PRIMARY:
+                raise
+            logger.warning(f"⚠️ Replica {node} unavailable, using primary: {e}")
+            return None
+        waited = time.perf_counter() - start
+        stats.checkouts += 1
+        stats.wait.record(waited * 1000)
+        if self._prom:
+            self._prom[0].labels(workload, node).observe(waited)
+        return session
+
+    def _mark_unhealthy(self, node: str) -> None:
+        if node != PRIMARY:
+            replica = self._replica(node)
+            replica.healthy = False
+            replica.checked_at = time.time()
+
+    # -- replication lag ---------------------------------------------------
+
+    async def check_replica(self, replica: ReplicaState) -> None:
+        """Refresh health and lag for one replica."""
+        engine = self.engine(BACKGROUND, replica.name)
+        try:
+            async with engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    result = await conn.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    ))
+                    replica.lag_seconds = float(result.scalar() or 0)
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    replica.lag_seconds = 0.0
+            replica.healthy = True
+            replica.last_error = None
+        except Exception as e:  # noqa: BLE001
+            replica.healthy = False
+            replica.last_error = str(e)
+        replica.checked_at = time.time()
+        if replica.lag_seconds > self.max_replica_lag:
+            logger.warning(f"🐢 {replica.name} lag {replica.lag_seconds:.1f}s exceeds {self.max_replica_lag}s")
+
+    async def check_replicas(self) -> None:
+        await asyncio.gather(*(self.check_replica(r) for r in self.replicas))
+
+    def start_lag_monitor(self, interval: float = 5.0) -> None:
+        if not self.replicas or (self._lag_task is not None and not self._lag_task.done()):
+            return
+
+        async def _run():
+            while True:
+                await self.check_replicas()
+                await asyncio.sleep(interval)
+
+        self._lag_task = asyncio.create_task(_run(), name="db_replica_lag_monitor")
+
+    async def stop_lag_monitor(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+
+    # -- reporting / lifecycle --------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        pools = {}
+        for (node, workload), engine in self._engines.items():
+            entry = self._stats.get((workload, node), PoolStats()).to_dict()
+            entry["pool_status"] = engine.sync_engine.pool.status()
+            pools[f"{workload}@{node}"] = entry
+        return {
+            "pools": pools,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag_seconds,
+                    "checked_at": r.checked_at,
+                    "last_error": r.last_error,
+                }
+                for r in self.replicas
+            ],
+            "replica_fallbacks": self.replica_fallbacks,
+        }
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop pooled connections inherited from the parent process.
+
+        ``dispose(close=False)`` discards the pools without closing the
+        sockets, which still belong to the parent; each engine then opens
+        fresh connections in this process on first use. The lag monitor
+        task lived on the parent's loop and is forgotten.
+        """
+        for engine in self._engines.values():
+            engine.sync_engine.dispose(close=False)
+        for stats in self._stats.values():
+            stats.checked_out = 0
+        self._lag_task = None
+
+    async def dispose(self) -> None:
+        await self.stop_lag_monitor()
+        for engine in list(self._engines.values()):
+            await engine.dispose()
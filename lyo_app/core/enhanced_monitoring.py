@@ -5,11 +5,11 @@ Production-ready error tracking, logging, and performance monitoring
 
 import asyncio
 import traceback
-import sys
 import time
 import json
 import uuid
-from typing import Dict, List, Optional, Any, Callable
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any, Callable
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 from functools import wraps
@@ -27,6 +27,13 @@ except ImportError:
 
 from lyo_app.core.config import settings
 from lyo_app.core.logging import logger
+from lyo_app.core.query_accounting import query_accounting
+from lyo_app.core.request_metrics import (
+    SLOW_REQUEST_MS,
+    RequestMetrics,
+    process_sampler,
+    request_metrics,
+)
 
 @dataclass
 class ErrorContext:
@@ -241,29 +248,13 @@ class EnhancedErrorHandler:
         return ErrorSeverity.LOW
     
     def _collect_system_info(self) -> Dict[str, Any]:
-        """Collect current system information"""
+        """Collect current system information (last background sample; never blocks)"""
         
         if not PSUTIL_AVAILABLE:
             return {'error': 'psutil not available'}
         
         try:
-            return {
-                'memory_usage': {
-                    'total': psutil.virtual_memory().total,
-                    'available': psutil.virtual_memory().available,
-                    'percent': psutil.virtual_memory().percent
-                },
-                'cpu_usage': psutil.cpu_percent(interval=1),
-                'disk_usage': {
-                    'total': psutil.disk_usage('/').total,
-                    'free': psutil.disk_usage('/').free,
-                    'percent': psutil.disk_usage('/').percent
-                },
-                'python_version': sys.version,
-                'platform': sys.platform,
-                'process_id': psutil.Process().pid,
-                'thread_count': psutil.Process().num_threads()
-            }
+            return process_sampler.snapshot()
         except Exception as e:
             logger.warning(f"Failed to collect system info: {e}")
             return {'error': 'Failed to collect system info'}
@@ -502,12 +493,22 @@ class EnhancedErrorHandler:
         )
 
 class PerformanceMonitor:
-    """Real-time performance monitoring"""
+    """Real-time performance monitoring
+
+    Request latencies go into fixed-bucket histograms keyed by route
+    template (see ``lyo_app.core.request_metrics``); process memory/CPU come
+    from the background ``process_sampler`` rather than per-request psutil
+    calls.
+    """
     
-    def __init__(self):
-        self.metrics = []
+    def __init__(self, max_recent: int = 1000, metrics: Optional[RequestMetrics] = None):
+        self.metrics: Deque[PerformanceMetrics] = deque(maxlen=max_recent)
         self.slow_queries = []
-        self.endpoint_stats = {}
+        self.request_metrics = metrics or request_metrics
+    
+    @property
+    def endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.request_metrics.snapshot()
     
     @contextmanager
     def track_performance(
@@ -518,83 +519,61 @@ class PerformanceMonitor:
     ):
         """Context manager for performance tracking"""
         
-        start_time = time.time()
-        
-        if PSUTIL_AVAILABLE:
-            start_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-            start_cpu = psutil.cpu_percent()
-        else:
-            start_memory = 0
-            start_cpu = 0
-        
+        start_time = time.perf_counter()
+        status_code = 200
         try:
             yield
+        except Exception:
+            status_code = 500
+            raise
         finally:
-            end_time = time.time()
-            
-            if PSUTIL_AVAILABLE:
-                end_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-                end_cpu = psutil.cpu_percent()
-            else:
-                end_memory = 0
-                end_cpu = 0
-            
-            metrics = PerformanceMetrics(
+            self.record_request(
                 endpoint=endpoint,
                 method=method,
-                response_time_ms=(end_time - start_time) * 1000,
-                status_code=200,  # Will be updated by middleware
-                timestamp=datetime.utcnow(),
+                status_code=status_code,
+                response_time_ms=(time.perf_counter() - start_time) * 1000,
                 user_id=user_id,
-                memory_usage_mb=end_memory - start_memory,
-                cpu_usage_percent=end_cpu - start_cpu,
-                database_queries=0,  # Would be tracked by database middleware
-                cache_hits=0,  # Would be tracked by cache middleware
-                cache_misses=0
             )
-            
-            self.record_metrics(metrics)
+    
+    def record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: float,
+        user_id: Optional[int] = None,
+        database_queries: int = 0,
+    ) -> None:
+        """Record one finished request; ``endpoint`` should be a route template."""
+        
+        sample = process_sampler.snapshot() if PSUTIL_AVAILABLE else {}
+        self.record_metrics(PerformanceMetrics(
+            endpoint=endpoint,
+            method=method,
+            response_time_ms=response_time_ms,
+            status_code=status_code,
+            timestamp=datetime.utcnow(),
+            user_id=user_id,
+            memory_usage_mb=sample.get('process_rss_mb', 0),
+            cpu_usage_percent=sample.get('process_cpu_percent', 0),
+            database_queries=database_queries,
+            cache_hits=0,  # Would be tracked by cache middleware
+            cache_misses=0
+        ))
     
     def record_metrics(self, metrics: PerformanceMetrics):
         """Record performance metrics"""
         
         self.metrics.append(metrics)
-        
-        # Update endpoint statistics
-        if metrics.endpoint not in self.endpoint_stats:
-            self.endpoint_stats[metrics.endpoint] = {
-                'total_requests': 0,
-                'avg_response_time': 0,
-                'max_response_time': 0,
-                'min_response_time': float('inf'),
-                'error_count': 0
-            }
-        
-        stats = self.endpoint_stats[metrics.endpoint]
-        stats['total_requests'] += 1
-        
-        # Update response time statistics
-        current_avg = stats['avg_response_time']
-        total_requests = stats['total_requests']
-        stats['avg_response_time'] = (
-            (current_avg * (total_requests - 1) + metrics.response_time_ms) / total_requests
+        self.request_metrics.observe(
+            metrics.method, metrics.endpoint, metrics.status_code, metrics.response_time_ms
         )
         
-        if metrics.response_time_ms > stats['max_response_time']:
-            stats['max_response_time'] = metrics.response_time_ms
-        
-        if metrics.response_time_ms < stats['min_response_time']:
-            stats['min_response_time'] = metrics.response_time_ms
-        
         # Log slow requests
-        if metrics.response_time_ms > 5000:  # 5 seconds
+        if metrics.response_time_ms > SLOW_REQUEST_MS:
             logger.warning(
-                f"Slow request detected: {metrics.endpoint} took {metrics.response_time_ms:.2f}ms"
+                f"Slow request detected: {metrics.method} {metrics.endpoint} took {metrics.response_time_ms:.2f}ms"
             )
-        
-        # Keep only recent metrics (last 1000)
-        if len(self.metrics) > 1000:
-            self.metrics = self.metrics[-1000:]
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary"""
@@ -602,19 +581,20 @@ class PerformanceMonitor:
         if not self.metrics:
             return {'message': 'No performance data available'}
         
-        recent_metrics = self.metrics[-100:]  # Last 100 requests
+        recent_metrics = list(self.metrics)[-100:]  # Last 100 requests
         
         avg_response_time = sum(m.response_time_ms for m in recent_metrics) / len(recent_metrics)
-        avg_memory_usage = sum(m.memory_usage_mb for m in recent_metrics) / len(recent_metrics)
-        avg_cpu_usage = sum(m.cpu_usage_percent for m in recent_metrics) / len(recent_metrics)
+        total_requests = sum(s.histogram.count for s in self.request_metrics.routes.values())
+        sample = process_sampler.snapshot() if PSUTIL_AVAILABLE else {}
         
         return {
-            'total_requests': len(self.metrics),
+            'total_requests': total_requests,
             'recent_avg_response_time_ms': round(avg_response_time, 2),
-            'recent_avg_memory_usage_mb': round(avg_memory_usage, 2),
-            'recent_avg_cpu_usage_percent': round(avg_cpu_usage, 2),
+            'process_rss_mb': sample.get('process_rss_mb', 0),
+            'process_cpu_percent': sample.get('process_cpu_percent', 0),
             'endpoint_stats': self.endpoint_stats,
-            'slow_requests_count': len([m for m in recent_metrics if m.response_time_ms > 5000])
+            'query_stats': query_accounting.snapshot(),
+            'slow_requests_count': len([m for m in recent_metrics if m.response_time_ms > SLOW_REQUEST_MS])
         }
 
 # Global instances
@@ -0,0 +1,41 @@
+"""
+Fork-safety hooks for running with gunicorn ``preload_app``.
+
+With ``preload_app = True`` the app is imported once in the gunicorn master
+and each worker is forked from it, so imported modules are shared
+copy-on-write instead of being re-imported per worker. Anything created at
+import time that owns a socket, a pid or an event-loop task must not be
+carried across the fork: pooled DB connections would be shared between
+processes, and psutil handles would keep reporting the master.
+
+Modules that hold such state register a reset function with
+``register_after_fork``; every registered function runs in each forked child
+(via ``os.register_at_fork``), before the worker imports or serves anything.
+"""
+
+import logging
+import os
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+_after_fork_hooks: List[Callable[[], None]] = []
+
+
+def register_after_fork(func: Callable[[], None]) -> Callable[[], None]:
+    """Run ``func`` in every child process after a fork. Usable as a decorator."""
+    _after_fork_hooks.append(func)
+    return func
+
+
+def run_after_fork_hooks() -> None:
+    """Reset fork-unsafe state; called automatically in forked children."""
+    for func in _after_fork_hooks:
+        try:
+            func()
+        except Exception as e:  # noqa: BLE001 - one bad hook must not kill the worker
+            logger.warning(f"After-fork hook {getattr(func, '__qualname__', func)} failed: {e}")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=run_after_fork_hooks)
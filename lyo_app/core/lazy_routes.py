@@ -0,0 +1,305 @@
+"""
+Feature-router registration with an optional lazy mode.
+
+``create_app`` describes each feature router as a ``RouterSpec`` and hands
+the list to ``mount_routers``. In the default (eager) mode every module is
+imported and its router included, in order, exactly like the hand-written
+``try: from ... import router`` blocks this replaced.
+
+With ``LAZY_ROUTERS=1`` a spec whose routes are listed in the route manifest
+(``lyo_app/route_manifest.json``, written by ``scripts/build_route_manifest.py``)
+is registered as ``LazyRoute`` placeholders instead of being imported. A
+placeholder matches the same path and methods as the route it stands in for;
+the first request that hits any of a spec's placeholders imports the module,
+swaps the real routes in at the placeholders' position (so match precedence
+is the same as in eager mode) and re-dispatches the request. Specs that are
+missing from the manifest, or marked ``eager``, are imported at start-up, so a
+stale manifest only costs start-up time, never a route. Specs the manifest
+lists as ``unavailable`` (their import failed when it was built) are skipped
+without attempting the import.
+
+``/openapi.json`` loads every pending router first so the schema is complete.
+"""
+
+import importlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound, compile_path
+
+try:
+    from starlette._utils import get_route_path
+except ImportError:  # Starlette < 0.35 matches on the raw path
+    def get_route_path(scope: Dict[str, Any]) -> str:
+        return scope["path"]
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # FastAPI < 0.120 flattens included routers eagerly
+    iter_route_contexts = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "route_manifest.json"
+
+
+def lazy_routers_enabled() -> bool:
+    return os.getenv("LAZY_ROUTERS", "").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    """
+    One feature router and how to include it.
+
+    Args:
+        name: Stable key used in the route manifest and in logs
+        module: Module holding the router
+        attr: Router attribute on the module
+        prefixes: Include the router once per prefix ("" for none)
+        tags: OpenAPI tags applied to every include
+        fallback: Module to use when ``module`` cannot be imported
+        installer: Name of a ``fn(app)`` on the module to call instead of
+            including ``attr`` (for packages that mount several routers)
+        required: Import errors propagate instead of being logged
+        eager: Always import at start-up, even in lazy mode
+        description: Logged once the router is mounted
+    """
+
+    name: str
+    module: str
+    attr: str = "router"
+    prefixes: Tuple[str, ...] = ("",)
+    tags: Optional[Tuple[str, ...]] = None
+    fallback: Optional[str] = None
+    installer: Optional[str] = None
+    required: bool = False
+    eager: bool = False
+    description: str = ""
+
+    def _import(self) -> Any:
+        try:
+            module = importlib.import_module(self.module)
+        except ImportError:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Using {self.fallback} for {self.name} routes ({self.module} unavailable)")
+            module = importlib.import_module(self.fallback)
+        target = self.installer or self.attr
+        try:
+            return getattr(module, target)
+        except AttributeError as e:
+            raise ImportError(f"cannot import name {target!r} from {module.__name__!r}") from e
+
+    def install(self, app: FastAPI) -> None:
+        """Import the module and include its router(s) on ``app``."""
+        target = self._import()
+        if self.installer:
+            target(app)
+            return
+        for prefix in self.prefixes:
+            kwargs: Dict[str, Any] = {"prefix": prefix} if prefix else {}
+            if self.tags:
+                kwargs["tags"] = list(self.tags)
+            app.include_router(target, **kwargs)
+
+
+def route_entries(routes: Sequence[BaseRoute], skip: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Manifest entries (path, methods or websocket flag) for ``routes``.
+
+    Included routers are expanded to their effective, prefixed paths.
+    """
+    skip = set(skip)
+    contexts: Iterable[Any] = iter_route_contexts(routes) if iter_route_contexts else routes
+    entries = []
+    for ctx in contexts:
+        path = getattr(ctx, "path", None) or getattr(getattr(ctx, "starlette_route", None), "path", None)
+        if not path or path in skip:
+            continue
+        original = getattr(ctx, "original_route", ctx)
+        if "WebSocket" in type(original).__name__:
+            entries.append({"path": path, "websocket": True})
+        else:
+            methods = getattr(ctx, "methods", None)
+            entries.append({"path": path, "methods": sorted(methods) if methods else None})
+    return entries
+
+
+def spec_routes(spec: RouterSpec) -> List[Dict[str, Any]]:
+    """Import ``spec`` into a scratch app and list the routes it adds."""
+    scratch = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+    spec.install(scratch)
+    return route_entries(scratch.router.routes)
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, Any]:
+    """``{"routers": {spec name: [entries]}, "unavailable": [spec names]}``, or {}."""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+        return {"routers": manifest["routers"], "unavailable": manifest.get("unavailable", [])}
+    except FileNotFoundError:
+        logger.warning(f"Route manifest {path} not found; mounting all routers eagerly")
+    except (ValueError, KeyError) as e:
+        logger.warning(f"Route manifest {path} unreadable ({e}); mounting all routers eagerly")
+    return {}
+
+
+class LazyRoute(BaseRoute):
+    """Placeholder for a route whose module has not been imported yet."""
+
+    def __init__(self, table: "RouterTable", spec: RouterSpec, path: str,
+                 methods: Optional[Sequence[str]] = None, websocket: bool = False):
+        self.table = table
+        self.spec = spec
+        self.path = path
+        self.name = None
+        self.methods = set(methods) if methods else None
+        self.websocket = websocket
+        self.include_in_schema = False
+        self.path_regex, self.path_format, self.param_convertors = compile_path(path)
+
+    def matches(self, scope: Dict[str, Any]) -> Tuple[Match, Dict[str, Any]]:
+        if scope["type"] != ("websocket" if self.websocket else "http"):
+            return Match.NONE, {}
+        if not self.path_regex.match(get_route_path(scope)):
+            return Match.NONE, {}
+        if self.methods and scope["method"] not in self.methods:
+            return Match.PARTIAL, {}  # let the real route answer 405
+        return Match.FULL, {}
+
+    async def handle(self, scope, receive, send) -> None:
+        self.table.load(self.spec)
+        await self.table.app.router(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    def __repr__(self) -> str:
+        return f"LazyRoute(spec={self.spec.name!r}, path={self.path!r})"
+
+
+class RouterTable:
+    """Mounted specs for one app, and which of them are still placeholders."""
+
+    def __init__(self, app: FastAPI, specs: Sequence[RouterSpec]):
+        self.app = app
+        self.specs = list(specs)
+        self.pending: Dict[str, RouterSpec] = {}
+        self.loaded: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.load_ms: Dict[str, float] = {}
+
+    def _install(self, spec: RouterSpec) -> bool:
+        started = time.perf_counter()
+        try:
+            spec.install(self.app)
+        except ImportError as e:
+            if spec.required:
+                raise
+            self.failed.add(spec.name)
+            logger.warning(f"⚠️ {spec.name} routes not available: {e}")
+            return False
+        finally:
+            self.load_ms[spec.name] = round((time.perf_counter() - started) * 1000, 1)
+        self.loaded.add(spec.name)
+        if spec.description:
+            logger.info(f"✅ {spec.description}")
+        return True
+
+    def mount_placeholders(self, spec: RouterSpec, entries: Sequence[Dict[str, Any]]) -> None:
+        for entry in entries:
+            self.app.router.routes.append(
+                LazyRoute(self, spec, entry["path"], entry.get("methods"), entry.get("websocket", False))
+            )
+        self.pending[spec.name] = spec
+
+    def load(self, spec: RouterSpec) -> None:
+        """Import a pending spec and put its routes where its placeholders were."""
+        if self.pending.pop(spec.name, None) is None:
+            return
+        router = self.app.router
+        routes = router.routes
+        index = next(
+            (i for i, r in enumerate(routes) if isinstance(r, LazyRoute) and r.spec is spec),
+            len(routes),
+        )
+        routes[:] = [r for r in routes if not (isinstance(r, LazyRoute) and r.spec is spec)]
+        start = len(routes)
+        self._install(spec)
+        added = routes[start:]
+        del routes[start:]
+        routes[index:index] = added
+        if hasattr(router, "_mark_routes_changed"):
+            router._mark_routes_changed()
+        self.app.openapi_schema = None
+        logger.info(f"⚡ {spec.name} routes loaded on first use in {self.load_ms[spec.name]:.0f}ms")
+
+    def load_all(self) -> None:
+        for spec in list(self.pending.values()):
+            self.load(spec)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": sorted(self.loaded),
+            "pending": sorted(self.pending),
+            "failed": sorted(self.failed),
+            "load_ms": dict(self.load_ms),
+        }
+
+
+def mount_routers(
+    app: FastAPI,
+    specs: Sequence[RouterSpec],
+    lazy: Optional[bool] = None,
+    manifest: Optional[Dict[str, Any]] = None,
+) -> RouterTable:
+    """
+    Include ``specs`` on ``app`` in order, eagerly or as lazy placeholders.
+
+    Args:
+        app: Application to mount on
+        specs: Routers in inclusion (and therefore match-precedence) order
+        lazy: Defer imports; defaults to the ``LAZY_ROUTERS`` env var
+        manifest: Parsed route manifest; defaults to ``route_manifest.json``
+
+    Returns:
+        The ``RouterTable``, also stored on ``app.state.router_table``
+    """
+    if lazy is None:
+        lazy = lazy_routers_enabled()
+    if lazy and manifest is None:
+        manifest = load_manifest()
+    routes = manifest.get("routers", {}) if lazy else {}
+    unavailable = set(manifest.get("unavailable", ())) if lazy else set()
+
+    table = RouterTable(app, specs)
+    for spec in specs:
+        entries = routes.get(spec.name)
+        if spec.eager or (not entries and spec.name not in unavailable):
+            table._install(spec)
+        elif entries:
+            table.mount_placeholders(spec, entries)
+        else:
+            table.failed.add(spec.name)
+            logger.info(f"{spec.name} routes skipped (unavailable when the route manifest was built)")
+
+    if table.pending:
+        original_openapi = app.openapi
+
+        def openapi() -> Dict[str, Any]:
+            table.load_all()
+            return original_openapi()
+
+        app.openapi = openapi
+        logger.info(f"⚡ {len(table.pending)} routers deferred until first use")
+
+    app.state.router_table = table
+    return table
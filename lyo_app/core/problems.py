@@ -143,6 +143,20 @@ class ModelNotAvailableProblem(ProblemDetail):
         )
 
 
+class ServiceOverloadedProblem(ProblemDetail):
+    """RFC 9457 Problem for load shedding: the server is saturated, retry shortly."""
+    
+    def __init__(self, detail: str = "Service is overloaded", retry_after: int = 1, instance: Optional[str] = None):
+        super().__init__(
+            type_="https://api.lyo.app/problems/service-overloaded",
+            title="Service Overloaded",
+            status=503,
+            detail=detail,
+            instance=instance,
+            retryAfter=retry_after
+        )
+
+
 def create_problem_response(problem: ProblemDetail, request: Request) -> JSONResponse:
     """Create a JSONResponse from a ProblemDetail."""
     content = {
@@ -156,10 +170,14 @@ def create_problem_response(problem: ProblemDetail, request: Request) -> JSONRes
     # Add extensions
     content.update(problem.extensions)
     
+    headers = {"Content-Type": "application/problem+json"}
+    if "retryAfter" in problem.extensions:
+        headers["Retry-After"] = str(problem.extensions["retryAfter"])
+    
     return JSONResponse(
         status_code=problem.status,
         content=content,
-        headers={"Content-Type": "application/problem+json"}
+        headers=headers
     )
 
 
@@ -0,0 +1,52 @@
+"""
+Prometheus export for the ``/metrics`` endpoint.
+
+Under gunicorn every worker writes its samples to ``PROMETHEUS_MULTIPROC_DIR``
+(created in ``gunicorn.conf.py``); a scrape then has to aggregate all
+workers' files or it only sees whichever worker answered. When that
+directory is configured the handler collects through a fresh registry with
+``MultiProcessCollector``; otherwise it serves the default registry.
+"""
+
+import os
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def multiprocess_dir() -> str:
+    """The configured multiprocess directory, if it exists."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir") or ""
+    return path if path and os.path.isdir(path) else ""
+
+
+def metrics_endpoint_handler() -> bytes:
+    """Render all metrics in the Prometheus text format."""
+    if not PROMETHEUS_AVAILABLE:
+        raise RuntimeError("prometheus_client is not installed")
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def get_metrics_content_type() -> str:
+    return CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int, path: str = "") -> None:
+    """Drop a dead worker's live gauges (call from gunicorn's ``child_exit``)."""
+    path = path or multiprocess_dir()
+    if PROMETHEUS_AVAILABLE and path and os.path.isdir(path):
+        multiprocess.mark_process_dead(pid, path)
@@ -0,0 +1,249 @@
+"""
+Request-scoped SQL query accounting.
+
+The cursor-execute hooks in ``lyo_app.core.database`` report every statement
+to ``record_query``, which adds it to the ``QueryStats`` of the current
+request (held in a contextvar, so it follows the request through awaits and
+SQLAlchemy's greenlet bridge). Per request we track the query count, total
+DB time, and a count per statement *fingerprint* (the SQL with literals and
+bind parameters collapsed).
+
+When one fingerprint runs ``n_plus_one_threshold`` or more times in a single
+request, that is almost always a loop issuing one query per row (N+1); those
+are logged and counted per route.
+
+Routes can declare a budget with ``@query_budget(max_queries=..., max_repeats=...)``.
+Requests over budget are logged; in strict mode (``QUERY_BUDGET_STRICT=1``,
+enabled by the test suite) ``QueryBudgetExceeded`` is raised so the test
+fails.
+"""
+
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = re.compile(r"(?:%\(\w+\)s|\$\d+|:\w+|\?)")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:\?\s*,\s*)*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalise a SQL statement so repeats with different values compare equal."""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _BIND.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries (or repeats) than its route's budget allows."""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: Optional[int] = None
+    max_repeats: Optional[int] = None
+
+
+@dataclass
+class QueryStats:
+    """Queries issued while one request (or ``track_queries`` block) was active."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    statements: Dict[str, List[float]] = field(default_factory=dict)  # statement -> [count, ms]
+    closed: bool = False
+
+    def add(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, duration_ms]
+        else:
+            entry[0] += 1
+            entry[1] += duration_ms
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, float]]:
+        """Fingerprints executed at least ``threshold`` times, most frequent first."""
+        # Keyed by raw statement on the hot path; fingerprint only when asked
+        merged: Dict[str, List[float]] = {}
+        for stmt, (n, ms) in self.statements.items():
+            entry = merged.setdefault(fingerprint(stmt), [0, 0.0])
+            entry[0] += n
+            entry[1] += ms
+        return sorted(
+            ((fp, int(n), ms) for fp, (n, ms) in merged.items() if n >= threshold),
+            key=lambda item: -item[1],
+        )
+
+    def to_dict(self, n_plus_one_threshold: int = 5) -> Dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_time_ms": round(self.total_ms, 2),
+            "distinct_statements": len({fingerprint(s) for s in self.statements}),
+            "repeated": [
+                {"fingerprint": fp, "count": n, "db_time_ms": round(ms, 2)}
+                for fp, n, ms in self.repeated(n_plus_one_threshold)
+            ],
+        }
+
+
+@dataclass
+class RouteQueryTotals:
+    requests: int = 0
+    queries: int = 0
+    db_time_ms: float = 0.0
+    max_queries: int = 0
+    n_plus_one_requests: int = 0
+    budget_violations: int = 0
+    top_repeats: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "avg_queries": round(self.queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "avg_db_time_ms": round(self.db_time_ms / self.requests, 2) if self.requests else 0,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "budget_violations": self.budget_violations,
+            "top_repeats": dict(sorted(self.top_repeats.items(), key=lambda kv: -kv[1])[:5]),
+        }
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def record_query(statement: str, duration_seconds: float) -> None:
+    """Called from the cursor-execute hook for every statement."""
+    stats = _current_stats.get()
+    if stats is not None and not stats.closed:
+        stats.add(statement, duration_seconds * 1000)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Account all queries issued inside the block (and tasks it spawns)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.closed = True  # fire-and-forget tasks keep the context; stop counting them
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """Test helper: fail if the block issues more queries/repeats than allowed."""
+    with track_queries() as stats:
+        yield stats
+    _check(stats, QueryBudget(max_queries, max_repeats), "block", strict=True)
+
+
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Callable:
+    """Declare a query budget on a route endpoint (apply under ``@router.get``)."""
+
+    def decorator(func: Callable) -> Callable:
+        func.__query_budget__ = QueryBudget(max_queries, max_repeats)
+        return func
+
+    return decorator
+
+
+def _check(stats: QueryStats, budget: QueryBudget, route: str, strict: bool) -> Optional[str]:
+    problems = []
+    if budget.max_queries is not None and stats.count > budget.max_queries:
+        problems.append(f"{stats.count} queries > budget {budget.max_queries}")
+    if budget.max_repeats is not None:
+        worst = stats.repeated(budget.max_repeats + 1)
+        if worst:
+            fp, n, _ = worst[0]
+            problems.append(f"statement repeated {n}x > budget {budget.max_repeats}: {fp[:200]}")
+    if not problems:
+        return None
+    message = f"Query budget exceeded for {route}: " + "; ".join(problems)
+    if strict:
+        raise QueryBudgetExceeded(message)
+    return message
+
+
+class QueryAccounting:
+    """Per-route aggregation of request ``QueryStats`` plus budget checks."""
+
+    def __init__(self, n_plus_one_threshold: int = 5, strict: bool = False):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+        self.routes: Dict[str, RouteQueryTotals] = {}
+        self.budgets: Dict[str, QueryBudget] = {}
+
+    def set_budget(self, route: str, max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> None:
+        """Budget by route template, for routes whose endpoint can't be decorated."""
+        self.budgets[route] = QueryBudget(max_queries, max_repeats)
+
+    def budget_for(self, route: str, endpoint: Any = None) -> Optional[QueryBudget]:
+        return getattr(endpoint, "__query_budget__", None) or self.budgets.get(route)
+
+    def finish_request(self, route: str, stats: QueryStats, endpoint: Any = None) -> None:
+        """Fold a finished request into the route totals; log N+1s and check budgets."""
+        totals = self.routes.get(route)
+        if totals is None:
+            totals = self.routes[route] = RouteQueryTotals()
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.db_time_ms += stats.total_ms
+        if stats.count > totals.max_queries:
+            totals.max_queries = stats.count
+
+        if stats.count >= self.n_plus_one_threshold:
+            repeated = stats.repeated(self.n_plus_one_threshold)
+            if repeated:
+                totals.n_plus_one_requests += 1
+                for fp, n, _ in repeated:
+                    totals.top_repeats[fp] = max(totals.top_repeats.get(fp, 0), n)
+                fp, n, ms = repeated[0]
+                logger.warning(
+                    f"🔁 Possible N+1 on {route}: statement ran {n}x ({ms:.1f}ms) "
+                    f"of {stats.count} queries: {fp[:200]}"
+                )
+
+        budget = self.budget_for(route, endpoint)
+        if budget is not None:
+            try:
+                message = _check(stats, budget, route, self.strict)
+            except QueryBudgetExceeded:
+                totals.budget_violations += 1
+                raise
+            if message:
+                totals.budget_violations += 1
+                logger.warning(message)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            route: totals.to_dict()
+            for route, totals in sorted(self.routes.items(), key=lambda kv: -kv[1].queries)
+        }
+
+    def reset(self) -> None:
+        self.routes.clear()
+
+
+query_accounting = QueryAccounting(
+    n_plus_one_threshold=int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5")),
+    strict=os.getenv("QUERY_BUDGET_STRICT", "").lower() in ("1", "true", "yes"),
+)
@@ -4,11 +4,13 @@ Provides scalable rate limiting across multiple application instances.
 """
 
 import os
+import math
 import time
-import redis
 import hashlib
 import logging
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as aioredis
 from fastapi import Request, HTTPException
 from lyo_app.core.config import settings
 
@@ -36,14 +38,109 @@ def get_redis_url() -> Optional[str]:
     return getattr(settings, 'redis_url', None)
 
 
+# GCRA (generic cell rate algorithm) in one round trip. The key holds the
+# theoretical arrival time (TAT) in ms; Redis TIME is used so workers with
+# skewed clocks agree. ARGV: limit, window_ms, want, need, block_ms.
+# Grants between `need` and `want` tokens (want > need when leasing a batch).
+# Returns {granted, remaining, retry_after_ms, reset_after_ms}.
+GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local need = tonumber(ARGV[4])
+local block = tonumber(ARGV[5])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = window / limit
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local available = math.floor((now + window - tat) / interval)
+if available < need then
+  local retry = tat + need * interval - window - now
+  if block > 0 then
+    tat = math.max(tat, now + block + window)
+    redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+    retry = math.max(retry, block)
+  end
+  return {0, 0, math.ceil(retry), math.ceil(tat - now)}
+end
+local granted = math.min(want, available)
+tat = tat + granted * interval
+redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+return {granted, available - granted, 0, math.ceil(tat - now)}
+"""
+
+
+class LocalGCRA:
+    """
+    In-process GCRA with the same semantics as ``GCRA_LUA``.
+
+    Used when Redis is not configured or unreachable, so the limiter keeps
+    enforcing per-process limits instead of failing fully open.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tat: Dict[str, float] = {}
+
+    def take(
+        self,
+        key: str,
+        limit: int,
+        window_ms: float,
+        want: int = 1,
+        need: int = 1,
+        block_ms: float = 0,
+        now_ms: Optional[float] = None,
+    ) -> Tuple[int, int, int, int]:
+        now = now_ms if now_ms is not None else time.time() * 1000
+        interval = window_ms / limit
+        tat = max(self._tat.get(key, now), now)
+        available = int((now + window_ms - tat) // interval)
+        if available < need:
+            retry = tat + need * interval - window_ms - now
+            if block_ms > 0:
+                tat = max(tat, now + block_ms + window_ms)
+                self._store(key, tat, now)
+                retry = max(retry, block_ms)
+            return 0, 0, math.ceil(retry), math.ceil(tat - now)
+        granted = min(want, available)
+        tat += granted * interval
+        self._store(key, tat, now)
+        return granted, available - granted, 0, math.ceil(tat - now)
+
+    def _store(self, key: str, tat: float, now: float) -> None:
+        if key not in self._tat and len(self._tat) >= self.max_keys:
+            # Entries whose TAT has passed carry no state (bucket is full)
+            for k in [k for k, v in self._tat.items() if v <= now]:
+                del self._tat[k]
+            if len(self._tat) >= self.max_keys:
+                self._tat.pop(next(iter(self._tat)))
+        self._tat[key] = tat
+
+    def clear(self) -> None:
+        self._tat.clear()
+
+
 class RedisRateLimiter:
-    """Production-ready Redis-backed rate limiter using sliding window."""
+    """
+    Async Redis-backed GCRA rate limiter.
+    
+    Each check is a single EVALSHA of ``GCRA_LUA`` (no EXISTS/TTL/pipeline
+    round trips, no same-second ZSET member collisions). With ``lease_size``
+    set, a client that is hot on this worker leases a small batch of tokens
+    and spends it locally, so most of its requests need no round trip; the
+    global limit may be overshot by at most one lease per worker.
+    """
     
     def __init__(self, 
                  redis_url: str = None,
                  max_requests: int = 100, 
                  window_seconds: int = 60,
-                 block_duration: int = 300):
+                 block_duration: int = 300,
+                 lease_size: int = 0,
+                 lease_ttl: float = 1.0,
+                 redis_client=None):
         """
         Initialize rate limiter.
         
@@ -52,32 +149,51 @@ class RedisRateLimiter:
             max_requests: Maximum requests per window
             window_seconds: Time window in seconds
             block_duration: How long to block after limit exceeded
+            lease_size: Max tokens leased to this worker per round trip (0 disables)
+            lease_ttl: Seconds a leased batch stays valid locally
+            redis_client: Pre-built ``redis.asyncio`` client (mainly for tests)
         """
         self.redis_url = redis_url or get_redis_url()
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.block_duration = block_duration
-        self.redis_client = None
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.redis_client = redis_client
+        self.reconnect_interval = 30.0
+        
+        self._script = None
+        self._redis_down_until = 0.0
+        self._local = LocalGCRA()
+        # key -> [tokens, expires_at, remaining_at_lease, reset_time]
+        self._leases: Dict[str, list] = {}
+        self._last_seen: Dict[str, float] = {}
+        self.stats = {"checks": 0, "redis_calls": 0, "lease_hits": 0, "local_fallbacks": 0, "denied": 0}
         
         # Lazy initialization - do NOT connect here to avoid import-time crashes
         logger.info("RedisRateLimiter initialized (lazy connection strategy)")
             
     def _ensure_connection(self):
-        """Lazy connection to Redis."""
-        if self.redis_client:
-            return
+        """Lazy connection to Redis; returns the registered GCRA script or None."""
+        if self._script is not None:
+            return self._script
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self.redis_client is None:
+            if not self.redis_url:
+                return None
+            try:
+                self.redis_client = aioredis.from_url(self.redis_url, decode_responses=True)
+            except Exception as e:
+                logger.error(f"Failed to create Redis client for rate limiting: {e}")
+                self._mark_redis_down()
+                return None
+        self._script = self.redis_client.register_script(GCRA_LUA)
+        return self._script
 
-        if not self.redis_url:
-            return
-            
-        try:
-            self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
-            # Test connection
-            self.redis_client.ping()
-            logger.info("Redis rate limiter connected successfully")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis for rate limiting: {e}")
-            self.redis_client = None
+    def _mark_redis_down(self) -> None:
+        self._script = None
+        self._redis_down_until = time.monotonic() + self.reconnect_interval
     
     def get_secure_client_id(self, request: Request) -> str:
         """
@@ -99,8 +215,29 @@ class RedisRateLimiter:
         
         # Hash for privacy and consistency
         return hashlib.sha256(composite.encode()).hexdigest()[:16]
+
+    def _lease_batch(self, key: str, limit: int, now: float) -> int:
+        """Tokens to request for a hot key (1 = no lease)."""
+        if self.lease_size <= 1:
+            return 1
+        last = self._last_seen.get(key)
+        if len(self._last_seen) > 50_000:
+            self._last_seen.clear()
+        self._last_seen[key] = now
+        if last is None or now - last > self.lease_ttl:
+            return 1
+        # Never lease more than a tenth of the limit so one worker cannot
+        # starve the others
+        return max(1, min(self.lease_size, limit // 10))
     
-    def is_allowed(self, client_id: str, endpoint: str = "global", limit_override: Optional[int] = None) -> tuple[bool, dict]:
+    async def is_allowed(
+        self,
+        client_id: str,
+        endpoint: str = "global",
+        limit_override: Optional[int] = None,
+        window_override: Optional[int] = None,
+        cost: int = 1,
+    ) -> tuple[bool, dict]:
         """
         Check if request is allowed for client.
         
@@ -108,76 +245,65 @@ class RedisRateLimiter:
             client_id: Client identifier
             endpoint: Specific endpoint (for per-endpoint limits)
             limit_override: Optional custom limit for this check (for tenant plans)
+            window_override: Optional custom window in seconds
+            cost: Tokens this request consumes
             
         Returns:
             Tuple of (is_allowed, rate_limit_info)
         """
         effective_max = limit_override if limit_override is not None else self.max_requests
+        window = window_override if window_override is not None else self.window_seconds
+        rate_key = f"rate_limit:{client_id}:{endpoint}"
+        self.stats["checks"] += 1
         
-        self._ensure_connection()
+        now = time.monotonic()
+        lease = self._leases.get(rate_key)
+        if lease is not None:
+            if lease[1] > now and lease[0] >= cost:
+                lease[0] -= cost
+                self.stats["lease_hits"] += 1
+                return True, {"remaining": lease[2], "reset_time": lease[3]}
+            del self._leases[rate_key]
         
-        if not self.redis_client:
-            # Fail open if Redis is unavailable
-            logger.warning("Redis unavailable, allowing request")
-            return True, {"remaining": effective_max, "reset_time": time.time() + self.window_seconds}
+        want = max(cost, self._lease_batch(rate_key, effective_max, now))
+        args = (effective_max, window * 1000, want, cost, self.block_duration * 1000)
         
-        try:
-            current_time = int(time.time())
-            window_start = current_time - self.window_seconds
-            rate_key = f"rate_limit:{client_id}:{endpoint}"
-            block_key = f"rate_block:{client_id}:{endpoint}"
-            
-            # Check if client is currently blocked
-            if self.redis_client.exists(block_key):
-                block_ttl = self.redis_client.ttl(block_key)
-                return False, {
-                    "remaining": 0,
-                    "reset_time": current_time + block_ttl,
-                    "blocked_until": current_time + block_ttl
-                }
-            
-            # Use pipeline for atomic operations
-            pipe = self.redis_client.pipeline()
-            
-            # Remove old entries from sliding window
-            pipe.zremrangebyscore(rate_key, 0, window_start)
-            
-            # Count current requests in window
-            pipe.zcard(rate_key)
-            
-            # Add current request timestamp
-            pipe.zadd(rate_key, {str(current_time): current_time})
-            
-            # Set expiration for cleanup
-            pipe.expire(rate_key, self.window_seconds + 1)
-            
-            results = pipe.execute()
-            request_count = results[1]  # Count before adding current request
-            
-            if request_count >= effective_max:
-                # Block the client for block_duration
-                self.redis_client.setex(block_key, self.block_duration, "blocked")
-                
-                return False, {
-                    "remaining": 0,
-                    "reset_time": current_time + self.block_duration,
-                    "blocked_until": current_time + self.block_duration
-                }
-            
-            remaining = max(0, effective_max - request_count - 1)
-            reset_time = current_time + self.window_seconds
-            
-            return True, {
-                "remaining": remaining,
-                "reset_time": reset_time
+        script = self._ensure_connection()
+        result = None
+        if script is not None:
+            try:
+                self.stats["redis_calls"] += 1
+                result = await script(keys=[rate_key], args=list(args))
+            except Exception as e:
+                logger.error(f"Rate limiter error, using local fallback: {e}")
+                self._mark_redis_down()
+        if result is None:
+            self.stats["local_fallbacks"] += 1
+            result = self._local.take(rate_key, *args)
+        
+        granted, remaining, retry_after_ms, reset_after_ms = (int(v) for v in result)
+        wall = time.time()
+        
+        if granted < cost:
+            self.stats["denied"] += 1
+            return False, {
+                "remaining": 0,
+                "reset_time": wall + reset_after_ms / 1000,
+                "blocked_until": wall + max(retry_after_ms, 1) / 1000
             }
-            
-        except Exception as e:
-            logger.error(f"Rate limiter error: {e}")
-            # Fail open - allow request if Redis operation fails
-            return True, {"remaining": effective_max, "reset_time": time.time() + self.window_seconds}
+        
+        reset_time = wall + reset_after_ms / 1000
+        if granted > cost:
+            if len(self._leases) > 50_000:
+                self._leases.clear()
+            self._leases[rate_key] = [granted - cost, now + self.lease_ttl, remaining, reset_time]
+        
+        return True, {
+            "remaining": remaining,
+            "reset_time": reset_time
+        }
     
-    def get_rate_limit_status(self, client_id: str, endpoint: str = "global") -> dict:
+    async def get_rate_limit_status(self, client_id: str, endpoint: str = "global") -> dict:
         """
         Get current rate limit status for a client.
         
@@ -188,35 +314,36 @@ class RedisRateLimiter:
         Returns:
             Rate limit status information
         """
-        self._ensure_connection()
+        rate_key = f"rate_limit:{client_id}:{endpoint}"
+        window_ms = self.window_seconds * 1000
+        interval = window_ms / self.max_requests
+        now = time.time() * 1000
         
-        if not self.redis_client:
-            return {"requests_made": 0, "remaining": self.max_requests}
+        tat = None
+        script = self._ensure_connection()
+        if script is not None:
+            try:
+                raw = await self.redis_client.get(rate_key)
+                tat = float(raw) if raw is not None else None
+            except Exception as e:
+                logger.error(f"Failed to get rate limit status: {e}")
+        else:
+            tat = self._local._tat.get(rate_key)
         
-        try:
-            current_time = int(time.time())
-            window_start = current_time - self.window_seconds
-            rate_key = f"rate_limit:{client_id}:{endpoint}"
-            
-            # Clean old entries and count current
-            pipe = self.redis_client.pipeline()
-            pipe.zremrangebyscore(rate_key, 0, window_start)
-            pipe.zcard(rate_key)
-            results = pipe.execute()
-            
-            requests_made = results[1]
-            remaining = max(0, self.max_requests - requests_made)
-            
-            return {
-                "requests_made": requests_made,
-                "remaining": remaining,
-                "window_seconds": self.window_seconds,
-                "max_requests": self.max_requests
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to get rate limit status: {e}")
-            return {"requests_made": 0, "remaining": self.max_requests}
+        tat = max(tat or now, now)
+        remaining = max(0, min(self.max_requests, int((now + window_ms - tat) // interval)))
+        return {
+            "requests_made": self.max_requests - remaining,
+            "remaining": remaining,
+            "window_seconds": self.window_seconds,
+            "max_requests": self.max_requests
+        }
+
+    def reset(self) -> None:
+        """Drop local state (fallback buckets and leases)."""
+        self._local.clear()
+        self._leases.clear()
+        self._last_seen.clear()
 
 
 class RateLimitMiddleware:
@@ -235,7 +362,7 @@ class RateLimitMiddleware:
         endpoint = request.url.path
         
         # Check rate limit
-        is_allowed, rate_info = self.rate_limiter.is_allowed(client_id, endpoint)
+        is_allowed, rate_info = await self.rate_limiter.is_allowed(client_id, endpoint)
         
         if not is_allowed:
             # Add rate limit headers
@@ -308,7 +435,18 @@ in_memory_rate_limiter = InMemoryRateLimiter()
 # Global rate limiter instance
 rate_limiter = RedisRateLimiter(
     max_requests=getattr(settings, 'rate_limit_requests', 100),
-    window_seconds=getattr(settings, 'rate_limit_window', 60)
+    window_seconds=getattr(settings, 'rate_limit_window', 60),
+    lease_size=int(os.getenv("RATE_LIMIT_LEASE_SIZE", "5"))
+)
+
+# Shared limiter for the edge security middleware: per-path limits are
+# passed per call, and there is no extra block period (matches the previous
+# in-memory behaviour, but is now shared across workers via Redis)
+middleware_rate_limiter = RedisRateLimiter(
+    max_requests=120,
+    window_seconds=60,
+    block_duration=0,
+    lease_size=int(os.getenv("RATE_LIMIT_LEASE_SIZE", "5"))
 )
 
 # Middleware instance
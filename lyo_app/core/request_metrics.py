@@ -0,0 +1,307 @@
+"""
+Low-overhead request metrics.
+
+Per-request work is a ``bisect`` into a fixed bucket table plus a few integer
+increments; nothing here takes a lock or touches the OS. Percentiles are read
+from the bucket counts on demand. Series are keyed by route *template*
+(``/api/v1/users/{user_id}``) rather than the raw path, so cardinality is
+bounded by the number of registered routes.
+
+Process statistics (RSS, CPU, threads) are sampled by ``ProcessSampler`` in a
+background task and read from its cached snapshot, so request and error paths
+never call psutil.
+
+When ``prometheus_client`` is installed each observation is mirrored into a
+Prometheus histogram; see ``lyo_app.core.prometheus_metrics`` for the
+(multiprocess-aware) export.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from lyo_app.core.forksafe import register_after_fork
+from lyo_app.core.prometheus_metrics import PROMETHEUS_AVAILABLE
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds, roughly x1.5 per step from 1ms to 60s. The
+# last bucket is open ended; quantiles that land there report the max seen.
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 30000, 60000,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+SLOW_REQUEST_MS = 5000
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    ``record`` only does a bisect and list/int updates, which are atomic
+    under the GIL and never interleave on the event loop, so no lock is
+    needed. Quantiles are linearly interpolated inside the matching bucket.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0..1) in milliseconds."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class RouteStats:
+    """Counters and latency histogram for one route template."""
+
+    __slots__ = ("histogram", "error_count", "status_counts")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.histogram = LatencyHistogram(bounds)
+        self.error_count = 0
+        self.status_counts: Dict[int, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        h = self.histogram
+        return {
+            "total_requests": h.count,
+            "avg_response_time": round(h.mean, 2),
+            "max_response_time": round(h.max, 2),
+            "min_response_time": round(h.min, 2) if h.count else 0.0,
+            "p50_response_time": round(h.quantile(0.50), 2),
+            "p95_response_time": round(h.quantile(0.95), 2),
+            "p99_response_time": round(h.quantile(0.99), 2),
+            "error_count": self.error_count,
+            "status_counts": dict(self.status_counts),
+        }
+
+
+def route_template(scope: Dict[str, Any], root_path: str = "") -> str:
+    """
+    Route template for a routed ASGI scope, or ``UNMATCHED_ROUTE``.
+
+    Starlette stores the matched route in ``scope["route"]``. FastAPI
+    versions that include routers lazily leave the un-prefixed original
+    route there and put the effective (prefixed) one in
+    ``scope["fastapi"]["effective_route_context"]``, so that is preferred.
+    Routes inside a ``Mount`` only know their own suffix; the mount prefix
+    is recovered from the growth of ``root_path`` since the request entered
+    the app.
+    """
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    mount_prefix = scope.get("root_path", "")[len(root_path):]
+    return f"{mount_prefix}{path}" if mount_prefix else path
+
+
+class RequestMetrics:
+    """Registry of ``RouteStats`` keyed by (method, route template)."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.started_at = time.time()
+        self._prom_duration = None
+        self._prom_requests = None
+        if PROMETHEUS_AVAILABLE:
+            self._init_prometheus()
+
+    def _init_prometheus(self) -> None:
+        try:
+            self._prom_duration = Histogram(
+                "lyo_http_request_duration_seconds",
+                "HTTP request latency by route template",
+                ["method", "route"],
+                buckets=[b / 1000 for b in self.bounds],
+            )
+            self._prom_requests = Counter(
+                "lyo_http_requests",
+                "HTTP requests by route template and status class",
+                ["method", "route", "status"],
+            )
+        except ValueError:
+            # Already registered (module re-imported, e.g. in tests)
+            logger.debug("Prometheus request metrics already registered")
+
+    def observe(self, method: str, route: str, status_code: int, duration_ms: float) -> RouteStats:
+        """Record one request. Cheap enough to call on every request."""
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats(self.bounds)
+        stats.histogram.record(duration_ms)
+        stats.status_counts[status_code] = stats.status_counts.get(status_code, 0) + 1
+        if status_code >= 500:
+            stats.error_count += 1
+        if self._prom_duration is not None:
+            self._prom_duration.labels(method, route).observe(duration_ms / 1000)
+            self._prom_requests.labels(method, route, f"{status_code // 100}xx").inc()
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route stats as plain dicts, keyed ``"METHOD /template"``."""
+        return {
+            f"{method} {route}": stats.to_dict()
+            for (method, route), stats in sorted(self.routes.items(), key=lambda kv: kv[0][1])
+        }
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.started_at = time.time()
+
+
+class ProcessSampler:
+    """
+    Sample process and host statistics in the background.
+
+    ``snapshot()`` returns the last sample and never blocks; callers on the
+    request path (monitoring summaries, error reports) read it instead of
+    calling psutil themselves. Samples are also exported as Prometheus
+    gauges, one series per worker pid in multiprocess mode.
+    """
+
+    def __init__(self, interval: float = 15.0):
+        self.interval = interval
+        self._sample: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self._prom_rss = None
+        self._prom_cpu = None
+        if PROMETHEUS_AVAILABLE:
+            try:
+                self._prom_rss = Gauge(
+                    "lyo_process_resident_memory_mb", "Worker RSS in MB",
+                    multiprocess_mode="liveall",
+                )
+                self._prom_cpu = Gauge(
+                    "lyo_process_cpu_percent", "Worker CPU percent since the previous sample",
+                    multiprocess_mode="liveall",
+                )
+            except ValueError:
+                logger.debug("Prometheus process gauges already registered")
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now. Non-blocking: CPU is measured since the last call."""
+        if self._process is None:
+            self._sample = {"error": "psutil not available"}
+            return self._sample
+        try:
+            with self._process.oneshot():
+                rss_mb = self._process.memory_info().rss / 1024 / 1024
+                cpu = self._process.cpu_percent(interval=None)
+                threads = self._process.num_threads()
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage("/")
+            self._sample = {
+                "sampled_at": time.time(),
+                "process_id": self._process.pid,
+                "process_rss_mb": round(rss_mb, 2),
+                "process_cpu_percent": cpu,
+                "thread_count": threads,
+                "memory_usage": {
+                    "total": memory.total,
+                    "available": memory.available,
+                    "percent": memory.percent,
+                },
+                "cpu_usage": psutil.cpu_percent(interval=None),
+                "disk_usage": {
+                    "total": disk.total,
+                    "free": disk.free,
+                    "percent": disk.percent,
+                },
+            }
+            if self._prom_rss is not None:
+                self._prom_rss.set(rss_mb)
+                self._prom_cpu.set(cpu)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Process sampling failed: {e}")
+        return self._sample
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Last sample, plus static interpreter info. Samples once if never started."""
+        sample = self._sample or self.sample()
+        return {**sample, "python_version": sys.version, "platform": sys.platform}
+
+    def start(self) -> None:
+        """Start the background sampling task on the running loop."""
+        if self._task is None or self._task.done():
+            self.sample()  # prime cpu_percent so the first interval is meaningful
+            self._task = asyncio.create_task(self._run(), name="process_sampler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+    def reset_after_fork(self) -> None:
+        """Re-target the new process; the inherited handle and sample are the parent's."""
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self._sample = {}
+        self._task = None
+
+
+# Global instances
+request_metrics = RequestMetrics()
+process_sampler = ProcessSampler(interval=float(os.getenv("PROCESS_SAMPLE_INTERVAL", "15")))
+register_after_fork(process_sampler.reset_after_fork)
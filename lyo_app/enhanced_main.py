@@ -28,7 +28,6 @@ print(f">>> [PID {pid}] BOOTSTRAP STARTING (enhanced_main.py)...", flush=True)
 print(f">>> [PID {pid}] BOOTSTRAP: Loading FastAPI...", flush=True)
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 print(f">>> [PID {pid}] BOOTSTRAP: FastAPI loaded", flush=True)
 
 try:  # Config import (enhanced first)
@@ -59,15 +58,13 @@ except ImportError:  # pragma: no cover
     SENTRY_AVAILABLE = False
 
 try:  # Prometheus optional
-    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client import CONTENT_TYPE_LATEST
     PROMETHEUS_AVAILABLE = True
 except ImportError:  # pragma: no cover
     PROMETHEUS_AVAILABLE = False
 
-from lyo_app.auth.security_middleware import (
-    security_headers_middleware,
-    request_size_middleware,
-)
+from lyo_app.auth.security_middleware import SecurityConfig
+from lyo_app.core.lazy_routes import RouterSpec, mount_routers
 
 
 # Parallel initialization helpers
@@ -204,6 +201,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         successful = sum(1 for r in results if not isinstance(r, Exception))
         print(f">>> [LIFESPAN] Parallel services initialized: {successful}/5 services successful. Results: {results}", flush=True)
 
+        try:
+            from lyo_app.auth.jwt_auth import start_revocation_bus
+            await start_revocation_bus(getattr(settings, "REDIS_URL", None))
+        except Exception as e:
+            print(f">>> [LIFESPAN] JWT revocation fan-out skipped: {e}", flush=True)
+
         try:
             from lyo_app.core.cache_manager import IntelligentCacheManager
             from lyo_app.chat.stores import initialize_stores
@@ -220,10 +223,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     init_task.add_done_callback(_log_startup_task_result)
     app.state.lifespan_bg_init = init_task
     
+    from lyo_app.core.request_metrics import process_sampler
+    from lyo_app.core.database import db_router
+    from lyo_app.core.batch_writer import batch_writer
+    from lyo_app.events.bus import outbox_dispatcher
+    import lyo_app.events.processor  # noqa: F401 - registers the learning event handler
+    process_sampler.start()
+    db_router.start_lag_monitor()
+    batch_writer.start()
+    outbox_dispatcher.start()
+
     print(">>> [LIFESPAN] Startup background task scheduled successfully. Yielding instantly!", flush=True)
     yield
     
     logger.info("Shutting down LyoBackend...")
+    await process_sampler.stop()
+    await outbox_dispatcher.stop()
+    await batch_writer.stop()  # drain buffered usage/telemetry rows before the pools close
+    from lyo_app.auth.jwt_auth import stop_revocation_bus
+    await stop_revocation_bus()
     await close_db()
     try:
         from lyo_app.core.redis_client import close_redis
@@ -233,30 +251,151 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("LyoBackend shutdown completed")
 
 
-async def enhanced_error_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except HTTPException:
-        # Let FastAPI's registered exception handlers process HTTPExceptions
-        # (they preserve status codes like 404, 403, etc.)
-        raise
-    except Exception as e:  # noqa: BLE001
-        user_id = getattr(getattr(request.state, "user", None), "id", None)
-        return await enhanced_error_handler.handle_error(
-            error=e, request=request, user_id=user_id
-        )
-
-
-async def performance_monitoring_middleware(request: Request, call_next):
-    start_time = time.time()
-    with performance_monitor.track_performance(
-        endpoint=str(request.url.path),
-        method=request.method,
-        user_id=getattr(getattr(request.state, "user", {}), "id", None),
-    ):
-        response = await call_next(request)
-    response.headers["X-Process-Time"] = str(time.time() - start_time)
-    return response
+# Feature routers in inclusion order (earlier routers win on overlapping
+# paths). Mounted by ``mount_routers``; with LAZY_ROUTERS=1 everything not
+# marked eager is imported on first request instead of at start-up.
+ROUTER_SPECS = (
+    RouterSpec("vision", "lyo_app.ai_study.vision_routes",
+               description="Gemini Vision routes integrated - Multimodal image analysis active!"),
+    RouterSpec("recommendations", "lyo_app.ai_study.recommendations_routes",
+               description="Recommendations & Embeddings routes integrated - Smart content discovery active!"),
+    RouterSpec("api_v1", "lyo_app.api.v1", attr="api_router", prefixes=("/api/v1",),
+               description="API v1 routes integrated"),
+    # Analytics & Profiling
+    RouterSpec("analytics", "lyo_app.api.analytics", prefixes=("/api/v1",),
+               description="Analytics routes integrated - Implicit Behavioral Profiling active!"),
+    # iOS Compatibility Routes (feed alias, progress analytics)
+    RouterSpec("ios_compat", "lyo_app.api.v1.ios_compatibility",
+               description="iOS Compatibility routes integrated"),
+    RouterSpec("progressive_course", "lyo_app.api.progressive_course",
+               description="Progressive Course Generation routes integrated (iOS Phase A Compatibility)"),
+    RouterSpec("auth", "lyo_app.auth.routes", prefixes=("/auth",), tags=("auth",),
+               required=True, eager=True),
+    RouterSpec("ai_study", "lyo_app.ai_study.clean_routes", fallback="lyo_app.ai_study.routes",
+               required=True),
+    RouterSpec("feeds", "lyo_app.feeds.enhanced_routes", fallback="lyo_app.feeds.routes",
+               prefixes=("/api/v1",), required=True),
+    # Basic social feed routes: /posts, /comments, /posts/{id}/reactions,
+    # /follow, /feed, /feed/public, /users/{id}/posts, /users/{id}/stats.
+    # The enhanced feeds router above only serves /api/v1/feeds/*; without
+    # this, the paths the web/Android clients call do not exist and the
+    # notification triggers in feeds/service.py are unreachable. The
+    # versioned mount matches the mobile clients' /api/v1 surface.
+    RouterSpec("basic_feeds", "lyo_app.feeds.routes", prefixes=("", "/api/v1/feeds"), tags=("feeds",),
+               description="Basic feeds routes integrated - posts/comments/reactions/follow active!"),
+    # storage_routes includes both enhanced_routes AND the iOS-compatible uploads alias
+    RouterSpec("storage", "lyo_app.storage_routes", fallback="lyo_app.storage.enhanced_routes",
+               description="Google Cloud Storage routes integrated - File uploads and processing active!"),
+    # RouterSpec("ads", "lyo_app.monetization.routes"),  # TODO: Monetization module incomplete
+    RouterSpec("ai", "lyo_app.routers.ai_routes"),
+    # Mentor/engagement/curriculum agent endpoints (mentor conversation,
+    # sentiment analysis, websocket)
+    RouterSpec("ai_agents", "lyo_app.ai_agents.routes", prefixes=("/api/v1",)),
+    RouterSpec("ai_chat", "lyo_app.ai_chat.routes"),
+    RouterSpec("tts", "lyo_app.tts.routes"),
+    RouterSpec("image_gen", "lyo_app.image_gen.routes"),
+    # Video Generation (Runway Gen-4.5)
+    RouterSpec("video_gen", "lyo_app.video_gen.routes"),
+    # Phase 1: Generative AI Tutor Foundation
+    RouterSpec("personalization", "lyo_app.personalization.routes",
+               description="Personalization routes integrated - Deep Knowledge Tracing active!"),
+    # Friend challenges — shareable quiz duels with scoreboards
+    RouterSpec("challenges", "lyo_app.challenges.routes",
+               description="Challenge routes integrated - quiz duels active!"),
+    # Phase 2: Advanced AI Tutoring Features
+    RouterSpec("gen_curriculum", "lyo_app.gen_curriculum.routes",
+               description="Generative Curriculum routes integrated - AI-powered content generation active!"),
+    RouterSpec("collaboration", "lyo_app.collaboration.routes",
+               description="Collaborative Learning routes integrated - Peer learning and study groups active!"),
+    RouterSpec("adaptive_learning", "lyo_app.adaptive_learning.routes",
+               description="Adaptive Learning routes integrated - AI-powered personalized sessions active!"),
+    # Chat Module - Mode-based routing with agents
+    RouterSpec("chat", "lyo_app.chat", attr="chat_router", prefixes=("/api/v1",),
+               description="Chat routes integrated - Mode-based routing (Explainer, Planner, Practice, Notes) active!"),
+    # V2 Courses API - Multi-agent async course generation
+    RouterSpec("courses_v2", "lyo_app.api.v2", attr="courses_router",
+               description="V2 Courses API integrated - Multi-agent course generation with job tracking active!"),
+    # Health Check Routes (Phase 4: Observability); eager so probes never pay an import
+    RouterSpec("health", "lyo_app.routers.health_routes", eager=True,
+               description="Health check routes integrated - /health/live, /health/ready endpoints active!"),
+    # Clips Router - Educational video clips with AI course generation
+    RouterSpec("clips", "lyo_app.routers.clips", prefixes=("/api/v1",), tags=("clips",),
+               description="Clips routes integrated - Video clips with AI course generation active!"),
+    # Search Router - cross-entity search (users, groups, events, posts)
+    RouterSpec("search", "lyo_app.routers.search", prefixes=("/api/v1",),
+               description="Search routes integrated - cross-entity search active!"),
+    # User media Router - multipart upload + public serving for reels/posts
+    RouterSpec("user_media", "lyo_app.routers.user_media",
+               description="User media routes integrated - reel/post uploads active!"),
+    # Messaging Router - Direct messages between users
+    RouterSpec("messaging", "lyo_app.routers.messaging", prefixes=("", "/api/v1"),
+               description="Messaging routes integrated - Direct messages active!"),
+    # Multi-Device Sync Router - cross-device conversation continuity
+    # (REST under both legacy and /api/v1 prefixes, matching community/gamification;
+    #  websocket lives at /api/v1/sync/ws)
+    RouterSpec("sync", "lyo_app.routers.sync", prefixes=("", "/api/v1"), tags=("Multi-Device Sync",),
+               description="Multi-device sync routes integrated - cross-device continuity active!"),
+    RouterSpec("community", "lyo_app.community.routes", prefixes=("/community", "/api/v1/community"),
+               tags=("community",)),
+    RouterSpec("gamification", "lyo_app.gamification.routes",
+               prefixes=("/gamification", "/api/v1/gamification"), tags=("gamification",)),
+    RouterSpec("learning", "lyo_app.learning.routes", prefixes=("/learning", "/api/v1/learning"),
+               tags=("learning",)),
+    RouterSpec("stack", "lyo_app.stack.routes", prefixes=("/stack", "/api/v1/stack"),
+               description="Stack routes integrated at /stack and /api/v1/stack - Personal knowledge stack active!"),
+    # Stories Router - Instagram-style 24h expiring stories
+    RouterSpec("stories", "lyo_app.routers.stories", prefixes=("/api/v1",),
+               description="Stories routes integrated at /api/v1/stories - Ephemeral content active!"),
+    # Multi-Agent Course Generation v2
+    RouterSpec("course_gen_v2", "lyo_app.ai_agents.multi_agent_v2.routes",
+               description="Multi-Agent Course Generation v2 integrated - 5-agent pipeline with Gemini 2.5 Pro + 1.5 Flash!"),
+    # AI Tutor and Exercise Validation v2
+    RouterSpec("tutor_v2", "lyo_app.ai_agents.multi_agent_v2.tutor_routes",
+               description="AI Tutor & Exercise Validator integrated - Context-aware tutoring with code sandbox!"),
+    RouterSpec("streaming_v2", "lyo_app.ai_agents.multi_agent_v2.routes_streaming", attr="streaming_router",
+               description="Multi-agent v2 streaming routes loaded - Real-time progress updates!"),
+    RouterSpec("analytics_v2", "lyo_app.ai_agents.multi_agent_v2.routes_analytics", attr="analytics_router",
+               description="Multi-agent v2 analytics routes loaded - Usage tracking active!"),
+    # A2A Protocol - Google Agent-to-Agent Course Generation
+    RouterSpec("a2a", "lyo_app.ai_agents.a2a", installer="include_a2a_routes",
+               description="A2A Protocol routes integrated - Multi-agent pipeline with AgentCards, streaming, and discovery!"),
+    # Temporal Workflow Routes - Durable AI Course Generation
+    RouterSpec("workflows", "lyo_app.routers.workflows",
+               description="Temporal Workflow routes integrated - Durable AI generation at /api/v1/workflows!"),
+    # Multi-Tenant SaaS API
+    RouterSpec("tenants", "lyo_app.tenants.routes", prefixes=("/api/v1",),
+               description="Tenant routes integrated - Multi-tenant SaaS API active!"),
+    # Notebook & Highlighting Feature
+    RouterSpec("notebook", "lyo_app.api.v1.notebook", prefixes=("/api/v1/notebook",), tags=("notebook",),
+               description="Notebook routes integrated - Persistent highlights and notes active!"),
+    # ── Self-Evolution OS ──
+    RouterSpec("ambient", "lyo_app.ambient.routes", prefixes=("/api/v1",),
+               description="Ambient Presence routes integrated - Inline help & quick actions active!"),
+    RouterSpec("proactive", "lyo_app.proactive.routes", prefixes=("/api/v1",),
+               description="Proactive Intervention routes integrated - Smart nudges active!"),
+    RouterSpec("predictive", "lyo_app.predictive.routes", prefixes=("/api/v1",),
+               description="Predictive Intelligence routes integrated - Struggle prediction & dropout prevention active!"),
+    # ── Living Classroom: websocket scenes, HTTP chat/playback, monitoring ──
+    RouterSpec("living_classroom", "lyo_app.ai_classroom.websocket_routes",
+               description="Living Classroom WebSocket routes integrated - Real-time scene streaming active!"),
+    RouterSpec("ai_classroom", "lyo_app.ai_classroom.routes",
+               description="AI Classroom HTTP routes integrated!"),
+    RouterSpec("classroom_playback", "lyo_app.ai_classroom.playback_routes",
+               description="AI Classroom Playback routes integrated!"),
+    RouterSpec("classroom_monitoring", "lyo_app.ai_classroom.monitoring_dashboard",
+               description="Living Classroom Monitoring Dashboard integrated - Real-time metrics & A/B testing active!"),
+    # ── Self-Evolution OS: Evolution and Relationship ──
+    RouterSpec("evolution", "lyo_app.evolution.routes", prefixes=("/api/v1",),
+               description="Evolution routes integrated - Goals CRUD, Events logging & Reflections active!"),
+    RouterSpec("relationship", "lyo_app.relationship.routes", prefixes=("/api/v1",),
+               description="Relationship routes integrated - Milestones, personality & memory active!"),
+    # Notifications Router - User notification management
+    RouterSpec("notifications", "lyo_app.routers.notifications", prefixes=("", "/api/v1"),
+               description="Notification routes integrated - User notifications active!"),
+    # Discover Router - Educational places and trending content
+    RouterSpec("discover", "lyo_app.routers.discover", prefixes=("", "/api/v1"),
+               description="Discover routes integrated - Places & trending content active!"),
+)
 
 
 def create_app() -> FastAPI:
@@ -273,6 +412,13 @@ def create_app() -> FastAPI:
     # Middleware - Security First
     from lyo_app.middleware.security_middleware import SecurityMiddleware
     from lyo_app.middleware.usage_middleware import UsageMiddleware
+    from lyo_app.middleware.asgi import (
+        ErrorHandlingMiddleware,
+        QueryAccountingMiddleware,
+        RequestSizeLimitMiddleware,
+        StreamingSafeGZipMiddleware,
+        TimingMiddleware,
+    )
     from lyo_app.core.structured_logging import setup_logging as setup_structured_logging
     
     # Setup structured logging
@@ -283,6 +429,14 @@ def create_app() -> FastAPI:
         json_logs=(settings.ENVIRONMENT in ("production", "staging"))
     )
     
+    # Middleware chain (pure ASGI except CORS, which Starlette already
+    # implements as raw ASGI). add_middleware wraps outward, so the last
+    # one added runs first:
+    #   size limit -> errors -> timing -> gzip -> CORS -> security -> usage -> queries -> app
+    
+    # Per-request SQL accounting (innermost, so usage logging isn't counted)
+    app.add_middleware(QueryAccountingMiddleware)
+
     # Add usage middleware (inner layer, runs after security)
     app.add_middleware(UsageMiddleware)
     
@@ -297,456 +451,18 @@ def create_app() -> FastAPI:
     # CORS
     app.add_middleware(CORSMiddleware, **settings.get_cors_config())
     
-    # Add response compression for bandwidth optimization (60-80% reduction)
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Response compression (60-80% reduction); skips SSE so /chat/stream
+    # frames are not held back in the gzip window
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1000)
     logger.info("🛡️ Middlewares added")
     
     # Performance and error monitoring
-    app.middleware("http")(performance_monitoring_middleware)
-    app.middleware("http")(enhanced_error_middleware)
-    app.middleware("http")(request_size_middleware)
+    app.add_middleware(TimingMiddleware, monitor=performance_monitor)
+    app.add_middleware(ErrorHandlingMiddleware, handler=enhanced_error_handler)
+    app.add_middleware(RequestSizeLimitMiddleware, max_size=SecurityConfig.MAX_REQUEST_SIZE)
     setup_error_handlers(app)
-    # Routers
-    print(">>> IMPORTING AUTH ROUTES...", flush=True)
-    from lyo_app.auth.routes import router as auth_router
-    print(">>> AUTH ROUTES IMPORTED", flush=True)
-    try:
-        print(">>> IMPORTING AI STUDY ROUTES...", flush=True)
-        from lyo_app.ai_study.clean_routes import router as ai_study_router
-        print(">>> AI STUDY ROUTES IMPORTED", flush=True)
-    except ImportError:
-        from lyo_app.ai_study.routes import router as ai_study_router
-        logger.warning("Using basic AI study routes (clean routes unavailable)")
-    
-    # Vision routes
-    try:
-        from lyo_app.ai_study.vision_routes import router as vision_router
-        app.include_router(vision_router)
-        logger.info("✅ Gemini Vision routes integrated - Multimodal image analysis active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Could not import Vision routes: {e}")
-
-    # Recommendations routes
-    try:
-        from lyo_app.ai_study.recommendations_routes import router as recommendations_router
-        app.include_router(recommendations_router)
-        logger.info("✅ Recommendations & Embeddings routes integrated - Smart content discovery active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Could not import Recommendations routes: {e}")
-    
-    try:
-        from lyo_app.feeds.enhanced_routes import router as feeds_router
-    except ImportError:
-        from lyo_app.feeds.routes import router as feeds_router
-        logger.warning("Using basic feeds routes (enhanced routes unavailable)")
-    # Use storage_routes which includes both enhanced_routes AND iOS-compatible uploads alias
-    try:
-        from lyo_app.storage_routes import router as storage_router
-        logger.info("✅ Storage routes loaded (with iOS uploads alias)")
-    except ImportError:
-        try:
-            from lyo_app.storage.enhanced_routes import router as storage_router
-            logger.warning("Using storage.enhanced_routes (iOS alias unavailable)")
-        except ImportError:
-            storage_router = None
-            logger.warning("Storage routes unavailable")
-    # from lyo_app.monetization.routes import router as ads_router  # TODO: stripe_service doesn't exist
-    try:
-        print(">>> IMPORTING API V1 ROUTES...", flush=True)
-        from lyo_app.api.v1 import api_router
-
-        app.include_router(api_router, prefix="/api/v1")
-        print(">>> API V1 ROUTES INTEGRATED", flush=True)
-    except ImportError as e:  # noqa: BLE001
-        logger.warning(f"API v1 routes not available: {e}")
-
-    # Analytics & Profiling
-    try:
-        from lyo_app.api.analytics import router as analytics_router
-        app.include_router(analytics_router, prefix="/api/v1")
-        logger.info("✅ Analytics routes integrated - Implicit Behavioral Profiling active!")
-    except ImportError as e:
-        logger.warning(f"Analytics routes not available: {e}")
-
-    # iOS Compatibility Routes (feed alias, progress analytics)
-    try:
-        from lyo_app.api.v1.ios_compatibility import router as ios_compat_router
-        app.include_router(ios_compat_router)
-        logger.info("✅ iOS Compatibility routes integrated")
-    except ImportError as e:
-        logger.warning(f"iOS Compatibility routes not available: {e}")
-
-
-    try:
-        from lyo_app.api.progressive_course import router as progressive_router
-        app.include_router(progressive_router)
-        logger.info("✅ Progressive Course Generation routes integrated (iOS Phase A Compatibility)")
-    except ImportError as e:
-        logger.warning(f"⚠️ Progressive Course routes not loaded: {e}")
-
-    app.include_router(auth_router, prefix="/auth", tags=["auth"])
-    app.include_router(ai_study_router)
-    app.include_router(feeds_router, prefix="/api/v1")
-
-    # Basic social feed routes: /posts, /comments, /posts/{id}/reactions,
-    # /follow, /feed, /feed/public, /users/{id}/posts, /users/{id}/stats.
-    # The enhanced feeds router above only serves /api/v1/feeds/*; without
-    # this, the paths the web/Android clients call do not exist and the
-    # notification triggers in feeds/service.py are unreachable.
-    try:
-        from lyo_app.feeds.routes import router as basic_feeds_router
-        app.include_router(basic_feeds_router, tags=["feeds"])
-        # Versioned mount: /api/v1/feeds/posts, /comments, /feed/public, ...
-        # matches the mobile clients' /api/v1 surface and the route tests.
-        app.include_router(basic_feeds_router, prefix="/api/v1/feeds", tags=["feeds"])
-        logger.info("✅ Basic feeds routes integrated - posts/comments/reactions/follow active!")
-    except ImportError as e:
-        logger.warning(f"Basic feeds routes not available: {e}")
-
-    if storage_router:
-        app.include_router(storage_router)
-    # app.include_router(ads_router)  # TODO: Monetization module incomplete
-    # AI API Routes
-    try:
-        from lyo_app.routers.ai_routes import router as ai_router
-        app.include_router(ai_router)
-        # Mentor/engagement/curriculum agent endpoints (mentor conversation,
-        # sentiment analysis, websocket) were defined but never mounted.
-        from lyo_app.ai_agents.routes import router as ai_agents_router
-        app.include_router(ai_agents_router, prefix="/api/v1")
-    except ImportError:
-        pass
-    
-    # AI Chat
-    try:
-        from lyo_app.ai_chat.routes import router as ai_chat_router
-        app.include_router(ai_chat_router)
-    except ImportError:
-        pass
-    
-    # TTS
-    try:
-        from lyo_app.tts.routes import router as tts_router
-        app.include_router(tts_router)
-    except ImportError:
-        pass
-    
-    # Image Generation
-    try:
-        from lyo_app.image_gen.routes import router as image_gen_router
-        app.include_router(image_gen_router)
-    except ImportError:
-        pass
-    
-    # Video Generation (Runway Gen-4.5)
-    try:
-        from lyo_app.video_gen.routes import router as video_gen_router
-        app.include_router(video_gen_router)
-    except ImportError:
-        pass
-    
-    # Phase 1: Generative AI Tutor Foundation
-    try:
-        from lyo_app.personalization.routes import router as personalization_router
-        app.include_router(personalization_router)
-        logger.info("✅ Personalization routes integrated - Deep Knowledge Tracing active!")
-    except ImportError as e:
-        logger.warning(f"Personalization routes not available: {e}")
-
-    # Friend challenges — shareable quiz duels with scoreboards
-    try:
-        from lyo_app.challenges.routes import router as challenges_router
-        app.include_router(challenges_router)
-        logger.info("✅ Challenge routes integrated - quiz duels active!")
-    except ImportError as e:
-        logger.warning(f"Challenge routes not available: {e}")
-    
-    # Phase 2: Advanced AI Tutoring Features
-    try:
-        from lyo_app.gen_curriculum.routes import router as gen_curriculum_router
-        app.include_router(gen_curriculum_router)
-        logger.info("✅ Generative Curriculum routes integrated - AI-powered content generation active!")
-    except ImportError as e:
-        logger.warning(f"Generative Curriculum routes not available: {e}")
-    
-    try:
-        from lyo_app.collaboration.routes import router as collaboration_router
-        app.include_router(collaboration_router)
-        logger.info("✅ Collaborative Learning routes integrated - Peer learning and study groups active!")
-    except ImportError as e:
-        logger.warning(f"Collaborative Learning routes not available: {e}")
-    
-    try:
-        from lyo_app.adaptive_learning.routes import router as adaptive_router
-        app.include_router(adaptive_router)
-        logger.info("✅ Adaptive Learning routes integrated - AI-powered personalized sessions active!")
-    except ImportError as e:
-        logger.warning(f"Adaptive Learning routes not available: {e}")
-    
-    # Chat Module - Mode-based routing with agents
-    try:
-        from lyo_app.chat import chat_router
-        app.include_router(chat_router, prefix="/api/v1")
-        logger.info("✅ Chat routes integrated - Mode-based routing (Explainer, Planner, Practice, Notes) active!")
-    except ImportError as e:
-        logger.warning(f"Chat routes not available: {e}")
-    
-    # V2 Courses API - Multi-agent async course generation
-    try:
-        from lyo_app.api.v2 import courses_router
-        app.include_router(courses_router)
-        logger.info("✅ V2 Courses API integrated - Multi-agent course generation with job tracking active!")
-    except ImportError as e:
-        logger.warning(f"V2 Courses API not available: {e}")
-    
-    # Optional legacy/feature routers (only include if present)
-    # Health Check Routes (Phase 4: Observability)
-    try:
-        from lyo_app.routers.health_routes import router as health_router
-        app.include_router(health_router)
-        logger.info("✅ Health check routes integrated - /health/live, /health/ready endpoints active!")
-    except ImportError as e:
-        logger.warning(f"Health check routes not available: {e}")
-    
-    # Clips Router - Educational video clips with AI course generation
-    try:
-        from lyo_app.routers.clips import router as clips_router
-        app.include_router(clips_router, prefix="/api/v1", tags=["clips"])
-        logger.info("✅ Clips routes integrated - Video clips with AI course generation active!")
-    except ImportError as e:
-        logger.warning(f"Clips routes not available: {e}")
-    
-    # Search Router - cross-entity search (users, groups, events, posts)
-    try:
-        from lyo_app.routers.search import router as search_router
-        app.include_router(search_router, prefix="/api/v1")
-        logger.info("✅ Search routes integrated - cross-entity search active!")
-    except ImportError as e:
-        logger.warning(f"Search routes not available: {e}")
-
-    # User media Router - multipart upload + public serving for reels/posts
-    try:
-        from lyo_app.routers.user_media import router as user_media_router
-        app.include_router(user_media_router)
-        logger.info("✅ User media routes integrated - reel/post uploads active!")
-    except ImportError as e:
-        logger.warning(f"User media routes not available: {e}")
-
-    # Messaging Router - Direct messages between users
-    try:
-        from lyo_app.routers.messaging import router as messaging_router
-        app.include_router(messaging_router)
-        app.include_router(messaging_router, prefix="/api/v1")
-        logger.info("✅ Messaging routes integrated - Direct messages active!")
-    except ImportError as e:
-        logger.warning(f"Messaging routes not available: {e}")
-
-    # Multi-Device Sync Router - cross-device conversation continuity
-    # (REST under both legacy and /api/v1 prefixes, matching community/gamification;
-    #  websocket lives at /api/v1/sync/ws)
-    try:
-        from lyo_app.routers.sync import router as sync_router
-        app.include_router(sync_router, tags=["Multi-Device Sync"])
-        app.include_router(sync_router, prefix="/api/v1", tags=["Multi-Device Sync"])
-        logger.info("✅ Multi-device sync routes integrated - cross-device continuity active!")
-    except ImportError as e:
-        logger.warning(f"Sync routes not available: {e}")
-
-    # Optional legacy/feature routers (only include if present)
-    try:
-        from lyo_app.community.routes import router as community_router
-        app.include_router(community_router, prefix="/community", tags=["community"])
-        app.include_router(community_router, prefix="/api/v1/community", tags=["community"])
-    except ImportError:
-        pass
-    try:
-        from lyo_app.gamification.routes import router as gamification_router
-        app.include_router(gamification_router, prefix="/gamification", tags=["gamification"])
-        app.include_router(gamification_router, prefix="/api/v1/gamification", tags=["gamification"])
-    except ImportError:
-        pass
-    try:
-        from lyo_app.learning.routes import router as learning_router
-        app.include_router(learning_router, prefix="/learning", tags=["learning"])
-        app.include_router(learning_router, prefix="/api/v1/learning", tags=["learning"])
-    except ImportError:
-        pass
-    try:
-        from lyo_app.storage_routes import router as storage_router
-        app.include_router(storage_router)
-        logger.info("✅ Google Cloud Storage routes integrated - File uploads and processing active!")
-    except ImportError as e:
-        logger.warning(f"Storage routes not available: {e}")
-
-    try:
-        from lyo_app.stack.routes import router as stack_router
-        app.include_router(stack_router, prefix="/stack")
-        app.include_router(stack_router, prefix="/api/v1/stack")
-        logger.info("✅ Stack routes integrated at /stack and /api/v1/stack - Personal knowledge stack active!")
-    except ImportError as e:
-        logger.warning(f"Stack routes not available: {e}")
-
-    # Stories Router - Instagram-style 24h expiring stories
-    try:
-        from lyo_app.routers.stories import router as stories_router
-        app.include_router(stories_router, prefix="/api/v1")
-        logger.info("✅ Stories routes integrated at /api/v1/stories - Ephemeral content active!")
-    except ImportError as e:
-        logger.warning(f"Stories routes not available: {e}")
-    
-    # Multi-Agent Course Generation v2
-    try:
-        from lyo_app.ai_agents.multi_agent_v2.routes import router as course_gen_router
-        app.include_router(course_gen_router)
-        logger.info("✅ Multi-Agent Course Generation v2 integrated - 5-agent pipeline with Gemini 2.5 Pro + 1.5 Flash!")
-    except ImportError as e:
-        logger.warning(f"Multi-Agent Course Generation v2 routes not available: {e}")
-    
-    # AI Tutor and Exercise Validation v2
-    try:
-        from lyo_app.ai_agents.multi_agent_v2.tutor_routes import router as tutor_router
-        app.include_router(tutor_router)
-        logger.info("✅ AI Tutor & Exercise Validator integrated - Context-aware tutoring with code sandbox!")
-    except ImportError as e:
-        logger.warning(f"AI Tutor v2 routes not available: {e}")
-    
-    # Multi-Agent V2 - Streaming Support (NEW - Gemini Enhancements)
-    try:
-        from lyo_app.ai_agents.multi_agent_v2.routes_streaming import streaming_router
-        app.include_router(streaming_router)
-        logger.info("✅ Multi-agent v2 streaming routes loaded - Real-time progress updates!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Streaming routes not available: {e}")
-    
-    # Multi-Agent V2 - Analytics (NEW - Gemini Enhancements)
-    try:
-        from lyo_app.ai_agents.multi_agent_v2.routes_analytics import analytics_router
-        app.include_router(analytics_router)
-        logger.info("✅ Multi-agent v2 analytics routes loaded - Usage tracking active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Analytics routes not available: {e}")
-
-    # A2A Protocol - Google Agent-to-Agent Course Generation (NEW)
-    try:
-        from lyo_app.ai_agents.a2a import include_a2a_routes
-        include_a2a_routes(app)
-        logger.info("✅ A2A Protocol routes integrated - Multi-agent pipeline with AgentCards, streaming, and discovery!")
-    except ImportError as e:
-        logger.warning(f"⚠️ A2A Protocol routes not available: {e}")
-
-    # Temporal Workflow Routes - Durable AI Course Generation
-    try:
-        from lyo_app.routers.workflows import router as workflow_router
-        app.include_router(workflow_router)
-        logger.info("✅ Temporal Workflow routes integrated - Durable AI generation at /api/v1/workflows!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Temporal Workflow routes not available: {e}")
-
-    # Multi-Tenant SaaS API
-    try:
-        from lyo_app.tenants.routes import router as tenants_router
-        app.include_router(tenants_router, prefix="/api/v1")
-        logger.info("✅ Tenant routes integrated - Multi-tenant SaaS API active!")
-    except ImportError as e:
-        logger.warning(f"Tenant routes not available: {e}")
-
-
-    # Notebook & Highlighting Feature
-    try:
-        from lyo_app.api.v1.notebook import router as notebook_router
-        app.include_router(notebook_router, prefix="/api/v1/notebook", tags=["notebook"])
-        logger.info("✅ Notebook routes integrated - Persistent highlights and notes active!")
-    except ImportError as e:
-        logger.warning(f"Notebook routes not available: {e}")
-
-    # ── Self-Evolution OS: Ambient Presence ──
-    try:
-        from lyo_app.ambient.routes import router as ambient_router
-        app.include_router(ambient_router, prefix="/api/v1")
-        logger.info("✅ Ambient Presence routes integrated - Inline help & quick actions active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Ambient Presence routes not available: {e}")
-
-    # ── Self-Evolution OS: Proactive Interventions ──
-    try:
-        from lyo_app.proactive.routes import router as proactive_router
-        app.include_router(proactive_router, prefix="/api/v1")
-        logger.info("✅ Proactive Intervention routes integrated - Smart nudges active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Proactive Intervention routes not available: {e}")
-
-    # ── Self-Evolution OS: Predictive Intelligence ──
-    try:
-        from lyo_app.predictive.routes import router as predictive_router
-        app.include_router(predictive_router, prefix="/api/v1")
-        logger.info("✅ Predictive Intelligence routes integrated - Struggle prediction & dropout prevention active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Predictive Intelligence routes not available: {e}")
-
-    # ── Living Classroom: Real-time Scene-based Learning ──
-    try:
-        from lyo_app.ai_classroom.websocket_routes import router as living_classroom_router
-        app.include_router(living_classroom_router)
-        logger.info("✅ Living Classroom WebSocket routes integrated - Real-time scene streaming active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Living Classroom routes not available: {e}")
-
-    # ── Living Classroom: HTTP routes (Chat and Playback) ──
-    try:
-        from lyo_app.ai_classroom.routes import router as ai_classroom_router
-        app.include_router(ai_classroom_router)
-        logger.info("✅ AI Classroom HTTP routes integrated!")
-    except ImportError as e:
-        logger.warning(f"⚠️ AI Classroom HTTP routes not available: {e}")
-
-    try:
-        from lyo_app.ai_classroom.playback_routes import router as playback_router
-        app.include_router(playback_router)
-        logger.info("✅ AI Classroom Playback routes integrated!")
-    except ImportError as e:
-        logger.warning(f"⚠️ AI Classroom Playback routes not available: {e}")
-
-    # ── Living Classroom: Production Monitoring Dashboard ──
-    try:
-        from lyo_app.ai_classroom.monitoring_dashboard import router as monitoring_router
-        app.include_router(monitoring_router)
-        logger.info("✅ Living Classroom Monitoring Dashboard integrated - Real-time metrics & A/B testing active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Living Classroom monitoring dashboard not available: {e}")
-
-    # ── Self-Evolution OS: Evolution (Goals, Events, Reflections) ──
-    try:
-        from lyo_app.evolution.routes import router as evolution_router
-        app.include_router(evolution_router, prefix="/api/v1")
-        logger.info("✅ Evolution routes integrated - Goals CRUD, Events logging & Reflections active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Evolution routes not available: {e}")
-
-    # ── Self-Evolution OS: Relationship System ──
-    try:
-        from lyo_app.relationship.routes import router as relationship_router
-        app.include_router(relationship_router, prefix="/api/v1")
-        logger.info("✅ Relationship routes integrated - Milestones, personality & memory active!")
-    except ImportError as e:
-        logger.warning(f"⚠️ Relationship routes not available: {e}")
-
-    # Notifications Router - User notification management
-    try:
-        from lyo_app.routers.notifications import router as notifications_router
-        app.include_router(notifications_router)
-        app.include_router(notifications_router, prefix="/api/v1")
-        logger.info("✅ Notification routes integrated - User notifications active!")
-    except ImportError as e:
-        logger.warning(f"Notification routes not available: {e}")
-
-    # Discover Router - Educational places and trending content
-    try:
-        from lyo_app.routers.discover import router as discover_router
-        app.include_router(discover_router)
-        app.include_router(discover_router, prefix="/api/v1")
-        logger.info("✅ Discover routes integrated - Places & trending content active!")
-    except ImportError as e:
-        logger.warning(f"Discover routes not available: {e}")
+    # Routers (see ROUTER_SPECS)
+    mount_routers(app, ROUTER_SPECS)
 
     @app.get("/health")
     async def enhanced_health_check():  # noqa: D401
@@ -869,15 +585,20 @@ def create_app() -> FastAPI:
         if not settings.ENABLE_METRICS:
             raise HTTPException(status_code=404, detail="Metrics disabled")
         metrics = performance_monitor.get_performance_summary()
-        import psutil
+        from lyo_app.core.request_metrics import process_sampler
 
+        system = process_sampler.snapshot()
+        from lyo_app.auth.jwt_auth import jwt_cache, principal_cache
         metrics.update(
             {
+                "jwt_cache": jwt_cache.stats(),
+                "principal_cache": principal_cache.stats(),
                 "system": {
-                    "cpu_percent": psutil.cpu_percent(),
-                    "memory_percent": psutil.virtual_memory().percent,
-                    "disk_percent": psutil.disk_usage("/").percent,
-                    "active_connections": len(psutil.net_connections()),
+                    "cpu_percent": system.get("cpu_usage"),
+                    "memory_percent": system.get("memory_usage", {}).get("percent"),
+                    "disk_percent": system.get("disk_usage", {}).get("percent"),
+                    "process_rss_mb": system.get("process_rss_mb"),
+                    "sampled_at": system.get("sampled_at"),
                 },
                 "application": {
                     "uptime_seconds": time.time() - app.state.start_time
@@ -935,7 +656,8 @@ app = get_app()
 if PROMETHEUS_AVAILABLE and settings.ENABLE_METRICS:
     @app.get("/prometheus")
     async def get_prometheus_metrics():  # noqa: D401
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        from lyo_app.core.prometheus_metrics import metrics_endpoint_handler
+        return Response(metrics_endpoint_handler(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
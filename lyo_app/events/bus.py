@@ -0,0 +1,307 @@
+"""
+Outbox-backed async event bus.
+
+Producers call ``publish(db, topic, user_id, payload)`` before committing
+their own change, so the event exists if and only if the change does.
+``OutboxDispatcher`` polls pending outbox rows and hands them to the handler
+registered for their topic:
+
+* Rows are grouped by user. Up to ``workers`` users are handled
+  concurrently. One user's events run one at a time, in id order, on one
+  session. Each event commits in its own transaction together with its
+  outbox row's status, so a crash never applies an event twice or skips
+  one.
+* A failing event is retried with exponential backoff (``retry_base``
+  seconds, doubling per attempt, capped at ``retry_max``), and the user's
+  later events wait behind it. After ``max_attempts`` it is marked failed
+  (-1) and the queue moves on.
+* Users are split into ``shards`` (``user_id % shards``). On Postgres each
+  process takes a session-level advisory lock per shard it serves, so with
+  several app processes every user is still handled by exactly one
+  consumer.
+
+``drain()`` processes everything pending and returns: it is the in-process
+consumer tests use instead of the background loop.
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import aliased
+
+from lyo_app.core.forksafe import register_after_fork
+from lyo_app.events.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+PENDING, PROCESSED, FAILED = 0, 1, -1
+
+# Advisory lock namespace for outbox shards (arbitrary, fixed)
+_LOCK_NAMESPACE = 0x0B0C
+
+Handler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+
+def publish(db: AsyncSession, topic: str, user_id: int, payload: Dict[str, Any]) -> OutboxEvent:
+    """Add an outbox row to ``db``'s transaction; the caller commits."""
+    event = OutboxEvent(topic=topic, user_id=user_id, payload=payload)
+    db.add(event)
+    return event
+
+
+def _default_session_factory():
+    from lyo_app.core.database import background_session
+
+    return background_session()
+
+
+class OutboxDispatcher:
+    """
+    Polls the outbox and dispatches events to topic handlers.
+
+    Args:
+        session_factory: Returns an ``async with`` session context
+            (default: ``background_session``)
+        workers: Users handled concurrently
+        batch_size: Pending rows fetched per poll
+        poll_interval: Seconds between polls when not woken by ``notify``
+        max_attempts: Failures before an event is marked failed
+        retry_base: Seconds before the first retry; doubles per failure
+        retry_max: Longest wait between retries, in seconds
+        shards: Number of user shards, shared by every process
+        clock: Current UTC time (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        workers: int = 4,
+        batch_size: int = 200,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_base: float = 2.0,
+        retry_max: float = 300.0,
+        shards: int = 1,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self._session_factory = session_factory or _default_session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.shards = shards
+        self._clock = clock
+        self.handlers: Dict[str, Handler] = {}
+        self.counts: Counter = Counter()
+        self._owned: Optional[Set[int]] = None  # None: every shard (no locking needed)
+        self._dialect_checked = False
+        self._lock_conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poll_lock: Optional[asyncio.Lock] = None
+
+    def register(self, topic: str, handler: Handler) -> Handler:
+        """Handle ``topic`` events with ``handler(db, payload)``; it must not commit."""
+        self.handlers[topic] = handler
+        return handler
+
+    def handler(self, topic: str) -> Callable[[Handler], Handler]:
+        return lambda func: self.register(topic, func)
+
+    def notify(self) -> None:
+        """Wake the background loop now (after publishing from this process)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim_shards(self) -> None:
+        """On Postgres, hold an advisory lock per shard this process serves."""
+        if not self._dialect_checked:
+            self._dialect_checked = True
+            async with self._session_factory() as probe:
+                engine = (await probe.connection()).engine
+            if engine.dialect.name != "postgresql":
+                return  # single-process dev/test databases: serve every shard
+            # Session-level locks live on one connection, held for the
+            # dispatcher's lifetime outside any transaction.
+            self._lock_conn = await engine.connect()
+            await self._lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            self._owned = set()
+        if self._owned is None or len(self._owned) == self.shards:
+            return
+        for shard in range(self.shards):
+            if shard in self._owned:
+                continue
+            got = (await self._lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:ns, :shard)"),
+                {"ns": _LOCK_NAMESPACE, "shard": shard},
+            )).scalar()
+            if got:
+                self._owned.add(shard)
+                logger.info(f"📬 Outbox shard {shard}/{self.shards} claimed")
+
+    async def run_once(self) -> int:
+        """Dispatch one batch of pending events; returns how many were handled."""
+        if self._poll_lock is None:
+            self._poll_lock = asyncio.Lock()
+        async with self._poll_lock:
+            await self._claim_shards()
+            if self._owned is not None and not self._owned:
+                return 0
+            async with self._session_factory() as db:
+                # A row is skipped while it, or an earlier pending row of the
+                # same user, is backing off: per-user order is kept.
+                waiting = aliased(OutboxEvent)
+                backing_off = select(waiting.id).where(
+                    waiting.user_id == OutboxEvent.user_id,
+                    waiting.status == PENDING,
+                    waiting.id <= OutboxEvent.id,
+                    waiting.next_attempt_at > self._clock(),
+                ).exists()
+                query = select(OutboxEvent.id, OutboxEvent.user_id).where(
+                    OutboxEvent.status == PENDING, ~backing_off
+                )
+                if self._owned is not None and len(self._owned) < self.shards:
+                    query = query.where((OutboxEvent.user_id % self.shards).in_(self._owned))
+                rows = (await db.execute(query.order_by(OutboxEvent.id).limit(self.batch_size))).all()
+            by_user: "OrderedDict[int, List[int]]" = OrderedDict()
+            for event_id, user_id in rows:
+                by_user.setdefault(user_id, []).append(event_id)
+
+            limit = asyncio.Semaphore(self.workers)
+
+            async def run_user(user_id: int, ids: List[int]) -> int:
+                async with limit:
+                    return await self._process_user(user_id, ids)
+
+            done = await asyncio.gather(*(run_user(u, ids) for u, ids in by_user.items()))
+            return sum(done)
+
+    async def _process_user(self, user_id: int, ids: List[int]) -> int:
+        handled = 0
+        async with self._session_factory() as db:
+            events = (await db.execute(
+                select(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload)
+                .where(OutboxEvent.id.in_(ids))
+                .order_by(OutboxEvent.id)
+            )).all()
+            for event_id, topic, payload in events:
+                handler = self.handlers.get(topic)
+                try:
+                    if handler is None:
+                        raise LookupError(f"no handler registered for topic {topic!r}")
+                    await handler(db, payload)
+                    await db.execute(
+                        update(OutboxEvent)
+                        .where(OutboxEvent.id == event_id)
+                        .values(status=PROCESSED, processed_at=datetime.utcnow())
+                    )
+                    await db.commit()
+                except Exception as e:  # noqa: BLE001
+                    await db.rollback()
+                    attempts = await self._record_failure(db, event_id, e)
+                    logger.error(f"Outbox event {event_id} ({topic}) for user {user_id} failed "
+                                 f"(attempt {attempts}): {e}")
+                    self.counts[(topic, "failed")] += 1
+                    if attempts < self.max_attempts:
+                        break  # later events for this user wait behind this one
+                    continue
+                handled += 1
+                self.counts[(topic, "processed")] += 1
+        return handled
+
+    async def _record_failure(self, db: AsyncSession, event_id: int, error: Exception) -> int:
+        attempts = (await db.execute(
+            select(OutboxEvent.attempts).where(OutboxEvent.id == event_id)
+        )).scalar_one() + 1
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == event_id)
+            .values(
+                attempts=attempts,
+                last_error=str(error)[:500],
+                status=FAILED if attempts >= self.max_attempts else PENDING,
+                next_attempt_at=self._clock() + timedelta(seconds=delay),
+            )
+        )
+        await db.commit()
+        return attempts
+
+    async def drain(self, max_rounds: int = 100) -> int:
+        """Handle pending events until none are left (or only backing-off ones)."""
+        total = 0
+        for _ in range(max_rounds):
+            handled = await self.run_once()
+            total += handled
+            if not handled:
+                break
+        return total
+
+    def start(self) -> None:
+        """Start the background consumer on the running loop."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="outbox_dispatcher")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.run_once() >= self.batch_size:
+                    pass
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Outbox dispatch failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock_conn is not None:
+            try:
+                # Pooled connections keep session-level locks unless told otherwise
+                await self._lock_conn.execute(text("SELECT pg_advisory_unlock_all()"))
+                await self._lock_conn.close()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Releasing outbox shard locks failed: {e}")
+            self._lock_conn = None
+        self._owned = None
+        self._dialect_checked = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "owned_shards": sorted(self._owned) if self._owned is not None else list(range(self.shards)),
+            "topics": {f"{topic}.{outcome}": n for (topic, outcome), n in self.counts.items()},
+        }
+
+    def reset_after_fork(self) -> None:
+        self._task = None
+        self._wakeup = None
+        self._poll_lock = None
+        self._lock_conn = None  # the parent's connection and locks
+        self._owned = None
+        self._dialect_checked = False
+
+
+outbox_dispatcher = OutboxDispatcher(
+    workers=int(os.getenv("OUTBOX_WORKERS", "4")),
+    poll_interval=float(os.getenv("OUTBOX_POLL_SECONDS", "1.0")),
+    max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5")),
+    shards=int(os.getenv("OUTBOX_SHARDS", "1")),
+)
+register_after_fork(outbox_dispatcher.reset_after_fork)
@@ -8,7 +8,7 @@ from enum import Enum
 
 from sqlalchemy import (
     Column, DateTime, Integer, String, ForeignKey,
-    Enum as SQLEnum, Float, JSON
+    Enum as SQLEnum, Float, JSON, Index
 )
 
 from lyo_app.core.database import Base
@@ -50,3 +50,31 @@ class LearningEvent(Base):
     
     # Metadata
     timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class OutboxEvent(Base):
+    """
+    Transactional outbox: written in the same transaction as the change it
+    announces, consumed asynchronously by ``lyo_app.events.bus``.
+    """
+
+    __tablename__ = "event_outbox"
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(64), nullable=False)
+    # Ordering key: events for one user are handled one at a time, in id order
+    user_id = Column(Integer, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+
+    status = Column(Integer, nullable=False, default=0)  # 0=Pending, 1=Processed, -1=Failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    # Retry backoff: a failed event (and its user's later ones) waits until then
+    next_attempt_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_event_outbox_status_id", "status", "id"),
+    )
@@ -3,6 +3,7 @@ from typing import Optional, List, Any, Dict
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .bus import outbox_dispatcher, publish
 from .models import LearningEvent, EventType
 from .schemas import LearningEventCreate
 
@@ -16,10 +17,16 @@ from lyo_app.services.memory_synthesis import MemorySynthesisService, MemoryInsi
 
 logger = logging.getLogger(__name__)
 
+LEARNING_EVENT_TOPIC = "learning_event"
+
+
 async def log_learning_event(db: AsyncSession, event_in: LearningEventCreate) -> LearningEvent:
     """
     Core entrypoint for logging a new learning event.
-    Logs the event to the DB and triggers the compounding growth loop.
+
+    Logs the event and its outbox entry in one transaction; the compounding
+    growth loop runs on the outbox consumer (``lyo_app.events.bus``), so the
+    caller's request does not wait for mastery, goal and memory updates.
     """
     db_event = LearningEvent(
         user_id=event_in.user_id,
@@ -29,16 +36,24 @@ async def log_learning_event(db: AsyncSession, event_in: LearningEventCreate) ->
         measurable_outcome=event_in.measurable_outcome
     )
     db.add(db_event)
+    await db.flush()
+    publish(db, LEARNING_EVENT_TOPIC, db_event.user_id, {"event_id": db_event.id})
     await db.commit()
     await db.refresh(db_event)
-    
-    # Trigger the background processing for the compounding evolution loop
-    # In a real distributed system, this would be pushed to Celery/Redis
-    await _process_evolution_loop(db, db_event)
-    
+    outbox_dispatcher.notify()
+
     return db_event
 
 
+@outbox_dispatcher.handler(LEARNING_EVENT_TOPIC)
+async def handle_learning_event(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """Outbox handler: run the evolution loop for one event (the dispatcher commits)."""
+    event = await db.get(LearningEvent, payload["event_id"])
+    if event is None or event.processed_for_mastery:
+        return  # deleted, or already processed by the legacy inline path
+    await _process_evolution_loop(db, event)
+
+
 async def _process_evolution_loop(db: AsyncSession, event: LearningEvent):
     """
     Executes the self-evolution background job for a given event.
@@ -47,73 +62,66 @@ async def _process_evolution_loop(db: AsyncSession, event: LearningEvent):
     2. Gamification (XP / Streaks)
     3. Goals Trajectory Engine
     4. Memory Synthesis (via AI background task)
+
+    Mastery and goal updates are flushed, not committed: the caller commits
+    them together with the event's outbox status. Errors propagate so the
+    outbox can retry the event.
     """
-    try:
-        logger.info(f"Processing Evolution Loop for user {event.user_id}, event {event.id}")
-        
-        # 1. Update DKT Mastery
-        if event.skill_ids_json:
-            for skill_id in event.skill_ids_json:
-                # Convert the measurable outcome (e.g. normalized confidence) to a 'correct' boolean for the DKT logic
-                is_positive_event = (event.measurable_outcome or 0.0) >= 0.5
-                
-                # We use a default time_taken of 30s and 0 hints for reflection/generic events
-                await personalization_engine.dkt.update_mastery(
-                    db=db,
-                    user_id=event.user_id,
-                    skill_id=str(skill_id),
-                    correct=is_positive_event,
-                    time_taken=30.0,
-                    hints_used=0
-                )
-        
-        # 2. Update Gamification (XP)
-        # Example: await gamification_service.award_xp_for_event(event)
-
-        # 3. Update Goals Trajectory
-        # Fetch active goals related to this event's skills and recalculate momentum/completion
-        if event.skill_ids_json:
-            active_goals = await get_user_goals(db, user_id=event.user_id)
-            for goal in active_goals:
-                # Naive check: does this goal map to any skills in the event?
-                goal_skill_ids = [mapping.skill_id for mapping in goal.skill_mappings]
-                if any(skill_id in goal_skill_ids for skill_id in event.skill_ids_json):
-                    # Calculate real completion % from DKT mastery averages for goal skills
-                    mastery_sum = 0.0
-                    mastery_count = 0
-                    for gsk in goal_skill_ids:
-                        m_row = await db.execute(
-                            select(LearnerMastery.mastery_level).where(
-                                LearnerMastery.user_id == event.user_id,
-                                LearnerMastery.skill_id == str(gsk),
-                            )
-                        )
-                        m_val = m_row.scalar_one_or_none()
-                        mastery_sum += (m_val or 0.0)
-                        mastery_count += 1
-
-                    completion_pct = (mastery_sum / mastery_count * 100.0) if mastery_count else 0.0
-                    # Momentum: positive if new event has good outcome, else flat
-                    momentum = 1.5 if (event.measurable_outcome or 0.0) >= 0.5 else 0.5
-
-                    snapshot = GoalProgressSnapshotCreate(
-                        overall_completion_percentage=min(100.0, completion_pct),
-                        momentum_score=momentum,
+    logger.info(f"Processing Evolution Loop for user {event.user_id}, event {event.id}")
+
+    # 1. Update DKT Mastery
+    if event.skill_ids_json:
+        # Convert the measurable outcome (e.g. normalized confidence) to a 'correct' boolean for the DKT logic
+        is_positive_event = (event.measurable_outcome or 0.0) >= 0.5
+        for skill_id in event.skill_ids_json:
+            # We use a default time_taken of 30s and 0 hints for reflection/generic events
+            await personalization_engine.dkt.update_mastery(
+                db=db,
+                user_id=event.user_id,
+                skill_id=str(skill_id),
+                correct=is_positive_event,
+                time_taken=30.0,
+                hints_used=0,
+                commit=False
+            )
+
+    # 2. Update Gamification (XP)
+    # Example: await gamification_service.award_xp_for_event(event)
+
+    # 3. Update Goals Trajectory
+    # Fetch active goals related to this event's skills and recalculate momentum/completion
+    if event.skill_ids_json:
+        active_goals = await get_user_goals(db, user_id=event.user_id)
+        for goal in active_goals:
+            # Naive check: does this goal map to any skills in the event?
+            goal_skill_ids = [mapping.skill_id for mapping in goal.skill_mappings]
+            if any(skill_id in goal_skill_ids for skill_id in event.skill_ids_json):
+                # Calculate real completion % from DKT mastery averages for goal skills
+                m_rows = await db.execute(
+                    select(LearnerMastery.mastery_level).where(
+                        LearnerMastery.user_id == event.user_id,
+                        LearnerMastery.skill_id.in_([str(gsk) for gsk in goal_skill_ids]),
                     )
-                    await record_progress_snapshot(db, goal.id, snapshot)
-        
-        # 4. Handle Voice Interactions (Live Context)
-        if event.event_type == EventType.VOICE_INTERACTION:
-            await _process_voice_interaction(db, event)
-
-        # Mark as processed
-        event.processed_for_mastery = 1
-        await db.commit()
-        
-    except Exception as e:
-        logger.error(f"Failed to process evolution loop for event {event.id}: {str(e)}")
-        event.processed_for_mastery = -1
-        await db.commit()
+                )
+                mastery_sum = sum(m_val or 0.0 for m_val in m_rows.scalars())
+                mastery_count = len(goal_skill_ids)
+
+                completion_pct = (mastery_sum / mastery_count * 100.0) if mastery_count else 0.0
+                # Momentum: positive if new event has good outcome, else flat
+                momentum = 1.5 if (event.measurable_outcome or 0.0) >= 0.5 else 0.5
+
+                snapshot = GoalProgressSnapshotCreate(
+                    overall_completion_percentage=min(100.0, completion_pct),
+                    momentum_score=momentum,
+                )
+                await record_progress_snapshot(db, goal.id, snapshot, commit=False)
+
+    # 4. Handle Voice Interactions (Live Context)
+    if event.event_type == EventType.VOICE_INTERACTION:
+        await _process_voice_interaction(db, event)
+
+    # Mark as processed
+    event.processed_for_mastery = 1
 
 async def _process_voice_interaction(db: AsyncSession, event: LearningEvent):
     """
@@ -86,14 +86,19 @@ async def add_goal_skill_mapping(db: AsyncSession, goal_id: int, mapping_in: Goa
     return db_mapping
 
 
-async def record_progress_snapshot(db: AsyncSession, goal_id: int, snapshot_in: GoalProgressSnapshotCreate) -> GoalProgressSnapshot:
-    """Record a point-in-time snapshot of the user's progress toward the goal."""
+async def record_progress_snapshot(
+    db: AsyncSession, goal_id: int, snapshot_in: GoalProgressSnapshotCreate, commit: bool = True
+) -> GoalProgressSnapshot:
+    """Record a point-in-time snapshot of the user's progress toward the goal (``commit=False``: flush only)."""
     db_snapshot = GoalProgressSnapshot(
         goal_id=goal_id,
         overall_completion_percentage=snapshot_in.overall_completion_percentage,
         momentum_score=snapshot_in.momentum_score
     )
     db.add(db_snapshot)
+    if not commit:
+        await db.flush()
+        return db_snapshot
     await db.commit()
     await db.refresh(db_snapshot)
     return db_snapshot
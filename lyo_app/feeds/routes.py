@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from lyo_app.auth.routes import get_current_user
 from lyo_app.auth.schemas import UserRead
-from lyo_app.core.database import get_db
-from lyo_app.core.database import get_db
+from lyo_app.core.database import get_db, get_read_db
+from lyo_app.core.query_accounting import query_budget
 from lyo_app.feeds.schemas import (
     PostCreate, PostUpdate, PostRead, PostWithDetailsRead,
     CommentCreate, CommentUpdate, CommentRead,
@@ -435,7 +435,7 @@ async def get_user_feed(
 @router.get("/feed/public", response_model=FeedResponse)
 async def get_public_feed(
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     course_id: Optional[int] = Query(None, description="Filter by course ID"),
@@ -522,6 +522,7 @@ async def get_user_posts(
 
 
 @router.get("/users/{user_id}/stats", response_model=UserStatsResponse)
+@query_budget(max_queries=6)
 async def get_user_stats(
     user_id: int,
     current_user: Annotated[UserRead, Depends(get_current_user)],
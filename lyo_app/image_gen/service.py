@@ -148,8 +148,6 @@ class GeneratedImage:
 
 
 import base64
-import vertexai
-from vertexai.preview.vision_models import ImageGenerationModel
 
 class ImageService:
     """
@@ -165,7 +163,7 @@ class ImageService:
     
     def __init__(self, config: Optional[ImageConfig] = None):
         self.config = config or ImageConfig()
-        self._model: Optional[ImageGenerationModel] = None
+        self._model = None  # vertexai ImageGenerationModel, loaded in initialize()
         self._cache: Dict[str, CachedImage] = {}
         self._initialized = False
         
@@ -173,7 +171,11 @@ class ImageService:
         """Initialize image service with Vertex AI"""
         if self._initialized:
             return
-            
+
+        # Deferred: the Vertex SDK adds ~2s to process start-up
+        import vertexai
+        from vertexai.preview.vision_models import ImageGenerationModel
+
         project_id = get_secret("GOOGLE_CLOUD_PROJECT", os.getenv("GOOGLE_CLOUD_PROJECT", ""))
         location = get_secret("GOOGLE_CLOUD_LOCATION", os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1"))
         
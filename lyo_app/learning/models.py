@@ -69,6 +69,7 @@ class Course(TenantMixin, Base):
     is_featured: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     generation_metadata: Mapped[Optional[dict]] = mapped_column(JSON)
     embedding: Mapped[Optional[List[float]]] = mapped_column(Vector(768))
+    embedding_hash: Mapped[Optional[str]] = mapped_column(String(64))  # content hash the embedding was built from
     
     # Instructor (foreign key to User)
     instructor_id: Mapped[int] = mapped_column(
@@ -135,6 +136,7 @@ class Lesson(TenantMixin, Base):
     difficulty_score: Mapped[Optional[float]] = mapped_column(Float)
     generation_prompt: Mapped[Optional[str]] = mapped_column(Text)
     embedding: Mapped[Optional[List[float]]] = mapped_column(Vector(768))
+    embedding_hash: Mapped[Optional[str]] = mapped_column(String(64))  # content hash the embedding was built from
     
     # Lesson status
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
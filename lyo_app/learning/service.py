@@ -22,7 +22,7 @@ from lyo_app.learning.schemas import (
     CourseCreate, CourseUpdate, LessonCreate, LessonUpdate,
     CourseEnrollmentCreate, LessonCompletionCreate
 )
-from lyo_app.services.embedding_service import embedding_service
+from lyo_app.services.embedding_backfill import embed_row
 
 
 class LearningService:
@@ -64,9 +64,8 @@ class LearningService:
         db.add(db_course)
         
         # Generate embedding
-        embed_text = f"{course_data.title} {course_data.description or ''} {course_data.short_description or ''}"
         try:
-            db_course.embedding = await embedding_service.embed_text(embed_text.strip())
+            await embed_row(db_course)
         except Exception as exc:  # noqa: BLE001 — embeddings must not block course creation
             logger.warning(f"Course embedding skipped: {exc}")
             db_course.embedding = None
@@ -198,9 +197,8 @@ class LearningService:
         db.add(db_lesson)
 
         # Generate embedding
-        embed_text = f"{lesson_data.title} {lesson_data.description or ''} {lesson_data.content or ''}"
         try:
-            db_lesson.embedding = await embedding_service.embed_text(embed_text.strip())
+            await embed_row(db_lesson)
         except Exception as exc:  # noqa: BLE001 — embeddings must not block lesson creation
             logger.warning(f"Lesson embedding skipped: {exc}")
             db_lesson.embedding = None
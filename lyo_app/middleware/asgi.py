@@ -0,0 +1,351 @@
+"""
+Pure-ASGI middleware building blocks.
+
+``BaseHTTPMiddleware`` and ``@app.middleware("http")`` run every layer in its
+own task with a memory stream between them, which costs several allocations
+and context switches per request per layer and can hold back streamed
+responses. The middlewares here wrap ``send`` with a single closure instead,
+touch raw header lists rather than building Request/Response objects, and
+only construct a ``Request`` on the (rare) error path.
+
+Compose them with ``app.add_middleware`` like any Starlette middleware.
+"""
+
+import gzip
+import io
+import json
+import logging
+import time
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from lyo_app.core.query_accounting import query_accounting, track_queries
+from lyo_app.core.request_metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def get_header(scope: Scope, name: bytes) -> Optional[bytes]:
+    """Return the first value of a (lowercase) request header."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
+
+
+def get_client_ip(scope: Scope) -> str:
+    """Client IP, honouring the first X-Forwarded-For hop."""
+    forwarded = get_header(scope, b"x-forwarded-for")
+    if forwarded:
+        return forwarded.split(b",", 1)[0].strip().decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def encode_headers(headers: Iterable[Tuple[str, str]]) -> RawHeaders:
+    return [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+
+async def send_json(
+    send: Send,
+    status: int,
+    content: Any,
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> None:
+    """Send a complete JSON response without building a Response object."""
+    body = json.dumps(content, separators=(",", ":")).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# ---------------------------------------------------------------------------
+# Request size limit
+# ---------------------------------------------------------------------------
+
+class RequestSizeLimitMiddleware:
+    """Reject requests whose Content-Length exceeds ``max_size`` with 413."""
+
+    def __init__(self, app: ASGIApp, max_size: int = 10 * 1024 * 1024):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            content_length = get_header(scope, b"content-length")
+            if content_length:
+                try:
+                    size = int(content_length)
+                except ValueError:
+                    size = 0
+                if size > self.max_size:
+                    await send_json(send, 413, {
+                        "error": "Request too large",
+                        "detail": f"Request size {size} exceeds limit {self.max_size}",
+                    })
+                    return
+        await self.app(scope, receive, send)
+
+
+# ---------------------------------------------------------------------------
+# Error handling
+# ---------------------------------------------------------------------------
+
+class ErrorHandlingMiddleware:
+    """
+    Turn unhandled exceptions into the structured error response produced
+    by ``handler.handle_error`` (``EnhancedErrorHandler``).
+
+    HTTPExceptions are re-raised for FastAPI's own handlers, and errors
+    raised after the response has started are re-raised since no new
+    response can be sent.
+    """
+
+    def __init__(self, app: ASGIApp, handler: Any):
+        self.app = app
+        self.handler = handler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except HTTPException:
+            raise
+        except Exception as e:  # noqa: BLE001
+            if started:
+                raise
+            # The body stream is already consumed; the handler skips it
+            request = Request(scope)
+            user = scope.get("state", {}).get("user")
+            response = await self.handler.handle_error(
+                error=e, request=request, user_id=getattr(user, "id", None)
+            )
+            await response(scope, receive, send)
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+class TimingMiddleware:
+    """
+    Record request timing with ``monitor`` and set ``X-Process-Time``.
+
+    Requests are recorded under their route template, which the router puts
+    in ``scope["route"]``, so this reads it after the app has run.
+    """
+
+    def __init__(self, app: ASGIApp, monitor: Any):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = str(time.perf_counter() - start).encode("latin-1")
+                message["headers"] = [*message.get("headers", ()), (b"x-process-time", elapsed)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            state = scope.get("state", {})
+            user = state.get("user")
+            query_stats = state.get("query_stats")
+            self.monitor.record_request(
+                endpoint=route_template(scope, root_path),
+                method=scope["method"],
+                status_code=status_code,
+                response_time_ms=(time.perf_counter() - start) * 1000,
+                user_id=getattr(user, "id", None),
+                database_queries=query_stats.count if query_stats else 0,
+            )
+
+
+# ---------------------------------------------------------------------------
+# SQL query accounting
+# ---------------------------------------------------------------------------
+
+class QueryAccountingMiddleware:
+    """
+    Count the SQL statements each request issues (see
+    ``lyo_app.core.query_accounting``), flag N+1 patterns and enforce
+    ``@query_budget`` declarations. Stats are left in
+    ``scope["state"]["query_stats"]`` for outer middlewares.
+    """
+
+    def __init__(self, app: ASGIApp, accounting: Any = query_accounting):
+        self.app = app
+        self.accounting = accounting
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        state = scope.setdefault("state", {})
+        with track_queries() as stats:
+            state["query_stats"] = stats
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Failed requests are accounted too, before the context is reset
+                self.accounting.finish_request(
+                    f"{scope['method']} {route_template(scope, root_path)}", stats, scope.get("endpoint")
+                )
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+class StreamingSafeGZipMiddleware:
+    """
+    Gzip responses, except event streams and already-encoded bodies.
+
+    Compressing ``text/event-stream`` buffers SSE frames inside the gzip
+    window, so clients see tokens in bursts; those responses (and anything
+    small or already encoded) pass through untouched. WebSockets are not
+    HTTP scopes and always pass through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        compresslevel: int = 6,
+        excluded_media_types: Sequence[str] = ("text/event-stream",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.excluded = tuple(t.encode("latin-1") for t in excluded_media_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = get_header(scope, b"accept-encoding")
+        if not accept or b"gzip" not in accept:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _GZipResponder(self, send).send)
+
+
+class _GZipResponder:
+    __slots__ = ("mw", "downstream", "start", "mode", "buffer", "gzip_file")
+
+    def __init__(self, mw: StreamingSafeGZipMiddleware, send: Send):
+        self.mw = mw
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.mode = ""  # "" until decided, then "pass" or "gzip"
+        self.buffer: Optional[io.BytesIO] = None
+        self.gzip_file: Optional[gzip.GzipFile] = None
+
+    def _skip(self, headers: RawHeaders) -> bool:
+        for key, value in headers:
+            if key == b"content-encoding":
+                return True
+            if key == b"content-type" and value.split(b";", 1)[0].strip() in self.mw.excluded:
+                return True
+        return False
+
+    async def send(self, message: Message) -> None:
+        mtype = message["type"]
+        if mtype == "http.response.start":
+            if self._skip(message.get("headers", [])):
+                self.mode = "pass"
+                await self.downstream(message)
+            else:
+                self.start = message
+            return
+
+        if mtype != "http.response.body" or self.mode == "pass":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.mode:
+            if not more_body and len(body) < self.mw.minimum_size:
+                self.mode = "pass"
+                await self.downstream(self.start)
+                await self.downstream(message)
+                return
+            self.mode = "gzip"
+            self.buffer = io.BytesIO()
+            self.gzip_file = gzip.GzipFile(
+                mode="wb", fileobj=self.buffer, compresslevel=self.mw.compresslevel
+            )
+            headers = [
+                (k, v) for k, v in self.start.get("headers", [])
+                if k != b"content-length"
+            ]
+            headers.append((b"content-encoding", b"gzip"))
+            headers.append((b"vary", b"Accept-Encoding"))
+            self.gzip_file.write(body)
+            if not more_body:
+                self.gzip_file.close()
+                body = self.buffer.getvalue()
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            else:
+                body = self._drain()
+            self.start["headers"] = headers
+            await self.downstream(self.start)
+            await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.gzip_file.write(body)
+        if not more_body:
+            self.gzip_file.close()
+        await self.downstream({
+            "type": "http.response.body",
+            "body": self._drain(),
+            "more_body": more_body,
+        })
+
+    def _drain(self) -> bytes:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
@@ -5,97 +5,101 @@ Provides security-related middleware functionality including:
 - Rate limiting
 - Security headers
 - Audit logging
+
+Implemented as a pure ASGI middleware (see ``lyo_app.middleware.asgi``).
 """
 
 import logging
 import time
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
-from lyo_app.core.rate_limiter import InMemoryRateLimiter, in_memory_rate_limiter as _shared_rate_limiter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from lyo_app.core.rate_limiter import middleware_rate_limiter as _shared_rate_limiter
+from lyo_app.middleware.asgi import get_client_ip, send_json
 
 logger = logging.getLogger(__name__)
 
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class SecurityMiddleware:
     """
     Security middleware providing rate limiting, security headers, and audit logging.
     """
-    
+
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         enable_rate_limiting: bool = True,
         enable_audit_logging: bool = True,
         enable_security_headers: bool = True,
     ):
-        super().__init__(app)
+        self.app = app
         self.enable_rate_limiting = enable_rate_limiting
         self.enable_audit_logging = enable_audit_logging
         self.enable_security_headers = enable_security_headers
         self._rate_limiter = _shared_rate_limiter  # shared singleton — no duplicate state
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
-        
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        path = scope["path"]
+
         # Rate limiting
         if self.enable_rate_limiting:
-            client_ip = self._get_client_ip(request)
-            if not self._check_rate_limit(client_ip, request.url.path):
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Rate limit exceeded"},
-                    headers={"Retry-After": "60"}
+            client_ip = get_client_ip(scope)
+            if not await self._check_rate_limit(client_ip, path):
+                await send_json(
+                    send, 429, {"detail": "Rate limit exceeded"},
+                    headers=[(b"retry-after", b"60")]
                 )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add security headers
-        if self.enable_security_headers:
-            self._add_security_headers(response)
-        
+                return
+
+        status_code = 0
+        add_headers = self.enable_security_headers
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if add_headers:
+                    message["headers"] = [
+                        h for h in message.get("headers", ())
+                        if h[0] not in _SECURITY_HEADER_NAMES
+                    ] + SECURITY_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
         # Audit logging
-        if self.enable_audit_logging:
-            duration = time.time() - start_time
-            self._log_request(request, response, duration)
-        
-        return response
-    
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP from request."""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-    
-    def _check_rate_limit(self, client_ip: str, path: str) -> bool:
+        if self.enable_audit_logging and logger.isEnabledFor(logging.DEBUG):
+            duration = time.perf_counter() - start_time
+            logger.debug(
+                f"{scope['method']} {path} - "
+                f"Status: {status_code} - "
+                f"Duration: {duration:.3f}s"
+            )
+
+    async def _check_rate_limit(self, client_ip: str, path: str) -> bool:
         """Check if request is within rate limits."""
         # Define limits for different paths
         if path.startswith("/api/v1/auth/"):
-            limit, window = 10, 60  # 10 requests per minute for auth
+            bucket, limit, window = "auth", 10, 60  # 10 requests per minute for auth
         elif path.startswith("/api/v1/ai/"):
-            limit, window = 60, 60  # 60 requests per minute for AI
+            bucket, limit, window = "ai", 60, 60  # 60 requests per minute for AI
         else:
-            limit, window = 120, 60  # 120 requests per minute for general
-        
-        return self._rate_limiter.is_allowed(client_ip, limit, window)
-    
-    def _add_security_headers(self, response: Response) -> None:
-        """Add security headers to response."""
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    
-    def _log_request(self, request: Request, response: Response, duration: float) -> None:
-        """Log request details."""
-        logger.debug(
-            f"{request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Duration: {duration:.3f}s"
-        )
+            bucket, limit, window = "general", 120, 60  # 120 requests per minute for general
 
-
-# InMemoryRateLimiter imported from lyo_app.core.rate_limiter above
+        allowed, _ = await self._rate_limiter.is_allowed(
+            client_ip, bucket, limit_override=limit, window_override=window
+        )
+        return allowed
@@ -1,10 +1,8 @@
 import time
 import asyncio
 import logging
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from lyo_app.tenants.usage import log_usage_async
 
 logger = logging.getLogger(__name__)
@@ -16,88 +14,81 @@ def _log_task_exception(task: asyncio.Task) -> None:
         logger.error(f"Background task {task.get_name()} failed: {exc}", exc_info=exc)
 
 
-class UsageMiddleware(BaseHTTPMiddleware):
+class UsageMiddleware:
     """
     Middleware to track API usage per organization.
-    
+
     Intercepts requests and logs them to the database if an organization_id
     is present in the request state (set by authentication dependencies).
+    Pure ASGI: ``request.state`` is backed by ``scope["state"]``, which is
+    read after the app has run.
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Start timer
-        start_time = time.time()
-        
-        # Process request
-        try:
-            response = await call_next(request)
-        except Exception:
-            # If application errors, we still want to log it if possible,
-            # but usually the error handler returns a response.
-            # If exception bubbles up, we re-raise.
-            # For accurate duration logging, we rely on standard exception handlers.
-            raise
-        
-        # Calculate duration
-        duration_ms = int((time.time() - start_time) * 1000)
-        
+        start_time = time.perf_counter()
+        # Ensure the dict exists up front so handlers and we share it
+        state = scope.setdefault("state", {})
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # If the app raises, the exception bubbles up unlogged; error
+        # handlers further out produce the response.
+        await self.app(scope, receive, send_wrapper)
+
         # Check for organization_id in request state
         # Set by api_key_auth.get_api_key_org or jwt_auth dependencies
-        organization_id = getattr(request.state, "organization_id", None)
-        
-        if organization_id:
-            # Extract metrics
-            tokens_used = getattr(request.state, "tokens_used", 0)
-            cost_usd = getattr(request.state, "cost_usd", 0.0)
-            api_key_id = getattr(request.state, "api_key_id", None)
-            user_id = getattr(request.state, "user_id", None)
-            
-            # Log usage asynchronously (fire-and-forget)
-            # Using create_task to ensure it doesn't block the response
-            t1 = asyncio.create_task(
-                log_usage_async(
-                    organization_id=organization_id,
-                    endpoint=request.url.path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    latency_ms=duration_ms,
-                    tokens_used=tokens_used,
-                    cost_usd=cost_usd,
-                    api_key_id=api_key_id,
-                    user_id=user_id
-                )
-            )
-            t1.add_done_callback(_log_task_exception)
-
-            # Phase 2: Report to Unified Analytics
-            from lyo_app.services.analytics_service import analytics_service
-            t2 = asyncio.create_task(
-                analytics_service.track_system_event(
-                    event_name="api_request",
-                    properties={
-                        "endpoint": request.url.path,
-                        "method": request.method,
-                        "status": response.status_code,
-                        "latency_ms": duration_ms
-                    },
-                    user_id=user_id
-                )
+        organization_id = state.get("organization_id")
+        if not organization_id:
+            return
+
+        # Calculate duration
+        duration_ms = int((time.perf_counter() - start_time) * 1000)
+        endpoint = scope["path"]
+        method = scope["method"]
+        user_id = state.get("user_id")
+
+        # Log usage asynchronously (fire-and-forget)
+        # Using create_task to ensure it doesn't block the response
+        t1 = asyncio.create_task(
+            log_usage_async(
+                organization_id=organization_id,
+                endpoint=endpoint,
+                method=method,
+                status_code=status_code,
+                latency_ms=duration_ms,
+                tokens_used=state.get("tokens_used", 0),
+                cost_usd=state.get("cost_usd", 0.0),
+                api_key_id=state.get("api_key_id"),
+                user_id=user_id
             )
-            t2.add_done_callback(_log_task_exception)
-            
-            # Phase 2: Report to Unified Analytics
-            from lyo_app.services.analytics_service import analytics_service
-            asyncio.create_task(
-                analytics_service.track_system_event(
-                    event_name="api_request",
-                    properties={
-                        "endpoint": request.url.path,
-                        "method": request.method,
-                        "status": response.status_code,
-                        "latency_ms": duration_ms
-                    },
-                    user_id=user_id
-                )
+        )
+        t1.add_done_callback(_log_task_exception)
+
+        # Phase 2: Report to Unified Analytics
+        from lyo_app.services.analytics_service import analytics_service
+        t2 = asyncio.create_task(
+            analytics_service.track_system_event(
+                event_name="api_request",
+                properties={
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status": status_code,
+                    "latency_ms": duration_ms
+                },
+                user_id=user_id
             )
-            
-        return response
+        )
+        t2.add_done_callback(_log_task_exception)
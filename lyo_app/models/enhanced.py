@@ -279,4 +279,21 @@ class DiscoveryFeedItem(Base):
     )
 
 
+class SweepCheckpoint(Base):
+    """Progress of a scheduled engagement sweep, so a crashed run resumes."""
+    __tablename__ = "sweep_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+
+    # The run's reference time: a resumed run re-derives its windows from it
+    run_started_at = Column(DateTime, nullable=False)
+    last_key = Column(Integer, nullable=False, default=0)  # last user_id handled (keyset cursor)
+    processed = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False)  # heartbeat; a stale unfinished run is resumed
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SweepCheckpoint {self.name} at {self.last_key}>"
 
@@ -1,7 +1,7 @@
 """
 Social and real-time models for stories and messenger/chat features.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from lyo_app.core.database import Base
@@ -39,6 +39,11 @@ class Conversation(Base):
     name = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized inbox row, maintained by lyo_app.services.messaging_inbox
+    last_message_id = Column(Integer)  # messages.id; no FK to avoid a conversations <-> messages cycle
+    last_message_at = Column(DateTime)
+    last_message_preview = Column(String(200))
+    __table_args__ = (Index("ix_conversations_updated_at_id", "updated_at", "id"),)
     # Relationships
     participants = relationship("ConversationParticipant", back_populates="conversation")
     messages = relationship("Message", back_populates="conversation", order_by="Message.created_at")
@@ -50,11 +55,14 @@ class ConversationParticipant(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     joined_at = Column(DateTime, default=datetime.utcnow)
     last_read_at = Column(DateTime)
+    unread_count = Column(Integer, default=0, nullable=False, server_default="0")
     is_admin = Column(Boolean, default=False)
     # Relationships
     conversation = relationship("Conversation", back_populates="participants")
     user = relationship("User")
 
+    __table_args__ = (Index("ix_conversation_participants_user_conversation", "user_id", "conversation_id"),)
+
 class Message(Base):
     __tablename__ = "messages"
     id = Column(Integer, primary_key=True)
@@ -73,6 +81,8 @@ class Message(Base):
     sender = relationship("User")
     read_receipts = relationship("MessageReadReceipt", back_populates="message")
 
+    __table_args__ = (Index("ix_messages_conversation_created", "conversation_id", "created_at"),)
+
 class MessageReadReceipt(Base):
     __tablename__ = "message_read_receipts"
     id = Column(Integer, primary_key=True)
@@ -161,6 +161,7 @@ class MemoryInsight(Base):
     category = Column(String(50), index=True)  # learning_style, struggle_point, etc.
     insight_text = Column(Text, nullable=False)
     embedding = Column(Vector(768))  # Gemini-embedding-001 dimension
+    embedding_hash = Column(String(64), nullable=True)  # content hash the embedding was built from
     
     confidence = Column(Float, default=1.0)
     source_session_id = Column(String(100), nullable=True)
@@ -169,3 +170,16 @@ class MemoryInsight(Base):
     
     def __repr__(self) -> str:
         return f"<MemoryInsight(id={self.id}, user_id={self.user_id}, category='{self.category}')>"
+
+
+class MemorySynthesisState(Base):
+    """Per-user high-water mark for incremental memory synthesis"""
+    __tablename__ = "memory_synthesis_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_interaction_id = Column(Integer, nullable=False, default=0)  # newest MentorInteraction folded in
+    synthesized_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<MemorySynthesisState(user_id={self.user_id}, last_interaction_id={self.last_interaction_id})>"
+
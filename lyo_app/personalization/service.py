@@ -52,10 +52,14 @@ class DeepKnowledgeTracer:
         skill_id: str,
         correct: bool,
         time_taken: float,
-        hints_used: int
+        hints_used: int,
+        commit: bool = True
     ) -> float:
         """
         Update skill mastery using DKT algorithm
+
+        With ``commit=False`` the change is only flushed, so several updates
+        can share the caller's transaction.
         """
         # Get or create mastery record
         result = await db.execute(
@@ -145,7 +149,10 @@ class DeepKnowledgeTracer:
         if mastery.mastery_level >= 0.8 and not mastery.mastery_achieved:
             mastery.mastery_achieved = datetime.utcnow()
         
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
         return mastery.mastery_level
     
     async def get_skill_readiness(
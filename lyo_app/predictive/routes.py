@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
 from lyo_app.core.database import get_db
-from lyo_app.auth.jwt_auth import get_current_user
-from lyo_app.auth.models import User
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 
 from .schemas import (
     StrugglePredictionRequest,
@@ -41,7 +41,7 @@ router = APIRouter(prefix="/predictive", tags=["Predictive Intelligence"])
 async def predict_struggle(
     request: StrugglePredictionRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Predict if user will struggle with content BEFORE they attempt it.
@@ -99,7 +99,7 @@ async def predict_struggle(
 async def record_struggle_outcome(
     request: RecordOutcomeRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Record actual outcome after user attempts content.
@@ -129,7 +129,7 @@ async def record_struggle_outcome(
 @router.get("/dropout/risk", response_model=DropoutRiskResponse)
 async def get_dropout_risk(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get current dropout/churn risk assessment for user.
@@ -177,7 +177,7 @@ async def get_dropout_risk(
 @router.get("/timing/profile", response_model=TimingProfileResponse)
 async def get_timing_profile(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get user's optimal learning time profile.
@@ -216,7 +216,7 @@ async def get_timing_profile(
 @router.get("/timing/recommended", response_model=RecommendedTimeResponse)
 async def get_recommended_time(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get recommended time to send intervention for maximum engagement.
@@ -245,7 +245,7 @@ async def get_recommended_time(
 async def check_timing(
     request: CheckTimingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Check if now (or specified time) is a good time to send intervention.
@@ -286,7 +286,7 @@ async def check_timing(
 async def get_learning_plateaus(
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get detected learning plateaus where user is stuck on topics.
@@ -336,7 +336,7 @@ async def get_learning_plateaus(
 @router.get("/regressions", response_model=list[SkillRegressionResponse])
 async def get_skill_regressions(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get detected skill regressions where mastery is declining.
@@ -377,7 +377,7 @@ async def get_skill_regressions(
 @router.get("/insights", response_model=PredictiveInsightsResponse)
 async def get_predictive_insights(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get comprehensive predictive insights dashboard for user.
@@ -538,7 +538,7 @@ async def get_predictive_insights(
 @router.get("/content-recommendations")
 async def get_content_recommendations(
     limit: int = 5,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get AI-powered content recommendations based on mastery gaps, spaced rep and struggle predictions."""
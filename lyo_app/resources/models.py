@@ -1,7 +1,7 @@
 """
 Database models for educational resources
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from enum import Enum as PyEnum
@@ -36,6 +36,10 @@ class ResourceProvider(PyEnum):
 class EducationalResource(Base):
     """Model for storing educational resources from various APIs"""
     __tablename__ = "educational_resources"
+    __table_args__ = (
+        # Conflict target for the bulk upsert in ResourceAggregationService
+        Index("uq_educational_resources_provider_external_id", "provider", "external_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -91,6 +95,9 @@ class EducationalResource(Base):
 class ResourceTag(Base):
     """Tags for categorizing resources"""
     __tablename__ = "resource_tags"
+    __table_args__ = (
+        Index("uq_resource_tags_resource_id_tag", "resource_id", "tag", unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     resource_id = Column(Integer, ForeignKey("educational_resources.id"))
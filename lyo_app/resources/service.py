@@ -1,15 +1,33 @@
 """
 Educational Resources Service
 Manages aggregation, curation, and AI integration of educational resources
+
+Aggregation is batched end to end:
+
+* provider searches fan out concurrently under one process-wide budget
+  (``RESOURCE_PROVIDER_CONCURRENCY``), and their responses are cached for
+  ``RESOURCE_PROVIDER_CACHE_TTL`` seconds keyed by (provider, query, type,
+  limit), with identical in-flight searches sharing one call;
+* results are deduplicated in memory across providers by
+  ``(provider, external_id)`` and by normalized URL, keeping the copy with
+  the best quality score;
+* persisting a batch is one existence lookup, one
+  ``INSERT ... ON CONFLICT DO NOTHING`` for the resources and one for their
+  tags, and a single commit, however many results came back.
 """
 import asyncio
-from typing import List, Dict, Optional, Any
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Dict, Optional, Any, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, desc
-from datetime import datetime, timedelta
+from sqlalchemy import select, insert, or_, desc, tuple_
+from sqlalchemy.orm import selectinload
+from datetime import datetime
 import logging
 
-from .models import EducationalResource, ResourceType, ResourceProvider, ResourceTag, CourseResource
+from .models import EducationalResource, ResourceType, ResourceProvider, ResourceTag
 from .providers.youtube_provider import YouTubeProvider
 try:
     from lyo_app.integrations.gcp_secrets import get_secret
@@ -24,25 +42,144 @@ from .providers.base import ResourceData
 
 logger = logging.getLogger(__name__)
 
+PROVIDER_CONCURRENCY = int(os.getenv("RESOURCE_PROVIDER_CONCURRENCY", "8"))
+PROVIDER_CACHE_TTL = float(os.getenv("RESOURCE_PROVIDER_CACHE_TTL", "900"))
+# Rows per INSERT statement; keeps bind parameters under SQLite's limit
+INSERT_CHUNK = 500
+
+CacheKey = Tuple[str, str, Optional[str], int]
+
+
+def normalize_url(url: str) -> str:
+    """Scheme-, ``www.``-, fragment- and tracking-parameter-insensitive form of ``url``."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith("utm_")
+    )
+    normalized = f"{host}{parts.path.rstrip('/')}"
+    return f"{normalized}?{urlencode(params)}" if params else normalized
+
+
+def _resource_keys(provider: ResourceProvider, external_id: Optional[str], url: str) -> List[Any]:
+    keys: List[Any] = [normalize_url(url)]
+    if external_id:
+        keys.append((provider, external_id))
+    return keys
+
+
+def _retrieve_exception(task: "asyncio.Task") -> None:
+    """Mark a load failure as seen, so one nobody waited for is not logged."""
+    if not task.cancelled():
+        task.exception()
+
+
+class ProviderResponseCache:
+    """TTL/LRU cache of provider search responses with in-flight coalescing."""
+
+    def __init__(self, ttl: float = PROVIDER_CACHE_TTL, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[ResourceData]]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(provider: ResourceProvider, query: str, resource_type: Optional[ResourceType], limit: int) -> CacheKey:
+        return (
+            provider.value,
+            " ".join(query.lower().split()),
+            resource_type.value if resource_type else None,
+            limit,
+        )
+
+    async def fetch(self, key: CacheKey, loader: Callable[[], Awaitable[List[ResourceData]]]) -> List[ResourceData]:
+        """Cached response for ``key``, calling ``loader`` on a miss. Failures are not cached."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            del self._entries[key]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The load runs in its own task and every caller, the first one
+            # included, waits on it through a shield: a cancelled caller stops
+            # waiting without cancelling the load for the others.
+            pending = self._inflight[key] = asyncio.ensure_future(self._load(key, loader))
+            pending.add_done_callback(_retrieve_exception)
+        return list(await asyncio.shield(pending))
+
+    async def _load(self, key: CacheKey, loader: Callable[[], Awaitable[List[ResourceData]]]) -> List[ResourceData]:
+        try:
+            results = list(await loader())
+        finally:
+            self._inflight.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, results)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return results
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+class _ProviderBudget:
+    """Process-wide cap on concurrent provider calls (one semaphore per event loop)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._semaphore = loop, asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+
+provider_cache = ProviderResponseCache()
+provider_budget = _ProviderBudget(PROVIDER_CONCURRENCY)
+
+
 class ResourceAggregationService:
     """Service for aggregating educational resources from multiple providers"""
-    
-    def __init__(self, db_session: AsyncSession):
+
+    def __init__(self, db_session: AsyncSession, providers: Optional[Dict[ResourceProvider, Any]] = None):
         self.db = db_session
-        self.providers = self._initialize_providers()
-        
+        self.providers = providers if providers is not None else self._initialize_providers()
+
     def _initialize_providers(self) -> Dict[ResourceProvider, Any]:
         """Initialize all resource providers"""
         providers = {}
-        
+
         # Initialize providers - using mock API keys for testing
         yt_key = get_credential("YOUTUBE_API_KEY", settings.youtube_api_key) or "MOCK_YOUTUBE_API_KEY"
         providers[ResourceProvider.YOUTUBE] = YouTubeProvider(yt_key)
         providers[ResourceProvider.INTERNET_ARCHIVE] = InternetArchiveProvider()
         providers[ResourceProvider.KHAN_ACADEMY] = KhanAcademyProvider()
-        
+
         return providers
-    
+
     async def search_and_aggregate_resources(
         self,
         query: str,
@@ -51,112 +188,181 @@ class ResourceAggregationService:
         limit_per_provider: int = 20,
         subject_area: Optional[str] = None
     ) -> List[EducationalResource]:
-        """Search and aggregate resources from multiple providers"""
-        
+        """Search and aggregate resources from multiple providers.
+
+        Returns the resources this search added to the catalog; results that
+        were already stored are skipped.
+        """
+        results = await self._collect(query, resource_types, providers, limit_per_provider, subject_area)
+        all_resources = await self._persist(results)
+
+        # Sort by quality score and relevance
+        all_resources.sort(key=lambda x: (x.quality_score, x.created_at), reverse=True)
+
+        return all_resources
+
+    async def _collect(
+        self,
+        query: str,
+        resource_types: Optional[List[ResourceType]],
+        providers: Optional[List[ResourceProvider]],
+        limit: int,
+        subject_area: Optional[str],
+    ) -> List[ResourceData]:
+        """Fan a query out to the providers and return the deduplicated results."""
         if resource_types is None:
             resource_types = [ResourceType.VIDEO, ResourceType.EBOOK, ResourceType.COURSE]
-        
+
         if providers is None:
             providers = list(self.providers.keys())
-        
-        all_resources = []
-        tasks = []
-        
-        # Create search tasks for each provider
-        for provider_enum in providers:
-            if provider_enum in self.providers:
-                provider = self.providers[provider_enum]
-                for resource_type in resource_types:
-                    task = self._search_provider(provider, query, resource_type, limit_per_provider)
-                    tasks.append(task)
-        
+
         # Execute all searches concurrently
-        search_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        for result in search_results:
-            if isinstance(result, Exception):
-                logger.error(f"Provider search failed: {result}")
-                continue
-            
-            for resource_data in result:
-                # Filter by subject area if specified
-                if subject_area and resource_data.subject_area != subject_area:
-                    continue
-                
-                # Check if resource already exists
-                existing = await self._find_existing_resource(resource_data)
-                if existing:
-                    continue
-                
-                # Create new resource
-                db_resource = await self._create_resource_from_data(resource_data)
-                all_resources.append(db_resource)
-        
-        # Sort by quality score and relevance
-        all_resources.sort(key=lambda x: (x.quality_score, x.created_at), reverse=True)
-        
-        return all_resources
-    
+        search_results = await asyncio.gather(*(
+            self._search_provider(provider_enum, query, resource_type, limit)
+            for provider_enum in providers
+            if provider_enum in self.providers
+            for resource_type in resource_types
+        ))
+
+        results = (data for batch in search_results for data in batch)
+        if subject_area:
+            results = (data for data in results if data.subject_area == subject_area)
+        return self._dedupe(results)
+
     async def _search_provider(
         self,
-        provider: Any,
+        provider_enum: ResourceProvider,
         query: str,
         resource_type: ResourceType,
         limit: int
     ) -> List[ResourceData]:
         """Search a specific provider for resources"""
+        provider = self.providers[provider_enum]
+
+        async def call() -> List[ResourceData]:
+            async with provider_budget.semaphore():
+                return await provider.search_resources(query, resource_type, limit)
+
         try:
-            return await provider.search_resources(query, resource_type, limit)
+            return await provider_cache.fetch(provider_cache.key(provider_enum, query, resource_type, limit), call)
         except Exception as e:
             logger.error(f"Error searching provider {provider.__class__.__name__}: {e}")
             return []
-    
-    async def _find_existing_resource(self, resource_data: ResourceData) -> Optional[EducationalResource]:
-        """Check if a resource already exists in the database"""
-        query = select(EducationalResource).where(
-            and_(
-                EducationalResource.external_id == resource_data.external_id,
-                EducationalResource.provider == resource_data.provider
-            )
-        )
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
-    
-    async def _create_resource_from_data(self, resource_data: ResourceData) -> EducationalResource:
-        """Create a database resource from ResourceData"""
-        db_resource = EducationalResource(
-            title=resource_data.title,
-            description=resource_data.description,
-            author=resource_data.author,
-            resource_type=resource_data.resource_type,
-            provider=resource_data.provider,
-            external_id=resource_data.external_id,
-            external_url=resource_data.external_url,
-            thumbnail_url=resource_data.thumbnail_url,
-            download_url=resource_data.download_url,
-            duration_minutes=resource_data.duration_minutes,
-            page_count=resource_data.page_count,
-            subject_area=resource_data.subject_area,
-            difficulty_level=resource_data.difficulty_level,
-            language=resource_data.language,
-            isbn=resource_data.isbn,
-            quality_score=self._calculate_quality_score(resource_data),
-            raw_api_data=resource_data.raw_data,
-            last_verified=datetime.utcnow()
+
+    def _dedupe(self, results: Iterable[ResourceData]) -> List[ResourceData]:
+        """Drop repeats by (provider, external_id) or normalized URL, keeping the best-scored copy."""
+        kept: List[ResourceData] = []
+        slots: Dict[Any, int] = {}
+        for data in results:
+            keys = _resource_keys(data.provider, data.external_id, data.external_url)
+            slot = next((slots[k] for k in keys if k in slots), None)
+            if slot is None:
+                slot = len(kept)
+                kept.append(data)
+            elif self._calculate_quality_score(data) > self._calculate_quality_score(kept[slot]):
+                kept[slot] = data
+            for k in keys:
+                slots.setdefault(k, slot)
+        return kept
+
+    async def _persist(self, results: List[ResourceData]) -> List[EducationalResource]:
+        """Store the results not already in the catalog and return them with their tags loaded."""
+        if not results:
+            return []
+
+        # One lookup for everything that is already stored
+        id_keys = {(data.provider, data.external_id) for data in results if data.external_id}
+        urls = {data.external_url for data in results}
+        existing = await self.db.execute(
+            select(EducationalResource.provider, EducationalResource.external_id, EducationalResource.external_url)
+            .where(or_(
+                tuple_(EducationalResource.provider, EducationalResource.external_id).in_(list(id_keys)),
+                EducationalResource.external_url.in_(list(urls)),
+            ))
         )
-        
-        self.db.add(db_resource)
-        await self.db.flush()  # Get the ID
-        
-        # Add tags
-        for tag in resource_data.tags:
-            db_tag = ResourceTag(resource_id=db_resource.id, tag=tag[:50])  # Limit tag length
-            self.db.add(db_tag)
-        
+        stored = {k for row in existing for k in _resource_keys(*row)}
+        fresh = [
+            data for data in results
+            if not any(k in stored for k in _resource_keys(data.provider, data.external_id, data.external_url))
+        ]
+        if not fresh:
+            return []
+
+        now = datetime.utcnow()
+        insert_stmt = self._insert(EducationalResource)
+        new_ids: Dict[Tuple[ResourceProvider, str], int] = {}
+        for start in range(0, len(fresh), INSERT_CHUNK):
+            rows = [self._resource_row(data, now) for data in fresh[start:start + INSERT_CHUNK]]
+            stmt = insert_stmt.values(rows)
+            if hasattr(stmt, "on_conflict_do_nothing"):
+                # A concurrent aggregation may have stored some of these since the lookup
+                stmt = stmt.on_conflict_do_nothing(index_elements=["provider", "external_id"])
+            inserted = await self.db.execute(stmt.returning(
+                EducationalResource.id, EducationalResource.provider, EducationalResource.external_id
+            ))
+            new_ids.update({(provider, external_id): id_ for id_, provider, external_id in inserted})
+
+        tag_rows = [
+            {"resource_id": new_ids[key], "tag": tag}
+            for data in fresh
+            if (key := (data.provider, data.external_id)) in new_ids
+            for tag in dict.fromkeys(tag[:50] for tag in data.tags if tag)  # Limit tag length
+        ]
+        tag_insert = self._insert(ResourceTag)
+        for start in range(0, len(tag_rows), INSERT_CHUNK):
+            stmt = tag_insert.values(tag_rows[start:start + INSERT_CHUNK])
+            if hasattr(stmt, "on_conflict_do_nothing"):
+                stmt = stmt.on_conflict_do_nothing(index_elements=["resource_id", "tag"])
+            await self.db.execute(stmt)
+
         await self.db.commit()
-        return db_resource
-    
+        if not new_ids:
+            return []
+        loaded = await self.db.execute(
+            select(EducationalResource)
+            .where(EducationalResource.id.in_(list(new_ids.values())))
+            .options(selectinload(EducationalResource.tags))
+        )
+        return list(loaded.scalars().all())
+
+    def _insert(self, model: Any):
+        """Dialect ``insert`` (with ON CONFLICT support) where the backend has one."""
+        dialect = self.db.bind.dialect.name if self.db.bind else self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = insert
+        return dialect_insert(model)
+
+    def _resource_row(self, resource_data: ResourceData, now: datetime) -> Dict[str, Any]:
+        """Column values for a new resource built from ResourceData"""
+        return {
+            "title": resource_data.title,
+            "description": resource_data.description,
+            "author": resource_data.author,
+            "resource_type": resource_data.resource_type,
+            "provider": resource_data.provider,
+            "external_id": resource_data.external_id,
+            "external_url": resource_data.external_url,
+            "thumbnail_url": resource_data.thumbnail_url,
+            "download_url": resource_data.download_url,
+            "duration_minutes": resource_data.duration_minutes,
+            "page_count": resource_data.page_count,
+            "subject_area": resource_data.subject_area,
+            "difficulty_level": resource_data.difficulty_level,
+            "language": resource_data.language,
+            "isbn": resource_data.isbn,
+            "quality_score": self._calculate_quality_score(resource_data),
+            "raw_api_data": resource_data.raw_data,
+            "is_curated": False,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+            "last_verified": now,
+        }
+
     def _calculate_quality_score(self, resource_data: ResourceData) -> int:
         """Calculate a quality score for the resource (0-100)"""
         score = 50  # Base score
@@ -199,16 +405,33 @@ class ResourceAggregationService:
     ) -> List[EducationalResource]:
         """AI-powered curation of resources for a specific course"""
         
+        # Search every objective at once, under the shared provider budget
+        objectives = learning_objectives[:3]  # Limit to top 3 objectives
+        batches = await asyncio.gather(*(
+            self._collect(f"{course_topic} {objective}", None, None, 5, None)
+            for objective in objectives
+        ))
+
+        # ... and store what they found in one batch
+        created = await self._persist(self._dedupe(data for batch in batches for data in batch))
+        by_key = {}
+        for resource in created:
+            for key in _resource_keys(resource.provider, resource.external_id, resource.external_url):
+                by_key[key] = resource
+
         curated_resources = []
-        
-        # Search for resources matching the course topic
-        for objective in learning_objectives[:3]:  # Limit to top 3 objectives
-            search_query = f"{course_topic} {objective}"
-            resources = await self.search_and_aggregate_resources(
-                query=search_query,
-                limit_per_provider=5
-            )
-            
+        taken = set()
+        for batch in batches:
+            resources = {}
+            for data in batch:
+                for key in _resource_keys(data.provider, data.external_id, data.external_url):
+                    resource = by_key.get(key)
+                    if resource is not None and resource.id not in taken:
+                        resources[resource.id] = resource
+                        break
+            resources = sorted(resources.values(), key=lambda x: (x.quality_score, x.created_at), reverse=True)
+            taken.update(r.id for r in resources)
+
             # Filter by difficulty level
             filtered_resources = [
                 r for r in resources 
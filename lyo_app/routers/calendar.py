@@ -14,8 +14,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from lyo_app.core.database import get_db as get_async_db
-from lyo_app.auth.models import User
-from lyo_app.auth.jwt_auth import get_current_user
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.integrations.calendar_integration import (
     calendar_service,
     CalendarProvider,
@@ -89,7 +89,7 @@ class OAuthCallbackRequest(BaseModel):
 
 @router.get("/connect/google")
 async def get_google_auth_url(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get the Google OAuth URL to connect your calendar.
@@ -119,7 +119,7 @@ async def get_google_auth_url(
 @router.post("/connect/callback")
 async def handle_oauth_callback(
     request: OAuthCallbackRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -171,7 +171,7 @@ async def handle_oauth_callback(
 
 @router.get("/status", response_model=CalendarConnectionResponse)
 async def get_calendar_status(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -190,7 +190,7 @@ async def get_calendar_status(
 
 @router.post("/sync")
 async def trigger_calendar_sync(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -211,7 +211,7 @@ async def trigger_calendar_sync(
 async def get_upcoming_events(
     days: int = Query(default=14, ge=1, le=30, description="Days to look ahead"),
     prep_only: bool = Query(default=False, description="Only show events needing prep"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -227,7 +227,7 @@ async def get_upcoming_events(
 @router.get("/events/{event_id}/prep-plan", response_model=PrepPlanResponse)
 async def get_event_prep_plan(
     event_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -248,7 +248,7 @@ async def get_event_prep_plan(
 @router.post("/events/{event_id}/start-prep")
 async def start_event_prep(
     event_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -277,7 +277,7 @@ async def start_event_prep(
 
 @router.delete("/disconnect")
 async def disconnect_calendar(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -295,7 +295,7 @@ async def disconnect_calendar(
 
 @router.get("/settings")
 async def get_calendar_settings(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get calendar integration settings.
@@ -319,7 +319,7 @@ async def get_calendar_settings(
 @router.put("/settings")
 async def update_calendar_settings(
     settings: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -3,13 +3,14 @@ Discover Router - Educational places, trending topics, and curated content.
 Serves reference data for the Discover tab (places, trending resources).
 """
 
-import math
-from fastapi import APIRouter, Depends, Query, HTTPException
+import os
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
-from lyo_app.auth.jwt_auth import get_current_user
-from lyo_app.auth.models import User
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
+from lyo_app.services.place_catalog import PlaceCatalogStore, etag_for, etag_matches
 
 import logging
 
@@ -391,21 +392,22 @@ SEED_PLACES: list[PlaceDetail] = [
 VALID_CATEGORIES = {"museum", "library", "university", "lab", "coworking", "landmark"}
 
 
-# ============================================================================
-# Helper: Haversine distance (km)
-# ============================================================================
+# Loaded once into an indexed, pre-serialized catalog. DISCOVER_PLACES_PATH
+# points at a JSON list of places to serve instead of the seed data; edits
+# to the file are picked up without a restart.
+place_catalog = PlaceCatalogStore(
+    SEED_PLACES,
+    parse=PlaceDetail.model_validate,
+    path=os.getenv("DISCOVER_PLACES_PATH") or None,
+)
 
-def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    R = 6371.0  # Earth radius in km
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (
-        math.sin(dlat / 2) ** 2
-        + math.cos(math.radians(lat1))
-        * math.cos(math.radians(lat2))
-        * math.sin(dlng / 2) ** 2
-    )
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def _cached_json(body: Optional[bytes], etag: str, if_none_match: Optional[str]) -> Response:
+    """A pre-serialized JSON body, or 304 when the client already has this version."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ============================================================================
@@ -420,104 +422,98 @@ async def list_places(
     category: Optional[str] = Query(None, description="Filter by category"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """List educational places, optionally filtered by location and category."""
-    results = list(SEED_PLACES)
-
-    # Category filter
-    if category:
-        cat = category.lower()
-        if cat not in VALID_CATEGORIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid category '{category}'. Valid: {', '.join(sorted(VALID_CATEGORIES))}",
-            )
-        results = [p for p in results if p.category == cat]
-
-    # Proximity filter
-    if lat is not None and lng is not None:
-        results = [
-            p for p in results if _haversine_km(lat, lng, p.lat, p.lng) <= radius_km
-        ]
-        # Sort by distance
-        results.sort(key=lambda p: _haversine_km(lat, lng, p.lat, p.lng))
-    else:
-        # Default sort: featured first, then by rating
-        results.sort(key=lambda p: (-int(p.is_featured), -p.rating))
-
-    total = len(results)
-
-    # Pagination
+    cat = category.lower() if category else None
+    if cat and cat not in VALID_CATEGORIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid category '{category}'. Valid: {', '.join(sorted(VALID_CATEGORIES))}",
+        )
+    if lat is None or lng is None:
+        lat = lng = None  # proximity needs both
+
+    catalog = place_catalog.current()
+    etag = catalog.list_etag(cat, lat, lng, radius_km if lat is not None else None, page, per_page)
+    if etag_matches(if_none_match, etag):
+        return _cached_json(None, etag, if_none_match)
+
+    # Nearest first for a proximity search, else featured first, then by rating.
+    # List entries leave out hours/phone/reviews.
+    results = catalog.query(category=cat, lat=lat, lng=lng, radius_km=radius_km)
     start = (page - 1) * per_page
-    end = start + per_page
-    page_results = results[start:end]
-
-    # Return as Place (not PlaceDetail) to hide hours/phone/reviews in list view
-    places_out = [Place(**p.model_dump(exclude={"hours", "phone", "reviews"})) for p in page_results]
-
-    return PlacesResponse(places=places_out, total=total)
+    return _cached_json(catalog.render_list(results, start, start + per_page), etag, if_none_match)
 
 
 @router.get("/places/{place_id}", response_model=PlaceDetail)
 async def get_place(
     place_id: str,
-    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get detailed information about a single educational place."""
-    for place in SEED_PLACES:
-        if place.id == place_id:
-            return place
-    raise HTTPException(status_code=404, detail=f"Place '{place_id}' not found")
+    catalog = place_catalog.current()
+    body = catalog.detail_json.get(place_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Place '{place_id}' not found")
+    return _cached_json(body, catalog.detail_etags[place_id], if_none_match)
+
+
+# Static for now: built and serialized once
+TRENDING_TOPICS = [
+    TrendingTopic(name="Artificial Intelligence", count=12840, icon="brain"),
+    TrendingTopic(name="Quantum Computing", count=8920, icon="atom"),
+    TrendingTopic(name="Climate Science", count=7650, icon="leaf"),
+    TrendingTopic(name="Neuroscience", count=6430, icon="activity"),
+    TrendingTopic(name="Space Exploration", count=5870, icon="rocket"),
+    TrendingTopic(name="Biotechnology", count=4920, icon="dna"),
+    TrendingTopic(name="Machine Learning", count=11200, icon="cpu"),
+    TrendingTopic(name="Renewable Energy", count=3810, icon="zap"),
+]
+
+TRENDING_RESOURCES = [
+    TrendingResource(
+        title="MIT OpenCourseWare: Introduction to Deep Learning",
+        type="course",
+        url="https://ocw.mit.edu/courses/6-s191-introduction-to-deep-learning",
+    ),
+    TrendingResource(
+        title="Khan Academy: AP Physics 1",
+        type="course",
+        url="https://www.khanacademy.org/science/ap-physics-1",
+    ),
+    TrendingResource(
+        title="Nature: Recent Advances in CRISPR",
+        type="article",
+        url="https://www.nature.com/subjects/crispr-cas9",
+    ),
+    TrendingResource(
+        title="Stanford CS229: Machine Learning",
+        type="lecture",
+        url="https://cs229.stanford.edu",
+    ),
+    TrendingResource(
+        title="3Blue1Brown: Essence of Linear Algebra",
+        type="video",
+        url="https://www.3blue1brown.com/topics/linear-algebra",
+    ),
+    TrendingResource(
+        title="Coursera: The Science of Well-Being",
+        type="course",
+        url="https://www.coursera.org/learn/the-science-of-well-being",
+    ),
+]
+
+TRENDING_JSON = TrendingResponse(topics=TRENDING_TOPICS, resources=TRENDING_RESOURCES).model_dump_json().encode()
+TRENDING_ETAG = etag_for(TRENDING_JSON)
 
 
 @router.get("/trending", response_model=TrendingResponse)
 async def get_trending(
-    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get trending topics and resources for the discover page."""
-    topics = [
-        TrendingTopic(name="Artificial Intelligence", count=12840, icon="brain"),
-        TrendingTopic(name="Quantum Computing", count=8920, icon="atom"),
-        TrendingTopic(name="Climate Science", count=7650, icon="leaf"),
-        TrendingTopic(name="Neuroscience", count=6430, icon="activity"),
-        TrendingTopic(name="Space Exploration", count=5870, icon="rocket"),
-        TrendingTopic(name="Biotechnology", count=4920, icon="dna"),
-        TrendingTopic(name="Machine Learning", count=11200, icon="cpu"),
-        TrendingTopic(name="Renewable Energy", count=3810, icon="zap"),
-    ]
-
-    resources = [
-        TrendingResource(
-            title="MIT OpenCourseWare: Introduction to Deep Learning",
-            type="course",
-            url="https://ocw.mit.edu/courses/6-s191-introduction-to-deep-learning",
-        ),
-        TrendingResource(
-            title="Khan Academy: AP Physics 1",
-            type="course",
-            url="https://www.khanacademy.org/science/ap-physics-1",
-        ),
-        TrendingResource(
-            title="Nature: Recent Advances in CRISPR",
-            type="article",
-            url="https://www.nature.com/subjects/crispr-cas9",
-        ),
-        TrendingResource(
-            title="Stanford CS229: Machine Learning",
-            type="lecture",
-            url="https://cs229.stanford.edu",
-        ),
-        TrendingResource(
-            title="3Blue1Brown: Essence of Linear Algebra",
-            type="video",
-            url="https://www.3blue1brown.com/topics/linear-algebra",
-        ),
-        TrendingResource(
-            title="Coursera: The Science of Well-Being",
-            type="course",
-            url="https://www.coursera.org/learn/the-science-of-well-being",
-        ),
-    ]
-
-    return TrendingResponse(topics=topics, resources=resources)
+    return _cached_json(TRENDING_JSON, TRENDING_ETAG, if_none_match)
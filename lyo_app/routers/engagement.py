@@ -17,8 +17,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from lyo_app.core.database import get_db as get_async_db
-from lyo_app.auth.models import User
-from lyo_app.auth.jwt_auth import get_current_user
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.services.proactive_engagement import (
     proactive_engagement_service,
     NudgeType,
@@ -88,7 +88,7 @@ class EngagementStatsResponse(BaseModel):
 
 @router.get("/nudges", response_model=List[NudgeResponse])
 async def get_pending_nudges(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -130,7 +130,7 @@ async def get_pending_nudges(
 
 @router.get("/patterns", response_model=EngagementPatternResponse)
 async def get_engagement_patterns(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -181,7 +181,7 @@ async def get_engagement_patterns(
 @router.get("/optimal-time")
 async def get_optimal_notification_time(
     priority: str = "medium",
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -221,7 +221,7 @@ async def get_optimal_notification_time(
 
 @router.post("/analyze")
 async def trigger_engagement_analysis(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -251,7 +251,7 @@ async def trigger_engagement_analysis(
 
 @router.get("/streak")
 async def get_streak_status(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -321,7 +321,7 @@ async def get_streak_status(
 
 @router.get("/spaced-rep/due")
 async def get_spaced_rep_due(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -378,7 +378,7 @@ async def get_spaced_rep_due(
 
 @router.get("/weekly-summary")
 async def get_weekly_summary(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
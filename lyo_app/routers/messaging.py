@@ -3,7 +3,8 @@ Messaging Router — Direct messages between users.
 
 Uses ORM models from lyo_app.models.social (Conversation, ConversationParticipant,
 Message, MessageReadReceipt) which map to tables created by migration
-20250728_add_social_and_messenger_models.
+20250728_add_social_and_messenger_models. The inbox (last message, unread
+counts) is denormalized onto those rows by lyo_app.services.messaging_inbox.
 """
 
 from __future__ import annotations
@@ -14,19 +15,28 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select, and_, or_, desc, case
+from sqlalchemy import func, select, and_, or_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from lyo_app.auth.jwt_auth import get_current_user
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.auth.models import User
 from lyo_app.core.database import get_db
+from lyo_app.core.query_accounting import query_budget
 from lyo_app.models.social import (
     Conversation,
     ConversationParticipant,
     Message,
     MessageReadReceipt,
 )
+from lyo_app.services.messaging_inbox import (
+    decode_cursor,
+    load_inbox,
+    mark_read,
+    record_message,
+    retract_message,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,12 +71,14 @@ class ConversationOut(BaseModel):
     name: Optional[str] = None
     participants: List[ParticipantOut]
     last_message: Optional[MessageOut] = None
+    last_message_preview: Optional[str] = None
     unread_count: int = 0
     updated_at: str
 
 
 class ConversationsListResponse(BaseModel):
     conversations: List[ConversationOut]
+    next_cursor: Optional[str] = None
 
 
 class MessagesListResponse(BaseModel):
@@ -119,103 +131,39 @@ def _message_to_out(m: Message) -> MessageOut:
 
 
 @router.get("/conversations", response_model=ConversationsListResponse)
+@query_budget(max_queries=3)
 async def list_conversations(
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all conversations for the current user with last message, unread count, and other participants."""
-
-    # Step 1: Get conversation IDs where user is a participant
-    my_parts_q = (
-        select(ConversationParticipant)
-        .where(ConversationParticipant.user_id == current_user.id)
-    )
-    my_parts_result = await db.execute(my_parts_q)
-    my_parts = my_parts_result.scalars().all()
+    """List the current user's conversations, most recent first, with last message, unread count, and other participants."""
 
-    if not my_parts:
-        return ConversationsListResponse(conversations=[])
-
-    conv_id_to_last_read: dict[int, Optional[datetime]] = {
-        p.conversation_id: p.last_read_at for p in my_parts
-    }
-    conv_ids = list(conv_id_to_last_read.keys())
-
-    # Step 2: Load conversations with participants -> users
-    convs_q = (
-        select(Conversation)
-        .where(Conversation.id.in_(conv_ids))
-        .options(
-            selectinload(Conversation.participants).selectinload(ConversationParticipant.user)
-        )
-        .order_by(desc(Conversation.updated_at))
-    )
-    convs_result = await db.execute(convs_q)
-    convs = convs_result.scalars().unique().all()
-
-    # Step 3: For each conversation get last message and unread count
-    out: list[ConversationOut] = []
-    for conv in convs:
-        # Last message
-        last_msg_q = (
-            select(Message)
-            .where(Message.conversation_id == conv.id)
-            .order_by(desc(Message.created_at))
-            .limit(1)
-        )
-        last_msg_result = await db.execute(last_msg_q)
-        last_msg = last_msg_result.scalar_one_or_none()
-
-        # Unread count: messages after user's last_read_at that aren't from user
-        last_read = conv_id_to_last_read.get(conv.id)
-        unread_count = 0
-        if last_read is not None:
-            unread_q = (
-                select(func.count(Message.id))
-                .where(
-                    and_(
-                        Message.conversation_id == conv.id,
-                        Message.sender_id != current_user.id,
-                        Message.created_at > last_read,
-                        Message.is_deleted == False,  # noqa: E712
-                    )
-                )
-            )
-        else:
-            # Never read — all messages from others are unread
-            unread_q = (
-                select(func.count(Message.id))
-                .where(
-                    and_(
-                        Message.conversation_id == conv.id,
-                        Message.sender_id != current_user.id,
-                        Message.is_deleted == False,  # noqa: E712
-                    )
-                )
-            )
-        unread_result = await db.execute(unread_q)
-        unread_count = unread_result.scalar() or 0
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-        # Other participants (everyone except current user)
-        participants = [
-            _user_to_participant(p.user)
-            for p in conv.participants
-            if p.user_id != current_user.id and p.user is not None
-        ]
+    # Two queries per page however many conversations the user has
+    entries, next_cursor = await load_inbox(db, current_user.id, limit=limit, before=before)
 
-        out.append(
+    return ConversationsListResponse(
+        conversations=[
             ConversationOut(
-                id=conv.id,
-                type=conv.type or "direct",
-                name=conv.name,
-                participants=participants,
-                last_message=_message_to_out(last_msg) if last_msg else None,
-                unread_count=unread_count,
-                updated_at=conv.updated_at.isoformat() if conv.updated_at else "",
+                id=entry.conversation.id,
+                type=entry.conversation.type or "direct",
+                name=entry.conversation.name,
+                participants=[_user_to_participant(u) for u in entry.participants],
+                last_message=_message_to_out(entry.last_message) if entry.last_message else None,
+                last_message_preview=entry.conversation.last_message_preview,
+                unread_count=entry.unread_count,
+                updated_at=entry.conversation.updated_at.isoformat() if entry.conversation.updated_at else "",
             )
-        )
-
-    return ConversationsListResponse(conversations=out)
+            for entry in entries
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/conversations/{conversation_id}", response_model=MessagesListResponse)
@@ -223,7 +171,7 @@ async def get_conversation_messages(
     conversation_id: int,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get paginated messages in a conversation."""
@@ -276,7 +224,7 @@ async def get_conversation_messages(
 async def create_conversation(
     body: CreateConversationRequest,
     response: Response,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new conversation. For 1-on-1 DMs, reuse existing conversation if one exists (200, not 201)."""
@@ -352,34 +300,19 @@ async def create_conversation(
 
                 # Real last-message / unread state, same as list_conversations,
                 # so reopening an existing DM shows its preview and badge.
-                last_msg_q = (
-                    select(Message)
-                    .where(Message.conversation_id == existing_conv.id)
-                    .order_by(desc(Message.created_at))
-                    .limit(1)
+                last_msg = (
+                    await db.get(Message, existing_conv.last_message_id)
+                    if existing_conv.last_message_id
+                    else None
                 )
-                last_msg = (await db.execute(last_msg_q)).scalar_one_or_none()
-
-                my_last_read = next(
+                unread_count = next(
                     (
-                        p.last_read_at
+                        p.unread_count or 0
                         for p in existing_conv.participants
                         if p.user_id == current_user.id
                     ),
-                    None,
+                    0,
                 )
-                unread_filters = [
-                    Message.conversation_id == existing_conv.id,
-                    Message.sender_id != current_user.id,
-                    Message.is_deleted == False,  # noqa: E712
-                ]
-                if my_last_read is not None:
-                    unread_filters.append(Message.created_at > my_last_read)
-                unread_count = (
-                    await db.execute(
-                        select(func.count(Message.id)).where(and_(*unread_filters))
-                    )
-                ).scalar() or 0
 
                 # Reused, not created — 200 so clients don't treat this as a
                 # brand-new resource (duplicate rows, wrong analytics).
@@ -390,6 +323,7 @@ async def create_conversation(
                     name=existing_conv.name,
                     participants=participants_out,
                     last_message=_message_to_out(last_msg) if last_msg else None,
+                    last_message_preview=existing_conv.last_message_preview,
                     unread_count=unread_count,
                     updated_at=existing_conv.updated_at.isoformat() if existing_conv.updated_at else "",
                 )
@@ -444,7 +378,7 @@ async def create_conversation(
 async def send_message(
     conversation_id: int,
     body: SendMessageRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Send a message in a conversation."""
@@ -466,14 +400,9 @@ async def send_message(
         content=body.content,
         message_type=body.message_type,
     )
-    db.add(msg)
-
-    # Update conversation updated_at
-    conv_q = select(Conversation).where(Conversation.id == conversation_id)
-    conv_result = await db.execute(conv_q)
-    conv = conv_result.scalar_one_or_none()
-    if conv:
-        conv.updated_at = datetime.utcnow()
+    # Moves the conversation's last-message pointer and bumps the other
+    # participants' unread counters in the same transaction
+    await record_message(db, msg)
 
     await db.commit()
     await db.refresh(msg)
@@ -484,10 +413,10 @@ async def send_message(
 @router.post("/conversations/{conversation_id}/read")
 async def mark_conversation_read(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    """Mark a conversation as read (update last_read_at for the current user)."""
+    """Mark a conversation as read (update last_read_at and clear the unread counter for the current user)."""
 
     membership_q = select(ConversationParticipant).where(
         and_(
@@ -500,7 +429,7 @@ async def mark_conversation_read(
     if not participant:
         raise HTTPException(status_code=403, detail="Not a member of this conversation")
 
-    participant.last_read_at = datetime.utcnow()
+    await mark_read(db, participant)
     await db.commit()
 
     return {"status": "ok"}
@@ -509,7 +438,7 @@ async def mark_conversation_read(
 @router.delete("/{message_id}")
 async def delete_message(
     message_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Soft-delete a message (only the sender can delete their own messages)."""
@@ -529,6 +458,7 @@ async def delete_message(
 
     msg.is_deleted = True
     msg.updated_at = datetime.utcnow()
+    await retract_message(db, msg)
     await db.commit()
 
     return {"status": "deleted", "message_id": message_id}
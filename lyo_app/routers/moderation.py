@@ -7,8 +7,8 @@ from typing import Optional, List
 from enum import Enum
 from datetime import datetime
 
-from lyo_app.auth.jwt_auth import get_current_user
-from lyo_app.auth.models import User
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 
 router = APIRouter(prefix="/moderation", tags=["Moderation"])
 
@@ -41,7 +41,7 @@ class ReportResponse(BaseModel):
 @router.post("/report")
 async def report_content(
     report: ReportCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Report content for moderation review."""
     return ReportResponse(
@@ -53,7 +53,7 @@ async def report_content(
 
 @router.get("/reports/me")
 async def get_my_reports(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get reports submitted by current user."""
     return {"reports": [], "total": 0}
@@ -62,7 +62,7 @@ async def get_my_reports(
 @router.post("/block/{user_id}")
 async def block_user(
     user_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Block a user."""
     if user_id == current_user.id:
@@ -76,7 +76,7 @@ async def block_user(
 @router.delete("/block/{user_id}")
 async def unblock_user(
     user_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Unblock a user."""
     return {"status": "unblocked", "user_id": user_id}
@@ -84,7 +84,7 @@ async def unblock_user(
 
 @router.get("/blocked")
 async def get_blocked_users(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get list of blocked users."""
     return {"blocked_users": []}
@@ -93,7 +93,7 @@ async def get_blocked_users(
 @router.post("/mute/{user_id}")
 async def mute_user(
     user_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Mute a user (hide their content without blocking)."""
     return {"status": "muted", "user_id": user_id}
@@ -102,7 +102,7 @@ async def mute_user(
 @router.delete("/mute/{user_id}")
 async def unmute_user(
     user_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Unmute a user."""
     return {"status": "unmuted", "user_id": user_id}
@@ -110,7 +110,7 @@ async def unmute_user(
 
 @router.get("/muted")
 async def get_muted_users(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get list of muted users."""
     return {"muted_users": []}
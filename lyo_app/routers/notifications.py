@@ -11,7 +11,8 @@ from typing import Optional, List
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from lyo_app.auth.jwt_auth import get_current_user
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.auth.models import User
 from lyo_app.core.database import get_db, Base
 
@@ -135,7 +136,7 @@ async def list_notifications(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     type: Optional[str] = Query(None, description="Filter by notification type"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """List user's notifications with optional type filter, paginated."""
@@ -213,7 +214,7 @@ async def list_notifications(
 @router.post("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a single notification as read."""
@@ -236,7 +237,7 @@ async def mark_notification_read(
 
 @router.post("/read-all")
 async def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark all of the user's notifications as read."""
@@ -255,7 +256,7 @@ async def mark_all_notifications_read(
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Return the number of unread notifications."""
@@ -272,7 +273,7 @@ async def get_unread_count(
 
 @router.get("/preferences")
 async def get_notification_preferences(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get user's notification preferences."""
     return NotificationPreferences()
@@ -281,7 +282,7 @@ async def get_notification_preferences(
 @router.put("/preferences")
 async def update_notification_preferences(
     preferences: NotificationPreferences,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update user's notification preferences."""
     return {"status": "updated", "preferences": preferences}
@@ -292,7 +293,7 @@ async def update_notification_preferences(
 @router.get("/history")
 async def get_notification_history(
     limit: int = 20,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get user's notification history (legacy endpoint, prefer GET /notifications)."""
@@ -330,7 +331,7 @@ async def get_notification_history(
 async def register_device(
     device_token: str,
     platform: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Register a device for push notifications."""
     return {"status": "registered", "device_token": device_token[:10] + "..."}
@@ -339,7 +340,7 @@ async def register_device(
 @router.delete("/unregister-device")
 async def unregister_device(
     device_token: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Unregister a device from push notifications."""
     return {"status": "unregistered"}
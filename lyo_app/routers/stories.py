@@ -13,8 +13,8 @@ from sqlalchemy.orm import selectinload
 import uuid
 import logging
 
-from lyo_app.auth.jwt_auth import get_current_user
-from lyo_app.auth.models import User
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.core.database import get_db
 from lyo_app.models.social import Story as StoryModel, StoryView
 
@@ -184,7 +184,7 @@ async def cleanup_expired_stories():
 @router.get("", response_model=StoriesResponse)
 @router.get("/", response_model=StoriesResponse)
 async def get_stories_feed(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
     background_tasks: BackgroundTasks = None
 ):
@@ -228,7 +228,7 @@ async def get_stories_feed(
 
 @router.get("/me", response_model=List[StoryResponse])
 async def get_my_stories(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get current user's active stories."""
@@ -251,7 +251,7 @@ async def get_my_stories(
 @router.post("/", response_model=StoryResponse)
 async def create_story(
     request: StoryCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -305,7 +305,7 @@ async def create_story(
 @router.get("/{story_id}", response_model=StoryResponse)
 async def get_story(
     story_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific story by ID."""
@@ -330,7 +330,7 @@ async def get_story(
 @router.delete("/{story_id}")
 async def delete_story(
     story_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a story (only owner can delete)."""
@@ -362,7 +362,7 @@ async def delete_story(
 @router.post("/{story_id}/view")
 async def mark_story_viewed(
     story_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Mark a story as viewed by the current user."""
@@ -403,7 +403,7 @@ async def mark_story_viewed(
 @router.get("/{story_id}/viewers", response_model=List[StoryViewerResponse])
 async def get_story_viewers(
     story_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Get list of users who viewed a story (only owner can see)."""
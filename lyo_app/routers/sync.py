@@ -14,8 +14,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from lyo_app.core.database import get_db as get_async_db
-from lyo_app.auth.models import User
-from lyo_app.auth.jwt_auth import get_current_user
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.services.conversation_sync import (
     conversation_sync_service,
     DeviceType
@@ -63,7 +63,7 @@ class TransferSessionRequest(BaseModel):
 
 @router.get("/devices", response_model=List[DeviceInfo])
 async def get_connected_devices(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get all devices currently connected for this user.
@@ -84,7 +84,7 @@ async def get_connected_devices(
 
 @router.get("/state", response_model=ConversationStateResponse)
 async def get_conversation_state(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get current conversation state.
@@ -124,7 +124,7 @@ async def get_conversation_state(
 async def transfer_session_to_device(
     request: TransferSessionRequest,
     device_id: str = Query(..., description="Device ID to transfer to"),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Transfer the active session to a specific device.
@@ -18,8 +18,8 @@ import aiofiles
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
 from fastapi.responses import FileResponse
 
-from lyo_app.auth.jwt_auth import get_current_user
-from lyo_app.auth.models import User
+from lyo_app.auth.jwt_auth import get_current_principal
+from lyo_app.auth.principal import Principal
 from lyo_app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -58,7 +58,7 @@ async def upload_media(
     request: Request,
     file: UploadFile = File(...),
     folder: str = Form("content"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Upload supported media; returns a public, unguessable URL and API path."""
     content_type = (file.content_type or "").split(";")[0].strip().lower()
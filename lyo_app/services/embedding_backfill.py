@@ -0,0 +1,121 @@
+"""
+Embedding backfill.
+
+Walks courses, lessons and memory insights in id order and re-embeds only
+rows whose text changed since their embedding was built: each row stores
+``embedding_hash`` (the ``EmbeddingService.hash`` of the text it was
+embedded from), so an unchanged row costs one hash comparison and no
+provider call. Changing the embedding model or dimension changes every
+hash, which makes the same job a full re-index.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from lyo_app.learning.models import Course, Lesson
+from lyo_app.personalization.models import MemoryInsight
+from lyo_app.services.embedding_service import EmbeddingService, embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+def course_embedding_text(course: Course) -> str:
+    return f"{course.title} {course.description or ''} {course.short_description or ''}".strip()
+
+
+def lesson_embedding_text(lesson: Lesson) -> str:
+    return f"{lesson.title} {lesson.description or ''} {lesson.content or ''}".strip()
+
+
+def insight_embedding_text(insight: MemoryInsight) -> str:
+    return (insight.insight_text or "").strip()
+
+
+# model -> (text builder, columns the builder reads)
+EMBEDDING_SOURCES: Dict[Any, tuple] = {
+    Course: (course_embedding_text, ("title", "description", "short_description")),
+    Lesson: (lesson_embedding_text, ("title", "description", "content")),
+    MemoryInsight: (insight_embedding_text, ("insight_text",)),
+}
+
+
+async def embed_row(row: Any, service: Optional[EmbeddingService] = None) -> None:
+    """
+    Set ``row.embedding`` and ``row.embedding_hash`` from the row's text.
+
+    Used by writers so new rows are never picked up by the next backfill.
+    Leaves both unset when no embedding could be produced.
+    """
+    service = service or embedding_service
+    text = EMBEDDING_SOURCES[type(row)][0](row)
+    vector = await service.embed_text(text) if text else None
+    row.embedding = vector
+    row.embedding_hash = service.hash(text) if vector else None
+
+
+async def backfill_embeddings(
+    db: AsyncSession,
+    models: Optional[Iterable[Any]] = None,
+    batch_size: int = 200,
+    force: bool = False,
+    service: Optional[EmbeddingService] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Re-embed rows whose text no longer matches their stored embedding.
+
+    Args:
+        db: Session; committed after every batch
+        models: Subset of ``EMBEDDING_SOURCES`` keys (default: all)
+        batch_size: Rows read, embedded and committed per round
+        force: Re-embed every row regardless of hash
+        service: Embedding service (default: the global one)
+
+    Returns:
+        Per-table counts: scanned, embedded, unchanged, failed
+    """
+    service = service or embedding_service
+    report: Dict[str, Dict[str, int]] = {}
+    for model in models or EMBEDDING_SOURCES:
+        text_of, columns = EMBEDDING_SOURCES[model]
+        counts = report[model.__tablename__] = {"scanned": 0, "embedded": 0, "unchanged": 0, "failed": 0}
+        last_id = 0
+        while True:
+            # Keyset pagination; the embedding column itself is never loaded
+            rows = (await db.execute(
+                select(model)
+                .options(load_only(*(getattr(model, c) for c in ("id", "embedding_hash", *columns))))
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            )).scalars().all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            counts["scanned"] += len(rows)
+
+            stale = []
+            for row in rows:
+                text = text_of(row)
+                digest = service.hash(text) if text else None
+                if digest and (force or row.embedding_hash != digest):
+                    stale.append((row, text, digest))
+                else:
+                    counts["unchanged"] += 1
+            if not stale:
+                continue
+
+            vectors = await service.embed_many([text for _, text, _ in stale])
+            for (row, _, digest), vector in zip(stale, vectors):
+                if vector:
+                    row.embedding = vector
+                    row.embedding_hash = digest
+                    counts["embedded"] += 1
+                else:
+                    counts["failed"] += 1
+            await db.commit()
+        logger.info(f"🧮 Embedding backfill {model.__tablename__}: {counts}")
+    return report
@@ -1,28 +1,325 @@
 """
 Embedding Service
 Handles generation of vector embeddings for RAG system using Google's Gemini API.
+
+Every text is looked up in a content-hash keyed cache first: an in-process
+LRU (L1), then Redis when connected or a directory on disk (L2). Misses from
+concurrent callers are coalesced by ``EmbeddingBatcher`` into one provider
+call per ``EMBEDDING_BATCH_WINDOW_MS`` (or per ``EMBEDDING_MAX_BATCH`` texts),
+so re-indexing unchanged content and repeated queries cost nothing, and a
+burst of N lookups costs one round trip instead of N.
+
+``EMBEDDING_PROVIDER=stub`` swaps Gemini for ``StubEmbedder``, a local,
+deterministic hashing embedder for tests and offline development.
 """
-import logging
-import google.generativeai as genai
 import asyncio
-from typing import List, Optional
+import hashlib
+import logging
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from lyo_app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-if settings.gemini_api_key:
-    genai.configure(api_key=settings.gemini_api_key)
+RETRIEVAL_DOCUMENT = "retrieval_document"
+RETRIEVAL_QUERY = "retrieval_query"
+
+
+def content_hash(text: str, task_type: str = RETRIEVAL_DOCUMENT, model: str = "", dimension: int = 0) -> str:
+    """Stable cache key for one embedding: same text, task, model and size → same vector."""
+    return hashlib.sha256(f"{model}|{dimension}|{task_type}|{text}".encode()).hexdigest()
+
+
+class GeminiEmbedder:
+    """Gemini embeddings; ``embed_content`` accepts a list and returns one vector per text."""
+
+    MAX_BATCH = 100
+
+    def __init__(self, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+        self._configured = False
+
+    @property
+    def available(self) -> bool:
+        # No key configured (tests, minimal deploys): embeddings are
+        # best-effort, don't attempt network calls that must fail.
+        return bool(settings.gemini_api_key)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def embed_batch(self, texts: Sequence[str], task_type: str) -> List[Optional[List[float]]]:
+        import google.generativeai as genai
+
+        if not self._configured:
+            genai.configure(api_key=settings.gemini_api_key)
+            self._configured = True
+        # Run in executor since the library is synchronous
+        result = await asyncio.to_thread(
+            genai.embed_content,
+            model=self.model,
+            content=list(texts),
+            task_type=task_type,
+            output_dimensionality=self.dimension,
+        )
+        vectors = result.get("embedding") if result else None
+        if not vectors or len(vectors) != len(texts):
+            logger.warning("No embedding returned from Gemini API")
+            return [None] * len(texts)
+        return vectors
+
+
+class StubEmbedder:
+    """
+    Deterministic offline embedder (feature hashing of word uni/bigrams).
+
+    Texts sharing words get similar vectors, so retrieval tests behave
+    plausibly without network access. Not a semantic model.
+    """
+
+    MAX_BATCH = 256
+    available = True
+
+    def __init__(self, model: str = "stub", dimension: int = 768):
+        self.model = model
+        self.dimension = dimension
+        self.calls = 0
+
+    def embed_one(self, text: str) -> List[float]:
+        words = text.lower().split()
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dimension] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    async def embed_batch(self, texts: Sequence[str], task_type: str) -> List[Optional[List[float]]]:
+        self.calls += 1
+        return [self.embed_one(text) for text in texts]
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache keyed by ``content_hash``.
+
+    L1 is an in-process LRU. L2 is Redis when ``redis_client`` is connected,
+    otherwise ``disk_dir`` when set (one float32 file per key, safe to share
+    between workers on a host). L2 hits are promoted to L1.
+    """
+
+    def __init__(self, max_entries: int = 10_000, disk_dir: Optional[str] = None, ttl: int = 30 * 86400):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttl = ttl
+        self._l1: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.hits = {"l1": 0, "l2": 0}
+        self.misses = 0
+
+    def _redis(self):
+        try:
+            from lyo_app.core.redis_client import redis_client
+        except ImportError:
+            return None
+        return redis_client.client
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.f32")
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._l1[key] = vector
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        for key in keys:
+            vector = self._l1.get(key)
+            if vector is not None:
+                self._l1.move_to_end(key)
+                found[key] = vector
+        self.hits["l1"] += len(found)
+
+        missing = [k for k in keys if k not in found]
+        if missing:
+            for key, vector in (await self._l2_get(missing)).items():
+                found[key] = vector
+                self._remember(key, vector)
+                self.hits["l2"] += 1
+        self.misses += len(set(keys) - set(found))
+        return found
+
+    async def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        for key, vector in vectors.items():
+            self._remember(key, vector)
+        if vectors:
+            await self._l2_set(vectors)
+
+    async def _l2_get(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        redis = self._redis()
+        try:
+            if redis is not None:
+                raw = await redis.mget([f"emb:{k}" for k in keys])
+                return {k: np.frombuffer(v, dtype=np.float32).tolist() for k, v in zip(keys, raw) if v}
+            if self.disk_dir:
+                return await asyncio.to_thread(self._disk_get, keys)
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+        return {}
+
+    async def _l2_set(self, vectors: Dict[str, List[float]]) -> None:
+        redis = self._redis()
+        try:
+            if redis is not None:
+                pipe = redis.pipeline(transaction=False)
+                for key, vector in vectors.items():
+                    pipe.set(f"emb:{key}", np.asarray(vector, dtype=np.float32).tobytes(), ex=self.ttl)
+                await pipe.execute()
+            elif self.disk_dir:
+                await asyncio.to_thread(self._disk_set, vectors)
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def _disk_get(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        for key in keys:
+            try:
+                with open(self._path(key), "rb") as f:
+                    found[key] = np.frombuffer(f.read(), dtype=np.float32).tolist()
+            except FileNotFoundError:
+                pass
+        return found
+
+    def _disk_set(self, vectors: Dict[str, List[float]]) -> None:
+        for key, vector in vectors.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(np.asarray(vector, dtype=np.float32).tobytes())
+            os.replace(tmp, path)  # atomic, so concurrent readers never see half a vector
+
+    def clear(self) -> None:
+        self._l1.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._l1), "l1_hits": self.hits["l1"], "l2_hits": self.hits["l2"], "misses": self.misses}
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into provider batch calls.
+
+    The first request for a task type opens a ``window`` second window;
+    everything that arrives before it closes (up to ``max_batch`` texts) is
+    sent as one call. Identical in-flight texts share one future, so callers
+    await it through ``asyncio.shield``: one cancelled caller must not cancel
+    the result every other waiter is counting on.
+    """
+
+    def __init__(self, provider, window: float = 0.01, max_batch: int = 100):
+        self.provider = provider
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, "OrderedDict[str, asyncio.Future]"] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self.batches = 0
+
+    def submit(self, text: str, task_type: str) -> "asyncio.Future":
+        pending = self._pending.setdefault(task_type, OrderedDict())
+        future = pending.get(text)
+        if future is None:
+            future = pending[text] = asyncio.get_running_loop().create_future()
+        if len(pending) >= min(self.max_batch, self.provider.MAX_BATCH):
+            self._flush(task_type)
+        elif task_type not in self._timers:
+            self._timers[task_type] = asyncio.get_running_loop().call_later(self.window, self._flush, task_type)
+        return future
+
+    def _flush(self, task_type: str) -> None:
+        timer = self._timers.pop(task_type, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(task_type, None)
+        if pending:
+            asyncio.ensure_future(self._run(list(pending.items()), task_type))
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future"]], task_type: str) -> None:
+        self.batches += 1
+        try:
+            vectors = await self.provider.embed_batch([text for text, _ in batch], task_type)
+        except Exception as e:
+            logger.error(f"Error generating embeddings ({len(batch)} texts): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
 
 class EmbeddingService:
     """Service to generate embeddings for text content."""
-    
+
     MODEL_NAME = "models/gemini-embedding-001"
     DIMENSION = 768
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    def __init__(self, provider=None, cache: Optional[EmbeddingCache] = None,
+                 window: Optional[float] = None, max_batch: Optional[int] = None):
+        if provider is None:
+            if os.getenv("EMBEDDING_PROVIDER", "gemini").lower() == "stub":
+                provider = StubEmbedder(dimension=self.DIMENSION)
+            else:
+                provider = GeminiEmbedder(self.MODEL_NAME, self.DIMENSION)
+        self.provider = provider
+        self.cache = cache or EmbeddingCache(
+            max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+            disk_dir=os.getenv("EMBEDDING_CACHE_DIR") or None,
+        )
+        self.batcher = EmbeddingBatcher(
+            provider,
+            window=window if window is not None else float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10")) / 1000,
+            max_batch=max_batch or int(os.getenv("EMBEDDING_MAX_BATCH", "100")),
+        )
+
+    def hash(self, text: str, task_type: str = RETRIEVAL_DOCUMENT) -> str:
+        return content_hash(text, task_type, self.provider.model, self.provider.dimension)
+
+    async def embed_many(self, texts: Sequence[str], task_type: str = RETRIEVAL_DOCUMENT) -> List[Optional[List[float]]]:
+        """
+        Embed several texts, serving repeats from cache and batching the rest.
+
+        Args:
+            texts: Texts to embed; empty strings map to None
+            task_type: ``retrieval_document`` or ``retrieval_query``
+
+        Returns:
+            One vector (or None) per input text, in order
+        """
+        if not self.provider.available:
+            return [None] * len(texts)
+        keys = [self.hash(text, task_type) if text else None for text in texts]
+        cached = await self.cache.get_many([k for k in keys if k])
+
+        futures = {
+            key: self.batcher.submit(text, task_type)
+            for text, key in zip(texts, keys)
+            if key and key not in cached
+        }
+        if futures:
+            shared = (asyncio.shield(future) for future in futures.values())
+            fresh = dict(zip(futures, await asyncio.gather(*shared)))
+            await self.cache.set_many({k: v for k, v in fresh.items() if v})
+            cached.update(fresh)
+        return [cached.get(key) if key else None for key in keys]
+
     async def embed_text(self, text: str) -> Optional[List[float]]:
         """
         Generate embedding for a single text string.
@@ -30,32 +327,8 @@ class EmbeddingService:
         """
         if not text:
             return None
-        if not settings.gemini_api_key:
-            # No key configured (tests, minimal deploys): embeddings are
-            # best-effort, don't attempt network calls that must fail.
-            return None
+        return (await self.embed_many([text], RETRIEVAL_DOCUMENT))[0]
 
-        try:
-            # Run in executor since the library is synchronous
-            result = await asyncio.to_thread(
-                genai.embed_content,
-                model=self.MODEL_NAME,
-                content=text,
-                task_type="retrieval_document",
-                output_dimensionality=self.DIMENSION
-            )
-            
-            if 'embedding' in result:
-                return result['embedding']
-            else:
-                logger.warning("No embedding returned from Gemini API")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            raise e
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def embed_query(self, query: str) -> Optional[List[float]]:
         """
         Generate embedding for a search query.
@@ -63,25 +336,7 @@ class EmbeddingService:
         """
         if not query:
             return None
-        if not settings.gemini_api_key:
-            return None
-
-        try:
-            result = await asyncio.to_thread(
-                genai.embed_content,
-                model=self.MODEL_NAME,
-                content=query,
-                task_type="retrieval_query",
-                output_dimensionality=self.DIMENSION
-            )
-            
-            if 'embedding' in result:
-                return result['embedding']
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error generating query embedding: {e}")
-            raise e
+        return (await self.embed_many([query], RETRIEVAL_QUERY))[0]
 
 # Global instance
 embedding_service = EmbeddingService()
@@ -0,0 +1,342 @@
+"""
+Chunked engagement sweeps.
+
+The scheduled engagement tasks (streak reminders, spaced-repetition
+reminders, comeback nudges, weekly digests) used to load every candidate at
+once and queue one Celery task per user, each opening its own session to
+build a single nudge. ``run_sweep`` instead walks the candidates in keyset
+chunks (``user_id > last ORDER BY user_id LIMIT n``) and, per chunk:
+
+1. builds every nudge from a couple of ``IN (...)`` queries
+   (``ProactiveEngagementService.build_*`` hold the message logic),
+2. sends them through ``PushNotificationService.send_batch`` (one device
+   query, batched provider calls),
+3. advances the sweep's ``SweepCheckpoint`` in the same transaction.
+
+Each chunk is a short, index-bounded query, so no cursor or snapshot is held
+open while nudges are sent. A run that dies is resumed from its checkpoint by
+the next run once the checkpoint's heartbeat is older than ``lease``, with the
+original run's reference time so its windows do not shift. A run that is
+still making progress is left alone, so overlapping schedules do not double
+up. Delivery is at least once: a chunk interrupted after sending is sent
+again on resume.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from lyo_app.ai_agents.models import MentorInteraction
+from lyo_app.auth.models import User
+from lyo_app.gamification.models import Streak, StreakType, UserXP
+from lyo_app.models.enhanced import SweepCheckpoint
+from lyo_app.personalization.models import LearnerMastery, SpacedRepetitionSchedule
+from lyo_app.services.proactive_engagement import Nudge, proactive_engagement_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_LEASE = timedelta(minutes=15)
+
+
+@dataclass(frozen=True)
+class Sweep:
+    """
+    One scheduled sweep.
+
+    Attributes:
+        name: Checkpoint key
+        candidates: ``(run_at, after_user_id, limit)`` -> query for the next
+            chunk of ``(user_id, ...)`` rows, one per user, ordered by user_id
+        build: ``(db, rows, run_at)`` -> nudges for that chunk
+        push_data: Extra push payload for a nudge
+    """
+
+    name: str
+    candidates: Callable[[datetime, int, int], Select]
+    build: Callable[[AsyncSession, Sequence[Any], datetime], Awaitable[List[Nudge]]]
+    push_data: Callable[[Nudge], Dict[str, Any]]
+
+
+def _context_data(nudge: Nudge) -> Dict[str, Any]:
+    return {"type": nudge.nudge_type.value, "action_url": nudge.action_url, "context": nudge.context_data}
+
+
+# ==================== Streak reminders ====================
+
+def _streak_candidates(run_at: datetime, after: int, limit: int) -> Select:
+    warning_threshold = run_at - timedelta(hours=proactive_engagement_service.STREAK_WARNING_HOURS)
+    return (
+        select(Streak.user_id, func.max(Streak.current_count), func.max(Streak.last_activity_date))
+        .where(
+            Streak.user_id > after,
+            Streak.streak_type == StreakType.DAILY_LOGIN,
+            Streak.current_count >= 3,  # Only remind if they have a real streak
+            Streak.last_activity_date <= warning_threshold,
+            Streak.last_activity_date >= warning_threshold - timedelta(hours=4),  # Don't re-remind
+        )
+        .group_by(Streak.user_id)
+        .order_by(Streak.user_id)
+        .limit(limit)
+    )
+
+
+async def _build_streak_nudges(db: AsyncSession, rows: Sequence[Any], run_at: datetime) -> List[Nudge]:
+    nudges = (
+        proactive_engagement_service.build_streak_nudge(user_id, count, last_activity, now=run_at)
+        for user_id, count, last_activity in rows
+    )
+    return [n for n in nudges if n]
+
+
+STREAK_REMINDERS = Sweep("streak_reminders", _streak_candidates, _build_streak_nudges, _context_data)
+
+
+# ==================== Spaced repetition ====================
+
+def _spaced_rep_candidates(run_at: datetime, after: int, limit: int) -> Select:
+    return (
+        select(SpacedRepetitionSchedule.user_id, func.count(SpacedRepetitionSchedule.id))
+        .where(SpacedRepetitionSchedule.user_id > after, SpacedRepetitionSchedule.next_review <= run_at)
+        .group_by(SpacedRepetitionSchedule.user_id)
+        .having(func.count(SpacedRepetitionSchedule.id) >= 3)  # At least 3 items due
+        .order_by(SpacedRepetitionSchedule.user_id)
+        .limit(limit)
+    )
+
+
+async def _build_spaced_rep_nudges(db: AsyncSession, rows: Sequence[Any], run_at: datetime) -> List[Nudge]:
+    due_counts = dict(rows)
+    skills: Dict[int, List[str]] = {}
+    result = await db.execute(
+        select(SpacedRepetitionSchedule.user_id, SpacedRepetitionSchedule.skill_id)
+        .where(
+            SpacedRepetitionSchedule.user_id.in_(list(due_counts)),
+            SpacedRepetitionSchedule.next_review <= run_at,
+        )
+        .distinct()
+    )
+    for user_id, skill_id in result:
+        user_skills = skills.setdefault(user_id, [])
+        if len(user_skills) < 5:
+            user_skills.append(skill_id)
+    return [
+        proactive_engagement_service.build_spaced_rep_nudge(user_id, count, skills.get(user_id, []))
+        for user_id, count in due_counts.items()
+    ]
+
+
+SPACED_REPETITION_DUE = Sweep(
+    "spaced_repetition_due",
+    _spaced_rep_candidates,
+    _build_spaced_rep_nudges,
+    lambda n: {"type": n.nudge_type.value, "action_url": n.action_url, "due_count": n.context_data["due_count"]},
+)
+
+
+# ==================== Inactive users ====================
+
+def inactive_users_sweep(inactive_days: int = 7) -> Sweep:
+    """Comeback nudges for users whose last interaction is ``inactive_days`` to ``inactive_days + 7`` days old."""
+
+    def candidates(run_at: datetime, after: int, limit: int) -> Select:
+        cutoff = run_at - timedelta(days=inactive_days)
+        max_cutoff = run_at - timedelta(days=inactive_days + 7)  # Don't re-nudge
+        last_active = func.max(MentorInteraction.timestamp)
+        return (
+            select(MentorInteraction.user_id, last_active)
+            .where(MentorInteraction.user_id > after)
+            .group_by(MentorInteraction.user_id)
+            .having(and_(last_active <= cutoff, last_active >= max_cutoff))
+            .order_by(MentorInteraction.user_id)
+            .limit(limit)
+        )
+
+    async def build(db: AsyncSession, rows: Sequence[Any], run_at: datetime) -> List[Nudge]:
+        last_active = dict(rows)
+        users = await db.execute(
+            select(User.id, User.first_name, User.user_context_summary).where(User.id.in_(list(last_active)))
+        )
+        nudges = (
+            proactive_engagement_service.build_comeback_nudge(
+                user_id, first_name, summary, (run_at - last_active[user_id]).days
+            )
+            for user_id, first_name, summary in users
+        )
+        return [n for n in nudges if n]
+
+    return Sweep(
+        "inactive_users",
+        candidates,
+        build,
+        lambda n: {"type": n.nudge_type.value, "action_url": n.action_url,
+                   "days_inactive": n.context_data["days_inactive"]},
+    )
+
+
+# ==================== Weekly digests ====================
+
+def _digest_candidates(run_at: datetime, after: int, limit: int) -> Select:
+    since = run_at - timedelta(days=7)
+    return (
+        select(MentorInteraction.user_id, func.count(MentorInteraction.id))
+        .where(MentorInteraction.user_id > after, MentorInteraction.timestamp >= since)
+        .group_by(MentorInteraction.user_id)
+        .order_by(MentorInteraction.user_id)
+        .limit(limit)
+    )
+
+
+async def _build_digests(db: AsyncSession, rows: Sequence[Any], run_at: datetime) -> List[Nudge]:
+    since = run_at - timedelta(days=7)
+    interactions = dict(rows)
+    user_ids = list(interactions)
+    xp = dict((await db.execute(
+        select(UserXP.user_id, func.sum(UserXP.xp_earned))
+        .where(UserXP.user_id.in_(user_ids), UserXP.earned_at >= since)
+        .group_by(UserXP.user_id)
+    )).all())
+    mastered = dict((await db.execute(
+        select(LearnerMastery.user_id, func.count(LearnerMastery.id))
+        .where(
+            LearnerMastery.user_id.in_(user_ids),
+            LearnerMastery.last_seen >= since,
+            LearnerMastery.mastery_level >= 0.7,
+        )
+        .group_by(LearnerMastery.user_id)
+    )).all())
+    nudges = (
+        proactive_engagement_service.build_weekly_digest(
+            user_id, count, xp.get(user_id) or 0, mastered.get(user_id, 0)
+        )
+        for user_id, count in interactions.items()
+    )
+    return [n for n in nudges if n]
+
+
+WEEKLY_DIGESTS = Sweep("weekly_digests", _digest_candidates, _build_digests, _context_data)
+
+
+# ==================== Runner ====================
+
+def _default_session_factory():
+    from lyo_app.core.database import background_session
+
+    return background_session()
+
+
+async def _claim(db: AsyncSession, name: str, run_at: datetime, lease: timedelta) -> Optional[Dict[str, Any]]:
+    """Start or resume ``name``'s run; None if another run holds a live lease."""
+    now = datetime.utcnow()
+    checkpoint = await db.get(SweepCheckpoint, name, with_for_update=True)
+    if checkpoint is None:
+        checkpoint = SweepCheckpoint(name=name)
+        db.add(checkpoint)
+    elif checkpoint.finished_at is None and checkpoint.updated_at > now - lease:
+        return None
+    elif checkpoint.finished_at is None:
+        logger.warning(f"Resuming sweep {name} after user {checkpoint.last_key}")
+
+    if checkpoint.finished_at is not None or checkpoint.run_started_at is None:
+        checkpoint.run_started_at = run_at
+        checkpoint.last_key = checkpoint.processed = checkpoint.sent = 0
+        checkpoint.finished_at = None
+    checkpoint.updated_at = now
+    state = {
+        "run_at": checkpoint.run_started_at,
+        "last_key": checkpoint.last_key,
+        "processed": checkpoint.processed,
+        "sent": checkpoint.sent,
+    }
+    try:
+        await db.commit()
+    except IntegrityError:  # another process created the checkpoint first
+        await db.rollback()
+        return None
+    return state
+
+
+async def run_sweep(
+    sweep: Sweep,
+    session_factory: Optional[Callable[[], Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    lease: timedelta = DEFAULT_LEASE,
+    sender: Any = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Run (or resume) ``sweep`` chunk by chunk.
+
+    Args:
+        sweep: The sweep to run
+        session_factory: Returns an ``async with`` session context
+            (default: ``background_session``)
+        chunk_size: Candidates per chunk
+        lease: How long an unfinished run's heartbeat stays valid
+        sender: Object with ``send_batch`` (default: the push service)
+        now: Reference time for a new run (default: utcnow)
+    """
+    from lyo_app.services.push_notifications import PushNotification, push_service
+
+    session_factory = session_factory or _default_session_factory
+    sender = sender or push_service
+
+    async with session_factory() as db:
+        state = await _claim(db, sweep.name, now or datetime.utcnow(), lease)
+    if state is None:
+        logger.info(f"Sweep {sweep.name} is already running elsewhere")
+        return {"sweep": sweep.name, "status": "running_elsewhere"}
+
+    run_at, last_key = state["run_at"], state["last_key"]
+    processed, sent = state["processed"], state["sent"]
+    resumed = last_key > 0
+    chunks = 0
+
+    while True:
+        async with session_factory() as db:
+            rows = (await db.execute(sweep.candidates(run_at, last_key, chunk_size))).all()
+            if not rows:
+                break
+            nudges = await sweep.build(db, rows, run_at)
+            last_key, processed = rows[-1][0], processed + len(rows)
+
+            # Advance the checkpoint before sending, so it commits with the send
+            await db.execute(
+                update(SweepCheckpoint)
+                .where(SweepCheckpoint.name == sweep.name)
+                .values(last_key=last_key, processed=processed, updated_at=datetime.utcnow())
+            )
+            delivered = await sender.send_batch(
+                {n.user_id: PushNotification(title=n.title, message=n.message, data=sweep.push_data(n))
+                 for n in nudges},
+                db=db,
+            )
+            sent += len(delivered)
+            await db.execute(
+                update(SweepCheckpoint).where(SweepCheckpoint.name == sweep.name).values(sent=sent)
+            )
+            await db.commit()
+            chunks += 1
+
+    async with session_factory() as db:
+        await db.execute(
+            update(SweepCheckpoint)
+            .where(SweepCheckpoint.name == sweep.name)
+            .values(finished_at=datetime.utcnow(), updated_at=datetime.utcnow())
+        )
+        await db.commit()
+
+    logger.info(f"Sweep {sweep.name}: {processed} candidates, {sent} nudges sent in {chunks} chunks")
+    return {
+        "sweep": sweep.name,
+        "status": "resumed" if resumed else "success",
+        "candidates": processed,
+        "nudges_sent": sent,
+        "chunks": chunks,
+    }
@@ -0,0 +1,188 @@
+"""
+Hybrid keyword + vector retrieval.
+
+``BM25Index`` is an in-memory inverted index scored with Okapi BM25;
+``VectorIndex`` (``lyo_app.services.vector_index``) gives cosine similarity.
+``HybridIndex`` keeps both over the same documents and merges their rankings
+with reciprocal-rank fusion (RRF): each document scores ``sum(1 / (k + rank))``
+over the lists it appears in. RRF only uses ranks, so BM25 scores and cosine
+similarities never have to be put on a common scale, and a document that is
+strong in either list surfaces. Each hit still reports its raw similarity and
+BM25 score.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lyo_app.services.vector_index import VectorIndex
+
+RRF_K = 60
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its of on or that the this "
+    "to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens with common English stopwords removed."""
+    if not text:
+        return []
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory inverted index.
+
+    Args:
+        k1: Term-frequency saturation
+        b: Document-length normalisation
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {key: tf}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, key: str, text: str) -> None:
+        self.remove(key)
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self._postings[term][key] = tf
+        self._lengths[key] = len(tokens)
+        self._terms[key] = list(set(tokens))
+        self._total_length += len(tokens)
+
+    def remove(self, key: str) -> bool:
+        if key not in self._lengths:
+            return False
+        for term in self._terms.pop(key):
+            postings = self._postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(key)
+        return True
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top ``k`` (key, BM25 score) pairs, best first."""
+        n = len(self._lengths)
+        if not n:
+            return []
+        avg_length = self._total_length / n or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[key] / avg_length)
+                scores[key] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked key lists; returns (key, fused score) best first."""
+    fused: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda kv: -kv[1])
+
+
+@dataclass
+class SearchHit:
+    key: str
+    score: float  # fused RRF score, scaled so 1.0 = ranked first in every list
+    similarity: Optional[float] = None
+    keyword_score: Optional[float] = None
+    document: Dict[str, Any] = field(default_factory=dict)
+
+
+class HybridIndex:
+    """
+    Documents indexed for both BM25 and vector search.
+
+    Args:
+        dim: Embedding dimension
+        candidates: Hits taken from each list before fusion
+        **vector_kwargs: Passed to ``VectorIndex``
+    """
+
+    def __init__(self, dim: int, candidates: int = 50, **vector_kwargs):
+        self.vectors = VectorIndex(dim, **vector_kwargs)
+        self.keywords = BM25Index()
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.candidates = candidates
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, key: str, text: str, vector: Optional[Sequence[float]] = None, **document: Any) -> None:
+        """Index one document; ``document`` fields are returned with its hits."""
+        self.documents[key] = document
+        self.keywords.add(key, text)
+        if vector is not None and len(vector):
+            self.vectors.add(key, vector)
+        else:
+            self.vectors.remove(key)
+
+    def remove(self, key: str) -> None:
+        self.documents.pop(key, None)
+        self.keywords.remove(key)
+        self.vectors.remove(key)
+
+    def build(self) -> None:
+        self.vectors.build()
+
+    def search(
+        self,
+        query: str,
+        query_vector: Optional[Sequence[float]] = None,
+        k: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[SearchHit]:
+        """
+        Hybrid top ``k``. Without ``query_vector`` this is BM25 alone.
+
+        ``where`` keeps only documents whose fields equal the given values;
+        candidate lists are widened so filtering still leaves ``k`` hits
+        when they exist.
+        """
+        depth = max(self.candidates, k) * (4 if where else 1)
+        keyword_hits = self.keywords.search(query, depth)
+        vector_hits = self.vectors.search(query_vector, depth) if query_vector is not None else []
+        if where:
+            keep = lambda key: all(self.documents.get(key, {}).get(f) == v for f, v in where.items())  # noqa: E731
+            keyword_hits = [h for h in keyword_hits if keep(h[0])]
+            vector_hits = [h for h in vector_hits if keep(h[0])]
+
+        lists = [[key for key, _ in hits] for hits in (vector_hits, keyword_hits) if hits]
+        if not lists:
+            return []
+        similarity = dict(vector_hits)
+        keyword = dict(keyword_hits)
+        best_possible = len(lists) / (RRF_K + 1)
+        return [
+            SearchHit(
+                key=key,
+                score=round(fused / best_possible, 4),
+                similarity=similarity.get(key),
+                keyword_score=keyword.get(key),
+                document=self.documents.get(key, {}),
+            )
+            for key, fused in reciprocal_rank_fusion(lists)[:k]
+        ]
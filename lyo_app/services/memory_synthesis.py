@@ -15,11 +15,14 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_
 
 from lyo_app.personalization.models import (
-    LearnerState, LearnerMastery, SpacedRepetitionSchedule, MemoryInsight as MemoryInsightDB
+    LearnerState, LearnerMastery, SpacedRepetitionSchedule, MemoryInsight as MemoryInsightDB,
+    MemorySynthesisState
 )
 from lyo_app.services.embedding_service import embedding_service
 from lyo_app.ai_agents.models import MentorInteraction
@@ -74,6 +77,31 @@ class MemorySynthesisService:
     # Memory blob constraints
     MAX_SUMMARY_WORDS = 300
     MAX_INSIGHTS_PER_CATEGORY = 5
+
+    # Memory blob sections, by insight category (the extraction prompt's names included)
+    MEMORY_SECTIONS = [
+        ("Learning Style", ("learning_style",)),
+        ("What Works", ("success_pattern",)),
+        ("Challenging Areas", ("struggle_point",)),
+        ("Emotional Patterns", ("emotional_pattern", "emotional_trigger")),
+        ("Learning Interests", ("topic_interest", "interest")),
+        ("Personal Context", ("personal_context",)),
+    ]
+
+    # Incremental synthesis
+    MAX_NEW_INTERACTIONS = 100  # pending interactions summarized per run, oldest first
+    DUPLICATE_SIMILARITY = 0.9  # cosine similarity at which a new insight restates an existing one
+
+    SYNTHESIS_PROMPT_TEMPLATE = """You are the memory of a personal learning companion. Update the learner's memory profile with what the new interactions reveal.
+Keep what is still true, replace what the new data contradicts, and stay under 300 words.
+Write short bullet points under: Learning Style, What Works, Challenging Areas, Emotional Patterns, Learning Interests.
+
+## Current Profile:
+{current_profile}
+
+## New Interaction Data:
+{interaction_data}
+
 ## Memory Profile:"""
 
     INSIGHT_EXTRACTION_PROMPT = """You are a memory synthesis AI. Your job is to extract 3-5 discrete, high-value personal insights about a learner from their recent interactions.
@@ -202,12 +230,82 @@ Your output MUST be a JSON list of objects:
             )
 
             await self._save_user_memory(user_id, updated_memory, db)
+            if interactions:
+                # Incremental runs continue from here instead of re-reading these
+                await self._set_high_water_mark(user_id, max(i.id for i in interactions), db)
+                await db.commit()
             return updated_memory
 
         except Exception as e:
             logger.exception(f"Failed full memory synthesis for user {user_id}: {e}")
             return None
 
+    async def synthesize_incremental_memory(
+        self,
+        user_id: int,
+        db: AsyncSession
+    ) -> Optional[str]:
+        """
+        Fold only the interactions since the last synthesis into memory.
+
+        Reads interactions past the user's high-water mark, extracts insights
+        from them with one LLM call, merges those into the stored insight set
+        (restated insights reinforce the existing one instead of duplicating
+        it, then ``_prune_insights`` caps each category) and rebuilds the
+        memory blob from the merged set. At most ``MAX_NEW_INTERACTIONS`` are
+        read, oldest first, and the mark only moves past those; a longer
+        backlog is left for the next run. Returns None without any LLM call
+        when there is nothing new.
+        """
+        state = await db.get(MemorySynthesisState, user_id)
+        high_water = state.last_interaction_id if state else 0
+
+        result = await db.execute(
+            select(MentorInteraction)
+            .where(
+                and_(
+                    MentorInteraction.user_id == user_id,
+                    MentorInteraction.id > high_water
+                )
+            )
+            .order_by(MentorInteraction.id)
+            .limit(self.MAX_NEW_INTERACTIONS)
+        )
+        interactions = list(result.scalars().all())
+        if not interactions:
+            return None
+
+        try:
+            since = state.synthesized_at if state and state.synthesized_at else interactions[0].timestamp
+            interaction_data = self._format_interaction_data(
+                interactions=interactions,
+                learner_state=await self._get_learner_state(user_id, db),
+                mastery_changes=await self._get_mastery_changes_since(user_id, since, db),
+                engagement_patterns=self._summarize_engagement(interactions, days=max(
+                    (datetime.utcnow() - since).days, 1
+                ))
+            )
+            extracted = await self._extract_insights(interaction_data)
+            insights = await self._merge_insights(user_id, extracted, db)
+
+            memory = self._insights_to_memory(insights)
+            user = await self._get_user(user_id, db)
+            if user:
+                user.user_context_summary = memory
+                user.updated_at = datetime.utcnow()
+            await self._set_high_water_mark(user_id, interactions[-1].id, db)
+            await db.commit()
+
+            logger.info(f"Incremental memory for user {user_id}: {len(interactions)} new interactions, "
+                        f"{len(extracted)} insights extracted, {len(insights)} kept")
+            return memory
+
+        except Exception as e:
+            # The high-water mark stays put, so the next run retries these interactions
+            logger.exception(f"Failed incremental memory synthesis for user {user_id}: {e}")
+            await db.rollback()
+            return None
+
     async def get_memory_for_prompt(
         self,
         user_id: int,
@@ -270,7 +368,6 @@ Your output MUST be a JSON list of objects:
 
     async def _get_user(self, user_id: int, db: AsyncSession):
         """Fetch user from database."""
-        from lyo_app.modules.auth.models import User
         result = await db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
@@ -345,6 +442,26 @@ Your output MUST be a JSON list of objects:
         )
         return result.scalars().all()
 
+    async def _get_mastery_changes_since(
+        self,
+        user_id: int,
+        since: datetime,
+        db: AsyncSession
+    ) -> List[LearnerMastery]:
+        """Get mastery records touched since the last synthesis."""
+        result = await db.execute(
+            select(LearnerMastery)
+            .where(
+                and_(
+                    LearnerMastery.user_id == user_id,
+                    LearnerMastery.last_seen >= since
+                )
+            )
+            .order_by(desc(LearnerMastery.last_seen))
+            .limit(20)
+        )
+        return result.scalars().all()
+
     async def _get_all_mastery(
         self,
         user_id: int,
@@ -377,8 +494,10 @@ Your output MUST be a JSON list of objects:
                 )
             )
         )
-        interactions = result.scalars().all()
+        return self._summarize_engagement(result.scalars().all(), days=30)
 
+    def _summarize_engagement(self, interactions: List[MentorInteraction], days: int) -> Dict[str, Any]:
+        """Sentiment, helpfulness and frequency over ``interactions`` spanning ``days``."""
         # Analyze patterns
         sentiment_sum = 0
         sentiment_count = 0
@@ -398,7 +517,7 @@ Your output MUST be a JSON list of objects:
             "total_interactions": len(interactions),
             "avg_sentiment": sentiment_sum / sentiment_count if sentiment_count > 0 else 0,
             "helpfulness_rate": helpful_count / total_rated if total_rated > 0 else None,
-            "interaction_frequency": len(interactions) / 30  # per day
+            "interaction_frequency": len(interactions) / days  # per day
         }
 
     async def _get_spaced_repetition_summary(
@@ -530,6 +649,133 @@ Your output MUST be a JSON list of objects:
 
         return "\n".join(parts)
 
+    async def _extract_insights(self, interaction_data: str) -> List[Dict[str, Any]]:
+        """Ask the LLM for discrete insights; returns ``{category, insight, confidence}`` dicts."""
+        prompt = self.INSIGHT_EXTRACTION_PROMPT.format(interaction_data=interaction_data)
+
+        from lyo_app.ai_agents.orchestrator import ai_orchestrator, TaskComplexity, ModelType
+
+        response = await ai_orchestrator.generate_response(
+            prompt=prompt,
+            task_complexity=TaskComplexity.MEDIUM,
+            model_preference=ModelType.CLAUDE_3_5_SONNET,
+            max_tokens=500
+        )
+
+        content = ""
+        if hasattr(response, 'content'):
+            content = response.content.strip()
+        else:
+            content = str(response).strip()
+
+        # Clean and parse JSON
+        content = content.replace("```json", "").replace("```", "").strip()
+        return [item for item in json.loads(content) if item.get("insight")]
+
+    async def _merge_insights(
+        self,
+        user_id: int,
+        extracted: List[Dict[str, Any]],
+        db: AsyncSession
+    ) -> List[MemoryInsight]:
+        """
+        Merge newly extracted insights into the user's stored set.
+
+        A new insight in the same category whose embedding is within
+        ``DUPLICATE_SIMILARITY`` of an existing one (or whose text matches)
+        reinforces it: confidence becomes the higher of the two and it counts
+        as recent again. Others are added. The set is then pruned with
+        ``_prune_insights``, dropped rows are deleted, and the kept insights
+        are returned. Does not commit.
+        """
+        result = await db.execute(select(MemoryInsightDB).where(MemoryInsightDB.user_id == user_id))
+        existing = list(result.scalars().all())
+
+        embeddings = await embedding_service.embed_many([item["insight"] for item in extracted])
+        now = datetime.utcnow()
+
+        for item, embedding in zip(extracted, embeddings):
+            category = item.get("category", "general")
+            text = item["insight"].strip()
+            confidence = float(item.get("confidence", 1.0))
+
+            match = self._find_duplicate(category, text, embedding, existing)
+            if match is not None:
+                match.confidence = max(match.confidence or 0.0, confidence)
+                match.created_at = now
+                continue
+            if not embedding:
+                logger.warning(f"Failed to generate embedding for insight: {text}")
+                continue
+
+            row = MemoryInsightDB(
+                user_id=user_id,
+                category=category,
+                insight_text=text,
+                embedding=embedding,
+                embedding_hash=embedding_service.hash(text),
+                confidence=confidence,
+                created_at=now
+            )
+            db.add(row)
+            existing.append(row)
+
+        candidates = {}
+        for row in existing:
+            insight = MemoryInsight(
+                category=row.category,
+                content=row.insight_text,
+                confidence=row.confidence or 0.0,
+                source=row.source_session_id or "synthesis",
+                timestamp=row.created_at or now,
+            )
+            candidates[id(insight)] = (insight, row)
+        kept = self._prune_insights([insight for insight, _ in candidates.values()])
+        kept_keys = {id(insight) for insight in kept}
+        for key, (_, row) in candidates.items():
+            if key in kept_keys:
+                continue
+            if row in db.new:
+                db.expunge(row)
+            else:
+                await db.delete(row)
+        await db.flush()
+        return kept
+
+    def _find_duplicate(
+        self,
+        category: str,
+        text: str,
+        embedding: Optional[List[float]],
+        existing: List[MemoryInsightDB]
+    ) -> Optional[MemoryInsightDB]:
+        """The existing insight ``text`` restates, if any."""
+        normalized = " ".join(text.lower().split())
+        best, best_score = None, self.DUPLICATE_SIMILARITY
+        vector = np.asarray(embedding, dtype=np.float32) if embedding else None
+        for row in existing:
+            if row.category != category:
+                continue
+            if " ".join(row.insight_text.lower().split()) == normalized:
+                return row
+            if vector is None or row.embedding is None:
+                continue
+            other = np.asarray(row.embedding, dtype=np.float32)
+            denominator = float(np.linalg.norm(vector) * np.linalg.norm(other))
+            score = float(vector @ other) / denominator if denominator else 0.0
+            if score >= best_score:
+                best, best_score = row, score
+        return best
+
+    async def _set_high_water_mark(self, user_id: int, interaction_id: int, db: AsyncSession) -> None:
+        """Record that interactions up to ``interaction_id`` are in the user's memory (no commit)."""
+        state = await db.get(MemorySynthesisState, user_id)
+        if state is None:
+            state = MemorySynthesisState(user_id=user_id, last_interaction_id=0)
+            db.add(state)
+        state.last_interaction_id = max(state.last_interaction_id or 0, interaction_id)
+        state.synthesized_at = datetime.utcnow()
+
     async def _extract_and_save_discrete_insights(
         self,
         user_id: int,
@@ -539,37 +785,15 @@ Your output MUST be a JSON list of objects:
     ):
         """Extract discrete insights, vectorize them, and save to DB."""
         try:
-            prompt = self.INSIGHT_EXTRACTION_PROMPT.format(interaction_data=interaction_data)
-            
-            from lyo_app.ai_agents.orchestrator import ai_orchestrator, TaskComplexity, ModelType
-            
-            response = await ai_orchestrator.generate_response(
-                prompt=prompt,
-                task_complexity=TaskComplexity.MEDIUM,
-                model_preference=ModelType.CLAUDE_3_5_SONNET,
-                max_tokens=500
-            )
-
-            content = ""
-            if hasattr(response, 'content'):
-                content = response.content.strip()
-            else:
-                content = str(response).strip()
-
-            # Clean and parse JSON
-            content = content.replace("```json", "").replace("```", "").strip()
-            insights_list = json.loads(content)
+            insights_list = await self._extract_insights(interaction_data)
+            # One batched provider call for all of this session's insights
+            embeddings = await embedding_service.embed_many([item["insight"] for item in insights_list])
 
-            for item in insights_list:
+            for item, embedding in zip(insights_list, embeddings):
                 category = item.get("category", "general")
-                text = item.get("insight", "")
+                text = item["insight"]
                 confidence = item.get("confidence", 1.0)
 
-                if not text:
-                    continue
-
-                # Generate embedding
-                embedding = await embedding_service.embed_text(text)
                 if not embedding:
                     logger.warning(f"Failed to generate embedding for insight: {text}")
                     continue
@@ -580,6 +804,7 @@ Your output MUST be a JSON list of objects:
                     category=category,
                     insight_text=text,
                     embedding=embedding,
+                    embedding_hash=embedding_service.hash(text),
                     confidence=confidence,
                     source_session_id=session_id
                 )
@@ -631,7 +856,6 @@ Your output MUST be a JSON list of objects:
     ) -> bool:
         """Save updated memory to user record."""
         try:
-            from lyo_app.modules.auth.models import User
             result = await db.execute(select(User).where(User.id == user_id))
             user = result.scalar_one_or_none()
 
@@ -689,38 +913,20 @@ This is a new member. No previous interaction history available yet.
         if not insights:
             return self._get_default_memory()
 
-        parts = []
         by_category: Dict[str, List[MemoryInsight]] = {}
-
         for insight in insights:
             if insight.category not in by_category:
                 by_category[insight.category] = []
             by_category[insight.category].append(insight)
 
-        if "learning_style" in by_category:
-            parts.append("**Learning Style:**")
-            for i in by_category["learning_style"]:
-                parts.append(f"- {i.content}")
-
-        if "success_pattern" in by_category:
-            parts.append("\n**What Works:**")
-            for i in by_category["success_pattern"]:
-                parts.append(f"- {i.content}")
-
-        if "struggle_point" in by_category:
-            parts.append("\n**Challenging Areas:**")
-            for i in by_category["struggle_point"]:
-                parts.append(f"- {i.content}")
-
-        if "emotional_pattern" in by_category:
-            parts.append("\n**Emotional Patterns:**")
-            for i in by_category["emotional_pattern"]:
-                parts.append(f"- {i.content}")
-
-        if "topic_interest" in by_category:
-            parts.append("\n**Learning Interests:**")
-            for i in by_category["topic_interest"]:
-                parts.append(f"- {i.content}")
+        parts = []
+        for title, categories in self.MEMORY_SECTIONS:
+            section = [i for category in categories for i in by_category.get(category, [])]
+            if section:
+                if parts:
+                    parts.append("")
+                parts.append(f"**{title}:**")
+                parts.extend(f"- {i.content}" for i in section)
 
         return "\n".join(parts)
 
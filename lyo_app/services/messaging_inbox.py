@@ -0,0 +1,249 @@
+"""
+Denormalized conversation inbox.
+
+The inbox used to be assembled per request, with one query for the latest
+message and one unread ``COUNT`` for every conversation the user is in. Now
+each ``Conversation`` carries a pointer to its last message (plus its time
+and a preview) and each ``ConversationParticipant`` an ``unread_count``.
+Writers keep them current with set-based UPDATEs in the same transaction as
+the message itself:
+
+* ``record_message`` - a message was sent
+* ``retract_message`` - a message was soft-deleted
+* ``mark_read`` - a participant read the conversation
+
+``load_inbox`` reads a keyset page of the inbox in two queries however many
+conversations the user has, and ``reconcile_inbox`` recomputes pointers and
+counters from ``messages`` to repair drift (nightly, via
+``lyo_app.tasks.messaging.reconcile_inbox``).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lyo_app.auth.models import User
+from lyo_app.models.social import Conversation, ConversationParticipant, Message
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_LENGTH = 200  # Conversation.last_message_preview is String(200)
+
+
+@dataclass
+class InboxEntry:
+    conversation: Conversation
+    unread_count: int
+    last_message: Optional[Message]
+    participants: List[User] = field(default_factory=list)  # everyone except the reader
+
+
+def message_preview(message: Message) -> Optional[str]:
+    """Inbox preview for ``message`` (same rule as the SQL in ``reconcile_inbox``)."""
+    if message.is_deleted or message.content is None:
+        return None
+    return message.content[:PREVIEW_LENGTH]
+
+
+async def record_message(db: AsyncSession, message: Message) -> None:
+    """Add ``message`` and update its conversation's inbox rows (no commit)."""
+    db.add(message)
+    await db.flush()
+
+    # Concurrent senders: only move the pointer forward
+    await db.execute(
+        update(Conversation)
+        .where(
+            Conversation.id == message.conversation_id,
+            or_(Conversation.last_message_id.is_(None), Conversation.last_message_id < message.id),
+        )
+        .values(
+            last_message_id=message.id,
+            last_message_at=message.created_at,
+            last_message_preview=message_preview(message),
+            updated_at=message.created_at,
+        )
+    )
+    await db.execute(
+        update(ConversationParticipant)
+        .where(
+            ConversationParticipant.conversation_id == message.conversation_id,
+            ConversationParticipant.user_id != message.sender_id,
+        )
+        .values(unread_count=ConversationParticipant.unread_count + 1)
+    )
+
+
+async def retract_message(db: AsyncSession, message: Message) -> None:
+    """Update inbox rows after ``message`` was soft-deleted (no commit)."""
+    await db.execute(
+        update(ConversationParticipant)
+        .where(
+            ConversationParticipant.conversation_id == message.conversation_id,
+            ConversationParticipant.user_id != message.sender_id,
+            ConversationParticipant.unread_count > 0,
+            or_(
+                ConversationParticipant.last_read_at.is_(None),
+                ConversationParticipant.last_read_at < message.created_at,
+            ),
+        )
+        .values(unread_count=ConversationParticipant.unread_count - 1)
+    )
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == message.conversation_id, Conversation.last_message_id == message.id)
+        # A deletion is not new activity: keep the conversation's place in the inbox
+        .values(last_message_preview=None, updated_at=Conversation.updated_at)
+    )
+
+
+async def mark_read(db: AsyncSession, participant: ConversationParticipant) -> None:
+    """Mark the conversation read for ``participant`` (no commit)."""
+    await db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.id == participant.id)
+        .values(last_read_at=datetime.utcnow(), unread_count=0)
+    )
+
+
+def encode_cursor(conversation: Conversation) -> str:
+    return f"{conversation.updated_at.isoformat()}_{conversation.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError on a malformed cursor."""
+    timestamp, _, conversation_id = cursor.rpartition("_")
+    return datetime.fromisoformat(timestamp), int(conversation_id)
+
+
+async def load_inbox(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 50,
+    before: Optional[Tuple[datetime, int]] = None,
+) -> Tuple[List[InboxEntry], Optional[str]]:
+    """
+    One page of ``user_id``'s conversations, most recently active first.
+
+    ``before`` is a decoded cursor from the previous page. Returns the
+    entries and the cursor for the next page (None on the last page).
+    """
+    query = (
+        select(Conversation, ConversationParticipant.unread_count, Message)
+        .join(
+            ConversationParticipant,
+            and_(
+                ConversationParticipant.conversation_id == Conversation.id,
+                ConversationParticipant.user_id == user_id,
+            ),
+        )
+        .outerjoin(Message, Message.id == Conversation.last_message_id)
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        updated_at, conversation_id = before
+        query = query.where(
+            or_(
+                Conversation.updated_at < updated_at,
+                and_(Conversation.updated_at == updated_at, Conversation.id < conversation_id),
+            )
+        )
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    entries = [InboxEntry(conversation, unread or 0, message) for conversation, unread, message in rows[:limit]]
+    if not entries:
+        return [], None
+
+    by_id: Dict[int, InboxEntry] = {entry.conversation.id: entry for entry in entries}
+    others = await db.execute(
+        select(ConversationParticipant.conversation_id, User)
+        .join(User, User.id == ConversationParticipant.user_id)
+        .where(
+            ConversationParticipant.conversation_id.in_(by_id),
+            ConversationParticipant.user_id != user_id,
+        )
+        .order_by(ConversationParticipant.id)
+    )
+    for conversation_id, user in others.all():
+        by_id[conversation_id].participants.append(user)
+
+    return entries, encode_cursor(entries[-1].conversation) if has_more else None
+
+
+async def reconcile_inbox(db: AsyncSession, conversation_ids: Optional[Sequence[int]] = None) -> Dict[str, int]:
+    """
+    Recompute last-message pointers and unread counters from ``messages``.
+
+    Only rows that drifted are written. Returns how many of each were
+    repaired. Commits.
+    """
+    latest = (
+        select(Message.id)
+        .where(Message.conversation_id == Conversation.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    pointed_at = select(Message.created_at).where(Message.id == Conversation.last_message_id).scalar_subquery()
+    preview = (
+        select(case((Message.is_deleted == True, None), else_=func.substr(Message.content, 1, PREVIEW_LENGTH)))  # noqa: E712
+        .where(Message.id == Conversation.last_message_id)
+        .scalar_subquery()
+    )
+    unread = (
+        select(func.count(Message.id))
+        .where(
+            Message.conversation_id == ConversationParticipant.conversation_id,
+            Message.sender_id != ConversationParticipant.user_id,
+            Message.is_deleted == False,  # noqa: E712
+            or_(
+                ConversationParticipant.last_read_at.is_(None),
+                Message.created_at > ConversationParticipant.last_read_at,
+            ),
+        )
+        .scalar_subquery()
+    )
+
+    conversation_filter = [Conversation.id.in_(conversation_ids)] if conversation_ids is not None else []
+    participant_filter = (
+        [ConversationParticipant.conversation_id.in_(conversation_ids)] if conversation_ids is not None else []
+    )
+
+    pointers = await db.execute(
+        update(Conversation)
+        .where(Conversation.last_message_id.is_distinct_from(latest), *conversation_filter)
+        .values(last_message_id=latest, updated_at=Conversation.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    previews = await db.execute(
+        update(Conversation)
+        .where(
+            or_(
+                Conversation.last_message_at.is_distinct_from(pointed_at),
+                Conversation.last_message_preview.is_distinct_from(preview),
+            ),
+            *conversation_filter,
+        )
+        .values(last_message_at=pointed_at, last_message_preview=preview, updated_at=Conversation.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    counters = await db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.unread_count.is_distinct_from(unread), *participant_filter)
+        .values(unread_count=unread)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    report = {
+        "pointers": max(pointers.rowcount, previews.rowcount),
+        "unread_counters": counters.rowcount,
+    }
+    if any(report.values()):
+        logger.warning(f"📬 Inbox reconciliation repaired drift: {report}")
+    return report
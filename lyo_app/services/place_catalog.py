@@ -0,0 +1,256 @@
+"""
+Indexed, pre-serialized catalog behind the Discover places endpoints.
+
+The router used to copy the whole place list on every request, compute the
+haversine distance twice per place (filter, then sort), scan the list for a
+single id and re-serialize the Pydantic models each time. ``PlaceCatalog``
+does that work once, when the catalog is loaded:
+
+* an id -> place map, a category code per place and per-category buckets
+  in the default (featured, then rating) order;
+* latitude/longitude as NumPy arrays, so the distances for a radius query
+  are computed in one vectorized pass;
+* a grid index (``cell_deg`` x ``cell_deg`` cells) that narrows a radius
+  query to the places in the cells its bounding box touches; large radii
+  skip it and scan every place, which is still one vectorized pass;
+* each place's list-view and detail JSON, so a response is a join of
+  pre-encoded fragments, and strong ETags derived from the catalog digest
+  and the query, so a revalidation can be answered 304 before the body is
+  built.
+
+A catalog is immutable. ``PlaceCatalogStore`` holds the current one and
+swaps in a rebuilt catalog when its source changes: ``replace()`` for an
+in-process update, or, with a ``path``, a JSON file whose mtime is checked
+at most every ``check_interval`` seconds. Building a large catalog takes a
+noticeable fraction of a second, so on an event loop the check runs in a
+worker thread (``refresh()``) while requests keep getting the previous
+catalog, which is swapped out in one assignment once the new one is built.
+A file that fails to load is logged and the previous catalog stays in
+service.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Fields the list view leaves out of each place
+DETAIL_ONLY_FIELDS = {"hours", "phone", "reviews"}
+
+
+def etag_for(payload: bytes) -> str:
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` semantics: weak comparison, ``*`` matches anything."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances in km from ``(lat, lng)`` to every point of the (degree) arrays."""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    a = np.clip(a, 0.0, 1.0)  # rounding can push antipodal points just past 1
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class PlaceCatalog:
+    """Immutable, indexed snapshot of the place catalog; see module docstring."""
+
+    def __init__(self, places: Sequence[Any], cell_deg: float = 1.0):
+        self.places: Tuple[Any, ...] = tuple(places)
+        self.cell_deg = cell_deg
+        self.by_id: Dict[str, Any] = {p.id: p for p in self.places}
+        self.lats = np.array([p.lat for p in self.places], dtype=np.float64)
+        self.lngs = np.array([p.lng for p in self.places], dtype=np.float64)
+
+        self._category_names = sorted({p.category for p in self.places})
+        codes = {name: code for code, name in enumerate(self._category_names)}
+        self.category_codes = np.array([codes[p.category] for p in self.places], dtype=np.int32)
+        self._category_code = codes
+
+        # Featured first, then rating; source order breaks ties
+        self.default_order = np.array(
+            sorted(range(len(self.places)), key=lambda i: (-int(self.places[i].is_featured), -self.places[i].rating)),
+            dtype=np.int64,
+        )
+        self._default_by_category: Dict[int, np.ndarray] = {
+            code: self.default_order[self.category_codes[self.default_order] == code] for code in codes.values()
+        }
+
+        self.list_json: List[bytes] = [
+            p.model_dump_json(exclude=DETAIL_ONLY_FIELDS).encode() for p in self.places
+        ]
+        self.detail_json: Dict[str, bytes] = {p.id: p.model_dump_json().encode() for p in self.places}
+        self.detail_etags: Dict[str, str] = {pid: etag_for(body) for pid, body in self.detail_json.items()}
+        self.digest = hashlib.sha256(b"\n".join(self.detail_json[p.id] for p in self.places)).hexdigest()[:16]
+
+        self._columns = int(math.ceil(360.0 / cell_deg))
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (lat, lng) in enumerate(zip(self.lats, self.lngs)):
+            cells.setdefault(self._cell(lat, lng), []).append(i)
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {
+            cell: np.array(members, dtype=np.int64) for cell, members in cells.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _column(self, column: int) -> int:
+        half = self._columns // 2
+        return (column + half) % self._columns - half  # wraps the antimeridian
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), self._column(int(math.floor(lng / self.cell_deg)))
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> Optional[np.ndarray]:
+        """Indices (ascending) in the grid cells a radius query can reach; ``None`` means all."""
+        dlat = radius_km / KM_PER_DEGREE
+        lat_lo, lat_hi = lat - dlat, lat + dlat
+        if lat_lo <= -90 or lat_hi >= 90:
+            return None  # reaches a pole: every longitude is in range
+        dlng = dlat / math.cos(math.radians(max(abs(lat_lo), abs(lat_hi))))
+        if dlng >= 180:
+            return None
+        rows = range(int(math.floor(lat_lo / self.cell_deg)), int(math.floor(lat_hi / self.cell_deg)) + 1)
+        first = int(math.floor((lng - dlng) / self.cell_deg))
+        last = int(math.floor((lng + dlng) / self.cell_deg))
+        if len(rows) * (last - first + 1) > len(self._grid):
+            return None  # more cells to probe than are occupied
+        columns = {self._column(c) for c in range(first, last + 1)}
+        hits = [self._grid[(r, c)] for r in rows for c in columns if (r, c) in self._grid]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(hits))
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        radius_km: float = 50.0,
+    ) -> np.ndarray:
+        """Indices of matching places, nearest first for a radius query, else in default order."""
+        code = self._category_code.get(category) if category else None
+        if category and code is None:
+            return np.empty(0, dtype=np.int64)
+
+        if lat is None or lng is None:
+            return self.default_order if code is None else self._default_by_category[code]
+
+        candidates = self._candidates(lat, lng, radius_km)
+        if candidates is None:
+            candidates = np.arange(len(self.places), dtype=np.int64)
+        if code is not None:
+            candidates = candidates[self.category_codes[candidates] == code]
+        distances = haversine_km(lat, lng, self.lats[candidates], self.lngs[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        return candidates[np.argsort(distances, kind="stable")]
+
+    def list_etag(self, *params: Any) -> str:
+        """Strong ETag of a list response: the body is a function of the catalog and ``params``."""
+        key = json.dumps([self.digest, *params], default=str).encode()
+        return '"' + hashlib.sha256(key).hexdigest()[:32] + '"'
+
+    def render_list(self, indices: np.ndarray, start: int, stop: int) -> bytes:
+        page = b",".join(self.list_json[i] for i in indices[start:stop].tolist())
+        return b'{"places":[' + page + b'],"total":' + str(len(indices)).encode() + b"}"
+
+
+class PlaceCatalogStore:
+    """Holds the current ``PlaceCatalog`` and rebuilds it when the source changes."""
+
+    def __init__(
+        self,
+        seed: Iterable[Any],
+        parse: Callable[[Any], Any],
+        path: Optional[str] = None,
+        check_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.parse = parse
+        self.path = path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._catalog = PlaceCatalog(list(seed))
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.reloading: Optional[asyncio.Task] = None
+        if path:
+            self.check()
+
+    def current(self) -> PlaceCatalog:
+        """The catalog in service; a due file check is started, never awaited."""
+        if self.path and self._clock() >= self._next_check and self.reloading is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.check()  # no event loop to keep responsive
+            else:
+                self._next_check = self._clock() + self.check_interval
+                self.reloading = loop.create_task(self.refresh())
+        return self._catalog
+
+    async def refresh(self) -> None:
+        """``check()`` in a worker thread, off the event loop."""
+        try:
+            await asyncio.to_thread(self.check)
+        finally:
+            self.reloading = None
+
+    def replace(self, places: Iterable[Any]) -> PlaceCatalog:
+        """Build a catalog from ``places`` and put it in service."""
+        self._catalog = PlaceCatalog(list(places))
+        self.reloads += 1
+        return self._catalog
+
+    def check(self) -> None:
+        """Reload from ``path`` if the file changed since the last load."""
+        self._next_check = self._clock() + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            logger.warning(f"Place catalog {self.path} unavailable, serving the current catalog: {e}")
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                places = [self.parse(item) for item in json.load(f)]
+            self.replace(places)
+            logger.info(f"Loaded {len(places)} places from {self.path}")
+        except Exception as e:  # noqa: BLE001 - keep serving the previous catalog
+            self.reload_errors += 1
+            logger.error(f"Failed to load place catalog {self.path}: {e}")
+        self._mtime = mtime
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "places": len(self._catalog),
+            "digest": self._catalog.digest,
+            "source": self.path or "seed",
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
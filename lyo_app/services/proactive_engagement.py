@@ -253,54 +253,66 @@ class ProactiveEngagementService:
         if not streak:
             return None
 
+        return self.build_streak_nudge(user_id, streak.current_count, streak.last_activity_date)
+
+    def build_streak_nudge(
+        self,
+        user_id: int,
+        streak_count: int,
+        last_activity: Optional[datetime],
+        now: Optional[datetime] = None
+    ) -> Optional[Nudge]:
+        """Streak nudge from already-loaded streak data (shared with the bulk sweeps)."""
+        now = now or datetime.utcnow()
+
         # Check if streak is about to break
-        if streak.last_activity_at:
-            hours_since = (datetime.utcnow() - streak.last_activity_at).total_seconds() / 3600
+        if last_activity:
+            hours_since = (now - last_activity).total_seconds() / 3600
             hours_until_break = 24 - hours_since
 
-            if 0 < hours_until_break <= 4 and streak.current_count >= 3:
+            if 0 < hours_until_break <= 4 and streak_count >= 3:
                 # Streak warning
                 return Nudge(
                     user_id=user_id,
                     nudge_type=NudgeType.STREAK_REMINDER,
-                    title=f"Don't lose your {streak.current_count}-day streak!",
-                    message=f"You've been learning for {streak.current_count} days straight. "
+                    title=f"Don't lose your {streak_count}-day streak!",
+                    message=f"You've been learning for {streak_count} days straight. "
                             f"Just a quick session keeps the streak alive!",
                     priority=NudgePriority.HIGH,
                     action_label="Continue Learning",
                     action_url="/learn",
                     context_data={
-                        "streak_count": streak.current_count,
+                        "streak_count": streak_count,
                         "hours_until_break": round(hours_until_break, 1)
                     },
-                    expires_at=datetime.utcnow() + timedelta(hours=hours_until_break)
+                    expires_at=now + timedelta(hours=hours_until_break)
                 )
 
-            if hours_since >= 24 and streak.current_count > 0:
+            if hours_since >= 24 and streak_count > 0:
                 # Streak broken - recovery message
                 return Nudge(
                     user_id=user_id,
                     nudge_type=NudgeType.STREAK_RECOVERY,
                     title="Let's start a new streak!",
-                    message=f"Your {streak.current_count}-day streak ended, but that's okay! "
+                    message=f"Your {streak_count}-day streak ended, but that's okay! "
                             "Every expert was once a beginner. Start fresh today.",
                     priority=NudgePriority.MEDIUM,
                     action_label="Start Fresh",
                     action_url="/learn",
-                    context_data={"previous_streak": streak.current_count}
+                    context_data={"previous_streak": streak_count}
                 )
 
         # Streak milestone celebration
-        if streak.current_count in [7, 14, 30, 50, 100, 365]:
+        if streak_count in [7, 14, 30, 50, 100, 365]:
             return Nudge(
                 user_id=user_id,
                 nudge_type=NudgeType.STREAK_CELEBRATION,
-                title=f"Amazing! {streak.current_count}-day streak!",
-                message=self._get_streak_celebration_message(streak.current_count),
+                title=f"Amazing! {streak_count}-day streak!",
+                message=self._get_streak_celebration_message(streak_count),
                 priority=NudgePriority.MEDIUM,
                 action_label="Keep Going",
                 action_url="/learn",
-                context_data={"streak_count": streak.current_count}
+                context_data={"streak_count": streak_count}
             )
 
         return None
@@ -330,11 +342,12 @@ class ProactiveEngagementService:
         if not due_items:
             return None
 
-        count = len(due_items)
-
         # Get the skill names for context
         skill_ids = list(set(item.skill_id for item in due_items[:5]))
+        return self.build_spaced_rep_nudge(user_id, len(due_items), skill_ids)
 
+    def build_spaced_rep_nudge(self, user_id: int, count: int, skill_ids: List[str]) -> Nudge:
+        """Review reminder for ``count`` due items (shared with the bulk sweeps)."""
         if count == 1:
             message = f"One concept is ready for review: {skill_ids[0]}. A quick review keeps it fresh!"
         elif count <= 5:
@@ -379,12 +392,21 @@ class ProactiveEngagementService:
             return None
 
         days_inactive = (datetime.utcnow() - last_interaction).days
+        return self.build_comeback_nudge(user_id, user.first_name, user.user_context_summary, days_inactive)
 
+    def build_comeback_nudge(
+        self,
+        user_id: int,
+        first_name: Optional[str],
+        context_summary: Optional[str],
+        days_inactive: int
+    ) -> Optional[Nudge]:
+        """Comeback nudge from already-loaded user data (shared with the bulk sweeps)."""
         if days_inactive < self.INACTIVE_DAYS_COMEBACK:
             return None
 
         # Get user's memory for personalization
-        memory = user.user_context_summary or ""
+        memory = context_summary or ""
 
         # Personalize message based on what we know
         if "struggling" in memory.lower() or "difficult" in memory.lower():
@@ -400,7 +422,7 @@ class ProactiveEngagementService:
         return Nudge(
             user_id=user_id,
             nudge_type=NudgeType.COMEBACK,
-            title=f"Welcome back, {user.first_name or 'learner'}!",
+            title=f"Welcome back, {first_name or 'learner'}!",
             message=message,
             priority=NudgePriority.LOW,
             action_label="Resume Learning",
@@ -438,7 +460,7 @@ class ProactiveEngagementService:
 
         # Get XP earned this week
         xp_result = await db.execute(
-            select(func.sum(UserXP.xp_amount))
+            select(func.sum(UserXP.xp_earned))
             .where(
                 and_(
                     UserXP.user_id == user_id,
@@ -460,6 +482,18 @@ class ProactiveEngagementService:
         )
         improved_skills = mastery_result.scalars().all()
         skills_improved = len([s for s in improved_skills if s.mastery_level >= 0.7])
+        return self.build_weekly_digest(user_id, interaction_count, xp_earned, skills_improved)
+
+    def build_weekly_digest(
+        self,
+        user_id: int,
+        interaction_count: int,
+        xp_earned: int,
+        skills_improved: int
+    ) -> Optional[Nudge]:
+        """Weekly digest from already-aggregated stats (shared with the bulk sweeps)."""
+        if interaction_count == 0:
+            return None  # No activity, no digest
 
         message = f"This week: {interaction_count} learning sessions"
         if xp_earned > 0:
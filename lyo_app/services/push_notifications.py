@@ -3,12 +3,14 @@ Push Notification Service
 Handles push notifications for iOS (APNs) and Android (FCM)
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from lyo_app.models.production import PushDevice, PushPlatform
@@ -26,6 +28,9 @@ class PushNotification:
 
 class PushNotificationService:
     """Push notification service with database awareness and multi-platform support."""
+
+    # Messages dispatched concurrently per chunk of send_batch
+    PROVIDER_BATCH_SIZE = 500
     
     def __init__(self):
         self.initialized = True  # Ready to accept requests
@@ -75,6 +80,63 @@ class PushNotificationService:
             if close_db:
                 await async_db.close()
 
+    async def send_batch(
+        self,
+        notifications: Dict[int, PushNotification],
+        db: Optional[AsyncSession] = None
+    ) -> Dict[int, int]:
+        """
+        Send one notification to each user's active devices, for many users.
+
+        One device query and one ``last_used_at`` update for the whole batch.
+        Devices are grouped in-process into chunks of ``PROVIDER_BATCH_SIZE``
+        whose sends run concurrently; each message is still its own
+        ``send_notification`` call.
+        Returns devices reached per user. Unlike ``send_to_user``, database
+        and provider errors propagate so a caller can retry the batch.
+        """
+        if not notifications:
+            return {}
+        async_db = db or AsyncSessionLocal()
+        close_db = db is None
+
+        try:
+            result = await async_db.execute(
+                select(PushDevice.id, PushDevice.user_id, PushDevice.device_token, PushDevice.platform)
+                .where(PushDevice.user_id.in_(list(notifications)), PushDevice.is_active == True)
+            )
+            devices = result.all()
+
+            sent: Dict[int, int] = {}
+            reached: List[int] = []
+            for start in range(0, len(devices), self.PROVIDER_BATCH_SIZE):
+                chunk = devices[start:start + self.PROVIDER_BATCH_SIZE]
+                outcomes = await self.dispatch_batch([
+                    (token, notifications[user_id], getattr(platform, "value", platform))
+                    for _, user_id, token, platform in chunk
+                ])
+                for (device_id, user_id, _, _), success in zip(chunk, outcomes):
+                    if success:
+                        reached.append(device_id)
+                        sent[user_id] = sent.get(user_id, 0) + 1
+
+            if reached:
+                await async_db.execute(
+                    update(PushDevice).where(PushDevice.id.in_(reached)).values(last_used_at=datetime.utcnow())
+                )
+                await async_db.commit()
+            logger.info(f"Sent {len(reached)} notifications to {len(sent)}/{len(notifications)} users")
+            return sent
+        finally:
+            if close_db:
+                await async_db.close()
+
+    async def dispatch_batch(self, messages: List[Tuple[str, PushNotification, str]]) -> List[bool]:
+        """Send ``(device_token, notification, platform)`` messages concurrently; one outcome each."""
+        return list(await asyncio.gather(*(
+            self.send_notification(token, notification, platform) for token, notification, platform in messages
+        )))
+
     async def send_notification(self, device_token: str, notification: PushNotification, platform: str = "ios") -> bool:
         """Low-level dispatch to FCM or APNs."""
         try:
@@ -1,132 +1,311 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from sqlalchemy import select, or_, text, and_
+import os
+import time
+from typing import List, Dict, Any, Optional, Sequence
+from sqlalchemy import select, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from lyo_app.learning.models import Course, Lesson
 from lyo_app.personalization.models import MemoryInsight
 from lyo_app.core.database import get_db_session
-from lyo_app.services.embedding_service import embedding_service
+from lyo_app.services.embedding_service import EmbeddingService, embedding_service
+from lyo_app.services.hybrid_search import RRF_K, HybridIndex, SearchHit, reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
+# Insights considered per memory lookup (most recent first)
+MEMORY_CANDIDATES = 500
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.bind.dialect.name if db.bind else db.get_bind().dialect.name
+
+
+def _vector(value: Any) -> Optional[Sequence[float]]:
+    """pgvector columns come back as arrays (or lists on SQLite); empty means none."""
+    return value if value is not None and len(value) else None
+
+
+class ContentIndex:
+    """
+    Process-wide hybrid (BM25 + vector) index over courses and lessons.
+
+    On SQLite it is built inline on first use and is the only search path.
+    On PostgreSQL it is a hot cache in front of pgvector: the first request
+    schedules a background build and is served by pgvector, later requests
+    are served in-process. The index is rebuilt in the background once it is
+    older than ``ttl`` seconds. Corpora larger than ``max_documents`` are
+    never loaded; pgvector serves them.
+    """
+
+    def __init__(self, dim: int = EmbeddingService.DIMENSION, ttl: float = 600.0, max_documents: int = 200_000):
+        self.dim = dim
+        self.ttl = ttl
+        self.max_documents = max_documents
+        self.index: Optional[HybridIndex] = None
+        self.built_at = 0.0
+        self.oversized = False
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def ensure_ready(self, db: AsyncSession) -> bool:
+        """True when ``search`` can serve this request from memory."""
+        if self.oversized:
+            return False
+        if self.index is not None:
+            if time.time() - self.built_at > self.ttl:
+                self._schedule_refresh()
+            return True
+        if _dialect(db) == "sqlite":
+            async with self._lock:
+                if self.index is None:
+                    await self.refresh(db)
+            return self.index is not None
+        self._schedule_refresh()
+        return False
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_in_background(), name="rag_index_refresh")
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            session = await get_db_session()
+            async with session:
+                async with self._lock:
+                    await self.refresh(session)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"RAG index refresh failed: {e}")
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload all courses and lessons and swap in a freshly built index."""
+        started = time.perf_counter()
+        total = (await db.execute(select(func.count(Course.id)))).scalar_one() + \
+            (await db.execute(select(func.count(Lesson.id)))).scalar_one()
+        if total > self.max_documents:
+            self.oversized = True
+            logger.info(f"RAG corpus has {total} documents (> {self.max_documents}); using pgvector only")
+            return
+
+        courses = (await db.execute(select(
+            Course.id, Course.title, Course.description, Course.summary, Course.topic, Course.embedding
+        ))).all()
+        lessons = (await db.execute(select(
+            Lesson.id, Lesson.title, Lesson.content, Lesson.summary, Lesson.topic, Lesson.embedding
+        ))).all()
+        self.index = await asyncio.to_thread(self._build, courses, lessons)
+        self.built_at = time.time()
+        logger.info(
+            f"🔎 RAG index built: {len(self.index)} documents "
+            f"({len(self.index.vectors)} with embeddings) in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def _build(self, courses: Sequence[Any], lessons: Sequence[Any]) -> HybridIndex:
+        index = HybridIndex(self.dim)
+        for cid, title, description, summary, topic, embedding in courses:
+            content = description or summary
+            index.add(
+                f"course:{cid}", " ".join(filter(None, (title, topic, content))), _vector(embedding),
+                id=str(cid), type="course", title=title, content=content,
+            )
+        for lid, title, content, summary, topic, embedding in lessons:
+            index.add(
+                f"lesson:{lid}", " ".join(filter(None, (title, topic, summary, content))), _vector(embedding),
+                id=str(lid), type="lesson", title=title, content=content or summary,
+            )
+        index.build()
+        return index
+
+    def search(self, query: str, query_vector: Optional[Sequence[float]], limit: int,
+               filters: Optional[Dict[str, Any]] = None) -> List[SearchHit]:
+        where = {"type": filters["type"]} if filters and filters.get("type") else None
+        return self.index.search(query, query_vector, k=limit, where=where)
+
+    def invalidate(self) -> None:
+        """Force a rebuild on next use (e.g. after a bulk content import)."""
+        self.built_at = 0.0
+        self.oversized = False
+
+
+content_index = ContentIndex(
+    ttl=float(os.getenv("RAG_INDEX_TTL_SECONDS", "600")),
+    max_documents=int(os.getenv("RAG_INDEX_MAX_DOCUMENTS", "200000")),
+)
+
+
+def _hit_to_result(hit: SearchHit) -> Dict[str, Any]:
+    return {
+        **hit.document,
+        "score": hit.score,
+        "similarity": round(hit.similarity, 4) if hit.similarity is not None else None,
+        "keyword_score": round(hit.keyword_score, 4) if hit.keyword_score is not None else None,
+    }
+
+
+def _fuse(result_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """RRF over result dicts keyed by (type, id); keeps the first copy of each."""
+    lists = [lst for lst in result_lists if lst]
+    if not lists:
+        return []
+    by_key: Dict[str, Dict[str, Any]] = {}
+    for lst in lists:
+        for result in lst:
+            by_key.setdefault(f"{result['type']}:{result['id']}", result)
+    best_possible = len(lists) / (RRF_K + 1)
+    fused = reciprocal_rank_fusion([[f"{r['type']}:{r['id']}" for r in lst] for lst in lists])
+    return [{**by_key[key], "score": round(score / best_possible, 4)} for key, score in fused[:limit]]
+
+
 class RAGService:
     """
     RAG Retrieval Service for Lyo 2.0.
-    Uses pgvector for semantic search with keyword fallback.
+    Hybrid BM25 + vector retrieval over courses, lessons and user memory,
+    merged with reciprocal-rank fusion. Served from the in-process
+    ``content_index`` when it is warm, otherwise from pgvector.
     """
-    
+
     def __init__(self, db: AsyncSession = None):
         self._db = db
 
-    async def retrieve(self, query: str, limit: int = 5, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    async def retrieve(self, query: str, limit: int = 5, filters: Dict[str, Any] = None,
+                       user_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Retrieves relevant content chunks based on semantic similarity.
+        Retrieves relevant content chunks by hybrid keyword + semantic similarity.
+
+        Args:
+            query: Search text
+            limit: Maximum results
+            filters: Optional ``{"type": "course" | "lesson"}``
+            user_id: Also fuse in this user's memory insights
+
+        Returns:
+            Result dicts (id, type, title, content, score, similarity,
+            keyword_score), best first. ``score`` is the fused rank score in
+            0..1; ``similarity`` is the cosine similarity when the document
+            has an embedding.
         """
         if not self._db:
             session = await get_db_session()
             async with session:
-                return await self._execute_search(session, query, limit, filters)
+                return await self._execute_search(session, query, limit, filters, user_id)
         else:
-            return await self._execute_search(self._db, query, limit, filters)
+            return await self._execute_search(self._db, query, limit, filters, user_id)
 
-    async def _execute_search(self, db: AsyncSession, query: str, limit: int, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        results = []
-        
-        # 1. Generate Query Embedding
+    async def _embed(self, query: str) -> Optional[List[float]]:
         try:
-            query_vector = await embedding_service.embed_query(query)
+            return await embedding_service.embed_query(query)
         except Exception as e:
             logger.warning(f"Embedding generation failed, falling back to keyword search: {e}")
-            query_vector = None
-        
-        # Check dialect: SQLite does not support pgvector operators
-        dialect = db.bind.dialect.name if db.bind else db.get_bind().dialect.name
-        if dialect == "sqlite":
-            logger.warning("SQLite dialect detected, falling back to keyword search since pgvector is not supported")
-            return await self._execute_keyword_search(db, query, limit)
-            
-        # 2. Semantic Search (Courses) using Cosine Distance (<-> operator)
-        course_stmt = select(Course).order_by(
-            Course.embedding.cosine_distance(query_vector)
-        ).limit(limit)
-        
-        course_res = await db.execute(course_stmt)
-        for course in course_res.scalars().all():
-            # Calculate mock score (1 - distance approximation)
-            results.append({
-                "id": str(course.id),
-                "type": "course",
-                "title": course.title,
-                "content": course.description or course.summary,
-                "score": 0.95 # Placeholder, real distance calc requires raw SQL or specific attribute selection
-            })
-            
-        # 3. Semantic Search (Lessons)
-        lesson_stmt = select(Lesson).order_by(
-            Lesson.embedding.cosine_distance(query_vector)
-        ).limit(limit)
-        
-        lesson_res = await db.execute(lesson_stmt)
-        for lesson in lesson_res.scalars().all():
-            results.append({
-                "id": str(lesson.id),
-                "type": "lesson",
-                "title": lesson.title,
-                "content": lesson.content or lesson.summary,
-                "score": 0.95
-            })
-            
-        # Limit total results
-        return results[:limit]
+            return None
 
-    async def _execute_keyword_search(self, db: AsyncSession, query: str, limit: int) -> List[Dict[str, Any]]:
-        """Legacy keyword search fallback."""
+    async def _execute_search(self, db: AsyncSession, query: str, limit: int, filters: Dict[str, Any],
+                              user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        query_vector = await self._embed(query)
+
+        try:
+            ready = await content_index.ensure_ready(db)
+        except Exception as e:
+            logger.warning(f"RAG index unavailable, searching the database directly: {e}")
+            ready = False
+        if ready:
+            results = [_hit_to_result(hit) for hit in content_index.search(query, query_vector, limit, filters)]
+        elif _dialect(db) == "sqlite":
+            results = await self._execute_keyword_search(db, query, limit)
+        else:
+            results = await self._execute_pgvector_search(db, query, query_vector, limit, filters)
+
+        if user_id is None:
+            return results
+        memory = await self._execute_user_memory_search(db, user_id, query, limit, query_vector)
+        memory_results = [
+            {"id": str(m["id"]), "type": "memory", "title": m["category"], "content": m["insight"],
+             "similarity": m["similarity"], "keyword_score": m["keyword_score"]}
+            for m in memory
+        ]
+        return _fuse([results, memory_results], limit)
+
+    async def _execute_pgvector_search(self, db: AsyncSession, query: str, query_vector: Optional[List[float]],
+                                       limit: int, filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Cold-cache path: pgvector similarity fused with keyword matches."""
+        kinds = [(Course, "course", Course.description), (Lesson, "lesson", Lesson.content)]
+        if filters and filters.get("type"):
+            kinds = [k for k in kinds if k[1] == filters["type"]]
+
+        ranked: List[List[Dict[str, Any]]] = []
+        if query_vector:
+            for model, kind, body in kinds:
+                distance = model.embedding.cosine_distance(query_vector)
+                rows = (await db.execute(
+                    select(model.id, model.title, body, model.summary, (1 - distance).label("similarity"))
+                    .where(model.embedding.is_not(None))
+                    .order_by(distance)
+                    .limit(limit)
+                )).all()
+                ranked.append([
+                    {"id": str(r[0]), "type": kind, "title": r[1], "content": r[2] or r[3],
+                     "similarity": round(float(r[4]), 4), "keyword_score": None}
+                    for r in rows
+                ])
+        ranked.append(await self._execute_keyword_search(db, query, limit, [k[1] for k in kinds]))
+        # Vector lists are per type; interleave them as one ranking before fusing with keywords
+        vector_ranking = sorted(
+            (r for lst in ranked[:-1] for r in lst), key=lambda r: -r["similarity"]
+        )
+        return _fuse([vector_ranking, ranked[-1]], limit)
+
+    async def _execute_keyword_search(self, db: AsyncSession, query: str, limit: int,
+                                      kinds: Sequence[str] = ("course", "lesson")) -> List[Dict[str, Any]]:
+        """Substring fallback when no index is available; title matches rank first."""
         results = []
-        
-        # 1. Search Courses
-        course_stmt = select(Course).where(
-            or_(
-                Course.title.ilike(f"%{query}%"),
-                Course.description.ilike(f"%{query}%"),
-                Course.topic.ilike(f"%{query}%")
-            )
-        ).limit(limit)
-        
-        course_res = await db.execute(course_stmt)
-        for course in course_res.scalars().all():
-            results.append({
-                "id": str(course.id),
-                "type": "course",
-                "title": course.title,
-                "content": course.description or course.summary,
-                "score": 0.8  # Mock score for keyword match
-            })
-            
-        # 2. Search Lessons
-        lesson_stmt = select(Lesson).where(
-            or_(
-                Lesson.title.ilike(f"%{query}%"),
-                Lesson.content.ilike(f"%{query}%"),
-                Lesson.topic.ilike(f"%{query}%")
-            )
-        ).limit(limit)
-        
-        lesson_res = await db.execute(lesson_stmt)
-        for lesson in lesson_res.scalars().all():
-            results.append({
-                "id": str(lesson.id),
-                "type": "lesson",
-                "title": lesson.title,
-                "content": lesson.content or lesson.summary,
-                "score": 0.9 if query.lower() in lesson.title.lower() else 0.7
-            })
-            
-        results.sort(key=lambda x: x["score"], reverse=True)
+
+        if "course" in kinds:
+            course_stmt = select(Course).where(
+                or_(
+                    Course.title.ilike(f"%{query}%"),
+                    Course.description.ilike(f"%{query}%"),
+                    Course.topic.ilike(f"%{query}%")
+                )
+            ).limit(limit)
+
+            course_res = await db.execute(course_stmt)
+            for course in course_res.scalars().all():
+                results.append({
+                    "id": str(course.id),
+                    "type": "course",
+                    "title": course.title,
+                    "content": course.description or course.summary,
+                    "similarity": None,
+                    "keyword_score": 1.0 if query.lower() in (course.title or "").lower() else 0.5,
+                })
+
+        if "lesson" in kinds:
+            lesson_stmt = select(Lesson).where(
+                or_(
+                    Lesson.title.ilike(f"%{query}%"),
+                    Lesson.content.ilike(f"%{query}%"),
+                    Lesson.topic.ilike(f"%{query}%")
+                )
+            ).limit(limit)
+
+            lesson_res = await db.execute(lesson_stmt)
+            for lesson in lesson_res.scalars().all():
+                results.append({
+                    "id": str(lesson.id),
+                    "type": "lesson",
+                    "title": lesson.title,
+                    "content": lesson.content or lesson.summary,
+                    "similarity": None,
+                    "keyword_score": 1.0 if query.lower() in (lesson.title or "").lower() else 0.5,
+                })
+
+        results.sort(key=lambda x: x["keyword_score"], reverse=True)
+        for result in results:
+            result["score"] = result["keyword_score"]
         return results[:limit]
 
     async def retrieve_user_memory(self, user_id: int, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
-        Retrieves relevant personal insights for a user using vector search.
+        Retrieves relevant personal insights for a user (hybrid BM25 + vector).
         """
         if not self._db:
             session = await get_db_session()
@@ -135,42 +314,36 @@ class RAGService:
         else:
             return await self._execute_user_memory_search(self._db, user_id, query, limit)
 
-    async def _execute_user_memory_search(self, db: AsyncSession, user_id: int, query: str, limit: int) -> List[Dict[str, Any]]:
-        try:
-            query_vector = await embedding_service.embed_query(query)
-            if not query_vector:
-                return []
-        except Exception as e:
-            logger.error(f"Failed to generate query embedding for user memory: {e}")
-            return []
-
-        # Check dialect
-        dialect = db.bind.dialect.name if db.bind else db.get_bind().dialect.name
-        if dialect == "sqlite":
-            # Fallback to simple keyword search for SQLite
-            stmt = select(MemoryInsight).where(
-                and_(
-                    MemoryInsight.user_id == user_id,
-                    MemoryInsight.insight_text.ilike(f"%{query}%")
-                )
-            ).limit(limit)
-        else:
-            # Semantic search using pgvector
-            stmt = select(MemoryInsight).where(
-                MemoryInsight.user_id == user_id
-            ).order_by(
-                MemoryInsight.embedding.cosine_distance(query_vector)
-            ).limit(limit)
+    async def _execute_user_memory_search(self, db: AsyncSession, user_id: int, query: str, limit: int,
+                                          query_vector: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        if query_vector is None:
+            query_vector = await self._embed(query)
 
-        result = await db.execute(stmt)
-        insights = result.scalars().all()
+        # A user's insights are few; rank their most recent ones in-process
+        rows = (await db.execute(
+            select(MemoryInsight.id, MemoryInsight.category, MemoryInsight.insight_text,
+                   MemoryInsight.confidence, MemoryInsight.created_at, MemoryInsight.embedding)
+            .where(MemoryInsight.user_id == user_id)
+            .order_by(MemoryInsight.created_at.desc())
+            .limit(MEMORY_CANDIDATES)
+        )).all()
+        if not rows:
+            return []
 
+        index = HybridIndex(EmbeddingService.DIMENSION, ivf_threshold=MEMORY_CANDIDATES + 1)
+        for iid, category, text, confidence, created_at, embedding in rows:
+            index.add(
+                str(iid), f"{category or ''} {text}", _vector(embedding),
+                id=iid, category=category, insight=text, confidence=confidence,
+                created_at=created_at.isoformat() if created_at else None,
+            )
+        index.build()
         return [
             {
-                "category": insight.category,
-                "insight": insight.insight_text,
-                "confidence": insight.confidence,
-                "created_at": insight.created_at.isoformat()
+                **hit.document,
+                "score": hit.score,
+                "similarity": round(hit.similarity, 4) if hit.similarity is not None else None,
+                "keyword_score": round(hit.keyword_score, 4) if hit.keyword_score is not None else None,
             }
-            for insight in insights
+            for hit in index.search(query, query_vector, k=limit)
         ]
@@ -0,0 +1,552 @@
+"""
+Search index for the global search router.
+
+The router used to run ``%q%`` ILIKE scans over users, study groups,
+community events and posts (and prefix ILIKE scans for autocomplete), none
+of which can use a B-tree index. ``search_index`` serves the same searches
+from an index, with one API over two backends:
+
+* PostgreSQL: SQL against ``pg_trgm`` GIN indexes (names, titles,
+  descriptions), a ``to_tsvector('simple', content)`` GIN index (posts) and
+  ``lower(...) text_pattern_ops`` indexes (autocomplete); see migration
+  ``search_001``. Entity searches run concurrently, one connection each.
+* SQLite (development, tests): an in-process ``TextIndex`` per entity
+  (inverted index with word-prefix matching) and a sorted-array
+  ``PrefixIndex`` for usernames and group names, built on first use.
+
+The in-process index is kept current incrementally: a session hook captures
+indexed rows written in each flush and applies them once the transaction
+commits (rolled-back writes are dropped). Only writes made through this
+process are seen, which is what a single-process SQLite deployment needs.
+
+Hits carry a relevance in (0, 1] so ``search`` can merge the per-entity
+lists into one ranked list.
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from lyo_app.auth.models import User
+from lyo_app.community.models import CommunityEvent, CommunityPost, StudyGroup, StudyGroupPrivacy
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PREFIX_END = "\uffff"
+_TOP_CACHE = 50  # per-term head kept for single-word queries (the router's max limit)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric words (no stopword removal: names are short)."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class TextIndex:
+    """
+    Inverted index with word-prefix matching.
+
+    A document matches when every query word is a prefix of one of its
+    words. Relevance is the share of query words matched exactly (a full
+    word) rather than as a prefix, scaled to [0.5, 1]; ties go to the
+    document's ``order`` value, smallest first.
+
+    Single-word queries read a cached head of the term's postings (the
+    ``_TOP_CACHE`` best by order), kept in place on ``add`` and dropped when
+    one of its documents is removed, so common words don't re-rank their
+    whole posting list per query.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Any]] = {}
+        self._vocab: List[str] = []  # sorted terms, for prefix ranges
+        self._terms: Dict[Any, FrozenSet[str]] = {}
+        self._order: Dict[Any, Any] = {}
+        self._top: Dict[str, List[Tuple[Any, Any]]] = {}  # term -> sorted (order, key) head
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self._bulk = False
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, key: Any, text: str, document: Dict[str, Any], order: Any) -> None:
+        self.remove(key)
+        terms = frozenset(tokenize(text))
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                if not self._bulk:
+                    insort(self._vocab, term)
+            postings.add(key)
+            top = self._top.get(term)
+            if top is not None and (len(top) < _TOP_CACHE or (order, key) < top[-1]):
+                insort(top, (order, key))
+                del top[_TOP_CACHE:]
+        self._terms[key] = terms
+        self._order[key] = order
+        self.documents[key] = document
+
+    def remove(self, key: Any) -> bool:
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return False
+        order = self._order[key]
+        for term in terms:
+            top = self._top.get(term)
+            if top is not None and (order, key) <= top[-1]:
+                del self._top[term]
+            postings = self._postings[term]
+            postings.discard(key)
+            if not postings:
+                del self._postings[term]
+                i = bisect_left(self._vocab, term)
+                if i < len(self._vocab) and self._vocab[i] == term:
+                    del self._vocab[i]
+        del self._order[key]
+        del self.documents[key]
+        return True
+
+    def bulk_load(self, items: Iterable[Tuple[Any, str, Dict[str, Any], Any]]) -> None:
+        """``add`` many ``(key, text, document, order)`` items, sorting the vocabulary once."""
+        self._bulk = True
+        try:
+            for item in items:
+                self.add(*item)
+        finally:
+            self._bulk = False
+            self._vocab = sorted(self._postings)
+
+    def _prefix_matches(self, prefix: str) -> Set[Any]:
+        start = bisect_left(self._vocab, prefix)
+        stop = bisect_left(self._vocab, prefix + _PREFIX_END, start)
+        if stop - start == 1:
+            return self._postings[self._vocab[start]]
+        matched: Set[Any] = set()
+        for term in self._vocab[start:stop]:
+            matched |= self._postings[term]
+        return matched
+
+    def _head(self, term: str, limit: int) -> List[Tuple[Any, Any]]:
+        """The ``limit`` best (order, key) pairs among ``term``'s exact postings."""
+        postings = self._postings.get(term)
+        if not postings:
+            return []
+        if limit > _TOP_CACHE:
+            return heapq.nsmallest(limit, ((self._order[key], key) for key in postings))
+        top = self._top.get(term)
+        if top is None:
+            top = self._top[term] = heapq.nsmallest(_TOP_CACHE, ((self._order[key], key) for key in postings))
+        return top[:limit]
+
+    def search(self, query: str, limit: int) -> List[Tuple[Any, float]]:
+        """Top ``limit`` (key, relevance) pairs, best first."""
+        words = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not words:
+            return []
+        # Expand the most selective (longest) word through the vocabulary;
+        # check the rest against each candidate's own words
+        first, rest = words[0], words[1:]
+        if not rest:
+            # Single word: exact matches outrank every prefix-only match, so
+            # rank the exact postings alone and only fall back when short
+            exact = self._postings.get(first, ())
+            best = [key for _, key in self._head(first, limit)]
+            if len(best) < limit:
+                prefixed = ((self._order[key], key) for key in self._prefix_matches(first) if key not in exact)
+                best += [key for _, key in heapq.nsmallest(limit - len(best), prefixed)]
+            return [(key, 1.0 if key in exact else 0.5) for key in best]
+        scored = []
+        for key in self._prefix_matches(first):
+            terms = self._terms[key]
+            if rest and not all(word in terms or any(t.startswith(word) for t in terms) for word in rest):
+                continue
+            scored.append((-sum(word in terms for word in words), self._order[key], key))
+        best = heapq.nsmallest(limit, scored, key=lambda item: (item[0], item[1]))
+        return [(key, round(0.5 + 0.5 * -negative_exact / len(words), 4)) for negative_exact, _, key in best]
+
+
+class PrefixIndex:
+    """Case-insensitive autocomplete over a sorted array of names."""
+
+    def __init__(self):
+        self._entries: List[Tuple[str, Any]] = []  # (lowercased name, key), sorted
+        self._names: Dict[Any, Tuple[str, str]] = {}  # key -> (lowercased, display)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, name: Optional[str]) -> None:
+        self.remove(key)
+        if not name:
+            return
+        folded = name.lower()
+        insort(self._entries, (folded, key))
+        self._names[key] = (folded, name)
+
+    def remove(self, key: Any) -> None:
+        entry = self._names.pop(key, None)
+        if entry is None:
+            return
+        i = bisect_left(self._entries, (entry[0], key))
+        if i < len(self._entries) and self._entries[i] == (entry[0], key):
+            del self._entries[i]
+
+    def bulk_load(self, items: Iterable[Tuple[Any, Optional[str]]]) -> None:
+        for key, name in items:
+            if name:
+                self._names[key] = (name.lower(), name)
+        self._entries = sorted((folded, key) for key, (folded, _) in self._names.items())
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        folded = prefix.lower()
+        out = []
+        for i in range(bisect_left(self._entries, (folded,)), len(self._entries)):
+            name, key = self._entries[i]
+            if not name.startswith(folded) or len(out) == limit:
+                break
+            out.append(self._names[key][1])
+        return out
+
+
+# ── Indexed entities ─────────────────────────────────────────────────────────
+
+
+def _display_name(user: Any) -> str:
+    full = f"{user.first_name or ''} {user.last_name or ''}".strip()
+    return full or user.username or f"User {user.id}"
+
+
+def _user_document(u: Any) -> Dict[str, Any]:
+    return {"id": u.id, "username": u.username, "name": _display_name(u), "avatar_url": u.avatar_url}
+
+
+def _group_document(g: Any) -> Dict[str, Any]:
+    return {
+        "id": g.id,
+        "name": g.name,
+        "description": g.description,
+        "privacy": g.privacy.value if g.privacy else "public",
+    }
+
+
+def _event_document(e: Any) -> Dict[str, Any]:
+    return {
+        "id": e.id,
+        "title": e.title,
+        "event_type": e.event_type.value if e.event_type else "other",
+        "start_time": e.start_time.isoformat() if e.start_time else None,
+        "end_time": e.end_time.isoformat() if e.end_time else None,
+        "location": e.location,
+        "is_online": bool(e.is_online),
+        "latitude": e.latitude,
+        "longitude": e.longitude,
+    }
+
+
+def _post_document(p: Any) -> Dict[str, Any]:
+    return {
+        "id": str(p.id),
+        "content": (p.content[:200] + "…") if len(p.content or "") > 200 else p.content,
+        "author_name": p.author_name,
+        "created_at": p.created_at.isoformat() if p.created_at else None,
+    }
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    """How one model is indexed, searched and rendered."""
+
+    name: str
+    model: Any
+    columns: Tuple[Any, ...]  # loaded for the index and for PostgreSQL hits
+    text_fields: Tuple[str, ...]
+    document: Callable[[Any], Dict[str, Any]]
+    order: Callable[[Any], Any]  # in-process tie-break, smallest first
+    sql_order: Tuple[Any, ...]
+    filters: Tuple[Any, ...] = ()  # rows outside these are never returned
+    visible: Callable[[Any], bool] = lambda row: True  # same rule, for written instances
+    suggest_field: Optional[str] = None
+    fulltext: bool = False  # PostgreSQL: tsvector (posts) rather than trigram
+
+    def key(self, row: Any) -> Any:
+        return str(row.id) if self.model is CommunityPost else row.id
+
+    def text(self, row: Any) -> str:
+        return " ".join(filter(None, (getattr(row, f) for f in self.text_fields)))
+
+
+ENTITIES: Dict[str, SearchEntity] = {
+    entity.name: entity
+    for entity in (
+        SearchEntity(
+            name="users",
+            model=User,
+            columns=(User.id, User.username, User.first_name, User.last_name, User.avatar_url),
+            text_fields=("username", "first_name", "last_name"),
+            document=_user_document,
+            order=lambda u: (u.username or "").lower(),
+            sql_order=(User.username,),
+            suggest_field="username",
+        ),
+        SearchEntity(
+            name="groups",
+            model=StudyGroup,
+            columns=(StudyGroup.id, StudyGroup.name, StudyGroup.description, StudyGroup.privacy),
+            text_fields=("name", "description"),
+            document=_group_document,
+            order=lambda g: (g.name or "").lower(),
+            sql_order=(StudyGroup.name,),
+            filters=(StudyGroup.privacy == StudyGroupPrivacy.PUBLIC,),
+            visible=lambda g: g.privacy in (None, StudyGroupPrivacy.PUBLIC),
+            suggest_field="name",
+        ),
+        SearchEntity(
+            name="events",
+            model=CommunityEvent,
+            columns=(
+                CommunityEvent.id, CommunityEvent.title, CommunityEvent.description, CommunityEvent.event_type,
+                CommunityEvent.start_time, CommunityEvent.end_time, CommunityEvent.location,
+                CommunityEvent.is_online, CommunityEvent.latitude, CommunityEvent.longitude,
+            ),
+            text_fields=("title", "description"),
+            document=_event_document,
+            order=lambda e: e.start_time or datetime.max,
+            sql_order=(CommunityEvent.start_time,),
+        ),
+        SearchEntity(
+            name="posts",
+            model=CommunityPost,
+            columns=(CommunityPost.id, CommunityPost.content, CommunityPost.author_name, CommunityPost.created_at),
+            text_fields=("content",),
+            document=_post_document,
+            order=lambda p: -p.created_at.timestamp() if p.created_at else 0.0,
+            sql_order=(CommunityPost.created_at.desc(),),
+            filters=(CommunityPost.is_deleted == False,),  # noqa: E712
+            visible=lambda p: not p.is_deleted,
+            fulltext=True,
+        ),
+    )
+}
+_BY_MODEL = {entity.model: entity for entity in ENTITIES.values()}
+
+
+@dataclass
+class SearchHit:
+    entity: str
+    document: Dict[str, Any]
+    relevance: float
+
+
+class SearchIndex:
+    """Entity search and autocomplete over PostgreSQL indexes or in-process indexes."""
+
+    def __init__(self):
+        self.texts: Dict[str, TextIndex] = {}
+        self.prefixes: Dict[str, PrefixIndex] = {}
+        self.database_url: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.database_url is not None
+
+    def reset(self) -> None:
+        """Drop the in-process index; it is rebuilt on next use."""
+        self.texts, self.prefixes, self.database_url = {}, {}, None
+
+    # -- building ---------------------------------------------------------
+
+    async def _ensure_built(self, db: AsyncSession) -> None:
+        url = str(db.bind.url)
+        if self.database_url == url:
+            return
+        async with self._lock:
+            if self.database_url != url:
+                await self.build(db)
+
+    async def build(self, db: AsyncSession) -> None:
+        """Load every indexed row and swap in fresh in-process indexes."""
+        texts: Dict[str, TextIndex] = {}
+        prefixes: Dict[str, PrefixIndex] = {}
+        total = 0
+        for entity in ENTITIES.values():
+            rows = (await db.execute(select(*entity.columns).where(*entity.filters))).all()
+            total += len(rows)
+            texts[entity.name] = TextIndex()
+            texts[entity.name].bulk_load(
+                (entity.key(row), entity.text(row), entity.document(row), entity.order(row)) for row in rows
+            )
+            if entity.suggest_field:
+                prefixes[entity.name] = PrefixIndex()
+                prefixes[entity.name].bulk_load((entity.key(row), getattr(row, entity.suggest_field)) for row in rows)
+        self.texts, self.prefixes, self.database_url = texts, prefixes, str(db.bind.url)
+        logger.info(f"🔎 Search index built: {total} rows")
+
+    def apply(self, entity: SearchEntity, key: Any, row: Optional[Any]) -> None:
+        """Index (or, with ``row=None``, drop) one written row."""
+        text_index = self.texts.get(entity.name)
+        if text_index is None:
+            return
+        prefix_index = self.prefixes.get(entity.name)
+        if row is None or not entity.visible(row):
+            text_index.remove(key)
+            if prefix_index is not None:
+                prefix_index.remove(key)
+            return
+        text_index.add(key, entity.text(row), entity.document(row), entity.order(row))
+        if prefix_index is not None:
+            prefix_index.add(key, getattr(row, entity.suggest_field))
+
+    # -- queries ----------------------------------------------------------
+
+    async def search(self, db: AsyncSession, q: str, entities: Sequence[str], limit: int) -> Dict[str, List[SearchHit]]:
+        """Top ``limit`` hits per entity, best first."""
+        if db.bind.dialect.name == "postgresql":
+            async def one(name: str) -> List[SearchHit]:
+                # Own session per entity so the queries run concurrently
+                async with AsyncSession(db.bind) as session:
+                    return await self._search_sql(session, ENTITIES[name], q, limit)
+
+            results = await asyncio.gather(*(one(name) for name in entities))
+            return dict(zip(entities, results))
+
+        await self._ensure_built(db)
+        return {
+            name: [
+                SearchHit(name, self.texts[name].documents[key], relevance)
+                for key, relevance in self.texts[name].search(q, limit)
+            ]
+            for name in entities
+        }
+
+    async def suggest(self, db: AsyncSession, prefix: str, limit: int = 5) -> List[str]:
+        """Usernames, then public group names, starting with ``prefix``."""
+        names = [name for name, entity in ENTITIES.items() if entity.suggest_field]
+        if db.bind.dialect.name == "postgresql":
+            out: List[str] = []
+            for name in names:
+                entity = ENTITIES[name]
+                column = getattr(entity.model, entity.suggest_field)
+                result = await db.execute(
+                    select(column)
+                    .where(func.lower(column).like(_like_escape(prefix.lower()) + "%", escape="\\"), *entity.filters)
+                    .order_by(func.lower(column))
+                    .limit(limit)
+                )
+                out.extend(value for (value,) in result.all())
+            return out
+
+        await self._ensure_built(db)
+        return [value for name in names for value in self.prefixes[name].complete(prefix, limit)]
+
+    async def _search_sql(self, db: AsyncSession, entity: SearchEntity, q: str, limit: int) -> List[SearchHit]:
+        if entity.fulltext:
+            words = tokenize(q)
+            if not words:
+                return []
+            # Inline constants so the expression matches ix_community_posts_content_fts
+            vector = func.to_tsvector(
+                literal_column("'simple'"),
+                func.coalesce(getattr(entity.model, entity.text_fields[0]), literal_column("''")),
+            )
+            query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+            score = func.ts_rank(vector, query)
+            where = vector.op("@@")(query)
+        else:
+            pattern = f"%{_like_escape(q)}%"
+            fields = [getattr(entity.model, f) for f in entity.text_fields]
+            score = func.greatest(*(func.similarity(func.coalesce(field, ""), q) for field in fields)) \
+                if len(fields) > 1 else func.similarity(fields[0], q)
+            where = or_(*(field.ilike(pattern, escape="\\") for field in fields))
+        result = await db.execute(
+            select(*entity.columns, score.label("relevance"))
+            .where(where, *entity.filters)
+            .order_by(score.desc(), *entity.sql_order)
+            .limit(limit)
+        )
+        return [
+            SearchHit(entity.name, entity.document(row), round(min(float(row.relevance or 0.0), 1.0), 4))
+            for row in result.all()
+        ]
+
+
+def merge_ranked(hits: Dict[str, List[SearchHit]], limit: int) -> List[Dict[str, Any]]:
+    """One list across entities, by relevance (stable in entity order)."""
+    merged = heapq.nlargest(
+        limit,
+        ((hit.relevance, -order, -rank, hit) for order, name in enumerate(hits) for rank, hit in enumerate(hits[name])),
+        key=lambda item: item[:3],
+    )
+    return [{"type": hit.entity, "relevance": hit.relevance, **hit.document} for *_, hit in merged]
+
+
+search_index = SearchIndex()
+
+
+# ── Incremental maintenance ──────────────────────────────────────────────────
+
+_PENDING = "search_index_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_indexed_writes(session: Session, flush_context) -> None:
+    if not search_index.ready:
+        return
+    pending = session.info.setdefault(_PENDING, {})
+    for instances, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for instance in instances:
+            entity = _BY_MODEL.get(type(instance))
+            if entity is None:
+                continue
+            key = entity.key(instance)
+            # Snapshot now: attributes are expired after commit
+            snapshot = None if deleted else _Snapshot({f: getattr(instance, f) for f in _fields(entity)})
+            pending[(entity.name, key)] = (_bind_url(session), snapshot)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_indexed_writes(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    for (name, key), (url, snapshot) in pending.items():
+        if url == search_index.database_url:
+            search_index.apply(ENTITIES[name], key, snapshot)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_indexed_writes(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class _Snapshot:
+    def __init__(self, values: Dict[str, Any]):
+        self.__dict__.update(values)
+
+
+def _fields(entity: SearchEntity) -> List[str]:
+    fields = [column.key for column in entity.columns]
+    if entity.model is CommunityPost:
+        fields.append("is_deleted")
+    return fields
+
+
+def _bind_url(session: Session) -> Optional[str]:
+    try:
+        return str(session.get_bind().url)
+    except Exception:  # noqa: BLE001 - unbound session
+        return None
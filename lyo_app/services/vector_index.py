@@ -0,0 +1,240 @@
+"""
+In-process cosine-similarity index over NumPy arrays.
+
+Vectors are L2-normalised on insert, so similarity is a dot product and a
+search over ``n`` rows is one BLAS matrix-vector multiply. That is exact and
+fast enough up to a few tens of thousands of rows. Past ``ivf_threshold``
+rows ``build()`` also trains an IVF (inverted file) coarse quantizer: a
+spherical k-means over a sample gives ``nlist`` centroids, rows are stored
+grouped by their nearest centroid, and a search only scores the rows in the
+``nprobe`` lists whose centroids are closest to the query. Recall/latency
+for both modes is measured by ``scripts/bench_retrieval.py``.
+
+Rows added after the last ``build()`` sit in a small tail that is always
+searched exhaustively; removed rows are masked until the next build
+compacts them away.
+
+``save()``/``load()`` write the arrays as ``.npy`` files; ``load(mmap=True)``
+maps them read-only, so several workers on one host share a single copy in
+the page cache and a restart does not re-read the database.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    part = np.argpartition(-scores, k)[:k]
+    return part[np.argsort(-scores[part])]
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0, chunk: int = 65536
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    K-means on unit vectors using cosine similarity.
+
+    Args:
+        vectors: Normalised (n, dim) float32 matrix
+        k: Number of centroids
+        iterations: Lloyd iterations
+        seed: RNG seed for the initial centroids
+        chunk: Rows assigned per matmul, bounding peak memory
+
+    Returns:
+        (centroids, assignment) with centroids normalised
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    centroids = vectors[rng.choice(n, size=k, replace=False)].copy()
+    assignment = np.zeros(n, dtype=np.int32)
+    for _ in range(iterations):
+        for start in range(0, n, chunk):
+            assignment[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        counts = np.bincount(assignment, minlength=k)
+        order = np.argsort(assignment, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(vectors[order], starts[nonempty], axis=0)
+        empty = ~nonempty
+        if empty.any():  # re-seed empty clusters from random points
+            sums[empty] = vectors[rng.choice(n, size=int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids, assignment
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index keyed by string ids.
+
+    Args:
+        dim: Vector dimension
+        nprobe: IVF lists scored per query
+        ivf_threshold: Minimum rows before ``build()`` trains IVF lists;
+            smaller indexes are searched exactly
+        nlist: IVF list count; defaults to ~sqrt(rows)
+    """
+
+    def __init__(self, dim: int, nprobe: int = 16, ivf_threshold: int = 50_000, nlist: Optional[int] = None):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.ivf_threshold = ivf_threshold
+        self.nlist = nlist
+        self.keys: List[str] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._tail_keys: List[str] = []
+        self._tail: List[np.ndarray] = []
+        self._row: Dict[str, int] = {}  # key -> row (tail rows follow the built ones)
+        self._dead = np.zeros(0, dtype=bool)
+        self._dead_tail: set = set()
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._row
+
+    @property
+    def is_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, key: str, vector: Sequence[float]) -> None:
+        """Insert or replace one vector; searchable immediately."""
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"expected a {self.dim}-d vector, got shape {vector.shape}")
+        self.remove(key)
+        self._row[key] = len(self.keys) + len(self._tail_keys)
+        self._tail_keys.append(key)
+        self._tail.append(_normalize(vector))
+
+    def add_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        for key, vector in zip(keys, vectors):
+            self.add(key, vector)
+
+    def remove(self, key: str) -> bool:
+        row = self._row.pop(key, None)
+        if row is None:
+            return False
+        if row < len(self.keys):
+            self._dead[row] = True
+        else:
+            self._dead_tail.add(row - len(self.keys))
+        return True
+
+    def build(self, seed: int = 0) -> None:
+        """Fold the tail in, drop removed rows and (re)train IVF lists if large enough."""
+        live = ~self._dead
+        keys = [k for k, alive in zip(self.keys, live) if alive]
+        parts = [np.asarray(self._vectors)[live]]
+        tail_live = [i for i in range(len(self._tail_keys)) if i not in self._dead_tail]
+        keys += [self._tail_keys[i] for i in tail_live]
+        if tail_live:
+            parts.append(np.stack([self._tail[i] for i in tail_live]))
+        vectors = np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+        self._centroids = self._offsets = None
+        if len(vectors) >= self.ivf_threshold:
+            nlist = self.nlist or int(np.clip(np.sqrt(len(vectors)), 16, 4096))
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(len(vectors), size=min(len(vectors), nlist * 32), replace=False)]
+            centroids, _ = spherical_kmeans(sample, nlist, seed=seed)
+            assignment = np.concatenate([
+                np.argmax(vectors[s:s + 65536] @ centroids.T, axis=1)
+                for s in range(0, len(vectors), 65536)
+            ])
+            order = np.argsort(assignment, kind="stable")
+            vectors = vectors[order]
+            keys = [keys[i] for i in order]
+            self._centroids = centroids
+            self._offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+
+        self._set_rows(keys, np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def _set_rows(self, keys: List[str], vectors: np.ndarray) -> None:
+        self.keys = keys
+        self._vectors = vectors
+        self._row = {key: i for i, key in enumerate(keys)}
+        self._dead = np.zeros(len(keys), dtype=bool)
+        self._tail_keys, self._tail, self._dead_tail = [], [], set()
+
+    def search(self, query: Sequence[float], k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top ``k`` (key, cosine similarity) pairs, best first."""
+        if not self._row:
+            return []
+        q = _normalize(np.asarray(query, dtype=np.float32))
+        candidates: List[Tuple[np.ndarray, np.ndarray]] = []  # (rows, scores)
+
+        if len(self.keys):
+            if self._centroids is None:
+                rows = np.arange(len(self.keys))
+                scores = self._vectors @ q
+            else:
+                probes = _top_k(self._centroids @ q, min(nprobe or self.nprobe, len(self._centroids)))
+                spans = [(self._offsets[p], self._offsets[p + 1]) for p in probes]
+                rows = np.concatenate([np.arange(a, b) for a, b in spans])
+                scores = np.concatenate([self._vectors[a:b] @ q for a, b in spans])
+            if self._dead.any():
+                alive = ~self._dead[rows]
+                rows, scores = rows[alive], scores[alive]
+            candidates.append((rows, scores))
+
+        if self._tail:
+            tail_scores = np.stack(self._tail) @ q
+            tail_rows = np.arange(len(self._tail)) + len(self.keys)
+            if self._dead_tail:
+                alive = np.array([i not in self._dead_tail for i in range(len(self._tail))])
+                tail_rows, tail_scores = tail_rows[alive], tail_scores[alive]
+            candidates.append((tail_rows, tail_scores))
+
+        rows = np.concatenate([c[0] for c in candidates])
+        scores = np.concatenate([c[1] for c in candidates])
+        best = _top_k(scores, k)
+        return [(self._key_at(int(rows[i])), float(scores[i])) for i in best]
+
+    def _key_at(self, row: int) -> str:
+        return self.keys[row] if row < len(self.keys) else self._tail_keys[row - len(self.keys)]
+
+    def save(self, path: str) -> None:
+        """Build, then write the index to directory ``path``."""
+        self.build()
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self._vectors)
+        if self._centroids is not None:
+            np.save(os.path.join(path, "centroids.npy"), self._centroids)
+            np.save(os.path.join(path, "offsets.npy"), self._offsets)
+        with open(os.path.join(path, "keys.json"), "w") as f:
+            json.dump({"dim": self.dim, "keys": self.keys}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs) -> "VectorIndex":
+        """Load an index written by ``save``; ``mmap`` maps the vectors read-only."""
+        with open(os.path.join(path, "keys.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], **kwargs)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        index._set_rows(meta["keys"], vectors)
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            index._centroids = np.load(centroids_path)
+            index._offsets = np.load(os.path.join(path, "offsets.npy"))
+        return index
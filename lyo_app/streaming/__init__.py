@@ -10,11 +10,15 @@ from .sse import (
     stream_response,
     get_sse_manager
 )
+from .sse_writer import SSEWriter, encode_event, sse_frame
 
 __all__ = [
     "SSEManager",
     "StreamEvent", 
     "EventType",
     "stream_response",
-    "get_sse_manager"
+    "get_sse_manager",
+    "SSEWriter",
+    "encode_event",
+    "sse_frame"
 ]
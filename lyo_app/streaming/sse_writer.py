@@ -0,0 +1,145 @@
+"""
+Encode-once SSE event writer.
+
+Every event is serialized exactly once, by a shared C-accelerated
+``json.JSONEncoder`` whose ``default=str`` hook coerces anything JSON has no
+type for (datetimes, UUIDs, Decimals, model objects) to a string, which is
+what keeps iOS from decoding ``__SwiftValue``s. The bytes are identical to the old
+``json.dumps(json.loads(json.dumps(data, default=str)))`` round trip - same
+separators, same escaping - so iOS, Android and web parsers see no change.
+
+Frames are written into one preallocated buffer and handed to the response
+with ``drain()``, so several frames (coalesced token deltas, the final [DONE])
+leave as one chunk. Token deltas are merged until ``flush_interval`` has
+passed or ``max_delta_chars`` are pending, turning a word-per-event stream
+into a handful of frames per second.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DONE_FRAME = b"data: [DONE]\n\n"
+
+_encoder = json.JSONEncoder(default=str)
+
+
+def encode_event(data: Any, event_type: str = "unknown") -> str:
+    """
+    Serialize one event payload in a single pass.
+
+    Falls back to a ``serialization_error`` payload (and logs the culprit)
+    when the data cannot be encoded even with string coercion, e.g. circular
+    references.
+    """
+    try:
+        return _encoder.encode(data)
+    except (TypeError, ValueError, OverflowError, RecursionError) as e:
+        logger.error(f"❌ JSON serialization failed for {event_type}: {e}")
+        logger.error(f"Problematic data type: {type(data)}")
+        logger.error(f"Problematic data sample: {str(data)[:200]}")
+        return _encoder.encode({
+            "type": "serialization_error",
+            "message": f"Data serialization failed for {event_type}",
+            "error": str(e),
+            "timestamp": time.time(),
+        })
+
+
+def sse_frame(data: Any, event_type: str = "unknown") -> bytes:
+    """One ``data: ...`` SSE frame, UTF-8 encoded."""
+    return b"data: " + encode_event(data, event_type).encode() + b"\n\n"
+
+
+class SSEWriter:
+    """
+    Buffered SSE frame writer for one stream.
+
+    Args:
+        flush_interval: Seconds a token delta may wait to be merged with the next
+        max_delta_chars: Pending delta size that forces a flush regardless of time
+        capacity: Initial buffer size in bytes; grows (doubling) when exceeded
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.05,
+        max_delta_chars: int = 512,
+        capacity: int = 64 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.flush_interval = flush_interval
+        self.max_delta_chars = max_delta_chars
+        self._clock = clock
+        self._buffer = bytearray(capacity)
+        self._size = 0
+        self._deltas: List[str] = []
+        self._delta_chars = 0
+        self._delta_since: Optional[float] = None
+        self.events = 0
+        self.frames = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _append(self, frame: bytes) -> None:
+        end = self._size + len(frame)
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(max(end - len(self._buffer), len(self._buffer))))
+        self._buffer[self._size:end] = frame
+        self._size = end
+        self.frames += 1
+
+    def write(self, event_type: str, data: Any) -> bytes:
+        """Buffer one event frame (after any pending deltas); returns the frame."""
+        self.flush_deltas()
+        frame = sse_frame(data, event_type)
+        self._append(frame)
+        self.events += 1
+        return frame
+
+    def done(self) -> None:
+        self.flush_deltas()
+        self._append(DONE_FRAME)
+
+    def delta(self, text: str) -> bool:
+        """
+        Queue a token delta; returns True when the caller should ``drain()``.
+
+        Deltas become one ``{"type": "token", "text": ...}`` frame per
+        flush, in order with the surrounding events.
+        """
+        if not text:
+            return False
+        if self._delta_since is None:
+            self._delta_since = self._clock()
+        self._deltas.append(text)
+        self._delta_chars += len(text)
+        self.events += 1
+        return (
+            self._delta_chars >= self.max_delta_chars
+            or self._clock() - self._delta_since >= self.flush_interval
+        )
+
+    def flush_deltas(self) -> None:
+        if self._deltas:
+            self._append(sse_frame({"type": "token", "text": "".join(self._deltas)}, "token"))
+            self._deltas.clear()
+            self._delta_chars = 0
+            self._delta_since = None
+
+    def drain(self) -> bytes:
+        """Everything buffered so far as one chunk; the buffer is reused."""
+        self.flush_deltas()
+        chunk = bytes(memoryview(self._buffer)[:self._size])
+        self._size = 0
+        return chunk
+
+    def emit(self, event_type: str, data: Any) -> bytes:
+        """``write`` + ``drain``: the chunk to yield for a single event."""
+        self.write(event_type, data)
+        return self.drain()
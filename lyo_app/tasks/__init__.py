@@ -4,6 +4,8 @@ from lyo_app.tasks.course_generation import generate_course_task
 from lyo_app.tasks.notifications import send_push_notification_task, notify_course_ready_task
 from lyo_app.tasks.feeds import create_feed_item_task, update_feed_task
 from lyo_app.tasks import video_tasks
+from lyo_app.tasks.embeddings import backfill_embeddings_task
+from lyo_app.tasks.messaging import reconcile_inbox_task
 
 __all__ = [
     "generate_course_task",
@@ -11,6 +13,8 @@ __all__ = [
     "notify_course_ready_task",
     "create_feed_item_task",
     "update_feed_task",
-    "video_tasks"
+    "video_tasks",
+    "backfill_embeddings_task",
+    "reconcile_inbox_task",
 ]
 
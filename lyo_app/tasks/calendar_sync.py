@@ -8,7 +8,6 @@ Background tasks for:
 """
 
 import logging
-import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, List
 
@@ -17,6 +16,7 @@ from sqlalchemy import create_engine, select, and_
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from lyo_app.core.async_worker import run_async, worker_loop
 from lyo_app.core.celery_app import celery_app
 from lyo_app.core.config import settings
 from lyo_app.auth.models import User
@@ -66,21 +66,13 @@ def _build_async_database_url(url: str) -> str:
 ASYNC_DATABASE_URL = _build_async_database_url(DATABASE_URL)
 async_engine = create_async_engine(ASYNC_DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+worker_loop.on_shutdown(async_engine.dispose)
 
 
 def get_sync_db() -> Session:
     return SyncSessionLocal()
 
 
-def run_async(coro):
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(bind=True, name="lyo_app.tasks.calendar_sync.sync_user_calendar")
 def sync_user_calendar_task(self, user_id: int, connection_data: dict):
     """
@@ -5,7 +5,6 @@ Handles AI-powered course creation using local Gemma model.
 
 import uuid
 import logging
-import asyncio
 import json
 from typing import Dict, Any, Callable, List, Optional
 from datetime import datetime, timedelta
@@ -14,6 +13,7 @@ from celery import current_task
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from lyo_app.core.async_worker import run_async
 from lyo_app.core.celery_app import celery_app
 from lyo_app.core.redis_production import publish_task_progress
 from lyo_app.models.production import Task, Course, Lesson, CourseItem, TaskState, CourseStatus
@@ -456,7 +456,7 @@ def generate_course_task(self, task_id: str, user_id: str, payload: Dict[str, An
         db.commit()
         
         # Publish initial progress
-        asyncio.run(publish_task_progress(task_id, {
+        run_async(publish_task_progress(task_id, {
             "state": TaskState.RUNNING.value,
             "progressPct": 5,
             "message": "Starting course generation..."
@@ -469,14 +469,14 @@ def generate_course_task(self, task_id: str, user_id: str, payload: Dict[str, An
             db.commit()
             
             # Publish progress update
-            asyncio.run(publish_task_progress(task_id, {
+            run_async(publish_task_progress(task_id, {
                 "state": TaskState.RUNNING.value,
                 "progressPct": pct,
                 "message": message
             }))
         
         # Run async course generation
-        course_id = asyncio.run(course_generator.create_course_content(
+        course_id = run_async(course_generator.create_course_content(
             db=db,
             user_id=user_id,
             payload=payload,
@@ -497,7 +497,7 @@ def generate_course_task(self, task_id: str, user_id: str, payload: Dict[str, An
         db.commit()
         
         # Publish completion
-        asyncio.run(publish_task_progress(task_id, {
+        run_async(publish_task_progress(task_id, {
             "state": TaskState.DONE.value,
             "progressPct": 100,
             "message": "Course generation completed",
@@ -523,7 +523,7 @@ def generate_course_task(self, task_id: str, user_id: str, payload: Dict[str, An
             db.commit()
             
             # Publish error
-            asyncio.run(publish_task_progress(task_id, {
+            run_async(publish_task_progress(task_id, {
                 "state": TaskState.ERROR.value,
                 "message": str(e)
             }))
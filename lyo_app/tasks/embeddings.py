@@ -0,0 +1,42 @@
+"""
+Embedding maintenance tasks.
+
+``backfill_embeddings`` re-embeds courses, lessons and memory insights whose
+text changed since their embedding was built (see
+``lyo_app.services.embedding_backfill``). Rows that are already current cost
+a hash comparison, so the nightly run is cheap on an unchanged catalog.
+"""
+
+import logging
+from typing import List, Optional
+
+from lyo_app.core.celery_app import celery_app
+from lyo_app.tasks.memory_synthesis import AsyncSessionLocal, run_async
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, name="lyo_app.tasks.embeddings.backfill_embeddings")
+def backfill_embeddings_task(self, tables: Optional[List[str]] = None, batch_size: int = 200, force: bool = False):
+    """
+    Re-embed stale rows.
+
+    Args:
+        tables: Table names to process (default: courses, lessons, memory_insights)
+        batch_size: Rows embedded and committed per round
+        force: Re-embed every row (e.g. after switching embedding model)
+    """
+    from lyo_app.services.embedding_backfill import EMBEDDING_SOURCES, backfill_embeddings
+
+    models = [m for m in EMBEDDING_SOURCES if not tables or m.__tablename__ in tables]
+
+    async def _backfill():
+        async with AsyncSessionLocal() as db:
+            return await backfill_embeddings(db, models, batch_size=batch_size, force=force)
+
+    try:
+        report = run_async(_backfill())
+        return {"status": "success", "tables": report}
+    except Exception as e:
+        logger.exception(f"Embedding backfill failed: {e}")
+        raise
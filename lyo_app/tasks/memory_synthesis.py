@@ -7,19 +7,20 @@ makes Lyo feel like an indispensable companion.
 """
 
 import logging
-import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 
 from celery import current_task
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from lyo_app.core.async_worker import run_async, worker_loop
 from lyo_app.core.celery_app import celery_app
 from lyo_app.core.config import settings
 from lyo_app.auth.models import User
 from lyo_app.ai_agents.models import MentorInteraction
+from lyo_app.personalization.models import MemorySynthesisState
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,7 @@ def _build_async_database_url(url: str) -> str:
 ASYNC_DATABASE_URL = _build_async_database_url(DATABASE_URL)
 async_engine = create_async_engine(ASYNC_DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+worker_loop.on_shutdown(async_engine.dispose)
 
 
 def get_sync_db() -> Session:
@@ -95,16 +97,6 @@ async def get_async_db() -> AsyncSession:
         yield session
 
 
-def run_async(coro):
-    """Helper to run async code in sync Celery tasks."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(bind=True, name="lyo_app.tasks.memory_synthesis.synthesize_session_memory")
 def synthesize_session_memory_task(
     self,
@@ -198,26 +190,55 @@ def synthesize_full_memory_task(
         raise self.retry(exc=e, countdown=120 * (2 ** self.request.retries), max_retries=2)
 
 
+@celery_app.task(bind=True, name="lyo_app.tasks.memory_synthesis.synthesize_incremental_memory")
+def synthesize_incremental_memory_task(self, user_id: int):
+    """
+    Fold a user's interactions since their last synthesis into their memory.
+
+    Skips the LLM entirely when the user has nothing new.
+
+    Args:
+        user_id: The user's database ID
+    """
+    logger.info(f"Starting incremental memory synthesis for user {user_id}")
+
+    async def _synthesize():
+        from lyo_app.services.memory_synthesis import memory_synthesis_service
+
+        async with AsyncSessionLocal() as db:
+            return await memory_synthesis_service.synthesize_incremental_memory(user_id=user_id, db=db)
+
+    result = run_async(_synthesize())
+    if result:
+        return {"status": "success", "user_id": user_id, "memory_length": len(result)}
+    return {"status": "skipped", "user_id": user_id}
+
+
 @celery_app.task(bind=True, name="lyo_app.tasks.memory_synthesis.batch_memory_refresh")
 def batch_memory_refresh_task(
     self,
     user_ids: Optional[list] = None,
     inactive_days: int = 7,
-    batch_size: int = 50
+    batch_size: int = 50,
+    mode: str = "incremental"
 ):
     """
     Batch refresh memories for multiple users.
 
-    This task is designed to run periodically (e.g., nightly) to:
-    - Refresh memories for recently active users
-    - Create initial memories for users who don't have one yet
+    This task is designed to run periodically (e.g., nightly). In the default
+    incremental mode it queues only users with interactions past their
+    synthesis high-water mark, oldest pending activity first, so the work
+    (and LLM spend) follows activity rather than user count; users left over
+    by ``batch_size`` are picked up by the next run. ``mode="full"``
+    regenerates memories from the whole lookback window instead.
 
     Args:
         user_ids: Specific user IDs to refresh (optional)
-        inactive_days: Only refresh users active within this many days
+        inactive_days: (full mode) Only refresh users active within this many days
         batch_size: Maximum users to process in one batch
+        mode: "incremental" or "full"
     """
-    logger.info(f"Starting batch memory refresh")
+    logger.info(f"Starting batch memory refresh ({mode})")
 
     db = get_sync_db()
 
@@ -225,13 +246,20 @@ def batch_memory_refresh_task(
         if user_ids:
             # Refresh specific users
             users_to_refresh = user_ids[:batch_size]
+        elif mode == "incremental":
+            # Users with interactions newer than their high-water mark
+            result = db.execute(
+                select(MentorInteraction.user_id)
+                .outerjoin(MemorySynthesisState, MemorySynthesisState.user_id == MentorInteraction.user_id)
+                .where(MentorInteraction.id > func.coalesce(MemorySynthesisState.last_interaction_id, 0))
+                .group_by(MentorInteraction.user_id)
+                .order_by(func.min(MentorInteraction.id))
+                .limit(batch_size)
+            )
+            users_to_refresh = [row[0] for row in result.fetchall()]
         else:
-            # Find users who need refresh:
-            # 1. Active in last N days
-            # 2. Either no memory or memory is stale
-            since = datetime.utcnow() - timedelta(days=inactive_days)
-
             # Find users with recent interactions
+            since = datetime.utcnow() - timedelta(days=inactive_days)
             result = db.execute(
                 select(MentorInteraction.user_id)
                 .where(MentorInteraction.timestamp >= since)
@@ -243,11 +271,14 @@ def batch_memory_refresh_task(
         # Queue individual refresh tasks
         queued_count = 0
         for user_id in users_to_refresh:
-            synthesize_full_memory_task.delay(user_id=user_id, lookback_days=30)
+            if mode == "incremental":
+                synthesize_incremental_memory_task.delay(user_id=user_id)
+            else:
+                synthesize_full_memory_task.delay(user_id=user_id, lookback_days=30)
             queued_count += 1
 
         logger.info(f"Batch memory refresh queued {queued_count} users")
-        return {"status": "success", "queued_count": queued_count}
+        return {"status": "success", "mode": mode, "queued_count": queued_count}
 
     except Exception as e:
         logger.exception(f"Batch memory refresh failed: {e}")
@@ -0,0 +1,39 @@
+"""
+Messaging maintenance tasks.
+
+``reconcile_inbox`` recomputes each conversation's last-message pointer and
+each participant's unread counter from the messages table (see
+``lyo_app.services.messaging_inbox``). The counters are kept current on
+every send/read/delete, so a healthy run writes nothing; anything it does
+repair is logged.
+"""
+
+import logging
+from typing import List, Optional
+
+from lyo_app.core.celery_app import celery_app
+from lyo_app.tasks.memory_synthesis import AsyncSessionLocal, run_async
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, name="lyo_app.tasks.messaging.reconcile_inbox")
+def reconcile_inbox_task(self, conversation_ids: Optional[List[int]] = None):
+    """
+    Repair inbox counter drift.
+
+    Args:
+        conversation_ids: Limit the repair to these conversations (default: all)
+    """
+    from lyo_app.services.messaging_inbox import reconcile_inbox
+
+    async def _reconcile():
+        async with AsyncSessionLocal() as db:
+            return await reconcile_inbox(db, conversation_ids)
+
+    try:
+        report = run_async(_reconcile())
+        return {"status": "success", "repaired": report}
+    except Exception as e:
+        logger.exception(f"Inbox reconciliation failed: {e}")
+        raise
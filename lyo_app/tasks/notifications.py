@@ -11,6 +11,7 @@ from datetime import datetime
 from celery import current_task
 from sqlalchemy.orm import Session
 
+from lyo_app.core.async_worker import on_worker_loop
 from lyo_app.core.celery_app import celery_app
 from lyo_app.tasks.course_generation import get_sync_db
 from lyo_app.models.production import PushDevice, Course
@@ -90,8 +91,9 @@ class APNsService:
 apns_service = APNsService()
 
 
-@celery_app.task(bind=True)
-def send_push_notification_task(
+@celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={"countdown": 60, "max_retries": 3})
+@on_worker_loop
+async def send_push_notification_task(
     self,
     user_id: str,
     title: str,
@@ -102,17 +104,6 @@ def send_push_notification_task(
     Send push notification to all user devices using PushNotificationService.
     """
     from lyo_app.services.push_notifications import push_service, PushNotification
-    import asyncio
-
-    # Helper to run async in sync Celery (copied from proactive_engagement.py if needed, 
-    # or just use a simple local loop here)
-    def run_async(coro):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
 
     try:
         notification = PushNotification(
@@ -129,14 +120,16 @@ def send_push_notification_task(
             # Maybe it's a UUID? Check if we can handle it
             u_id = str(user_id) 
 
-        sent_count = run_async(push_service.send_to_user(u_id, notification))
+        sent_count = await push_service.send_to_user(u_id, notification)
         
         logger.info(f"Task sent {sent_count} notifications to user {user_id}")
         return {"status": "success", "sent_count": sent_count}
         
-    except Exception as e:
+    except Exception:
+        # Retried by autoretry_for: self.retry() needs Celery's thread-local
+        # request, which the worker loop's thread does not have
         logger.exception(f"Failed to send push notifications for user {user_id}")
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        raise
 
 
 @celery_app.task(bind=True)
@@ -3,25 +3,20 @@ Proactive Engagement Celery Tasks
 
 Scheduled and on-demand tasks for proactive user engagement.
 These tasks run periodically to identify users who need nudges
-and queue personalized notifications.
+and send personalized notifications in chunked, checkpointed sweeps.
 """
 
 import logging
-import asyncio
-from datetime import datetime, timedelta
 from typing import List, Optional
 
 from celery import current_task
-from sqlalchemy import create_engine, select, func, and_
+from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from lyo_app.core.async_worker import run_async, worker_loop
 from lyo_app.core.celery_app import celery_app
 from lyo_app.core.config import settings
-from lyo_app.auth.models import User
-from lyo_app.ai_agents.models import MentorInteraction
-from lyo_app.gamification.models import Streak
-from lyo_app.personalization.models import SpacedRepetitionSchedule
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +43,7 @@ SyncSessionLocal = sessionmaker(bind=sync_engine)
 
 async_engine = create_async_engine(ASYNC_DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+worker_loop.on_shutdown(async_engine.dispose)
 
 
 def get_sync_db() -> Session:
@@ -55,18 +51,13 @@ def get_sync_db() -> Session:
     return SyncSessionLocal()
 
 
-def run_async(coro):
-    """Helper to run async code in sync Celery tasks."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 # ==================== Scheduled Tasks ====================
 
+# Each scheduled task runs one chunked sweep (lyo_app.services.engagement_sweeps):
+# candidates are read in keyset chunks, every nudge of a chunk is built from
+# bulk queries and pushed in one batch, and a checkpoint lets a crashed run
+# resume. The per-user nudge tasks below remain for on-demand sends.
+
 @celery_app.task(bind=True, name="lyo_app.tasks.proactive_engagement.check_streak_reminders")
 def check_streak_reminders_task(self):
     """
@@ -74,46 +65,14 @@ def check_streak_reminders_task(self):
 
     Runs every hour to catch users before their 24-hour window closes.
     """
-    logger.info("Running streak reminder check...")
-    db = get_sync_db()
+    from lyo_app.services.engagement_sweeps import STREAK_REMINDERS, run_sweep
 
+    logger.info("Running streak reminder check...")
     try:
-        # Find streaks that will break in 4-6 hours
-        now = datetime.utcnow()
-        warning_threshold = now - timedelta(hours=20)  # 20 hours since last activity
-
-        # Get streaks at risk
-        streaks_at_risk = db.query(Streak).filter(
-            and_(
-                Streak.current_count >= 3,  # Only remind if they have a real streak
-                Streak.last_activity_at <= warning_threshold,
-                Streak.last_activity_at >= warning_threshold - timedelta(hours=4)  # Don't re-remind
-            )
-        ).all()
-
-        logger.info(f"Found {len(streaks_at_risk)} streaks at risk")
-
-        queued_count = 0
-        for streak in streaks_at_risk:
-            # Queue individual nudge
-            send_streak_nudge_task.delay(
-                user_id=streak.user_id,
-                streak_count=streak.current_count,
-                nudge_type="warning"
-            )
-            queued_count += 1
-
-        return {
-            "status": "success",
-            "streaks_checked": len(streaks_at_risk),
-            "nudges_queued": queued_count
-        }
-
+        return run_async(run_sweep(STREAK_REMINDERS, AsyncSessionLocal))
     except Exception as e:
         logger.exception(f"Streak reminder check failed: {e}")
         raise
-    finally:
-        db.close()
 
 
 @celery_app.task(bind=True, name="lyo_app.tasks.proactive_engagement.check_spaced_repetition_due")
@@ -123,46 +82,14 @@ def check_spaced_repetition_due_task(self):
 
     Runs twice daily (morning and evening) to remind users.
     """
-    logger.info("Running spaced repetition due check...")
-    db = get_sync_db()
+    from lyo_app.services.engagement_sweeps import SPACED_REPETITION_DUE, run_sweep
 
+    logger.info("Running spaced repetition due check...")
     try:
-        now = datetime.utcnow()
-
-        # Get users with items due
-        result = db.execute(
-            select(
-                SpacedRepetitionSchedule.user_id,
-                func.count(SpacedRepetitionSchedule.id).label("due_count")
-            )
-            .where(SpacedRepetitionSchedule.next_review <= now)
-            .group_by(SpacedRepetitionSchedule.user_id)
-            .having(func.count(SpacedRepetitionSchedule.id) >= 3)  # At least 3 items due
-        )
-        users_with_due_items = result.fetchall()
-
-        logger.info(f"Found {len(users_with_due_items)} users with items due")
-
-        queued_count = 0
-        for row in users_with_due_items:
-            user_id, due_count = row
-            send_spaced_rep_nudge_task.delay(
-                user_id=user_id,
-                due_count=due_count
-            )
-            queued_count += 1
-
-        return {
-            "status": "success",
-            "users_checked": len(users_with_due_items),
-            "nudges_queued": queued_count
-        }
-
+        return run_async(run_sweep(SPACED_REPETITION_DUE, AsyncSessionLocal))
     except Exception as e:
         logger.exception(f"Spaced repetition check failed: {e}")
         raise
-    finally:
-        db.close()
 
 
 @celery_app.task(bind=True, name="lyo_app.tasks.proactive_engagement.check_inactive_users")
@@ -172,52 +99,14 @@ def check_inactive_users_task(self, inactive_days: int = 7):
 
     Runs daily to identify users who might be churning.
     """
-    logger.info(f"Running inactive user check (threshold: {inactive_days} days)...")
-    db = get_sync_db()
+    from lyo_app.services.engagement_sweeps import inactive_users_sweep, run_sweep
 
+    logger.info(f"Running inactive user check (threshold: {inactive_days} days)...")
     try:
-        cutoff = datetime.utcnow() - timedelta(days=inactive_days)
-        max_cutoff = datetime.utcnow() - timedelta(days=inactive_days + 7)  # Don't re-nudge
-
-        # Find users with last interaction in the window
-        result = db.execute(
-            select(
-                MentorInteraction.user_id,
-                func.max(MentorInteraction.timestamp).label("last_active")
-            )
-            .group_by(MentorInteraction.user_id)
-            .having(
-                and_(
-                    func.max(MentorInteraction.timestamp) <= cutoff,
-                    func.max(MentorInteraction.timestamp) >= max_cutoff
-                )
-            )
-        )
-        inactive_users = result.fetchall()
-
-        logger.info(f"Found {len(inactive_users)} inactive users")
-
-        queued_count = 0
-        for row in inactive_users:
-            user_id, last_active = row
-            days_inactive = (datetime.utcnow() - last_active).days
-            send_comeback_nudge_task.delay(
-                user_id=user_id,
-                days_inactive=days_inactive
-            )
-            queued_count += 1
-
-        return {
-            "status": "success",
-            "users_checked": len(inactive_users),
-            "nudges_queued": queued_count
-        }
-
+        return run_async(run_sweep(inactive_users_sweep(inactive_days), AsyncSessionLocal))
     except Exception as e:
         logger.exception(f"Inactive user check failed: {e}")
         raise
-    finally:
-        db.close()
 
 
 @celery_app.task(bind=True, name="lyo_app.tasks.proactive_engagement.send_weekly_digests")
@@ -227,38 +116,14 @@ def send_weekly_digests_task(self):
 
     Runs every Sunday evening.
     """
-    logger.info("Sending weekly digests...")
-    db = get_sync_db()
+    from lyo_app.services.engagement_sweeps import WEEKLY_DIGESTS, run_sweep
 
+    logger.info("Sending weekly digests...")
     try:
-        since = datetime.utcnow() - timedelta(days=7)
-
-        # Find users with activity this week
-        result = db.execute(
-            select(MentorInteraction.user_id)
-            .where(MentorInteraction.timestamp >= since)
-            .distinct()
-        )
-        active_users = [row[0] for row in result.fetchall()]
-
-        logger.info(f"Sending digests to {len(active_users)} active users")
-
-        queued_count = 0
-        for user_id in active_users:
-            generate_weekly_digest_task.delay(user_id=user_id)
-            queued_count += 1
-
-        return {
-            "status": "success",
-            "users": len(active_users),
-            "digests_queued": queued_count
-        }
-
+        return run_async(run_sweep(WEEKLY_DIGESTS, AsyncSessionLocal))
     except Exception as e:
         logger.exception(f"Weekly digest send failed: {e}")
         raise
-    finally:
-        db.close()
 
 
 # ==================== Individual Nudge Tasks ====================
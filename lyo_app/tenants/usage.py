@@ -118,23 +118,23 @@ async def log_usage_async(
 ) -> None:
     """
     Fire-and-forget usage logging.
-    
-    Creates its own database session for background logging.
-    Safe to call with asyncio.create_task().
+
+    Queues the row on the shared write-behind ``batch_writer``, which
+    bulk-inserts usage logs on the background pool instead of committing
+    one row per request. Safe to call with asyncio.create_task().
     """
-    try:
-        from lyo_app.core.database import AsyncSessionLocal
-        
-        async with AsyncSessionLocal() as db:
-            await log_api_usage(
-                db=db,
-                organization_id=organization_id,
-                endpoint=endpoint,
-                method=method,
-                status_code=status_code,
-                latency_ms=latency_ms,
-                tokens_used=tokens_used,
-                **kwargs
-            )
-    except Exception as e:
-        logger.warning(f"Background usage logging failed: {e}")
+    from lyo_app.core.batch_writer import batch_writer
+
+    if not batch_writer.submit(
+        UsageLog,
+        organization_id=organization_id,
+        endpoint=endpoint[:200],
+        method=method,
+        status_code=status_code,
+        latency_ms=latency_ms,
+        tokens_used=tokens_used,
+        cost_usd=kwargs.get("cost_usd", 0.0),
+        api_key_id=kwargs.get("api_key_id"),
+        user_id=kwargs.get("user_id"),
+    ):
+        logger.warning("Usage log buffer full; dropped usage row")
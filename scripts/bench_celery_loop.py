@@ -0,0 +1,106 @@
+"""
+Per-task overhead of running async code from Celery tasks.
+
+    python scripts/bench_celery_loop.py
+    python scripts/bench_celery_loop.py --tasks 2000
+
+Compares the old ``run_async`` (new event loop per task, so nothing pooled
+can survive between tasks) with the persistent ``worker_loop``:
+
+  * empty: a coroutine that returns immediately (loop setup cost alone)
+  * db: one ``SELECT 1`` on an aiosqlite database - the old helper has to
+    open a connection per task, the worker loop reuses its pool
+  * threads: the db task from 16 pool threads at once (``-P threads``)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from lyo_app.core.async_worker import WorkerLoop  # noqa: E402
+
+
+def old_run_async(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def report(label, n, seconds):
+    print(f"  {label:<38} {seconds / n * 1e6:>9,.0f} us/task {n / seconds:>10,.0f} tasks/s")
+
+
+async def empty():
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    args = parser.parse_args()
+    n = args.tasks
+    url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    print(f"\n== {n:,} empty tasks ==")
+    started = time.perf_counter()
+    for _ in range(n):
+        old_run_async(empty())
+    report("old (new loop per task)", n, time.perf_counter() - started)
+
+    runner = WorkerLoop()
+    started = time.perf_counter()
+    for _ in range(n):
+        runner.run(empty())
+    report("worker_loop", n, time.perf_counter() - started)
+
+    print(f"\n== {n:,} tasks running SELECT 1 ==")
+
+    async def old_db_task():
+        engine = create_async_engine(url)
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    started = time.perf_counter()
+    for _ in range(n):
+        old_run_async(old_db_task())
+    report("old (connect per task)", n, time.perf_counter() - started)
+
+    engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=16)
+    runner.on_shutdown(engine.dispose)
+
+    async def db_task():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    started = time.perf_counter()
+    for _ in range(n):
+        runner.run(db_task())
+    report("worker_loop (pooled)", n, time.perf_counter() - started)
+
+    with ThreadPoolExecutor(16) as pool:
+        started = time.perf_counter()
+        list(pool.map(lambda _: old_run_async(old_db_task()), range(n)))
+        report("old, 16 threads", n, time.perf_counter() - started)
+        started = time.perf_counter()
+        list(pool.map(lambda _: runner.run(db_task()), range(n)))
+        report("worker_loop, 16 threads", n, time.perf_counter() - started)
+
+    runner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Discover places listing: per-request list copy + scalar haversine vs
+``PlaceCatalog``.
+
+    python scripts/bench_discover.py
+    python scripts/bench_discover.py --places 50000 --requests 200
+
+Builds a synthetic catalog of ``--places`` places clustered around a few
+hundred cities, then times the work ``list_places`` does per request
+(query, sort, page, serialize) for three request shapes: a 50km proximity
+search, a 2000km one, and the default featured/rating listing of one
+category. "before" reproduces the old handler; "after" is
+``PlaceCatalog.query`` + ``render_list``. Also reports the catalog build
+time, which is what a hot reload costs.
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.routers.discover import Place, PlaceDetail, PlacesResponse  # noqa: E402
+from lyo_app.services.place_catalog import PlaceCatalog  # noqa: E402
+
+CATEGORIES = ["museum", "library", "university", "lab", "coworking", "landmark"]
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    R = 6371.0
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def make_places(n, seed=0):
+    rng = random.Random(seed)
+    cities = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(300)]
+    places = []
+    for i in range(n):
+        lat, lng = rng.choice(cities)
+        places.append(PlaceDetail(
+            id=f"place-{i}", name=f"Place {i}", description="An educational place " * 4,
+            category=rng.choice(CATEGORIES), lat=lat + rng.gauss(0, 0.3), lng=lng + rng.gauss(0, 0.3),
+            rating=round(rng.uniform(3, 5), 1), review_count=rng.randrange(10000),
+            image_url="https://images.example.com/x.jpg", address="1 Example St", tags=["a", "b"],
+            is_featured=rng.random() < 0.05, hours="9-5", phone="+1",
+            reviews=[{"user": "A", "rating": 5, "text": "Great"}],
+        ))
+    return places, cities
+
+
+def before(places, lat, lng, radius_km, category, per_page=20):
+    results = list(places)
+    if category:
+        results = [p for p in results if p.category == category]
+    if lat is not None:
+        results = [p for p in results if _haversine_km(lat, lng, p.lat, p.lng) <= radius_km]
+        results.sort(key=lambda p: _haversine_km(lat, lng, p.lat, p.lng))
+    else:
+        results.sort(key=lambda p: (-int(p.is_featured), -p.rating))
+    page = [Place(**p.model_dump(exclude={"hours", "phone", "reviews"})) for p in results[:per_page]]
+    return PlacesResponse(places=page, total=len(results)).model_dump_json().encode()
+
+
+def after(catalog, lat, lng, radius_km, category, per_page=20):
+    return catalog.render_list(catalog.query(category, lat, lng, radius_km), 0, per_page)
+
+
+def timed(fn, requests):
+    samples = []
+    for args in requests:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    places, cities = make_places(args.places)
+    started = time.perf_counter()
+    catalog = PlaceCatalog(places)
+    print(f"\n== {args.places} places; catalog build (= hot reload) {time.perf_counter() - started:.2f}s ==")
+
+    rng = random.Random(1)
+    shapes = {
+        "radius 50km   ": lambda: (*rng.choice(cities), 50.0, None),
+        "radius 2000km ": lambda: (*rng.choice(cities), 2000.0, None),
+        "category list ": lambda: (None, None, 50.0, rng.choice(CATEGORIES)),
+    }
+    for label, make in shapes.items():
+        requests = [make() for _ in range(args.requests)]
+        for request in requests:
+            assert before(places, *request) == after(catalog, *request)
+        old_p50, old_p99 = timed(lambda *a: before(places, *a), requests)
+        new_p50, new_p99 = timed(lambda *a: after(catalog, *a), requests)
+        print(f"  {label} before p50 {old_p50:8.2f}ms p99 {old_p99:8.2f}ms   "
+              f"after p50 {new_p50:6.3f}ms p99 {new_p99:6.3f}ms   ({old_p50 / new_p50:5.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
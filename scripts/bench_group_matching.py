@@ -0,0 +1,146 @@
+"""
+Study-group matching in a popular subject: load-everything-and-score vs
+the snapshot matcher behind ``CollaborativeLearningEngine.find_suitable_groups``.
+
+    python scripts/bench_group_matching.py
+    python scripts/bench_group_matching.py --groups 20000 --requests 50
+
+Seeds ``--groups`` public groups in one subject (about 5 members each, a
+tenth of them full, 3-6 target skills from a vocabulary of 300) into a
+SQLite database, then times a request for a learner with 4 skill
+interests:
+
+  * before: every group plus all memberships loaded as ORM objects, each
+    group scored by an awaited per-group function, full sort, top 10
+  * after, cold: snapshot query + vectorized scoring + load of the 10 groups
+  * after, warm: the same with the subject's snapshot cached
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from lyo_app.auth.models import User  # noqa: E402
+from lyo_app.collaboration.matching import group_match_cache  # noqa: E402
+from lyo_app.collaboration.models import (  # noqa: E402
+    CollaborativeGroupMembership as GroupMembership,
+    CollaborativeStudyGroup as StudyGroup,
+)
+from lyo_app.collaboration.service import CollaborativeLearningEngine  # noqa: E402
+from lyo_app.core.database import Base  # noqa: E402
+
+SKILLS = [f"skill-{i}" for i in range(300)]
+
+
+async def seed(db, groups, rng):
+    group_rows, member_rows = [], []
+    for gid in range(1, groups + 1):
+        capacity = rng.randint(4, 12)
+        members = capacity if rng.random() < 0.1 else rng.randint(1, capacity - 1)
+        group_rows.append(dict(
+            id=gid, title=f"Group {gid}", subject_area="math", collaboration_type="study_group", created_by=1,
+            max_members=capacity, target_skills=rng.sample(SKILLS, rng.randint(3, 6)),
+            activity_score=rng.uniform(0, 1.2), learning_effectiveness=rng.choice([None, rng.uniform(0.4, 1)]),
+            is_active=True, is_public=True,
+        ))
+        member_rows.extend(dict(group_id=gid, user_id=uid, is_active=True) for uid in range(members))
+    await db.execute(insert(StudyGroup), group_rows)
+    await db.execute(insert(GroupMembership), member_rows)
+    await db.commit()
+
+
+async def before(db, interests):
+    """The old path: ORM groups + all memberships, per-group awaited scoring, full sort."""
+    groups = (await db.execute(select(StudyGroup).where(
+        StudyGroup.is_active == True, StudyGroup.is_public == True, StudyGroup.subject_area == "math",  # noqa: E712
+    ))).scalars().all()
+    memberships = (await db.execute(
+        select(GroupMembership).where(GroupMembership.group_id.in_([g.id for g in groups]))
+    )).scalars().all()
+    counts = {}
+    for m in memberships:
+        if m.is_active:
+            counts[m.group_id] = counts.get(m.group_id, 0) + 1
+
+    async def score(group, members):
+        skill = len(set(interests) & set(group.target_skills or [])) / max(len(interests), 1)
+        ideal = group.max_members * 0.6
+        return min(0.4 * skill + 0.2 * min(group.activity_score or 0.0, 1.0)
+                   + 0.2 * (1.0 - abs(members - ideal) / ideal) + 0.2 * (group.learning_effectiveness or 0.7), 1.0)
+
+    ranked = []
+    for group in groups:
+        members = counts.get(group.id, 0)
+        if members >= group.max_members:
+            continue
+        match = await score(group, members)
+        if match > 0.5:
+            ranked.append((match, group))
+    ranked.sort(key=lambda pair: pair[0], reverse=True)
+    return [group.id for _, group in ranked[:10]]
+
+
+async def main_async(args):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    statements = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(
+            c, tables=[User.__table__, StudyGroup.__table__, GroupMembership.__table__]))
+    rng = random.Random(0)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        await seed(db, args.groups, rng)
+    matcher = CollaborativeLearningEngine()
+    requests = [rng.sample(SKILLS[:60], 4) for _ in range(args.requests)]
+
+    async def run(label, fn, cold):
+        samples, counted = [], []
+        for interests in requests:
+            if cold:
+                group_match_cache.clear()
+            async with sessions() as db:
+                statements[0] = 0
+                started = time.perf_counter()
+                await fn(db, interests)
+                samples.append((time.perf_counter() - started) * 1000)
+                counted.append(statements[0])
+        print(f"  {label} p50 {statistics.median(samples):8.2f}ms  max {max(samples):8.2f}ms  "
+              f"{statistics.mean(counted):.0f} statements")
+
+    async def after(db, interests):
+        return [r["group"].id for r in await matcher.find_suitable_groups(1, "math", interests, db)]
+
+    async with sessions() as db:
+        for interests in requests[:5]:
+            group_match_cache.clear()
+            old = await before(db, interests)
+            new = await after(db, interests)
+            assert new == old, (old, new)
+
+    print(f"\n== {args.groups} groups in one subject, {args.requests} requests ==")
+    await run("before      ", before, cold=True)
+    await run("after, cold ", after, cold=True)
+    await run("after, warm ", after, cold=False)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Conversation inbox latency as a user's conversation count grows.
+
+    python scripts/bench_inbox.py
+    python scripts/bench_inbox.py --sizes 100,1000,5000 --messages 5
+
+For each size, seeds one user with that many conversations (``--messages``
+per conversation, on an aiosqlite file) and times opening the inbox:
+
+  * old: the previous ``list_conversations`` - load every conversation, then
+    one latest-message query and one unread ``COUNT`` per conversation
+  * new: ``load_inbox`` - first keyset page from the denormalized rows
+    (two queries whatever the conversation count)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, desc, func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from lyo_app.auth.models import User  # noqa: E402
+from lyo_app.core.database import Base  # noqa: E402
+from lyo_app.models.social import Conversation, ConversationParticipant, Message  # noqa: E402
+from lyo_app.services.messaging_inbox import load_inbox, reconcile_inbox  # noqa: E402
+
+TABLES = [User.__table__, Conversation.__table__, ConversationParticipant.__table__, Message.__table__]
+
+
+async def seed(sessions, conversations, messages):
+    now = datetime.utcnow()
+    async with sessions() as db:
+        await db.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "x"}
+            for i in range(1, conversations + 2)
+        ])
+        await db.execute(insert(Conversation), [
+            {"id": c, "type": "direct", "created_at": now, "updated_at": now - timedelta(minutes=c)}
+            for c in range(1, conversations + 1)
+        ])
+        await db.execute(insert(ConversationParticipant), [
+            {"conversation_id": c, "user_id": uid, "unread_count": 0}
+            for c in range(1, conversations + 1) for uid in (1, c + 1)
+        ])
+        await db.execute(insert(Message), [
+            {"conversation_id": c, "sender_id": c + 1 if m % 2 == 0 else 1, "content": f"message {m}",
+             "message_type": "text", "is_deleted": False, "created_at": now - timedelta(minutes=c, seconds=-m)}
+            for c in range(1, conversations + 1) for m in range(messages)
+        ])
+        await db.commit()
+        await reconcile_inbox(db)
+
+
+async def old_inbox(db, user_id):
+    parts = (await db.execute(
+        select(ConversationParticipant).where(ConversationParticipant.user_id == user_id)
+    )).scalars().all()
+    last_read = {p.conversation_id: p.last_read_at for p in parts}
+    convs = (await db.execute(
+        select(Conversation)
+        .where(Conversation.id.in_(list(last_read)))
+        .options(selectinload(Conversation.participants).selectinload(ConversationParticipant.user))
+        .order_by(desc(Conversation.updated_at))
+    )).scalars().unique().all()
+    out = []
+    for conv in convs:
+        last = (await db.execute(
+            select(Message).where(Message.conversation_id == conv.id).order_by(desc(Message.created_at)).limit(1)
+        )).scalar_one_or_none()
+        filters = [Message.conversation_id == conv.id, Message.sender_id != user_id, Message.is_deleted == False]  # noqa: E712
+        if last_read.get(conv.id) is not None:
+            filters.append(Message.created_at > last_read[conv.id])
+        unread = (await db.execute(select(func.count(Message.id)).where(and_(*filters)))).scalar()
+        out.append((conv, last, unread))
+    return out
+
+
+async def timed(sessions, fn, runs):
+    samples = []
+    for _ in range(runs):
+        async with sessions() as db:
+            started = time.perf_counter()
+            await fn(db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def bench(size, messages, runs):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/inbox.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=TABLES))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    await seed(sessions, size, messages)
+
+    old = await timed(sessions, lambda db: old_inbox(db, 1), runs)
+    new = await timed(sessions, lambda db: load_inbox(db, 1, limit=50), runs)
+    print(f"  {size:>7,} conversations   old {old:>9.1f} ms   new (page of 50) {new:>6.2f} ms")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,3000")
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"\n== inbox open, {args.messages} messages per conversation (median of {args.runs}) ==")
+    for size in (int(s) for s in args.sizes.split(",")):
+        asyncio.run(bench(size, args.messages, args.runs))
+
+
+if __name__ == "__main__":
+    main()
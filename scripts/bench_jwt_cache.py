@@ -0,0 +1,88 @@
+"""
+JWT verification cache memory and latency under login churn.
+
+    python scripts/bench_jwt_cache.py
+    python scripts/bench_jwt_cache.py --logins 200000 --max-entries 10000
+
+Simulates ``--logins`` distinct access tokens, each verified a few times
+(as a client makes its first requests after logging in), and reports:
+
+  * resident cache size (tracemalloc) for the old unbounded dict keyed by
+    the full token vs the bounded digest-keyed LRU
+  * ``verify_token_async`` latency on a cache miss (signature check) vs hit
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.auth.jwt_auth import create_access_token, jwt_cache, verify_token_async  # noqa: E402
+from lyo_app.auth.jwt_cache import JWTCache  # noqa: E402
+
+
+class UnboundedCache:
+    """The previous cache: every token stays until it is looked up again after expiry."""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._cache = {}
+
+    def get(self, token):
+        entry = self._cache.get(token)
+        if entry is not None and time.time() < entry["expires"]:
+            return entry["data"]
+        return None
+
+    def set(self, token, data):
+        self._cache[token] = {"data": data, "expires": time.time() + self.ttl}
+
+
+def resident_mb(cache, tokens, payloads):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for token, payload in zip(tokens, payloads):
+        if cache.get(token) is None:
+            cache.set(token, payload)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size / 1e6
+
+
+async def verify_latency(tokens):
+    jwt_cache.clear()
+    miss, hit = [], []
+    for token in tokens:
+        for samples in (miss, hit, hit):
+            started = time.perf_counter()
+            await verify_token_async(token)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(miss) * 1e6, statistics.median(hit) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100_000)
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"\n== {args.logins:,} logins ==")
+    tokens = [create_access_token(str(i % 5000)) for i in range(args.logins)]
+    payloads = [{"user_id": str(i % 5000), "token_type": "access", "exp": time.time() + 1800, "iat": time.time(),
+                 "jti": f"{i:016x}", "sub": str(i % 5000), "iss": "lyo-backend"} for i in range(args.logins)]
+    old = resident_mb(UnboundedCache(), tokens, payloads)
+    new = resident_mb(JWTCache(max_entries=args.max_entries), tokens, payloads)
+    print(f"  resident cache   old (unbounded, token keys) {old:8.1f} MB   "
+          f"new (LRU {args.max_entries:,}, digest keys) {new:6.1f} MB")
+
+    miss, hit = asyncio.run(verify_latency(tokens[:2000]))
+    print(f"  verify_token_async   miss p50 {miss:6.1f} us   hit p50 {hit:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark per-request middleware overhead.
+
+    python scripts/bench_middleware.py [--requests 5000]
+
+"before" reproduces the previous layering: two BaseHTTPMiddleware classes,
+three ``@app.middleware("http")`` functions, CORS and Starlette's GZip.
+"after" is the pure-ASGI chain installed by ``enhanced_main.create_app``.
+Both wrap the same trivial endpoint and are driven directly over ASGI so
+only middleware cost is measured. Rate limiting and monitoring are stubbed
+to no-ops on both sides.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.middleware.gzip import GZipMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from lyo_app.middleware.asgi import (  # noqa: E402
+    ErrorHandlingMiddleware,
+    RequestSizeLimitMiddleware,
+    StreamingSafeGZipMiddleware,
+    TimingMiddleware,
+)
+from lyo_app.middleware.security_middleware import SecurityMiddleware  # noqa: E402
+from lyo_app.middleware.usage_middleware import UsageMiddleware  # noqa: E402
+
+
+class _NullMonitor:
+    def record_request(self, **kwargs):
+        pass
+
+
+class _PassThrough(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        return response
+
+
+def _endpoint_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def build_before() -> FastAPI:
+    app = _endpoint_app()
+    app.add_middleware(_PassThrough)  # UsageMiddleware
+    app.add_middleware(_PassThrough)  # SecurityMiddleware
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    async def http_mw(request: Request, call_next):
+        return await call_next(request)
+
+    for _ in range(3):  # timing, errors, size limit
+        app.middleware("http")(http_mw)
+    return app
+
+
+def build_after() -> FastAPI:
+    app = _endpoint_app()
+    app.add_middleware(UsageMiddleware)
+    app.add_middleware(SecurityMiddleware, enable_rate_limiting=False)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1000)
+    app.add_middleware(TimingMiddleware, monitor=_NullMonitor())
+    app.add_middleware(ErrorHandlingMiddleware, handler=None)
+    app.add_middleware(RequestSizeLimitMiddleware)
+    return app
+
+
+async def drive(app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "query_string": b"", "root_path": "", "server": ("test", 80),
+        "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(scope, state={}), receive, send)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope, state={}), receive, send)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    n = parser.parse_args().requests
+
+    bare = await drive(_endpoint_app(), n)
+    before = await drive(build_before(), n)
+    after = await drive(build_after(), n)
+    for label, elapsed in (("no middleware", bare), ("before", before), ("after", after)):
+        overhead = (elapsed - bare) / n * 1e6
+        print(f"{label:<14} {elapsed / n * 1e6:8.1f} us/request  (middleware overhead {overhead:7.1f} us)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Event-loop lag during a login storm: inline KDF vs ``password_hasher``.
+
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --logins 400 --concurrency 100
+
+Fires ``--logins`` password verifications, ``--concurrency`` at a time, while
+a heartbeat task sleeps 5ms in a loop and records how late each wake-up is
+(what every other request on the worker, e.g. a streaming response, would
+see). Compares:
+
+  * inline: ``verify_password`` called in the coroutine, as the handlers did
+  * pool: ``await password_hasher.verify(...)``
+
+and, for the pool, a storm large enough to trip shedding (503s).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.auth.password_hashing import password_hasher  # noqa: E402
+from lyo_app.auth.security import verify_password  # noqa: E402
+from lyo_app.core.problems import ServiceOverloadedProblem  # noqa: E402
+
+
+async def heartbeat(lags, stop, interval=0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def storm(verify, hashed, logins, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    outcome = {"ok": 0, "shed": 0}
+
+    async def login():
+        async with gate:
+            try:
+                assert await verify("correct horse battery", hashed)
+                outcome["ok"] += 1
+            except ServiceOverloadedProblem:
+                outcome["shed"] += 1
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    return outcome, elapsed, statistics.median(lags) if lags else 0.0, p99, lags[-1] if lags else 0.0
+
+
+async def inline_verify(password, hashed):
+    return verify_password(password, hashed)
+
+
+async def main_async(logins, concurrency):
+    hashed = password_hasher.hash_sync("correct horse battery")
+    print(f"\n== {logins} logins, {concurrency} concurrent, {password_hasher.workers} KDF workers ==")
+    runs = (
+        ("inline              ", inline_verify, concurrency),
+        ("pool                ", password_hasher.verify, min(concurrency, password_hasher.max_pending)),
+        ("pool, over capacity ", password_hasher.verify, concurrency * 4),
+    )
+    for label, verify, conc in runs:
+        outcome, elapsed, p50, p99, worst = await storm(verify, hashed, logins, conc)
+        print(f"  {label} {outcome['ok'] / elapsed:6.0f} logins/s  shed {outcome['shed']:4d}   "
+              f"loop lag p50 {p50:6.2f}ms  p99 {p99:7.2f}ms  max {worst:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Auth cost per request: full ``User`` load vs the principal cache.
+
+    python scripts/bench_principal.py
+    python scripts/bench_principal.py --users 500 --requests 20000
+
+Replays ``--requests`` authenticated requests spread over ``--users``
+distinct users (aiosqlite file) through:
+
+  * old: ``get_current_user`` as it was - ``select(User)`` per request
+  * new: ``get_current_principal`` - ``principal_cache`` (one slim query per
+    user per TTL)
+
+and reports database queries per request and p50 resolution time. Token
+verification is served from the JWT cache in both, so it is not measured.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import event, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from lyo_app.auth.jwt_auth import create_access_token, get_current_principal, verify_token_async  # noqa: E402
+from lyo_app.auth.models import User  # noqa: E402
+from lyo_app.auth.principal import principal_cache  # noqa: E402
+from lyo_app.core.database import Base  # noqa: E402
+
+
+async def old_current_user(credentials, db):
+    token_data = await verify_token_async(credentials.credentials, "access")
+    user = (await db.execute(select(User).where(User.id == int(token_data.user_id)))).scalars().first()
+    if not user or not user.is_active:
+        raise RuntimeError("unauthorized")
+    return user
+
+
+async def replay(sessions, resolve, requests):
+    samples = []
+    for credentials in requests:
+        async with sessions() as db:  # a session per request, as get_db gives
+            started = time.perf_counter()
+            await resolve(credentials, db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+async def bench(n_users, n_requests):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/principal.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[User.__table__]))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        await db.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"u{i}", "hashed_password": "x",
+             "bio": "x" * 400, "learning_profile": {"visual_score": 8}}
+            for i in range(1, n_users + 1)
+        ])
+        await db.commit()
+
+    tokens = {i: HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(str(i)))
+              for i in range(1, n_users + 1)}
+    rng = random.Random(7)
+    requests = [tokens[rng.randint(1, n_users)] for _ in range(n_requests)]
+
+    queries = 0
+
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    for credentials in tokens.values():
+        await verify_token_async(credentials.credentials)  # warm the JWT cache for both runs
+
+    print(f"\n== {n_requests:,} requests over {n_users:,} users ==")
+    for label, resolve in (("old select(User)    ", old_current_user), ("new principal cache ", get_current_principal)):
+        principal_cache.clear()
+        queries = 0
+        p50 = await replay(sessions, resolve, requests)
+        print(f"  {label} queries/request {queries / n_requests:6.3f}   p50 {p50:7.1f} us")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(bench(args.users, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark rate limiter overhead per request.
+
+    python scripts/bench_rate_limiter.py [--requests 20000] [--redis-url redis://localhost:6379/0]
+
+Always measures the in-process paths (local GCRA fallback, leased tokens).
+With a reachable Redis it also compares the single-EVALSHA GCRA check
+against the previous EXISTS + ZSET pipeline approach (3-5 round trips).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.core.rate_limiter import RedisRateLimiter  # noqa: E402
+
+
+def _report(label: str, n: int, elapsed: float, limiter: RedisRateLimiter = None) -> None:
+    line = f"{label:<28} {elapsed / n * 1e6:9.2f} us/request"
+    if limiter is not None:
+        line += f"   redis_calls={limiter.stats['redis_calls']} lease_hits={limiter.stats['lease_hits']}"
+    print(line)
+
+
+async def _run(limiter: RedisRateLimiter, n: int, clients: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        await limiter.is_allowed(f"client{i % clients}", "bench", limit_override=10**9)
+    return time.perf_counter() - start
+
+
+async def _legacy_pipeline(client, n: int, clients: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        now = int(time.time())
+        key = f"bench_legacy:{i % clients}"
+        if await client.exists(f"block:{key}"):
+            await client.ttl(f"block:{key}")
+        pipe = client.pipeline()
+        pipe.zremrangebyscore(key, 0, now - 60)
+        pipe.zcard(key)
+        pipe.zadd(key, {str(now): now})
+        pipe.expire(key, 61)
+        await pipe.execute()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL"))
+    args = parser.parse_args()
+    n, clients = args.requests, args.clients
+
+    local = RedisRateLimiter(block_duration=0)
+    local.redis_url = None
+    _report("local GCRA (no redis)", n, await _run(local, n, clients), local)
+
+    leased = RedisRateLimiter(block_duration=0, lease_size=10)
+    leased.redis_url = None
+    _report("local GCRA + leasing", n, await _run(leased, n, clients), leased)
+
+    if not args.redis_url:
+        print("(set --redis-url to benchmark the Redis paths)")
+        return
+
+    import redis.asyncio as aioredis
+
+    client = aioredis.from_url(args.redis_url, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        print(f"Redis unreachable ({e}); skipping Redis benchmarks")
+        return
+
+    rn = max(1000, n // 10)
+    _report("legacy EXISTS+ZSET pipeline", rn, await _legacy_pipeline(client, rn, clients))
+
+    gcra = RedisRateLimiter(redis_client=client, block_duration=0)
+    _report("redis GCRA (1 EVALSHA)", rn, await _run(gcra, rn, clients), gcra)
+
+    hot = RedisRateLimiter(redis_client=client, block_duration=0, lease_size=10)
+    _report("redis GCRA + leasing", rn, await _run(hot, rn, clients), hot)
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Database round trips and wall time for resource aggregation: per-result
+check-then-insert vs the batched pipeline in ``ResourceAggregationService``.
+
+    python scripts/bench_resources.py
+    python scripts/bench_resources.py --overlap 0.8 --latency 0.2
+
+Fake providers (three of them, three resource types each) return
+``--results`` items per call, ``--overlap`` of them duplicated across
+providers under a different id/URL spelling, after ``--latency`` seconds.
+Compares, on a fresh SQLite database each time:
+
+  * per-result: one SELECT per result, then add/flush/tags/commit for each new
+    one, objectives searched one after another (the previous implementation)
+  * batched: ``curate_resources_for_course`` as it is now
+  * batched, warm: the same curation again, served from the response cache
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from lyo_app.core.database import Base  # noqa: E402
+from lyo_app.resources import service as resource_service  # noqa: E402
+from lyo_app.resources.models import EducationalResource, ResourceProvider, ResourceTag, ResourceType  # noqa: E402
+from lyo_app.resources.providers.base import ResourceData  # noqa: E402
+from lyo_app.resources.service import ResourceAggregationService  # noqa: E402
+
+PROVIDERS = (ResourceProvider.YOUTUBE, ResourceProvider.KHAN_ACADEMY, ResourceProvider.INTERNET_ARCHIVE)
+
+
+class FakeProvider:
+    def __init__(self, provider, results, overlap, latency):
+        self.provider, self.results, self.overlap, self.latency = provider, results, overlap, latency
+
+    async def search_resources(self, query, resource_type=None, limit=50):
+        await asyncio.sleep(self.latency)
+        shared = int(self.results * self.overlap)
+        items = []
+        for i in range(self.results):
+            slug = f"{query}-{resource_type.value}-{i}".replace(" ", "-")
+            if i < shared:  # the same item every provider lists, spelled differently
+                url = f"https://www.shared.org/{slug}?utm_source={self.provider.value}"
+            else:
+                url = f"https://{self.provider.value}.org/{slug}"
+            items.append(ResourceData(
+                title=slug, description="x" * 120, external_url=url, resource_type=resource_type,
+                provider=self.provider, external_id=f"{self.provider.value}:{slug}",
+                tags=["bench", resource_type.value], author="author",
+            ))
+        return items[:limit]
+
+
+class PerResultService(ResourceAggregationService):
+    """The previous pipeline, kept here for comparison."""
+
+    async def search_and_aggregate_resources(self, query, resource_types=None, providers=None,
+                                             limit_per_provider=20, subject_area=None):
+        resource_types = resource_types or [ResourceType.VIDEO, ResourceType.EBOOK, ResourceType.COURSE]
+        batches = await asyncio.gather(*(
+            self.providers[p].search_resources(query, t, limit_per_provider)
+            for p in self.providers for t in resource_types
+        ))
+        created = []
+        for data in (d for batch in batches for d in batch):
+            existing = (await self.db.execute(select(EducationalResource).where(and_(
+                EducationalResource.external_id == data.external_id,
+                EducationalResource.provider == data.provider,
+            )))).scalar_one_or_none()
+            if existing:
+                continue
+            row = EducationalResource(**self._resource_row(data, datetime.utcnow()))
+            self.db.add(row)
+            await self.db.flush()
+            for tag in data.tags:
+                self.db.add(ResourceTag(resource_id=row.id, tag=tag[:50]))
+            await self.db.commit()
+            created.append(row)
+        created.sort(key=lambda x: x.quality_score, reverse=True)
+        return created
+
+    async def curate_resources_for_course(self, course_topic, learning_objectives, difficulty_level="beginner",
+                                          max_resources=10):
+        curated = []
+        for objective in learning_objectives[:3]:
+            resources = await self.search_and_aggregate_resources(f"{course_topic} {objective}",
+                                                                  limit_per_provider=5)
+            curated.extend(resources[:3])
+        return sorted({r.external_id: r for r in curated}.values(), key=lambda x: x.quality_score,
+                      reverse=True)[:max_resources]
+
+
+async def run(service_cls, args, repeat=1):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    statements = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(
+            c, tables=[EducationalResource.__table__, ResourceTag.__table__]))
+    statements[0] = 0
+    fakes = {p: FakeProvider(p, args.results, args.overlap, args.latency) for p in PROVIDERS}
+    resource_service.provider_cache.clear()
+    timings = []
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        service = service_cls(db, providers=fakes)
+        for _ in range(repeat):
+            statements[0] = 0
+            started = time.perf_counter()
+            curated = await service.curate_resources_for_course("algebra", ["equations", "graphs", "functions"])
+            timings.append((time.perf_counter() - started, statements[0], len(curated)))
+        stored = len((await db.execute(select(EducationalResource.id))).all())
+    await engine.dispose()
+    return timings, stored
+
+
+async def main_async(args):
+    per_call = args.results
+    print(f"\n== 3 objectives x {len(PROVIDERS)} providers x 3 types, {per_call} results/call "
+          f"({args.overlap:.0%} cross-provider duplicates), {args.latency * 1000:.0f}ms provider latency ==")
+    (old,), old_stored = await run(PerResultService, args)
+    (cold, warm), new_stored = await run(ResourceAggregationService, args, repeat=2)
+    for label, (elapsed, statements, curated), stored in (
+        ("per-result   ", old, old_stored),
+        ("batched      ", cold, new_stored),
+        ("batched, warm", warm, new_stored),
+    ):
+        print(f"  {label} {elapsed * 1000:8.1f}ms  {statements:5d} statements  "
+              f"{curated:2d} curated  {stored:4d} rows stored")
+    print(f"  round trips saved: {old[1] - cold[1]} ({old[1] / max(cold[1], 1):.0f}x fewer)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=5, help="curation asks each provider for at most 5")
+    parser.add_argument("--overlap", type=float, default=0.4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Retrieval recall/latency benchmark for the in-process vector and BM25 indexes.
+
+    python scripts/bench_retrieval.py                        # 10k and 100k chunks
+    python scripts/bench_retrieval.py --sizes 10000,100000,1000000 --dim 768
+
+For each corpus size, builds a ``VectorIndex`` over synthetic clustered
+unit vectors (so nearest neighbours are meaningful, unlike uniform noise)
+and reports:
+
+  * exact (brute-force) search latency
+  * IVF build time, search latency and recall@k against the exact top k,
+    for each ``--nprobe``
+  * BM25 search latency over synthetic chunk text
+
+1M x 768 float32 vectors are ~3 GB; add ``--dim 256`` to keep that run
+inside a laptop's memory.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.services.hybrid_search import BM25Index  # noqa: E402
+from lyo_app.services.vector_index import VectorIndex  # noqa: E402
+
+VOCAB = [f"term{i}" for i in range(5000)]
+
+
+def clustered(rng, n, dim, clusters=1000, spread=0.3):
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(n, start + 100_000)
+        noise = rng.standard_normal((stop - start, dim)).astype(np.float32)
+        vectors[start:stop] = centers[rng.integers(0, clusters, stop - start)] + spread * noise
+    return vectors
+
+
+def ms(samples):
+    return f"p50 {np.percentile(samples, 50) * 1000:7.2f}ms  p95 {np.percentile(samples, 95) * 1000:7.2f}ms"
+
+
+def timed(fn, queries):
+    results, samples = [], []
+    for q in queries:
+        started = time.perf_counter()
+        results.append(fn(q))
+        samples.append(time.perf_counter() - started)
+    return results, samples
+
+
+def bench(n, dim, k, nprobes, n_queries, rng):
+    print(f"\n== {n:,} chunks, dim {dim} ==")
+    data = clustered(rng, n, dim)
+    keys = [str(i) for i in range(n)]
+    queries = data[rng.choice(n, n_queries, replace=False)] + 0.1 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+
+    exact = VectorIndex(dim, ivf_threshold=n + 1)
+    exact._set_rows(keys, np.ascontiguousarray(data / np.linalg.norm(data, axis=1, keepdims=True)))
+    truth, samples = timed(lambda q: {key for key, _ in exact.search(q, k)}, queries)
+    print(f"exact        {ms(samples)}")
+
+    ivf = VectorIndex(dim, ivf_threshold=0)
+    ivf._set_rows(keys, exact._vectors)
+    started = time.perf_counter()
+    ivf.build()
+    print(f"ivf build    {time.perf_counter() - started:7.2f}s  ({len(ivf._centroids)} lists)")
+    for nprobe in nprobes:
+        found, samples = timed(lambda q: {key for key, _ in ivf.search(q, k, nprobe=nprobe)}, queries)
+        recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+        print(f"ivf nprobe={nprobe:<3} {ms(samples)}  recall@{k} {recall:.3f}")
+    del exact, ivf, data
+
+    bm25 = BM25Index()
+    words = rng.zipf(1.3, size=(n, 40)) % len(VOCAB)
+    started = time.perf_counter()
+    for i, row in enumerate(words):
+        bm25.add(keys[i], " ".join(VOCAB[w] for w in row))
+    print(f"bm25 build   {time.perf_counter() - started:7.2f}s")
+    text_queries = [" ".join(VOCAB[w] for w in rng.integers(0, 500, 3)) for _ in range(n_queries)]
+    _, samples = timed(lambda q: bm25.search(q, k), text_queries)
+    print(f"bm25         {ms(samples)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="8,16,32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n in (int(s) for s in args.sizes.split(",")):
+        bench(n, args.dim, args.k, [int(p) for p in args.nprobe.split(",")], args.queries, rng)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Global search latency: ILIKE scans vs the search index.
+
+    python scripts/bench_search.py                    # 100k and 1M posts
+    python scripts/bench_search.py --sizes 10000,100000 --queries 50
+
+For each corpus size, fills an aiosqlite ``community_posts`` table with
+synthetic posts (Zipf-distributed words, so some terms are common and most
+are rare) and a users table one tenth that size, then times:
+
+  * posts: ``content ILIKE '%q%'`` (the old router) vs ``TextIndex.search``,
+    first on cold terms, then repeated (served from the per-term head cache)
+  * suggestions: ``username ILIKE 'q%'`` vs ``PrefixIndex.complete``
+
+PostgreSQL's trigram / tsvector indexes (migration ``search_001``) are not
+exercised here; this measures the in-process fallback against the scans it
+replaces.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from lyo_app.auth.models import User  # noqa: E402
+from lyo_app.community.models import CommunityPost  # noqa: E402
+from lyo_app.core.database import Base  # noqa: E402
+from lyo_app.services.search_index import ENTITIES, PrefixIndex, TextIndex  # noqa: E402
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vi", "zo", "be", "di", "fu", "ga", "ho", "ji", "pe", "su"]
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+async def seed(sessions, rng, n_posts, words):
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    now = datetime.utcnow()
+    async with sessions() as db:
+        users = n_posts // 10
+        await db.execute(insert(User), [
+            {"id": i, "email": f"u{i}@example.com", "username": f"{rng.choice(words)}{i}", "hashed_password": "x"}
+            for i in range(1, users + 1)
+        ])
+        for start in range(0, n_posts, 50_000):
+            await db.execute(insert(CommunityPost), [
+                {"id": uuid.uuid4(), "author_id": 1, "author_name": "bench",
+                 "content": " ".join(rng.choices(words, cum_weights=cum_weights, k=12)), "is_deleted": False,
+                 "created_at": now - timedelta(seconds=i)}
+                for i in range(start, min(n_posts, start + 50_000))
+            ])
+        await db.commit()
+
+
+def ms(samples):
+    return f"p50 {statistics.median(samples) * 1000:8.2f}ms  max {max(samples) * 1000:8.2f}ms"
+
+
+async def timed(fn, queries):
+    samples = []
+    for q in queries:
+        started = time.perf_counter()
+        await fn(q)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def bench(n_posts, n_queries, rng):
+    print(f"\n== {n_posts:,} posts, {n_posts // 10:,} users ==")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/search.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=[User.__table__, CommunityPost.__table__]))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    words = vocabulary(rng, 20_000)
+    await seed(sessions, rng, n_posts, words)
+
+    posts, users = ENTITIES["posts"], ENTITIES["users"]
+    async with sessions() as db:
+        started = time.perf_counter()
+        rows = (await db.execute(select(*posts.columns).where(*posts.filters))).all()
+        text_index = TextIndex()
+        text_index.bulk_load((posts.key(r), posts.text(r), posts.document(r), posts.order(r)) for r in rows)
+        names = (await db.execute(select(User.id, User.username))).all()
+        prefix_index = PrefixIndex()
+        prefix_index.bulk_load(names)
+        print(f"  index build {time.perf_counter() - started:6.1f}s")
+
+        # Common words: the scan finds 10 matches early. Rare words: it reads every row.
+        workloads = {
+            "common": [rng.choice(words[:200]) for _ in range(n_queries)],
+            "rare": [rng.choice(words[5000:]) for _ in range(n_queries)],
+        }
+
+        async def old_posts(q):
+            await db.execute(select(CommunityPost).where(
+                CommunityPost.is_deleted == False, CommunityPost.content.ilike(f"%{q}%")  # noqa: E712
+            ).order_by(CommunityPost.created_at.desc()).limit(10))
+
+        async def new_posts(q):
+            text_index.search(q, 10)
+
+        for label, queries in workloads.items():
+            print(f"  posts {label:<6} ILIKE scan   {ms(await timed(old_posts, queries))}")
+            print(f"  posts {label:<6} TextIndex    {ms(await timed(new_posts, queries))}")
+            print(f"  posts {label:<6} (repeated)   {ms(await timed(new_posts, queries))}")
+
+        prefixes = [q[:3] for queries in workloads.values() for q in queries]
+
+        async def old_suggest(q):
+            await db.execute(select(User.username).where(User.username.ilike(f"{q}%")).limit(5))
+
+        async def new_suggest(q):
+            prefix_index.complete(q, 5)
+
+        print(f"  suggest      ILIKE scan   {ms(await timed(old_suggest, prefixes))}")
+        print(f"  suggest      PrefixIndex  {ms(await timed(new_suggest, prefixes))}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    logging.getLogger("lyo_app.core.database").setLevel(logging.ERROR)  # bulk inserts trip the slow-query log
+    for size in (int(s) for s in args.sizes.split(",")):
+        asyncio.run(bench(size, args.queries, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+SSE encoding throughput benchmark (events/sec on one worker core).
+
+    python scripts/bench_sse.py
+    python scripts/bench_sse.py --events 200000 --tokens 2000
+
+Compares the previous stream_lyo2 encoding (``json.dumps`` ->
+``json.loads`` -> ``json.dumps`` per event, one string per frame) with
+``SSEWriter`` for:
+
+  * brick events: the answer / artifact / actions payloads stream_lyo2 emits
+  * token deltas: one event per word versus deltas coalesced on the
+    writer's flush interval (frames actually sent are reported too)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyo_app.streaming.sse_writer import SSEWriter  # noqa: E402
+
+BRICKS = [
+    {"type": "skeleton", "blocks": ["answer", "artifact"]},
+    {"type": "answer", "block": {"type": "TutorMessageBlock", "priority": 0, "content": {
+        "text": "Photosynthesis turns light, water and CO₂ into glucose and oxygen. " * 12}}},
+    {"type": "artifact", "block": {"type": "QUIZ", "version_id": None, "content": {
+        "_agent": "quiz",
+        "questions": [{"question": f"Question {i}?", "options": ["A", "B", "C", "D"], "answer": i % 4}
+                      for i in range(5)]}}},
+    {"type": "actions", "blocks": [{"type": "CTARow", "priority": 0,
+                                    "content": {"actions": ["Quiz me", "Go deeper", "Make a course"]}}]},
+]
+
+
+def old_frame(data):
+    return f"data: {json.dumps(json.loads(json.dumps(data, default=str)))}\n\n"
+
+
+def rate(label, n, seconds, extra=""):
+    print(f"  {label:<34} {n / seconds:>12,.0f} events/s {extra}")
+
+
+def bench_bricks(n):
+    print(f"\n== {n:,} brick events ==")
+    started = time.perf_counter()
+    for i in range(n):
+        old_frame(BRICKS[i % len(BRICKS)]).encode()
+    rate("old (3 passes + str frame)", n, time.perf_counter() - started)
+
+    writer = SSEWriter()
+    started = time.perf_counter()
+    for i in range(n):
+        writer.emit("brick", BRICKS[i % len(BRICKS)])
+    rate("SSEWriter.emit", n, time.perf_counter() - started)
+
+
+def bench_tokens(streams, tokens):
+    n = streams * tokens
+    words = [f"word{i} " for i in range(tokens)]
+    print(f"\n== {n:,} token deltas ({streams} streams x {tokens} tokens, ~20ms apart) ==")
+
+    started = time.perf_counter()
+    for _ in range(streams):
+        for i, word in enumerate(words):
+            old_frame({"type": "token", "text": word, "index": i}).encode()
+    rate("old (one frame per token)", n, time.perf_counter() - started, f"{n:,} frames")
+
+    # Simulated clock: tokens arrive 20ms apart, so a 50ms interval merges ~3
+    frames = 0
+    started = time.perf_counter()
+    for _ in range(streams):
+        now = [0.0]
+        writer = SSEWriter(flush_interval=0.05, clock=lambda: now[0])
+        for word in words:
+            now[0] += 0.02
+            if writer.delta(word):
+                writer.drain()
+                frames += 1
+        if writer.drain():
+            frames += 1
+    rate("SSEWriter.delta (50ms flush)", n, time.perf_counter() - started, f"{frames:,} frames")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=1000)
+    args = parser.parse_args()
+    bench_bricks(args.events)
+    bench_tokens(args.streams, args.tokens)
+
+
+if __name__ == "__main__":
+    main()
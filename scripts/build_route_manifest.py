@@ -0,0 +1,68 @@
+"""
+Write (or check) the route manifest used by lazy router mounting.
+
+    python scripts/build_route_manifest.py          # rewrite lyo_app/route_manifest.json
+    python scripts/build_route_manifest.py --check  # exit 1 if it is out of date
+
+Imports every router in ``enhanced_main.ROUTER_SPECS`` and records the
+paths and methods each one adds. Run it after adding or changing routes;
+in lazy mode a router missing from the manifest is simply mounted eagerly,
+so a stale manifest slows start-up but never drops a route. Routers that
+fail to import are listed as ``unavailable`` and skipped in lazy mode, so
+build the manifest in the same image (dependencies) that will serve it.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LAZY_ROUTERS"] = "0"
+
+from lyo_app.core.lazy_routes import MANIFEST_PATH, spec_routes  # noqa: E402
+
+
+def build() -> dict:
+    from lyo_app.enhanced_main import ROUTER_SPECS
+
+    routers, unavailable = {}, []
+    for spec in ROUTER_SPECS:
+        try:
+            routers[spec.name] = spec_routes(spec)
+        except ImportError as e:
+            print(f"unavailable: {spec.name}: {e}", file=sys.stderr)
+            unavailable.append(spec.name)
+    return {"routers": routers, "unavailable": unavailable}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--check", action="store_true", help="fail if the manifest is stale")
+    parser.add_argument("--output", default=str(MANIFEST_PATH))
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rendered = json.dumps(build(), indent=1, sort_keys=True) + "\n"
+
+    if args.check:
+        try:
+            with open(args.output) as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = ""
+        if current != rendered:
+            print(f"{args.output} is out of date; run scripts/build_route_manifest.py", file=sys.stderr)
+            return 1
+        print(f"{args.output} is up to date")
+        return 0
+
+    with open(args.output, "w") as f:
+        f.write(rendered)
+    print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
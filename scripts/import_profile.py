@@ -0,0 +1,129 @@
+"""
+Import-time profile and cold-start budget.
+
+    python scripts/import_profile.py                          # report for lyo_app.enhanced_main
+    python scripts/import_profile.py --lazy --budget-ms 3000  # CI gate
+    python scripts/import_profile.py --forbid vertexai,openai,sklearn --lazy
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+parses its report: total import time, the slowest imports by cumulative
+time, and self time grouped by top-level package (where the cost actually
+lives). ``--lazy`` sets ``LAZY_ROUTERS=1`` for the child, which is how a
+cold-starting worker imports the app.
+
+Exits 1 if the total exceeds ``--budget-ms`` or any ``--forbid`` module was
+imported, so it can run as a CI step.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` lines: ``import time: self | cumulative | name``."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        records.append(ImportRecord(stripped, int(parts[0]), int(parts[1]), depth))
+    return records
+
+
+@dataclass
+class ImportProfile:
+    records: List[ImportRecord]
+    wall_ms: float
+
+    @property
+    def total_ms(self) -> float:
+        return sum(r.cumulative_us for r in self.records if r.depth == 0) / 1000
+
+    @property
+    def modules(self) -> List[str]:
+        return [r.module for r in self.records]
+
+    def slowest(self, n: int = 25) -> List[ImportRecord]:
+        return sorted(self.records, key=lambda r: -r.cumulative_us)[:n]
+
+    def by_package(self, n: int = 15) -> List[tuple]:
+        totals: Dict[str, int] = defaultdict(int)
+        for r in self.records:
+            totals[r.module.split(".")[0]] += r.self_us
+        return sorted(totals.items(), key=lambda kv: -kv[1])[:n]
+
+    def imported(self, names: Sequence[str]) -> List[str]:
+        loaded = set(self.modules)
+        return [n for n in names if n in loaded]
+
+
+def profile_import(module: str, env: Optional[Dict[str, str]] = None) -> ImportProfile:
+    """Import ``module`` in a fresh interpreter under ``-X importtime``."""
+    child_env = {**os.environ, "PYTHONPATH": ROOT, **(env or {})}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=child_env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"import {module} failed:\n{tail[-2000:]}")
+    return ImportProfile(parse_importtime(proc.stderr), wall_ms)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="lyo_app.enhanced_main")
+    parser.add_argument("--lazy", action="store_true", help="set LAZY_ROUTERS=1 for the import")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, help="fail if total import time exceeds this")
+    parser.add_argument("--forbid", default="", help="comma-separated modules that must not be imported")
+    args = parser.parse_args()
+
+    profile = profile_import(args.module, {"LAZY_ROUTERS": "1"} if args.lazy else None)
+
+    print(f"import {args.module}: {profile.total_ms:.0f}ms imports, {profile.wall_ms:.0f}ms wall, "
+          f"{len(profile.records)} modules")
+    print(f"\nslowest imports (cumulative ms, self ms):")
+    for r in profile.slowest(args.top):
+        print(f"  {r.cumulative_us / 1000:9.1f} {r.self_us / 1000:8.1f}  {r.module}")
+    print(f"\nself time by top-level package (ms):")
+    for package, self_us in profile.by_package():
+        print(f"  {self_us / 1000:9.1f}  {package}")
+
+    failed = False
+    forbidden = profile.imported([m for m in args.forbid.split(",") if m])
+    if forbidden:
+        print(f"\nFAIL: imported at start-up: {', '.join(forbidden)}")
+        failed = True
+    if args.budget_ms is not None:
+        verdict = "FAIL" if profile.total_ms > args.budget_ms else "ok"
+        print(f"\n{verdict}: {profile.total_ms:.0f}ms import time (budget {args.budget_ms:.0f}ms)")
+        failed = failed or verdict == "FAIL"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
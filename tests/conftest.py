@@ -107,17 +107,50 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _strict_query_budgets():
+    """Routes declaring ``@query_budget`` fail the test when they exceed it."""
+    from lyo_app.core.query_accounting import query_accounting
+
+    query_accounting.strict = True
+    yield
+    query_accounting.strict = False
+
+
 @pytest.fixture(autouse=True)
 def _fresh_rate_limit_window():
     """The shared in-memory limiter is keyed by client IP and every ASGI
     test request shares one; without a per-test reset a module's worth of
     register/login calls trips the 10/min auth limit."""
     try:
-        from lyo_app.core.rate_limiter import in_memory_rate_limiter
+        from lyo_app.core.rate_limiter import (
+            in_memory_rate_limiter,
+            middleware_rate_limiter,
+            rate_limiter,
+        )
 
         in_memory_rate_limiter.clients.clear()
+        middleware_rate_limiter.reset()
+        rate_limiter.reset()
     except ImportError:
         pass
+    try:
+        from lyo_app.auth.routes import auth_rate_limiter
+
+        auth_rate_limiter.reset()
+    except ImportError:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _fresh_principal_cache():
+    """Every test's database reuses user id 1; a principal cached by the
+    previous test must not authorize (or reject) this one's user."""
+    from lyo_app.auth.principal import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -130,26 +163,31 @@ async def async_client(db_session):
     """
     from httpx import ASGITransport, AsyncClient
 
-    from lyo_app.core.database import get_db
+    from lyo_app.core.database import get_analytics_db, get_db, get_read_db
     from lyo_app.enhanced_main import app
 
     async def override_get_db():
         yield db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+    # Read-only (replica) and analytics sessions land in the same test DB
+    session_dependencies = (get_db, get_read_db, get_analytics_db)
+    for dependency in session_dependencies:
+        app.dependency_overrides[dependency] = override_get_db
 
     # The security middleware rate-limits by client IP, and every ASGI test
     # request shares one — a module's worth of register/login calls trips the
     # 10/min auth limit. Each test starts with a clean window, like its DB.
-    from lyo_app.core.rate_limiter import in_memory_rate_limiter
+    from lyo_app.core.rate_limiter import in_memory_rate_limiter, middleware_rate_limiter
 
     in_memory_rate_limiter.clients.clear()
+    middleware_rate_limiter.reset()
     try:
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as c:
             yield c
     finally:
-        app.dependency_overrides.pop(get_db, None)
+        for dependency in session_dependencies:
+            app.dependency_overrides.pop(dependency, None)
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from lyo_app.ai_agents.a2a.orchestrator import A2AOrchestrator, PipelineConfig, EventType
+from lyo_app.ai_agents.a2a.scheduler import PhaseNode, PhaseScheduler
+from lyo_app.ai_agents.a2a.schemas import A2ACourseRequest
+
+
+def _recorder(log, name, delay=0.0, value=None):
+    async def run():
+        log.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        log.append(f"end:{name}")
+        return value
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_phases_overlap_and_critical_path():
+    log = []
+    nodes = [
+        PhaseNode("init", _recorder(log, "init")),
+        PhaseNode("research", _recorder(log, "research", 0.05), ["init"]),
+        PhaseNode("pedagogy", _recorder(log, "pedagogy", 0.01), ["init"]),
+        PhaseNode("cinematic", _recorder(log, "cinematic", 0.01), ["pedagogy"]),
+        PhaseNode("assembly", _recorder(log, "assembly"), ["research", "cinematic"]),
+    ]
+    report = await PhaseScheduler(nodes).run()
+
+    # research and pedagogy run concurrently
+    assert log.index("start:pedagogy") < log.index("end:research")
+    assert log[-1] == "end:assembly"
+    assert report.critical_path == ["init", "research", "assembly"]
+    assert report.wall_ms < report.serial_ms + 50
+    assert report.invalidated_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_dependencies_are_ignored():
+    log = []
+    nodes = [PhaseNode("voice", _recorder(log, "voice"), ["cinematic"])]
+    report = await PhaseScheduler(nodes).run()
+    assert log == ["start:voice", "end:voice"]
+    assert report.critical_path == ["voice"]
+
+
+@pytest.mark.asyncio
+async def test_gate_rejection_invalidates_speculative_work():
+    log = []
+    gate_calls = 0
+
+    async def gate():
+        nonlocal gate_calls
+        gate_calls += 1
+        await asyncio.sleep(0.02)
+        return _recorder(log, "cinematic_v2")
+
+    nodes = [
+        PhaseNode("cinematic", _recorder(log, "cinematic_v1"), gate=gate),
+        PhaseNode("voice", _recorder(log, "voice", 0.05), ["cinematic"], speculative=True),
+        PhaseNode("qa", _recorder(log, "qa"), ["cinematic", "voice"]),
+    ]
+    report = await PhaseScheduler(nodes).run()
+
+    assert gate_calls == 1
+    # voice started on the draft, was cancelled, then rerun on the revision
+    assert log.count("start:voice") == 2
+    assert log.count("end:voice") == 1
+    assert log.index("start:voice") < log.index("start:cinematic_v2")
+    assert log.index("end:cinematic_v2") < log.index("end:voice")
+    assert log[-1] == "end:qa"
+    assert report.speculative_runs == 1
+    assert report.invalidated_runs == 1
+
+
+@pytest.mark.asyncio
+async def test_speculation_disabled_waits_for_gate():
+    log = []
+
+    async def gate():
+        log.append("gate")
+        return None
+
+    nodes = [
+        PhaseNode("cinematic", _recorder(log, "cinematic"), gate=gate),
+        PhaseNode("voice", _recorder(log, "voice"), ["cinematic"], speculative=True),
+    ]
+    report = await PhaseScheduler(nodes, speculative=False).run()
+    assert log == ["start:cinematic", "end:cinematic", "gate", "start:voice", "end:voice"]
+    assert report.speculative_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_phase_failure_cancels_running_phases():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def boom():
+        raise ValueError("boom")
+
+    nodes = [PhaseNode("slow", slow), PhaseNode("boom", boom)]
+    with pytest.raises(ValueError):
+        await PhaseScheduler(nodes).run()
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_timing_report():
+    orchestrator = A2AOrchestrator(config=PipelineConfig(enable_qa=False))
+    orchestrator._save_state = AsyncMock()
+    for name in ("researcher_agent", "pedagogy_agent", "cinematic_agent", "visual_agent", "voice_agent"):
+        getattr(orchestrator, name).execute = AsyncMock(return_value=MagicMock(dict=lambda: {"ok": True}))
+
+    events = [e async for e in orchestrator.generate_course_streaming(A2ACourseRequest(topic="Graphs"))]
+
+    state = orchestrator.get_pipeline_state()
+    assert any(e.type == EventType.PIPELINE_COMPLETED for e in events)
+    assert state.timing_report["critical_path"][0] == "initialization"
+    assert state.timing_report["critical_path"][-1] == "finalization"
+    assert {"visual", "voice"} <= set(state.phase_results)
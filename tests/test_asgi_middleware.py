@@ -0,0 +1,138 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from lyo_app.middleware.asgi import (
+    ErrorHandlingMiddleware,
+    RequestSizeLimitMiddleware,
+    StreamingSafeGZipMiddleware,
+    TimingMiddleware,
+)
+from lyo_app.middleware.security_middleware import SecurityMiddleware
+from lyo_app.middleware.usage_middleware import UsageMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return {"data": "x" * 5000}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"data: {'y' * 600} {i}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    @app.post("/org")
+    async def org(request: Request):
+        request.state.organization_id = 42
+        request.state.tokens_used = 7
+        return {"ok": True}
+
+    return app
+
+
+async def _client(app):
+    return AsyncClient(transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_gzip_compresses_json_but_not_event_streams():
+    app = _app()
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1000)
+    async with await _client(app) as c:
+        big = await c.get("/big", headers={"accept-encoding": "gzip"})
+        small = await c.get("/small", headers={"accept-encoding": "gzip"})
+        sse = await c.get("/stream", headers={"accept-encoding": "gzip"})
+
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.json()["data"] == "x" * 5000
+    assert int(big.headers["content-length"]) < 5000
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in sse.headers
+    assert sse.text.count("data: ") == 3
+
+
+@pytest.mark.asyncio
+async def test_request_size_limit_rejects_large_bodies():
+    app = _app()
+    app.add_middleware(RequestSizeLimitMiddleware, max_size=10)
+    async with await _client(app) as c:
+        response = await c.post("/org", content=b"0123456789abc")
+    assert response.status_code == 413
+    assert response.json()["error"] == "Request too large"
+
+
+@pytest.mark.asyncio
+async def test_error_middleware_uses_structured_handler():
+    handler = MagicMock()
+    handler.handle_error = AsyncMock(return_value=JSONResponse({"error_id": "e1"}, status_code=500))
+    app = _app()
+    app.add_middleware(ErrorHandlingMiddleware, handler=handler)
+    async with await _client(app) as c:
+        response = await c.get("/boom")
+    assert response.status_code == 500
+    assert response.json() == {"error_id": "e1"}
+    assert isinstance(handler.handle_error.call_args.kwargs["error"], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_timing_middleware_sets_header():
+    monitor = MagicMock()
+    app = _app()
+    app.add_middleware(TimingMiddleware, monitor=monitor)
+    async with await _client(app) as c:
+        response = await c.get("/small")
+    assert float(response.headers["x-process-time"]) >= 0
+    kwargs = monitor.record_request.call_args.kwargs
+    assert kwargs["endpoint"] == "/small"
+    assert kwargs["status_code"] == 200
+
+
+@pytest.mark.asyncio
+async def test_security_headers_and_rate_limit():
+    app = _app()
+    app.add_middleware(SecurityMiddleware)
+    mw_limiter = "lyo_app.middleware.security_middleware._shared_rate_limiter.is_allowed"
+    async with await _client(app) as c:
+        with patch(mw_limiter, new_callable=AsyncMock, return_value=(True, {})):
+            ok = await c.get("/small")
+        with patch(mw_limiter, new_callable=AsyncMock, return_value=(False, {})):
+            limited = await c.get("/small")
+    assert ok.headers["x-frame-options"] == "DENY"
+    assert ok.headers["x-content-type-options"] == "nosniff"
+    assert limited.status_code == 429
+    assert limited.headers["retry-after"] == "60"
+
+
+@pytest.mark.asyncio
+async def test_usage_middleware_reads_request_state():
+    app = _app()
+    app.add_middleware(UsageMiddleware)
+    with patch("lyo_app.middleware.usage_middleware.log_usage_async", new_callable=AsyncMock) as log_usage, \
+         patch("lyo_app.services.analytics_service.analytics_service.track_system_event", new_callable=AsyncMock):
+        async with await _client(app) as c:
+            await c.post("/org")
+            await c.get("/small")
+        await asyncio.sleep(0)
+
+    log_usage.assert_called_once()
+    kwargs = log_usage.call_args.kwargs
+    assert kwargs["organization_id"] == 42
+    assert kwargs["tokens_used"] == 7
+    assert kwargs["status_code"] == 200
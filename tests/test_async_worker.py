@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from lyo_app.core.async_worker import WorkerLoop, on_worker_loop, worker_loop
+
+
+@pytest.fixture
+def loop_runner():
+    runner = WorkerLoop()
+    yield runner
+    runner.shutdown()
+
+
+def test_tasks_share_one_loop_and_its_connection_pool(loop_runner, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/worker.db", poolclass=AsyncAdaptedQueuePool)
+    loop_runner.on_shutdown(engine.dispose)
+
+    async def task():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return asyncio.get_running_loop()
+
+    loops = {loop_runner.run(task()) for _ in range(5)}
+    assert len(loops) == 1 and loops.pop().is_running()
+    assert engine.pool.checkedin() == 1  # one pooled connection, reused by every task
+    assert loop_runner.tasks_run == 5
+
+    loop_runner.shutdown()
+    assert engine.pool.checkedin() == 0  # disposed on shutdown
+    assert not loop_runner.running
+
+
+def test_resources_are_created_once_and_closed_on_shutdown(loop_runner):
+    created, closed = [], []
+
+    async def factory():
+        created.append(object())
+        return created[-1]
+
+    async def task():
+        return await loop_runner.resource("client", factory, closed.append)
+
+    first, second = loop_runner.run(task()), loop_runner.run(task())
+    assert first is second and len(created) == 1
+
+    loop_runner.shutdown()
+    assert closed == [first]
+    assert loop_runner.run(task()) is not first  # a restarted loop builds fresh resources
+
+
+def test_pool_threads_interleave_on_the_shared_loop(loop_runner):
+    async def io_bound():
+        await asyncio.sleep(0.1)
+
+    threads = [threading.Thread(target=loop_runner.run, args=(io_bound(),)) for _ in range(10)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - started < 0.5  # ~0.1s, not 10 x 0.1s
+
+
+def test_timeouts_cancel_the_coroutine_and_reentry_is_refused(loop_runner):
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        loop_runner.run(slow(), timeout=0.05)
+    loop_runner.run(asyncio.wait_for(cancelled.wait(), 1))
+
+    async def nested():
+        loop_runner.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="from the worker loop"):
+        loop_runner.run(nested())
+
+
+def test_async_celery_task_runs_on_the_worker_loop():
+    from lyo_app.services.push_notifications import push_service
+    from lyo_app.tasks.notifications import send_push_notification_task
+
+    @on_worker_loop
+    async def which_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        with patch.object(push_service, "send_to_user", AsyncMock(return_value=2)) as send:
+            result = send_push_notification_task.apply(args=("5", "Streak", "Keep it up")).get()
+        assert result == {"status": "success", "sent_count": 2}
+        assert send.await_args.args[0] == 5
+        assert which_loop() is which_loop() is worker_loop._loop
+    finally:
+        worker_loop.shutdown()
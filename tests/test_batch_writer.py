@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from lyo_app.chat.models import ChatTelemetry
+from lyo_app.chat.stores import TelemetryStore
+from lyo_app.core.batch_writer import BatchWriter
+from lyo_app.tenants.usage import UsageLog, log_usage_async
+
+
+@pytest.fixture
+def writer_for(db_session):
+    engine = db_session.bind
+    statements = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_inserts)
+
+    def make(**kwargs):
+        kwargs.setdefault("flush_interval", 60)
+        writer = BatchWriter(session_factory=async_sessionmaker(engine, expire_on_commit=False), **kwargs)
+        writer.statements = statements
+        return writer
+
+    yield make
+    event.remove(engine.sync_engine, "before_cursor_execute", count_inserts)
+
+
+def _usage(i):
+    return dict(organization_id=1, endpoint=f"/api/v1/items/{i}", method="GET", status_code=200, latency_ms=i)
+
+
+async def _count(db, model):
+    return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def test_rows_are_written_as_multi_row_inserts(writer_for, db_session):
+    writer = writer_for(max_batch=3)
+    for i in range(7):
+        assert writer.submit(UsageLog, **_usage(i))
+    await asyncio.sleep(0)  # let the size-triggered flushes run
+    await writer.stop()
+
+    assert await _count(db_session, UsageLog) == 7
+    # 3 + 3 on reaching max_batch, the last row on drain: one statement each
+    assert len(writer.statements) == 3
+    assert writer.stats() == {"pending": 0, "tables": {"usage_logs": {"submitted": 7, "written": 7}}}
+
+
+async def test_full_writer_drops_on_submit_and_flushes_on_put(writer_for, db_session):
+    writer = writer_for(max_pending=2)
+    assert writer.submit(UsageLog, **_usage(1)) and writer.submit(UsageLog, **_usage(2))
+    assert writer.submit(UsageLog, **_usage(3)) is False
+    assert writer.pending == 2
+
+    await writer.put(UsageLog, **_usage(4))  # waits for room by flushing
+    assert writer.pending == 1
+    assert await _count(db_session, UsageLog) == 2
+    await writer.stop()
+    assert writer.stats()["tables"]["usage_logs"] == {"submitted": 3, "dropped": 1, "written": 3}
+
+
+async def test_timestamps_are_taken_at_submit_and_time_flush_runs(writer_for, db_session):
+    writer = writer_for(flush_interval=0.01)
+    before = datetime.utcnow()
+    writer.submit(UsageLog, **_usage(1))
+    stamped = writer._buffers[UsageLog][0]["created_at"]
+    assert before <= stamped <= datetime.utcnow()
+
+    await asyncio.sleep(0.05)
+    assert writer.pending == 0
+    assert await _count(db_session, UsageLog) == 1
+    await writer.stop()
+
+
+async def test_failed_batches_are_counted_not_raised(writer_for):
+    writer = writer_for()
+    writer.submit(UsageLog, **_usage(1))
+    writer.submit(UsageLog, endpoint="/missing-required-columns")
+    await writer.stop()
+    assert writer.stats()["tables"]["usage_logs"]["failed"] == 2
+
+
+async def test_usage_and_telemetry_go_through_the_writer(writer_for, db_session):
+    writer = writer_for()
+    with patch("lyo_app.core.batch_writer.batch_writer", writer), \
+            patch("lyo_app.chat.stores.batch_writer", writer):
+        await log_usage_async(organization_id=1, endpoint="/api/v1/chat", method="POST", status_code=200,
+                              tokens_used=12, api_key_id=None, user_id=None)
+        recorded = await TelemetryStore().record(db_session, event_type="cta_click", cta_clicked="quiz",
+                                                 metadata={"cta_type": "primary"})
+    assert writer.pending == 2
+    await writer.stop()
+
+    usage = (await db_session.execute(select(UsageLog))).scalar_one()
+    assert (usage.endpoint, usage.tokens_used) == ("/api/v1/chat", 12)
+    telemetry = (await db_session.execute(select(ChatTelemetry))).scalar_one()
+    assert telemetry.id == recorded.id
+    assert telemetry.extra_data == {"cta_type": "primary"}
@@ -0,0 +1,131 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from lyo_app.core.forksafe import register_after_fork, _after_fork_hooks
+from lyo_app.core.lazy_routes import LazyRoute, RouterSpec, mount_routers, spec_routes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def feature_modules(tmp_path, monkeypatch):
+    """Two throwaway router modules with an overlapping path."""
+    (tmp_path / "coldstart_alpha.py").write_text(textwrap.dedent("""
+        from fastapi import APIRouter
+        router = APIRouter()
+
+        @router.get("/items/special")
+        async def special():
+            return {"from": "alpha"}
+    """))
+    (tmp_path / "coldstart_beta.py").write_text(textwrap.dedent("""
+        from fastapi import APIRouter
+        router = APIRouter()
+
+        @router.get("/items/{item_id}")
+        async def item(item_id: str):
+            return {"from": "beta", "id": item_id}
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in ("coldstart_alpha", "coldstart_beta"):
+        sys.modules.pop(name, None)
+
+
+def _specs():
+    return [
+        RouterSpec("alpha", "coldstart_alpha", prefixes=("/v1",)),
+        RouterSpec("beta", "coldstart_beta", prefixes=("/v1",)),
+        RouterSpec("gone", "coldstart_missing"),
+    ]
+
+
+def _manifest():
+    specs = _specs()
+    return {
+        "routers": {spec.name: spec_routes(spec) for spec in specs[:2]},
+        "unavailable": ["gone"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_lazy_mount_defers_import_until_first_request(feature_modules):
+    manifest = _manifest()
+    for name in ("coldstart_alpha", "coldstart_beta"):
+        sys.modules.pop(name, None)
+
+    app = FastAPI()
+    table = mount_routers(app, _specs(), lazy=True, manifest=manifest)
+    assert "coldstart_beta" not in sys.modules
+    assert sorted(table.pending) == ["alpha", "beta"]
+    assert table.failed == {"gone"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        r = await c.get("/v1/items/42")
+        assert r.json() == {"from": "beta", "id": "42"}
+        assert "coldstart_beta" in sys.modules and "coldstart_alpha" not in sys.modules
+
+        # alpha was mounted first, so its placeholder still wins /items/special
+        assert (await c.get("/v1/items/special")).json() == {"from": "alpha"}
+        assert (await c.post("/v1/items/special")).status_code == 405
+
+    assert not any(isinstance(r, LazyRoute) for r in app.router.routes)
+    assert table.stats()["loaded"] == ["alpha", "beta"]
+
+
+@pytest.mark.asyncio
+async def test_openapi_loads_pending_routers(feature_modules):
+    app = FastAPI()
+    mount_routers(app, _specs()[:2], lazy=True, manifest=_manifest())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        paths = (await c.get("/openapi.json")).json()["paths"]
+    assert set(paths) == {"/v1/items/special", "/v1/items/{item_id}"}
+    assert not app.state.router_table.pending
+
+
+def test_eager_mode_and_missing_manifest_entries_import_at_startup(feature_modules):
+    app = FastAPI()
+    table = mount_routers(app, _specs(), lazy=True, manifest={"routers": {}})
+    assert table.loaded == {"alpha", "beta"}
+    assert table.failed == {"gone"}  # import attempted, logged, skipped
+
+    with pytest.raises(ImportError):
+        mount_routers(FastAPI(), [RouterSpec("gone", "coldstart_missing", required=True)], lazy=False)
+
+
+def test_lazy_app_import_skips_heavy_sdks():
+    code = (
+        "import sys, lyo_app.enhanced_main as m; "
+        "print(sorted(k for k in ('vertexai', 'openai', 'sklearn') if k in sys.modules)); "
+        "print(len(m.app.state.router_table.pending) > 0)"
+    )
+    env = {**os.environ, "LAZY_ROUTERS": "1", "PYTHONPATH": ROOT}
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr[-2000:]
+    assert out.stdout.strip().splitlines()[-2:] == ["[]", "True"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_after_fork_hooks_run_in_child():
+    read_fd, write_fd = os.pipe()
+
+    @register_after_fork
+    def _mark():
+        os.write(write_fd, b"reset")
+
+    try:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child
+            os._exit(0)
+        os.waitpid(pid, 0)
+        os.close(write_fd)
+        assert os.read(read_fd, 16) == b"reset"
+    finally:
+        _after_fork_hooks.remove(_mark)
+        os.close(read_fd)
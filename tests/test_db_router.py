@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import Column, Integer, String, select, text
+from sqlalchemy.orm import declarative_base
+
+from lyo_app.core.db_router import (
+    ANALYTICS,
+    BACKGROUND,
+    INTERACTIVE,
+    PRIMARY,
+    DatabaseRouter,
+    ReadOnlySessionError,
+    WorkloadPool,
+    default_workloads,
+    engine_kwargs,
+)
+
+_Base = declarative_base()
+
+
+class _Note(_Base):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    body = Column(String)
+
+
+async def _seed(router: DatabaseRouter, node: str, body: str) -> None:
+    async with router.engine(BACKGROUND, node).begin() as conn:
+        await conn.run_sync(_Base.metadata.create_all)
+        await conn.execute(text("INSERT INTO notes (body) VALUES (:b)"), {"b": body})
+
+
+@pytest.fixture
+async def router(tmp_path):
+    r = DatabaseRouter(
+        f"sqlite+aiosqlite:///{tmp_path}/primary.db",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path}/replica.db"],
+        max_replica_lag=2.0,
+    )
+    await _seed(r, PRIMARY, "from-primary")
+    await _seed(r, "replica0", "from-replica")
+    yield r
+    await r.dispose()
+
+
+async def _read_body(router: DatabaseRouter, **kwargs) -> str:
+    async with router.session(**kwargs) as session:
+        return (await session.execute(select(_Note.body))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_read_only_sessions_use_replica_and_writes_use_primary(router):
+    assert await _read_body(router, read_only=True) == "from-replica"
+    assert await _read_body(router, read_only=False) == "from-primary"
+    assert await _read_body(router, workload=ANALYTICS, read_only=True) == "from-replica"
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(router):
+    router.replicas[0].lag_seconds = 30.0
+    assert await _read_body(router, read_only=True) == "from-primary"
+    assert router.replica_fallbacks == 1
+
+    await router.check_replicas()  # SQLite reports no lag
+    assert router.replicas[0].lag_seconds == 0.0
+    assert await _read_body(router, read_only=True) == "from-replica"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_is_marked_unhealthy(tmp_path):
+    router = DatabaseRouter(
+        f"sqlite+aiosqlite:///{tmp_path}/primary.db",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path}/missing-dir/replica.db"],
+    )
+    try:
+        await _seed(router, PRIMARY, "from-primary")
+        assert await _read_body(router, read_only=True) == "from-primary"
+        assert router.replicas[0].healthy is False
+        assert router.stats()["pools"]["interactive@replica0"]["failures"] == 1
+        # Subsequent reads skip the replica without retrying it
+        assert await _read_body(router, read_only=True) == "from-primary"
+        assert router.replica_fallbacks == 2
+    finally:
+        await router.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_refuses_to_flush(router):
+    with pytest.raises(ReadOnlySessionError):
+        async with router.session(read_only=True) as session:
+            session.add(_Note(body="nope"))
+            await session.flush()
+
+
+@pytest.mark.asyncio
+async def test_pool_checkout_metrics_are_recorded(router):
+    for _ in range(3):
+        await _read_body(router, read_only=True)
+    stats = router.stats()
+    replica_pool = stats["pools"]["interactive@replica0"]
+    assert replica_pool["checkouts"] == 3
+    assert replica_pool["checked_out"] == 0
+    assert replica_pool["wait_max_ms"] > 0
+    assert stats["replicas"][0]["healthy"] is True
+
+
+def test_workload_pools_are_sized_independently(monkeypatch):
+    monkeypatch.setenv("DB_POOL_ANALYTICS_SIZE", "2")
+    monkeypatch.setenv("DB_POOL_ANALYTICS_OVERFLOW", "0")
+    workloads = default_workloads()
+    assert workloads[INTERACTIVE].pool_size == 20
+    assert workloads[ANALYTICS] == WorkloadPool(ANALYTICS, 2, 0, 60.0)
+
+    pg = engine_kwargs("postgresql+asyncpg://u@h/db", workloads[ANALYTICS])
+    assert (pg["pool_size"], pg["max_overflow"]) == (2, 0)
+    assert "poolclass" in engine_kwargs("sqlite+aiosqlite:///x.db", workloads[ANALYTICS])
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_refresh_works_without_the_read_db_override(async_client, auth_headers, db_session, monkeypatch):
+    """The leaderboard refresh writes rows; any read-only session it got would refuse the flush."""
+    from lyo_app.core import database
+    from lyo_app.core.database import get_read_db
+    from lyo_app.enhanced_main import app
+    from lyo_app.gamification.models import UserXP, XPActionType
+
+    test_router = DatabaseRouter(str(db_session.bind.url))
+    test_router.adopt_engine(db_session.bind)
+    monkeypatch.setattr(database, "db_router", test_router)
+    app.dependency_overrides.pop(get_read_db, None)
+
+    db_session.add(UserXP(user_id=1, action_type=XPActionType.LESSON_COMPLETED, xp_earned=50))
+    await db_session.commit()
+
+    response = await async_client.get("/api/v1/gamification/leaderboards/xp", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["total_entries"] == 1
@@ -0,0 +1,115 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from lyo_app.learning.models import Course, Lesson
+from lyo_app.models.enhanced import User
+from lyo_app.services.embedding_backfill import backfill_embeddings, embed_row
+from lyo_app.services.embedding_service import (
+    EmbeddingCache,
+    EmbeddingService,
+    GeminiEmbedder,
+    StubEmbedder,
+)
+
+
+def _service(**kwargs):
+    provider = StubEmbedder()
+    return EmbeddingService(provider=provider, window=0.005, **kwargs), provider
+
+
+async def test_concurrent_requests_share_one_batch():
+    service, provider = _service()
+    texts = ["fractions", "photosynthesis", "fractions", "the water cycle"]
+    vectors = await asyncio.gather(*(service.embed_text(t) for t in texts))
+
+    assert provider.calls == 1
+    assert service.batcher.batches == 1
+    assert vectors[0] == vectors[2]
+    assert len(vectors[1]) == EmbeddingService.DIMENSION
+    assert np.linalg.norm(vectors[1]) == pytest.approx(1.0, abs=1e-5)
+
+
+async def test_max_batch_splits_bursts():
+    service, provider = _service(max_batch=3)
+    vectors = await service.embed_many([f"topic {i}" for i in range(7)])
+    assert provider.calls == 3 and all(vectors)
+
+
+async def test_cache_hits_skip_the_provider_and_disk_survives_restart(tmp_path):
+    service, provider = _service(cache=EmbeddingCache(disk_dir=str(tmp_path)))
+    first = await service.embed_query("what is osmosis")
+    assert await service.embed_query("what is osmosis") == first
+    assert provider.calls == 1
+    # query and document embeddings are cached separately
+    await service.embed_text("what is osmosis")
+    assert provider.calls == 2
+
+    restarted, fresh_provider = _service(cache=EmbeddingCache(disk_dir=str(tmp_path)))
+    assert await restarted.embed_query("what is osmosis") == pytest.approx(first)
+    assert fresh_provider.calls == 0
+    assert restarted.cache.stats()["l2_hits"] == 1
+
+
+async def test_provider_errors_reach_every_waiter():
+    class Failing(StubEmbedder):
+        async def embed_batch(self, texts, task_type):
+            raise RuntimeError("quota exceeded")
+
+    service = EmbeddingService(provider=Failing(), window=0.005)
+    results = await asyncio.gather(service.embed_text("a"), service.embed_text("b"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service.cache.stats()["entries"] == 0
+
+
+async def test_a_cancelled_caller_does_not_cancel_a_shared_text():
+    service, provider = _service()
+    first = asyncio.ensure_future(service.embed_text("fractions"))
+    second = asyncio.ensure_future(service.embed_text("fractions"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    vector = await second
+    assert first.cancelled()
+    assert vector and provider.calls == 1
+
+
+async def test_without_api_key_gemini_returns_none(monkeypatch):
+    from lyo_app.services import embedding_service as module
+
+    monkeypatch.setattr(module.settings, "gemini_api_key", None, raising=False)
+    service = EmbeddingService(provider=GeminiEmbedder(EmbeddingService.MODEL_NAME, EmbeddingService.DIMENSION))
+    assert await service.embed_many(["x", "y"]) == [None, None]
+
+
+async def test_backfill_only_reembeds_changed_rows(db_session):
+    service, provider = _service()
+    user = User(email="emb@example.com", username="embuser", hashed_password="x",
+                first_name="E", last_name="B", is_active=True)
+    db_session.add(user)
+    await db_session.flush()
+    course = Course(title="Algebra", description="Equations", instructor_id=user.id)
+    db_session.add(course)
+    await db_session.flush()
+    lessons = [Lesson(title=f"Lesson {i}", content=f"Content {i}", course_id=course.id, order_index=i)
+               for i in range(5)]
+    db_session.add_all(lessons)
+    await embed_row(course, service)  # written with a hash already: never re-embedded
+    await db_session.commit()
+
+    report = await backfill_embeddings(db_session, batch_size=2, service=service)
+    assert report["courses"] == {"scanned": 1, "embedded": 0, "unchanged": 1, "failed": 0}
+    assert report["lessons"]["embedded"] == 5
+    assert report["memory_insights"]["scanned"] == 0
+
+    lessons[3].content = "Rewritten content"
+    await db_session.commit()
+    calls = provider.calls
+    report = await backfill_embeddings(db_session, service=service)
+    assert report["lessons"] == {"scanned": 5, "embedded": 1, "unchanged": 4, "failed": 0}
+    assert provider.calls == calls + 1
+
+    stored = (await db_session.execute(select(Lesson.embedding_hash).where(Lesson.id == lessons[3].id))).scalar_one()
+    assert stored == service.hash("Lesson 3  Rewritten content")
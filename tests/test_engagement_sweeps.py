@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from lyo_app.ai_agents.models import AIModelTypeEnum, MentorInteraction
+from lyo_app.auth.models import User
+from lyo_app.gamification.models import Streak, StreakType, UserXP, XPActionType
+from lyo_app.models.enhanced import PushDevice, PushPlatform, SweepCheckpoint
+from lyo_app.personalization.models import SpacedRepetitionSchedule
+from lyo_app.services.engagement_sweeps import (
+    SPACED_REPETITION_DUE,
+    STREAK_REMINDERS,
+    WEEKLY_DIGESTS,
+    inactive_users_sweep,
+    run_sweep,
+)
+from lyo_app.services.push_notifications import push_service
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+class RecordingSender:
+    def __init__(self, fail_on_call=None):
+        self.batches = []
+        self.fail_on_call = fail_on_call
+
+    async def send_batch(self, notifications, db=None):
+        if len(self.batches) + 1 == self.fail_on_call:
+            raise ConnectionError("push provider unavailable")
+        self.batches.append(notifications)
+        return {user_id: 1 for user_id in notifications}
+
+
+@pytest.fixture
+def sessions(db_session):
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+async def _add_streaks(db, user_ids, hours_ago=21, count=5):
+    for user_id in user_ids:
+        db.add(Streak(user_id=user_id, streak_type=StreakType.DAILY_LOGIN, current_count=count,
+                      last_activity_date=NOW - timedelta(hours=hours_ago)))
+    await db.commit()
+
+
+async def test_streak_sweep_sends_each_chunk_as_one_batch(db_session, sessions):
+    await _add_streaks(db_session, [1, 2, 3, 4, 5])
+    await _add_streaks(db_session, [6], hours_ago=10)  # not at risk yet
+    await _add_streaks(db_session, [7], count=2)  # no real streak
+
+    sender = RecordingSender()
+    report = await run_sweep(STREAK_REMINDERS, sessions, chunk_size=2, sender=sender, now=NOW)
+
+    assert [sorted(batch) for batch in sender.batches] == [[1, 2], [3, 4], [5]]
+    notification = sender.batches[0][1]
+    assert notification.title == "Don't lose your 5-day streak!"
+    assert notification.data["type"] == "streak_reminder"
+    assert notification.data["context"]["hours_until_break"] == 3.0
+    assert report == {"sweep": "streak_reminders", "status": "success", "candidates": 5, "nudges_sent": 5,
+                      "chunks": 3}
+
+    checkpoint = await db_session.get(SweepCheckpoint, "streak_reminders")
+    assert (checkpoint.last_key, checkpoint.finished_at is not None) == (5, True)
+
+
+async def test_a_crashed_sweep_resumes_from_its_checkpoint(db_session, sessions):
+    await _add_streaks(db_session, range(1, 7))
+
+    with pytest.raises(ConnectionError):
+        await run_sweep(STREAK_REMINDERS, sessions, chunk_size=2, sender=RecordingSender(fail_on_call=2), now=NOW)
+
+    # The failed chunk's checkpoint update rolled back with it
+    checkpoint = (await db_session.execute(select(SweepCheckpoint))).scalar_one()
+    await db_session.refresh(checkpoint)
+    assert (checkpoint.last_key, checkpoint.processed, checkpoint.finished_at) == (2, 2, None)
+
+    # A run while the lease is live leaves the crashed run alone
+    idle = RecordingSender()
+    assert (await run_sweep(STREAK_REMINDERS, sessions, sender=idle))["status"] == "running_elsewhere"
+    assert idle.batches == []
+
+    # Once the lease lapses the next run resumes with the original reference time
+    sender = RecordingSender()
+    report = await run_sweep(STREAK_REMINDERS, sessions, chunk_size=2, lease=timedelta(0), sender=sender,
+                             now=NOW + timedelta(hours=1))
+    assert [sorted(batch) for batch in sender.batches] == [[3, 4], [5, 6]]
+    assert (report["status"], report["candidates"], report["nudges_sent"]) == ("resumed", 6, 6)
+
+    # The next scheduled run starts over
+    report = await run_sweep(STREAK_REMINDERS, sessions, chunk_size=10, sender=RecordingSender(), now=NOW)
+    assert (report["status"], report["candidates"]) == ("success", 6)
+
+
+async def test_spaced_rep_sweep_pushes_through_send_batch(db_session, sessions):
+    for user_id, due in ((1, 4), (2, 2)):
+        for i in range(due):
+            db_session.add(SpacedRepetitionSchedule(user_id=user_id, skill_id=f"skill-{i % 3}", item_id=f"q{i}",
+                                                    next_review=NOW - timedelta(hours=1)))
+    db_session.add_all([
+        PushDevice(user_id=1, device_token="token-a" * 4, platform=PushPlatform.IOS),
+        PushDevice(user_id=1, device_token="token-b" * 4, platform=PushPlatform.ANDROID),
+        PushDevice(user_id=1, device_token="token-c" * 4, platform=PushPlatform.IOS, is_active=False),
+    ])
+    await db_session.commit()
+
+    report = await run_sweep(SPACED_REPETITION_DUE, sessions, sender=push_service, now=NOW)
+    assert (report["candidates"], report["nudges_sent"]) == (1, 1)  # user 2 has too few items due
+
+    devices = (await db_session.execute(select(PushDevice).order_by(PushDevice.id))).scalars().all()
+    for device in devices:
+        await db_session.refresh(device)
+    assert [d.last_used_at is not None for d in devices] == [True, True, False]
+
+
+async def test_digest_and_comeback_chunks_use_a_fixed_number_of_queries(db_session, sessions):
+    for user_id in range(1, 21):
+        db_session.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}",
+                            hashed_password="x", first_name=f"Learner{user_id}"))
+        db_session.add(MentorInteraction(user_id=user_id, mentor_response="hi", model_used=AIModelTypeEnum.CLOUD_LLM,
+                                         timestamp=NOW - timedelta(days=2 if user_id % 2 else 9)))
+        db_session.add(UserXP(user_id=user_id, action_type=list(XPActionType)[0], xp_earned=10,
+                              earned_at=NOW - timedelta(days=1)))
+    await db_session.commit()
+
+    selects = []
+
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        digests = RecordingSender()
+        report = await run_sweep(WEEKLY_DIGESTS, sessions, chunk_size=50, sender=digests, now=NOW)
+        digest_selects = len(selects)
+        comebacks = RecordingSender()
+        await run_sweep(inactive_users_sweep(7), sessions, chunk_size=50, sender=comebacks, now=NOW)
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", count_selects)
+
+    assert report["nudges_sent"] == 10  # odd users were active this week
+    assert digests.batches[0][1].message == "This week: 1 learning sessions, 10 XP earned. Keep up the great work!"
+    assert sorted(comebacks.batches[0]) == list(range(2, 21, 2))
+    assert comebacks.batches[0][4].title == "Welcome back, Learner4!"
+    # checkpoint claim, one chunk (candidates, XP, mastery) and the empty next chunk
+    assert digest_selects <= 6
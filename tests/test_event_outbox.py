@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from lyo_app.events.bus import FAILED, PENDING, PROCESSED, OutboxDispatcher, publish
+from lyo_app.events.models import EventType, LearningEvent, OutboxEvent
+from lyo_app.events.processor import LEARNING_EVENT_TOPIC, handle_learning_event, log_learning_event
+from lyo_app.events.schemas import LearningEventCreate
+from lyo_app.models.enhanced import Base
+from lyo_app.personalization.models import LearnerMastery
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    # A file database: the dispatcher runs several sessions concurrently
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/outbox.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _dispatcher(sessions, **kwargs):
+    dispatcher = OutboxDispatcher(session_factory=sessions, poll_interval=60, **kwargs)
+    dispatcher.register(LEARNING_EVENT_TOPIC, handle_learning_event)
+    return dispatcher
+
+
+async def _log(sessions, user_id, skills, outcome=1.0):
+    async with sessions() as db:
+        return await log_learning_event(db, LearningEventCreate(
+            user_id=user_id, event_type=EventType.QUIZ_ANSWER, skill_ids_json=skills, measurable_outcome=outcome,
+        ))
+
+
+async def test_logging_an_event_defers_the_evolution_loop_to_the_outbox(sessions):
+    with patch("lyo_app.personalization.service.DeepKnowledgeTracer.update_mastery") as update_mastery:
+        event = await _log(sessions, 7, ["fractions", "decimals"])
+    update_mastery.assert_not_called()
+    assert event.processed_for_mastery == 0
+
+    async with sessions() as db:
+        outbox = (await db.execute(select(OutboxEvent))).scalar_one()
+    assert (outbox.topic, outbox.user_id, outbox.payload, outbox.status) == (
+        LEARNING_EVENT_TOPIC, 7, {"event_id": event.id}, PENDING)
+
+    assert await _dispatcher(sessions).drain() == 1
+    async with sessions() as db:
+        mastery = dict((await db.execute(select(LearnerMastery.skill_id, LearnerMastery.attempts))).all())
+        assert mastery == {"fractions": 1, "decimals": 1}
+        assert (await db.get(LearningEvent, event.id)).processed_for_mastery == 1
+        assert (await db.get(OutboxEvent, outbox.id)).status == PROCESSED
+
+
+async def test_all_mastery_updates_of_an_event_commit_together(sessions):
+    from lyo_app.personalization.service import DeepKnowledgeTracer
+
+    real = DeepKnowledgeTracer.update_mastery
+
+    async def third_skill_fails(self, db, user_id, skill_id, **kwargs):
+        if skill_id == "c":
+            raise RuntimeError("mastery store unavailable")
+        return await real(self, db, user_id, skill_id, **kwargs)
+
+    now = [datetime(2026, 1, 1)]
+    dispatcher = _dispatcher(sessions, clock=lambda: now[0])
+    event = await _log(sessions, 3, ["a", "b", "c"])
+    with patch.object(DeepKnowledgeTracer, "update_mastery", third_skill_fails):
+        assert await dispatcher.drain() == 0
+
+    async with sessions() as db:
+        assert (await db.execute(select(func.count()).select_from(LearnerMastery))).scalar_one() == 0
+        outbox = (await db.execute(select(OutboxEvent))).scalar_one()
+        assert (outbox.status, outbox.attempts) == (PENDING, 1)
+        assert "mastery store unavailable" in outbox.last_error
+
+    assert await dispatcher.drain() == 0  # backing off
+    now[0] += timedelta(seconds=2)
+    assert await dispatcher.drain() == 1  # retried once the store is back
+    async with sessions() as db:
+        assert (await db.get(LearningEvent, event.id)).processed_for_mastery == 1
+
+
+async def test_events_are_ordered_per_user_and_users_run_concurrently(sessions):
+    dispatcher = OutboxDispatcher(session_factory=sessions, workers=3)
+    seen, running, peak = [], set(), [0]
+
+    @dispatcher.handler("ping")
+    async def ping(db, payload):
+        running.add(payload["user"])
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.01)
+        seen.append((payload["user"], payload["n"]))
+        running.discard(payload["user"])
+
+    async with sessions() as db:
+        for n in range(4):
+            for user in (1, 2, 3):
+                publish(db, "ping", user, {"user": user, "n": n})
+        await db.commit()
+
+    assert await dispatcher.drain() == 12
+    for user in (1, 2, 3):
+        assert [n for u, n in seen if u == user] == [0, 1, 2, 3]
+    assert peak[0] == 3
+    assert dispatcher.stats()["topics"] == {"ping.processed": 12}
+
+
+async def test_a_failing_event_holds_back_its_user_until_it_is_dead_lettered(sessions):
+    now = [datetime(2026, 1, 1)]
+    dispatcher = OutboxDispatcher(session_factory=sessions, max_attempts=2, clock=lambda: now[0])
+    seen = []
+
+    @dispatcher.handler("ping")
+    async def ping(db, payload):
+        if payload["n"] == "poison":
+            raise ValueError("bad payload")
+        seen.append((payload["user"], payload["n"]))
+
+    async with sessions() as db:
+        publish(db, "ping", 1, {"user": 1, "n": "poison"})
+        publish(db, "ping", 1, {"user": 1, "n": 1})
+        publish(db, "ping", 2, {"user": 2, "n": 1})
+        await db.commit()
+
+    assert await dispatcher.run_once() == 1
+    assert seen == [(2, 1)]  # user 1 waits behind its failing event
+    assert await dispatcher.run_once() == 0  # ...and not on the very next poll
+    now[0] += timedelta(seconds=2)
+    assert await dispatcher.run_once() == 1  # second failure dead-letters it, then user 1 moves on
+    assert seen == [(2, 1), (1, 1)]
+
+    async with sessions() as db:
+        statuses = (await db.execute(select(OutboxEvent.status).order_by(OutboxEvent.id))).scalars().all()
+    assert statuses == [FAILED, PROCESSED, PROCESSED]
+    assert dispatcher.stats()["topics"] == {"ping.processed": 2, "ping.failed": 2}
+
+
+async def test_retries_back_off_exponentially_up_to_a_cap(sessions):
+    now = [datetime(2026, 1, 1)]
+    dispatcher = OutboxDispatcher(session_factory=sessions, max_attempts=5, retry_base=1, retry_max=3,
+                                  clock=lambda: now[0])
+
+    @dispatcher.handler("ping")
+    async def ping(db, payload):
+        raise ValueError("still broken")
+
+    async with sessions() as db:
+        event = publish(db, "ping", 1, {})
+        await db.commit()
+
+    delays = []
+    for _ in range(4):
+        await dispatcher.run_once()
+        async with sessions() as db:
+            outbox = await db.get(OutboxEvent, event.id)
+        delays.append((outbox.next_attempt_at - now[0]).total_seconds())
+        now[0] = outbox.next_attempt_at
+    assert delays == [1, 2, 3, 3]
+
+    await dispatcher.run_once()
+    async with sessions() as db:
+        assert (await db.get(OutboxEvent, event.id)).status == FAILED
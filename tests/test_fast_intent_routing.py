@@ -0,0 +1,154 @@
+import asyncio
+import os
+import re
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from lyo_app.ai.fast_intent import FastIntentRouter
+from lyo_app.ai.schemas.lyo2 import Intent, MediaRef, RouterDecision, RouterRequest, RouterResponse
+from lyo_app.ai_classroom.intent_detector import INTENT_PATTERNS, IntentDetector, IntentType
+
+
+@pytest.mark.parametrize("text, intent, topic", [
+    ("explain photosynthesis", Intent.EXPLAIN, "photosynthesis"),
+    ("What is the mitochondria?", Intent.EXPLAIN, "the mitochondria"),
+    ("define entropy", Intent.EXPLAIN, "entropy"),
+    ("Make me a course on linear algebra", Intent.COURSE, "linear algebra"),
+    ("teach me python from scratch", Intent.COURSE, "python"),
+    ("quiz me on fractions", Intent.QUIZ, "fractions"),
+    ("create a study plan for calculus", Intent.STUDY_PLAN, "calculus"),
+    ("Hi!", Intent.GREETING, None),
+    ("good morning lyo", Intent.GREETING, None),
+])
+def test_unambiguous_requests_take_the_fast_path(text, intent, topic):
+    assert FastIntentRouter(enabled=True).classify_text(text)[::2] == (intent, topic)
+
+
+@pytest.mark.parametrize("text", [
+    "I don't know",
+    "10th grade",
+    "more",
+    "can you help me with my homework",
+    "explain how to make a quiz",
+    "Explain osmosis. Then quiz me on it.",
+    "hi, can you explain derivatives",
+    "explain " + "x" * 400,
+    "what is up",
+    "what is the weather today",
+    "create a course for my kid",
+    "what is your name",
+    "explain this",
+])
+def test_ambiguous_requests_go_to_the_llm_router(text):
+    assert FastIntentRouter(enabled=True).classify_text(text) is None
+
+
+def test_media_artifacts_and_kill_switch_skip_the_fast_path():
+    router = FastIntentRouter(enabled=True)
+    assert router.classify(RouterRequest(text="explain osmosis")).intent == Intent.EXPLAIN
+    with_media = RouterRequest(text="explain osmosis", media=[MediaRef(modality="IMAGE", uri="gs://b/x.png")])
+    assert router.classify(with_media) is None
+    assert FastIntentRouter(enabled=False).classify(RouterRequest(text="explain osmosis")) is None
+
+    router.record("fast", Intent.EXPLAIN)
+    router.record("llm", Intent.CHAT)
+    router.record("forced", Intent.QUIZ)
+    assert router.stats() == {"fast": 1, "llm": 1, "forced": 1, "fast_path_ratio": 0.5}
+
+
+def _reference_match(message):
+    """The pre-compilation algorithm: scan every pattern, keep the best."""
+    best = (IntentType.UNKNOWN, None, 0.3)
+    for intent_type, patterns in INTENT_PATTERNS.items():
+        for pattern in patterns:
+            match = re.search(pattern, message, re.IGNORECASE)
+            if match:
+                topic = match.group(1) if match.groups() else None
+                if topic:
+                    topic = topic.strip().rstrip("?.!")
+                confidence = min(0.7 + (len(pattern) / 200), 0.95)
+                if confidence > best[2]:
+                    best = (intent_type, topic, confidence)
+    return best
+
+
+@pytest.mark.parametrize("message", [
+    "create a course on machine learning", "what is a neural network", "quiz me on the french revolution",
+    "i have a midterm on organic chemistry", "thanks!", "keep going", "how do i learn guitar",
+    "give me an example of recursion", "how am i doing", "lol", "", "explain quantum tunneling in detail",
+])
+def test_compiled_matcher_agrees_with_full_scan(message):
+    assert IntentDetector()._match_patterns(message) == _reference_match(message)
+
+
+@pytest.fixture
+def stream_client():
+    os.environ.setdefault("LYO_LIGHTWEIGHT_STARTUP", "1")
+    from lyo_app.app_factory import create_app
+    from lyo_app.auth.dependencies import get_current_user_or_guest, get_db
+
+    app = create_app()
+    user = MagicMock()
+    user.id = "fast_path_user"
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    result.scalars.return_value.all.return_value = []
+    db.execute.return_value = result
+    db.add = MagicMock()
+    app.dependency_overrides[get_current_user_or_guest] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides = {}
+
+
+async def _stream(client, text):
+    async with client.stream("POST", "/api/v1/lyo2/chat/stream", json={"text": text}) as response:
+        assert response.status_code == 200
+        return [line async for line in response.aiter_lines() if line.strip()]
+
+
+async def test_greeting_streams_without_calling_the_llm_router(stream_client):
+    async def tokens(*args, **kwargs):
+        yield "Hello!"
+
+    with patch("lyo_app.api.v1.stream_lyo2.router_agent") as router_agent, \
+            patch("lyo_app.api.v1.stream_lyo2.proactive_engagement_service") as nudges, \
+            patch("lyo_app.chat.agents.agent_registry.process_stream", side_effect=tokens):
+        router_agent.route = AsyncMock()
+        nudges.get_pending_nudges_for_user = AsyncMock(return_value=[])
+        chunks = await _stream(stream_client, "hey there")
+
+    router_agent.route.assert_not_awaited()
+    nudges.get_pending_nudges_for_user.assert_awaited_once()
+    assert any('"skeleton"' in c for c in chunks)
+    assert not any('"clarification"' in c for c in chunks)
+
+
+async def test_nudge_lookup_overlaps_the_llm_router(stream_client):
+    route_started = asyncio.Event()
+    seen = {}
+
+    async def route(*args, **kwargs):
+        route_started.set()
+        return RouterResponse(decision=RouterDecision(intent=Intent.CHAT, confidence=0.9), trace_id="t")
+
+    async def pending_nudges(*args, **kwargs):
+        # Serial code would only start the router after this returned
+        seen["router_running"] = await asyncio.wait_for(route_started.wait(), 2.0)
+        return []
+
+    async def tokens(*args, **kwargs):
+        yield "Sure."
+
+    with patch("lyo_app.api.v1.stream_lyo2.router_agent") as router_agent, \
+            patch("lyo_app.api.v1.stream_lyo2.proactive_engagement_service") as nudges, \
+            patch("lyo_app.chat.agents.agent_registry.process_stream", side_effect=tokens):
+        router_agent.route = AsyncMock(side_effect=route)
+        nudges.get_pending_nudges_for_user = AsyncMock(side_effect=pending_nudges)
+        await _stream(stream_client, "I don't know")
+
+    router_agent.route.assert_awaited_once()
+    assert seen == {"router_running": True}
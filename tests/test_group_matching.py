@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from lyo_app.collaboration.matching import GroupCandidates, group_match_cache
+from lyo_app.collaboration.models import (
+    CollaborativeGroupMembership as GroupMembership,
+    CollaborativeStudyGroup as StudyGroup,
+)
+from lyo_app.collaboration.service import CollaborativeLearningEngine
+from lyo_app.core.query_accounting import assert_max_queries
+
+SKILLS = [f"skill-{i}" for i in range(40)]
+
+
+def _reference_score(group, members, interests):
+    """The per-group formula the engine used before vectorizing."""
+    skill = len(set(interests) & set(group["target_skills"] or [])) / max(len(interests), 1)
+    ideal = group["max_members"] * 0.6
+    return min(
+        0.4 * skill
+        + 0.2 * min(group["activity_score"] or 0.0, 1.0)
+        + 0.2 * (1.0 - abs(members - ideal) / ideal)
+        + 0.2 * (group["learning_effectiveness"] or 0.7),
+        1.0,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _fresh_group_match_cache():
+    group_match_cache.clear()
+    yield
+    group_match_cache.clear()
+
+
+def test_vectorized_scores_match_the_per_group_formula():
+    rng = random.Random(3)
+    groups = []
+    for gid in range(1, 801):
+        capacity = rng.randint(2, 12)
+        groups.append((
+            gid, rng.sample(SKILLS, rng.randint(0, 6)) + (["skill-0"] if rng.random() < 0.1 else []), capacity,
+            rng.choice([None, rng.uniform(0, 1.5)]), rng.choice([None, 0.0, rng.uniform(0, 1)]),
+            rng.randint(0, capacity - 1),
+        ))
+    candidates = GroupCandidates(groups)
+    for interests in (SKILLS[:3], SKILLS[5:15], [], ["unknown", "skill-1", "skill-1"]):
+        expected = sorted(
+            ((_reference_score(dict(target_skills=g[1], max_members=g[2], activity_score=g[3],
+                                    learning_effectiveness=g[4]), g[5], interests), g[0]) for g in groups),
+            key=lambda pair: (-pair[0], pair[1]),
+        )
+        expected = [(gid, score) for score, gid in expected if score > 0.5][:10]
+        matches = candidates.top_matches(interests, k=10)
+        assert [m.group_id for m in matches] == [gid for gid, _ in expected]
+        assert [m.score for m in matches] == pytest.approx([score for _, score in expected])
+    assert GroupCandidates([]).top_matches(SKILLS[:2]) == []
+
+
+async def test_matching_skips_full_groups_and_tracks_joins(db_session):
+    def group(title, **overrides):
+        values = dict(title=title, subject_area="math", collaboration_type="study_group", created_by=1,
+                      max_members=3, target_skills=["algebra", "calculus"], activity_score=0.9,
+                      learning_effectiveness=0.9)
+        values.update(overrides)
+        return StudyGroup(**values)
+
+    open_group, nearly_full, private, other_subject = (
+        group("Open"), group("Nearly full"), group("Private", is_public=False), group("Physics", subject_area="physics"),
+    )
+    db_session.add_all([open_group, nearly_full, private, other_subject])
+    await db_session.flush()
+    db_session.add_all([GroupMembership(group_id=nearly_full.id, user_id=uid) for uid in (1, 2)])
+    db_session.add(GroupMembership(group_id=open_group.id, user_id=1))
+    await db_session.commit()
+    engine = CollaborativeLearningEngine()
+
+    # Snapshot + the returned groups; no memberships loaded
+    with assert_max_queries(2):
+        results = await engine.find_suitable_groups(9, "math", ["algebra"], db_session)
+    assert [r["group"].id for r in results] == [nearly_full.id, open_group.id]
+    assert [r["current_members"] for r in results] == [2, 1]
+    assert "Focuses on algebra" in results[0]["reasons"]
+    with assert_max_queries(1):
+        await engine.find_suitable_groups(9, "math", ["algebra"], db_session)
+
+    # A join fills the group: the snapshot is dropped at commit and the group no longer matches
+    db_session.add(GroupMembership(group_id=nearly_full.id, user_id=3))
+    await db_session.commit()
+    assert len(group_match_cache) == 0
+    results = await engine.find_suitable_groups(9, "math", ["algebra"], db_session)
+    assert [r["group"].id for r in results] == [open_group.id]
+
+    # An unrelated group edit leaves other subjects cached
+    other_subject.activity_score = 0.1
+    await db_session.commit()
+    assert group_match_cache.stats()["subjects"] == 1
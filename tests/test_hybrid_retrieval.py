@@ -0,0 +1,168 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from lyo_app.learning.models import Course, Lesson
+from lyo_app.models.enhanced import User
+from lyo_app.personalization.models import MemoryInsight
+from lyo_app.services import rag_service
+from lyo_app.services.hybrid_search import BM25Index, HybridIndex, reciprocal_rank_fusion
+from lyo_app.services.rag_service import ContentIndex, RAGService
+from lyo_app.services.vector_index import VectorIndex
+
+DIM = 768
+
+
+def _unit(rng, n, dim):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _axis(i, dim=DIM):
+    v = np.zeros(dim, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+def test_bm25_ranks_rare_terms_and_handles_removal():
+    index = BM25Index()
+    index.add("a", "Photosynthesis converts light into chemical energy in plants")
+    index.add("b", "Plants need water and light")
+    index.add("c", "The French revolution began in 1789")
+    hits = index.search("photosynthesis in plants")
+    assert [k for k, _ in hits] == ["a", "b"]
+    assert hits[0][1] > hits[1][1] > 0
+
+    index.remove("a")
+    assert [k for k, _ in index.search("photosynthesis")] == []
+    assert len(index) == 2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = dict(reciprocal_rank_fusion([["x", "y", "z"], ["y", "x"], ["y"]]))
+    assert fused["y"] > fused["x"] > fused["z"]
+
+
+def test_vector_index_exact_and_ivf_recall():
+    rng = np.random.default_rng(1)
+    centers = _unit(rng, 64, 32)
+    data = centers[rng.integers(0, 64, 6000)] + 0.15 * rng.standard_normal((6000, 32)).astype(np.float32)
+    keys = [str(i) for i in range(len(data))]
+
+    exact = VectorIndex(32)
+    exact.add_many(keys, data)
+    exact.build()
+    ivf = VectorIndex(32, ivf_threshold=1000, nprobe=8)
+    ivf.add_many(keys, data)
+    ivf.build()
+    assert ivf.is_ivf and not exact.is_ivf
+
+    queries = data[rng.choice(len(data), 50, replace=False)] + 0.05
+    recall = np.mean([
+        len({k for k, _ in exact.search(q, 10)} & {k for k, _ in ivf.search(q, 10)}) / 10 for q in queries
+    ])
+    assert recall >= 0.9
+    key, similarity = exact.search(data[7], 1)[0]
+    assert key == "7" and similarity == pytest.approx(1.0, abs=1e-5)
+
+
+def test_vector_index_tail_removal_and_mmap_roundtrip(tmp_path):
+    index = VectorIndex(8)
+    index.add("a", _axis(0, 8))
+    index.add("b", _axis(1, 8))
+    index.build()
+    index.add("c", _axis(2, 8))  # tail row, searchable before build
+    assert index.search(_axis(2, 8), 1)[0][0] == "c"
+
+    index.remove("a")
+    index.remove("c")
+    assert {k for k, _ in index.search(_axis(0, 8), 5)} == {"b"}
+
+    index.add("d", _axis(3, 8))
+    index.save(str(tmp_path))
+    loaded = VectorIndex.load(str(tmp_path))
+    assert isinstance(loaded._vectors, np.memmap)
+    assert sorted(loaded.keys) == ["b", "d"]
+    assert loaded.search(_axis(3, 8), 1)[0][0] == "d"
+
+
+def test_hybrid_index_fuses_and_filters():
+    index = HybridIndex(8)
+    index.add("course:1", "Intro to algebra", _axis(0, 8), type="course")
+    index.add("lesson:1", "Solving linear equations in algebra", _axis(1, 8), type="lesson")
+    index.add("lesson:2", "Cell biology basics", None, type="lesson")
+    index.build()
+
+    hits = index.search("algebra equations", _axis(1, 8), k=3)
+    assert hits[0].key == "lesson:1"
+    assert hits[0].score == pytest.approx(1.0)  # ranked first in both lists
+    assert hits[0].similarity == pytest.approx(1.0) and hits[0].keyword_score > 0
+
+    only_courses = index.search("algebra", _axis(1, 8), k=3, where={"type": "course"})
+    assert [h.key for h in only_courses] == ["course:1"]
+    assert [h.key for h in index.search("biology", None)] == ["lesson:2"]
+
+
+@pytest.fixture
+async def corpus(db_session):
+    user = User(email="rag@example.com", username="raguser", hashed_password="x",
+                first_name="R", last_name="G", is_active=True)
+    db_session.add(user)
+    await db_session.flush()
+    algebra = Course(title="Algebra foundations", description="Variables, equations and functions",
+                     topic="math", instructor_id=user.id, embedding=_axis(0).tolist())
+    biology = Course(title="Cell biology", description="Organelles and membranes",
+                     topic="science", instructor_id=user.id, embedding=_axis(5).tolist())
+    db_session.add_all([algebra, biology])
+    await db_session.flush()
+    db_session.add_all([
+        Lesson(title="Quadratic equations", content="Factoring and the quadratic formula",
+               course_id=algebra.id, order_index=1, embedding=_axis(1).tolist()),
+        Lesson(title="Mitochondria", content="The powerhouse of the cell",
+               course_id=biology.id, order_index=1),
+        MemoryInsight(user_id=user.id, category="struggle_point",
+                      insight_text="Struggles with factoring quadratic equations", embedding=_axis(1).tolist(),
+                      created_at=datetime.utcnow()),
+        MemoryInsight(user_id=user.id, category="learning_style",
+                      insight_text="Prefers visual diagrams", created_at=datetime.utcnow()),
+    ])
+    await db_session.commit()
+    return user
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    index = ContentIndex()
+    monkeypatch.setattr(rag_service, "content_index", index)
+    return index
+
+
+async def test_rag_service_hybrid_scores_on_sqlite(db_session, corpus, fresh_index):
+    with patch.object(rag_service.embedding_service, "embed_query", AsyncMock(return_value=_axis(1).tolist())):
+        results = await RAGService(db_session).retrieve("quadratic equations", limit=3)
+
+    assert fresh_index.index is not None and len(fresh_index.index) == 4
+    top = results[0]
+    assert (top["type"], top["title"]) == ("lesson", "Quadratic equations")
+    assert top["similarity"] == pytest.approx(1.0) and top["keyword_score"] > 0
+    assert top["score"] == pytest.approx(1.0)
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+
+    with patch.object(rag_service.embedding_service, "embed_query", AsyncMock(return_value=None)):
+        courses = await RAGService(db_session).retrieve("biology", filters={"type": "course"})
+    assert [r["title"] for r in courses] == ["Cell biology"]
+    assert courses[0]["similarity"] is None
+
+
+async def test_rag_service_merges_user_memory(db_session, corpus, fresh_index):
+    service = RAGService(db_session)
+    with patch.object(rag_service.embedding_service, "embed_query", AsyncMock(return_value=_axis(1).tolist())):
+        memory = await service.retrieve_user_memory(corpus.id, "factoring", limit=5)
+        merged = await service.retrieve("quadratic factoring", limit=5, user_id=corpus.id)
+
+    assert memory[0]["category"] == "struggle_point"
+    assert memory[0]["similarity"] == pytest.approx(1.0)
+    assert {"insight", "confidence", "created_at"} <= set(memory[0])
+    assert {r["type"] for r in merged} >= {"lesson", "memory"}
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from lyo_app.ai_agents.models import AIModelTypeEnum, MentorInteraction
+from lyo_app.auth.models import User
+from lyo_app.core.database import Base
+from lyo_app.personalization.models import MemoryInsight, MemorySynthesisState
+from lyo_app.services.embedding_service import EmbeddingService, StubEmbedder
+from lyo_app.services.memory_synthesis import memory_synthesis_service
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def stub_embeddings():
+    service = EmbeddingService(provider=StubEmbedder(), window=0.005)
+    with patch("lyo_app.services.memory_synthesis.embedding_service", service):
+        yield service
+
+
+def _insight(category, text, confidence=0.8):
+    return {"category": category, "insight": text, "confidence": confidence}
+
+
+async def _add_user(db, user_id=1):
+    db.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}", hashed_password="x"))
+    await db.commit()
+
+
+async def _add_interactions(db, user_id, messages):
+    rows = [
+        MentorInteraction(user_id=user_id, user_message=message, mentor_response="ok",
+                          model_used=AIModelTypeEnum.CLOUD_LLM, timestamp=NOW - timedelta(minutes=len(messages) - i))
+        for i, message in enumerate(messages)
+    ]
+    db.add_all(rows)
+    await db.commit()
+    return rows
+
+
+async def test_no_new_interactions_skips_the_llm(db_session):
+    await _add_user(db_session)
+    interactions = await _add_interactions(db_session, 1, ["hello"])
+    db_session.add(MemorySynthesisState(user_id=1, last_interaction_id=interactions[-1].id))
+    await db_session.commit()
+
+    with patch.object(memory_synthesis_service, "_extract_insights", AsyncMock()) as extract:
+        assert await memory_synthesis_service.synthesize_incremental_memory(1, db_session) is None
+    extract.assert_not_awaited()
+
+
+async def test_only_interactions_past_the_high_water_mark_are_summarized(db_session):
+    await _add_user(db_session)
+    old = await _add_interactions(db_session, 1, ["old question about loops"])
+
+    extract = AsyncMock(return_value=[_insight("learning_style", "Learns best from worked examples")])
+    with patch.object(memory_synthesis_service, "_extract_insights", extract):
+        await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+        new = await _add_interactions(db_session, 1, ["what is recursion?", "show me an example"])
+        memory = await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+
+    prompt_data = extract.await_args.args[0]
+    assert "what is recursion?" in prompt_data and "old question about loops" not in prompt_data
+    assert "Interactions per day: 2.0" in prompt_data
+
+    state = await db_session.get(MemorySynthesisState, 1)
+    assert state.last_interaction_id == new[-1].id > old[-1].id
+    user = await db_session.get(User, 1)
+    assert user.user_context_summary == memory
+    assert memory.startswith("**Learning Style:**\n- Learns best from worked examples")
+
+
+async def test_a_backlog_longer_than_one_run_is_not_skipped(db_session, monkeypatch):
+    await _add_user(db_session)
+    monkeypatch.setattr(memory_synthesis_service, "MAX_NEW_INTERACTIONS", 2)
+    rows = await _add_interactions(db_session, 1, ["first", "second", "third"])
+
+    extract = AsyncMock(return_value=[])
+    with patch.object(memory_synthesis_service, "_extract_insights", extract):
+        await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+        assert (await db_session.get(MemorySynthesisState, 1)).last_interaction_id == rows[1].id
+        first_run = extract.await_args.args[0]
+        await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+        second_run = extract.await_args.args[0]
+
+    assert "first" in first_run and "second" in first_run and "third" not in first_run
+    assert "third" in second_run and "second" not in second_run
+    assert (await db_session.get(MemorySynthesisState, 1)).last_interaction_id == rows[2].id
+
+
+async def test_restated_insights_reinforce_instead_of_duplicating(db_session):
+    await _add_user(db_session)
+    await _add_interactions(db_session, 1, ["first"])
+    first = [_insight("struggle_point", "Struggles with recursion base cases", 0.6)]
+    with patch.object(memory_synthesis_service, "_extract_insights", AsyncMock(return_value=first)):
+        await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+
+    await _add_interactions(db_session, 1, ["second"])
+    second = [
+        _insight("struggle_point", "struggles with  recursion base cases", 0.9),
+        _insight("interest", "Interested in game development"),
+    ]
+    with patch.object(memory_synthesis_service, "_extract_insights", AsyncMock(return_value=second)):
+        memory = await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+
+    rows = (await db_session.execute(select(MemoryInsight).order_by(MemoryInsight.id))).scalars().all()
+    assert [(r.category, r.insight_text) for r in rows] == [
+        ("struggle_point", "Struggles with recursion base cases"),
+        ("interest", "Interested in game development"),
+    ]
+    assert rows[0].confidence == 0.9
+    assert memory.count("recursion base cases") == 1
+    assert "**Learning Interests:**\n- Interested in game development" in memory
+
+
+async def test_each_category_is_capped_after_merging(db_session):
+    await _add_user(db_session)
+    cap = memory_synthesis_service.MAX_INSIGHTS_PER_CATEGORY
+    topics = ["sorting", "graphs", "hash maps", "dynamic programming", "regex", "sql joins", "closures"]
+    for i, topic in enumerate(topics):
+        await _add_interactions(db_session, 1, [topic])
+        extracted = [_insight("success_pattern", f"Succeeded quickly at {topic}", 0.5 + i / 100)]
+        with patch.object(memory_synthesis_service, "_extract_insights", AsyncMock(return_value=extracted)):
+            await memory_synthesis_service.synthesize_incremental_memory(1, db_session)
+
+    rows = (await db_session.execute(select(MemoryInsight))).scalars().all()
+    assert len(rows) == cap
+    assert {r.insight_text for r in rows} == {f"Succeeded quickly at {t}" for t in topics[-cap:]}
+
+
+def test_batch_refresh_queues_only_users_with_new_activity(tmp_path):
+    from lyo_app.tasks import memory_synthesis as tasks
+
+    engine = create_engine(f"sqlite:///{tmp_path}/memory.db")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(engine)
+    with Session() as db:
+        for user_id in (1, 2, 3, 4):
+            db.add(User(id=user_id, email=f"u{user_id}@example.com", username=f"u{user_id}", hashed_password="x"))
+        for user_id in (3, 1, 2, 3):
+            db.add(MentorInteraction(user_id=user_id, mentor_response="ok", model_used=AIModelTypeEnum.CLOUD_LLM))
+        db.flush()
+        db.add(MemorySynthesisState(user_id=2, last_interaction_id=3))  # already synthesized
+        db.add(MemorySynthesisState(user_id=3, last_interaction_id=1))  # interaction 4 is new
+        db.commit()
+
+    with patch.object(tasks, "get_sync_db", Session), \
+            patch.object(tasks.synthesize_incremental_memory_task, "delay") as delay:
+        result = tasks.batch_memory_refresh_task.apply(kwargs={"batch_size": 10}).get()
+    assert result == {"status": "success", "mode": "incremental", "queued_count": 2}
+    # Oldest pending activity first; user 4 has none, user 2 is up to date
+    assert [c.kwargs["user_id"] for c in delay.call_args_list] == [1, 3]
+
+    with patch.object(tasks, "get_sync_db", Session), \
+            patch.object(tasks.synthesize_incremental_memory_task, "delay") as delay:
+        tasks.batch_memory_refresh_task.apply(kwargs={"batch_size": 1}).get()
+    assert [c.kwargs["user_id"] for c in delay.call_args_list] == [1]
+    engine.dispose()
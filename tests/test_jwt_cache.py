@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from lyo_app.auth.jwt_auth import create_access_token, jwt_cache
+from lyo_app.auth.jwt_cache import JWTCache, RevocationBus, revoke_event, revoke_user_event
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    jwt_cache.clear()
+    yield
+    jwt_cache.clear()
+
+
+def test_lru_is_bounded_and_entries_never_outlive_the_token():
+    clock = FakeClock()
+    cache = JWTCache(ttl=300, max_entries=100, clock=clock)
+    for i in range(1000):  # login churn
+        cache.set(f"token-{i}", {"user_id": str(i), "exp": clock.now + 3600})
+    assert len(cache) == 100 and cache.evictions == 900
+    assert cache.get("token-0") is None and cache.get("token-999")["user_id"] == "999"
+
+    cache.set("short", {"user_id": "1", "exp": clock.now + 30})
+    clock.now += 31  # token expired, policy TTL has not
+    assert cache.get("short") is None
+    assert cache.get("token-999") is not None
+    clock.now += 300
+    assert cache.get("token-999") is None
+    assert cache.stats() == {
+        "entries": 98, "max_entries": 100, "hits": 2, "misses": 3, "evictions": 901, "expirations": 2,
+        "revoked_tokens": 0, "revoked_users": 0,
+    }
+
+
+async def test_revocations_fan_out_to_every_subscribed_cache():
+    clock = FakeClock()
+    workers = [JWTCache(clock=clock) for _ in range(3)]
+    bus = RevocationBus()
+    for cache in workers:
+        bus.subscribe(cache)
+        cache.set("alice-1", {"user_id": "1", "iat": clock.now - 60, "exp": clock.now + 600})
+        cache.set("bob-1", {"user_id": "2", "iat": clock.now - 60, "exp": clock.now + 600})
+
+    await bus.publish(revoke_event("alice-1", clock.now + 600))
+    assert all(c.get("alice-1") is None and c.is_revoked("alice-1", {"user_id": "1"}) for c in workers)
+    assert all(c.get("bob-1") is not None for c in workers)
+
+    await bus.publish(revoke_user_event("2", clock.now))
+    assert all(c.get("bob-1") is None for c in workers)
+    assert workers[0].is_revoked("bob-2", {"user_id": "2", "iat": clock.now - 1})
+    assert not workers[0].is_revoked("bob-3", {"user_id": "2", "iat": clock.now})
+
+    clock.now += 601  # the token would be rejected as expired now; the tombstone goes
+    await bus.publish(revoke_event("other", clock.now + 600))
+    assert workers[0].stats()["revoked_tokens"] == 1
+
+
+async def test_logout_and_password_change_revoke_access_tokens(async_client, auth_headers):
+    response = await async_client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    user_id = response.json()["id"]
+
+    response = await async_client.post("/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+    assert (await async_client.get("/api/v1/auth/me", headers=auth_headers)).status_code == 401
+
+    older = {"Authorization": f"Bearer {create_access_token(user_id, {'iat': datetime.utcnow() - timedelta(minutes=5)})}"}
+    assert (await async_client.get("/api/v1/auth/me", headers=older)).status_code == 200  # now cached
+    response = await async_client.post("/auth/change-password", headers=older, json={
+        "current_password": "testpassword123", "new_password": "newpassword456", "confirm_password": "newpassword456",
+    })
+    assert response.status_code == 200
+    assert (await async_client.get("/api/v1/auth/me", headers=older)).status_code == 401
+
+    response = await async_client.post("/api/v1/auth/login", json={
+        "email": "conftest_user@example.com", "password": "newpassword456",
+    })
+    fresh = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert (await async_client.get("/api/v1/auth/me", headers=fresh)).status_code == 200
+
+
+async def test_password_change_revokes_refresh_tokens(async_client, auth_headers):
+    response = await async_client.post("/auth/login", json={
+        "email": "conftest_user@example.com", "password": "testpassword123",
+    })
+    assert response.status_code == 200
+    session = response.json()
+
+    response = await async_client.post("/auth/change-password", json={
+        "current_password": "testpassword123", "new_password": "newpassword456", "confirm_password": "newpassword456",
+    }, headers={"Authorization": f"Bearer {session['access_token']}"})
+    assert response.status_code == 200
+
+    response = await async_client.post("/auth/refresh", json={"refresh_token": session["refresh_token"]})
+    assert response.status_code == 401
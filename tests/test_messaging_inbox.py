@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from lyo_app.auth.models import User
+from lyo_app.core.query_accounting import assert_max_queries
+from lyo_app.models.social import Conversation, ConversationParticipant, Message
+from lyo_app.services.messaging_inbox import decode_cursor, load_inbox, reconcile_inbox, record_message
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+async def _users(db, count):
+    users = [User(id=i, email=f"u{i}@example.com", username=f"u{i}", hashed_password="x") for i in range(1, count + 1)]
+    db.add_all(users)
+    await db.commit()
+
+
+async def _conversation(db, *user_ids):
+    conversation = Conversation(type="direct" if len(user_ids) == 2 else "group", updated_at=NOW - timedelta(days=30))
+    db.add(conversation)
+    await db.flush()
+    db.add_all(ConversationParticipant(conversation_id=conversation.id, user_id=uid) for uid in user_ids)
+    await db.commit()
+    return conversation
+
+
+async def _send(db, conversation_id, sender_id, content, at):
+    message = Message(conversation_id=conversation_id, sender_id=sender_id, content=content, message_type="text",
+                      created_at=at)
+    await record_message(db, message)
+    await db.commit()
+    return message
+
+
+async def _user_id(db, username):
+    return (await db.execute(select(User.id).where(User.username == username))).scalar_one()
+
+
+async def test_counters_follow_send_read_and_delete(async_client, db_session, auth_headers, second_auth_headers):
+    other = await _user_id(db_session, "conftest_user2")
+    response = await async_client.post("/api/v1/messages/conversations", json={"participant_ids": [other]},
+                                       headers=auth_headers)
+    conversation_id = response.json()["id"]
+
+    for text in ("hey", "are you studying tonight?"):
+        response = await async_client.post(f"/api/v1/messages/conversations/{conversation_id}/messages",
+                                           json={"content": text}, headers=second_auth_headers)
+        assert response.status_code == 201
+    last_id = response.json()["id"]
+
+    async def inbox():
+        response = await async_client.get("/api/v1/messages/conversations", headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()["conversations"][0]
+
+    entry = await inbox()
+    assert (entry["unread_count"], entry["last_message"]["id"]) == (2, last_id)
+    assert entry["last_message_preview"] == "are you studying tonight?"
+    assert [p["username"] for p in entry["participants"]] == ["conftest_user2"]
+
+    await async_client.post(f"/api/v1/messages/conversations/{conversation_id}/read", headers=auth_headers)
+    assert (await inbox())["unread_count"] == 0
+
+    response = await async_client.post(f"/api/v1/messages/conversations/{conversation_id}/messages",
+                                       json={"content": "nvm"}, headers=second_auth_headers)
+    assert (await inbox())["unread_count"] == 1
+    await async_client.delete(f"/api/v1/messages/{response.json()['id']}", headers=second_auth_headers)
+    entry = await inbox()
+    assert (entry["unread_count"], entry["last_message"]["is_deleted"], entry["last_message_preview"]) == (0, True, None)
+
+    # Reopening the DM reports the same state without recounting
+    response = await async_client.post("/api/v1/messages/conversations", json={"participant_ids": [other]},
+                                       headers=auth_headers)
+    assert response.status_code == 200 and response.json()["unread_count"] == 0
+
+
+async def test_inbox_pages_by_keyset_in_constant_queries(db_session):
+    await _users(db_session, 26)
+    for other in range(2, 27):
+        conversation = await _conversation(db_session, 1, other)
+        await _send(db_session, conversation.id, other, f"hello from {other}", NOW - timedelta(minutes=other))
+        if other % 5 == 0:
+            await _send(db_session, conversation.id, 1, "reply", NOW - timedelta(minutes=other, seconds=-1))
+
+    pages, cursor = [], None
+    while True:
+        with assert_max_queries(2):
+            entries, cursor = await load_inbox(db_session, 1, limit=10,
+                                               before=decode_cursor(cursor) if cursor else None)
+        pages.append(entries)
+        if cursor is None:
+            break
+
+    entries = [entry for page in pages for entry in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [e.participants[0].id for e in entries] == list(range(2, 27))  # most recent first
+    assert entries[0].last_message.content == "hello from 2"
+    assert entries[3].last_message.content == "reply"
+    assert [e.unread_count for e in entries[:4]] == [1, 1, 1, 1]
+
+
+async def test_reconcile_repairs_drift_and_is_idempotent(db_session):
+    await _users(db_session, 3)
+    group = await _conversation(db_session, 1, 2, 3)
+    first = await _send(db_session, group.id, 2, "first", NOW - timedelta(minutes=3))
+    last = await _send(db_session, group.id, 3, "x" * 300, NOW - timedelta(minutes=1))
+    await db_session.refresh(group)
+    assert group.last_message_preview == "x" * 200
+    await db_session.execute(update(ConversationParticipant).where(ConversationParticipant.user_id == 2)
+                             .values(last_read_at=NOW - timedelta(minutes=2)))
+    # Drift: a message written behind the service's back, and corrupted rows
+    db_session.add(Message(conversation_id=group.id, sender_id=1, content="raw", created_at=NOW))
+    await db_session.execute(update(ConversationParticipant).values(unread_count=7))
+    await db_session.execute(update(Conversation).values(last_message_id=first.id))
+    await db_session.commit()
+
+    assert await reconcile_inbox(db_session) == {"pointers": 1, "unread_counters": 3}
+    assert await reconcile_inbox(db_session) == {"pointers": 0, "unread_counters": 0}
+
+    raw_id = (await db_session.execute(select(func.max(Message.id)))).scalar()
+    await db_session.refresh(group)
+    assert (group.last_message_id, group.last_message_preview) == (raw_id, "raw")
+    assert raw_id > last.id
+    counters = (await db_session.execute(
+        select(ConversationParticipant.user_id, ConversationParticipant.unread_count)
+        .order_by(ConversationParticipant.user_id)
+    )).all()
+    assert counters == [(1, 2), (2, 2), (3, 2)]
@@ -0,0 +1,132 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from lyo_app.ai_agents.multi_agent_v2.agents.base_agent import BaseAgent
+from lyo_app.ai_agents.multi_agent_v2.agents.prompt_cache import (
+    JSONObjectExtractor,
+    PromptTemplateCache,
+    estimate_tokens,
+    extract_json_object,
+    prompt_template_cache,
+)
+from lyo_app.core.ai_resilience import (
+    AIModelConfig,
+    AIResilienceManager,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+)
+
+
+class _Output(BaseModel):
+    title: str
+    items: list[str]
+
+
+class _EchoAgent(BaseAgent[_Output]):
+    def get_system_prompt(self) -> str:
+        return "You are a test agent."
+
+    def build_prompt(self, **kwargs) -> str:
+        return f"Topic: {kwargs['topic']}"
+
+
+@pytest.fixture
+def agent():
+    a = _EchoAgent(name="echo_agent", output_schema=_Output, max_retries=2)
+    a._available = True
+    return a
+
+
+def test_schema_prompt_is_compiled_once():
+    cache = PromptTemplateCache()
+    with patch.object(_Output, "model_json_schema", wraps=_Output.model_json_schema) as spy:
+        first = cache.get(_EchoAgent, _Output, "sys")
+        second = cache.get(_EchoAgent, _Output, "sys")
+    assert first is second
+    assert spy.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_prefix_is_stable_and_keyed_by_system_prompt():
+    cache = PromptTemplateCache()
+    a = cache.get(_EchoAgent, _Output, "sys A")
+    b = cache.get(_EchoAgent, _Output, "sys B")
+    assert a.prefix_key != b.prefix_key
+    assert a.render("user").startswith(a.prefix)
+    assert "Output Format Requirements" in a.prefix
+
+
+def test_prefix_cache_is_bounded():
+    cache = PromptTemplateCache(max_entries=2)
+    for i in range(5):
+        cache.get(_EchoAgent, _Output, f"sys {i}")
+    assert cache.stats()["entries"] == 2
+
+
+def test_estimate_tokens_counts_json_punctuation():
+    text = json.dumps({"a": 1, "b": [1, 2, 3]})
+    assert estimate_tokens(text) > len(text.split())
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("internationalization") == 5
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"title": "x", "items": []}',
+        '```json\n{"title": "x", "items": []}\n```',
+        'json {"title": "x", "items": []}',
+        'Sure! Here it is: {"title": "x", "items": []} Hope that helps {}',
+    ],
+)
+def test_extract_json_object_variants(raw):
+    assert json.loads(extract_json_object(raw)) == {"title": "x", "items": []}
+
+
+def test_extractor_handles_braces_in_strings_across_chunks():
+    extractor = JSONObjectExtractor()
+    chunks = ['noise {"title": "a } b', ' \\" {", "items"', ': ["}"]} trailing']
+    results = [extractor.feed(c) for c in chunks]
+    assert results[:2] == [None, None]
+    assert json.loads(results[2]) == {"title": 'a } b " {', "items": ["}"]}
+
+
+@pytest.mark.asyncio
+async def test_execute_uses_cached_prefix_and_passes_prefix_key(agent):
+    prompt_template_cache.clear()
+    response = '```json\n{"title": "Intro", "items": ["a"]}\n```'
+    with patch.object(agent, "_call_model", new_callable=AsyncMock) as call:
+        call.return_value = response
+        first = await agent.execute(topic="one")
+        second = await agent.execute(topic="two")
+
+    assert first.success and second.success
+    assert first.data.title == "Intro"
+    prompts = [c.args[0] for c in call.call_args_list]
+    prefix = agent.get_compiled_prompt().prefix
+    assert all(p.startswith(prefix) for p in prompts)
+    assert call.call_args.kwargs["prefix_key"] == agent.get_compiled_prompt().prefix_key
+    assert prompt_template_cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prefix_key_reaches_the_openai_request():
+    manager = AIResilienceManager()
+    manager._initialized = True
+    manager.models = {"gpt-4o-mini": AIModelConfig(name="GPT-4o mini", endpoint="openai", api_key="sk-x")}
+    manager.circuit_breakers = {"gpt-4o-mini": CircuitBreaker(CircuitBreakerConfig())}
+    completion = MagicMock()
+    completion.choices[0].message.content = "{}"
+    completion.usage.total_tokens = 3
+    manager.openai_client = MagicMock()
+    manager.openai_client.chat.completions.create = AsyncMock(return_value=completion)
+
+    await manager.chat_completion(
+        [{"role": "user", "content": "hi"}], provider_order=["gpt-4o-mini"], use_cache=False,
+        prompt_cache_key="abc123",
+    )
+    kwargs = manager.openai_client.chat.completions.create.call_args.kwargs
+    assert kwargs["extra_body"] == {"prompt_cache_key": "abc123"}
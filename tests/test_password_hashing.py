@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import select
+
+from lyo_app.auth.models import User
+from lyo_app.auth.password_hashing import PasswordHashingService, build_context, password_hasher
+from lyo_app.core.problems import ServiceOverloadedProblem
+
+
+async def test_saturated_pool_sheds_instead_of_queueing():
+    service = PasswordHashingService(build_context(1000), workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.ensure_future(service.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ServiceOverloadedProblem) as exc:
+        await service.hash("hunter22")
+    assert (exc.value.status, exc.value.extensions["retryAfter"]) == (503, 1)
+
+    release.set()
+    await asyncio.gather(*running)
+    assert await service.verify("hunter22", await service.hash("hunter22"))
+    assert service.stats() == {"workers": 1, "pending": 0, "max_pending": 2, "completed": 4, "shed": 1,
+                               "rehashed": 0}
+
+
+async def test_outdated_hashes_are_upgraded_on_verify():
+    service = PasswordHashingService(build_context(2000), workers=2, max_queue=4)
+    weak = build_context(1000).hash("correct horse")
+    assert await service.verify_and_update("wrong horse", weak) == (False, None)
+    ok, new_hash = await service.verify_and_update("correct horse", weak)
+    assert ok and new_hash.startswith("$pbkdf2-sha256$2000$")
+    assert await service.verify_and_update("correct horse", new_hash) == (True, None)
+
+    legacy = CryptContext(schemes=["bcrypt"]).hash("correct horse")
+    ok, new_hash = await service.verify_and_update("correct horse", legacy)
+    assert ok and new_hash.startswith("$pbkdf2-sha256$")
+
+    # The old hash_password truncated every password to 72 bytes
+    long_password = "x" * 80
+    truncated = service.context.hash("x" * 72)
+    ok, new_hash = await service.verify_and_update(long_password, truncated)
+    assert ok and service.context.verify(long_password, new_hash)
+    assert await service.verify_and_update("anything", "not-a-hash") == (False, None)
+
+
+async def test_login_rehashes_and_sheds_with_retry_after(async_client, db_session, auth_headers, monkeypatch):
+    user = (await db_session.execute(select(User).where(User.username == "conftest_user"))).scalar_one()
+    user.hashed_password = build_context(1000).hash("testpassword123")
+    await db_session.commit()
+    credentials = {"email": "conftest_user@example.com", "password": "testpassword123"}
+
+    assert (await async_client.post("/api/v1/auth/login", json=credentials)).status_code == 200
+    await db_session.refresh(user)
+    assert password_hasher.context.identify(user.hashed_password) == "pbkdf2_sha256"
+    assert not password_hasher.context.needs_update(user.hashed_password)
+
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = await async_client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+
+
+async def test_register_sheds_with_503_not_500(async_client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = await async_client.post("/auth/register", json={
+        "email": "shed@example.com", "username": "shed_user",
+        "password": "Str0ng!Passw0rd", "confirm_password": "Str0ng!Passw0rd",
+    })
+    assert response.status_code == 503, response.text
+    assert response.headers["Retry-After"] == "1"
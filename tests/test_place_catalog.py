@@ -0,0 +1,127 @@
+import json
+import math
+import os
+import random
+
+from lyo_app.routers.discover import SEED_PLACES, PlaceDetail, place_catalog
+from lyo_app.services.place_catalog import PlaceCatalog, PlaceCatalogStore
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    dlat, dlng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 6371.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _places(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        PlaceDetail(
+            id=f"p-{i}", name=f"Place {i}", description="", category=rng.choice(["museum", "library", "lab"]),
+            lat=rng.uniform(-85, 85), lng=rng.uniform(-180, 180), rating=round(rng.uniform(3, 5), 1),
+            review_count=i, image_url="", address="", is_featured=rng.random() < 0.1,
+        )
+        for i in range(n)
+    ]
+
+
+def test_radius_queries_match_a_full_scan():
+    places = _places(3000)
+    catalog = PlaceCatalog(places)
+    rng = random.Random(1)
+    probes = [(rng.uniform(-80, 80), rng.uniform(-180, 180), rng.choice([50, 500, 2000, 15000])) for _ in range(40)]
+    probes += [(10.0, 179.9, 800), (10.0, -179.9, 800), (84.0, 0.0, 900)]  # antimeridian, near the pole
+    for lat, lng, radius in probes:
+        for category in (None, "lab"):
+            expected = sorted(
+                (i for i, p in enumerate(places)
+                 if (category is None or p.category == category) and _haversine_km(lat, lng, p.lat, p.lng) <= radius),
+                key=lambda i: _haversine_km(lat, lng, places[i].lat, places[i].lng),
+            )
+            assert catalog.query(category, lat, lng, radius).tolist() == expected
+
+    default = catalog.query()
+    assert default.tolist() == sorted(range(len(places)), key=lambda i: (-places[i].is_featured, -places[i].rating))
+    assert catalog.query("museum").tolist() == [i for i in default if places[i].category == "museum"]
+    assert catalog.query("coworking").tolist() == []
+
+
+async def test_list_and_detail_revalidate_with_304(async_client, auth_headers):
+    url = "/discover/places?lat=51.5&lng=-0.12&radius_km=20&per_page=2"
+    first = await async_client.get(url, headers=auth_headers)
+    body = first.json()
+    assert first.status_code == 200 and body["total"] == 2
+    assert [p["id"] for p in body["places"]] == ["place-003", "place-012"]
+    assert "reviews" not in body["places"][0]
+
+    revalidated = await async_client.get(url, headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == first.headers["ETag"]
+    other_page = await async_client.get(url + "&page=2", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert other_page.status_code == 200 and other_page.json() == {"places": [], "total": 2}
+
+    featured = (await async_client.get("/discover/places?category=Library", headers=auth_headers)).json()
+    assert [p["id"] for p in featured["places"]][:2] == ["place-004", "place-015"]
+    assert (await async_client.get("/discover/places?category=zoo", headers=auth_headers)).status_code == 400
+
+    detail = await async_client.get("/discover/places/place-005", headers=auth_headers)
+    assert PlaceDetail(**detail.json()) == place_catalog.current().by_id["place-005"]
+    assert (await async_client.get("/discover/places/place-005",
+                                   headers={**auth_headers, "If-None-Match": detail.headers["ETag"]})).status_code == 304
+    assert (await async_client.get("/discover/places/nope", headers=auth_headers)).status_code == 404
+
+    trending = await async_client.get("/discover/trending", headers=auth_headers)
+    assert len(trending.json()["topics"]) == 8
+    assert (await async_client.get("/discover/trending",
+                                   headers={**auth_headers, "If-None-Match": trending.headers["ETag"]})).status_code == 304
+
+
+def test_store_reloads_when_the_catalog_file_changes(tmp_path):
+    now = [0.0]
+    path = tmp_path / "places.json"
+    path.write_text(json.dumps([p.model_dump() for p in SEED_PLACES[:3]]))
+    store = PlaceCatalogStore(SEED_PLACES, parse=PlaceDetail.model_validate, path=str(path),
+                              check_interval=5, clock=lambda: now[0])
+    loaded = store.current()
+    assert len(loaded) == 3
+
+    path.write_text("not json")
+    os.utime(path, (1, 1))
+    assert store.current() is loaded  # not due for a check yet
+    now[0] = 6
+    assert store.current() is loaded and store.stats()["reload_errors"] == 1
+
+    path.write_text(json.dumps([p.model_dump() for p in SEED_PLACES[:5]]))
+    os.utime(path, (2, 2))
+    now[0] = 12
+    reloaded = store.current()
+    assert len(reloaded) == 5 and reloaded.digest != loaded.digest
+    assert reloaded.list_etag(None, 1, 20) != loaded.list_etag(None, 1, 20)
+
+
+async def test_reload_on_the_event_loop_builds_in_a_thread(tmp_path, monkeypatch):
+    import threading
+
+    from lyo_app.services import place_catalog as module
+
+    now = [0.0]
+    path = tmp_path / "places.json"
+    path.write_text(json.dumps([p.model_dump() for p in SEED_PLACES[:3]]))
+    store = PlaceCatalogStore(SEED_PLACES, parse=PlaceDetail.model_validate, path=str(path),
+                              check_interval=5, clock=lambda: now[0])
+    loaded = store.current()
+
+    built_on = []
+    build = module.PlaceCatalog
+
+    def recording_build(places):
+        built_on.append(threading.current_thread())
+        return build(places)
+
+    monkeypatch.setattr(module, "PlaceCatalog", recording_build)
+    path.write_text(json.dumps([p.model_dump() for p in SEED_PLACES[:5]]))
+    os.utime(path, (2, 2))
+    now[0] = 6
+    assert store.current() is loaded  # the old catalog is served while the new one builds
+    await store.reloading
+    assert len(store.current()) == 5 and store.reloading is None
+    assert built_on and built_on[0] is not threading.main_thread()
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import select
+
+from lyo_app.auth.models import User
+from lyo_app.auth.principal import Principal, principal_cache
+from lyo_app.core.query_accounting import assert_max_queries
+
+
+async def _conftest_user(db):
+    return (await db.execute(select(User).where(User.username == "conftest_user"))).scalar_one()
+
+
+async def test_warm_principal_costs_no_query(async_client, db_session, auth_headers):
+    user = await _conftest_user(db_session)
+    principal_cache.clear()
+    before = principal_cache.stats()
+
+    with assert_max_queries(1):
+        principal = await principal_cache.get(db_session, user.id)
+    assert principal == Principal(user.id, user.email, "conftest_user", True, user.is_verified, False)
+    with assert_max_queries(0):
+        assert await principal_cache.get(db_session, user.id) is principal
+    assert await principal_cache.get(db_session, 999_999) is None
+    assert (await principal.load(db_session)) is user
+    after = principal_cache.stats()
+    assert (after["entries"], after["l1_hits"] - before["l1_hits"], after["misses"] - before["misses"]) == (1, 1, 2)
+
+    # The inbox page is two queries; authorizing the request adds none
+    with assert_max_queries(2):
+        response = await async_client.get("/api/v1/messages/conversations", headers=auth_headers)
+    assert response.status_code == 200
+
+
+async def test_committed_account_changes_invalidate_the_principal(async_client, db_session, auth_headers):
+    assert (await async_client.get("/api/v1/notifications", headers=auth_headers)).status_code == 200
+    user = await _conftest_user(db_session)
+
+    user.bio = "unrelated profile edit"
+    await db_session.commit()
+    assert len(principal_cache) == 1
+
+    user.is_active = False
+    await db_session.flush()
+    await db_session.rollback()  # nothing committed, nothing to invalidate
+    assert len(principal_cache) == 1
+
+    user.is_active = False
+    await db_session.commit()
+    assert len(principal_cache) == 0
+    assert (await async_client.get("/api/v1/notifications", headers=auth_headers)).status_code == 403
+
+
+async def test_bulk_deactivation_is_caught_on_the_loaded_row(async_client, db_session, auth_headers):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from sqlalchemy import update
+
+    from lyo_app.auth.jwt_auth import get_current_user
+    from lyo_app.core.problems import AuthorizationProblem
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=auth_headers["Authorization"][7:])
+    user = await get_current_user(credentials, db_session)
+    assert len(principal_cache) == 1
+
+    # A bulk UPDATE bypasses the session hook, so the cached principal still says active
+    await db_session.execute(update(User).where(User.id == user.id).values(is_active=False))
+    await db_session.commit()
+    assert len(principal_cache) == 1
+
+    with pytest.raises(AuthorizationProblem):
+        await get_current_user(credentials, db_session)
+    assert len(principal_cache) == 0
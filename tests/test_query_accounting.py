@@ -0,0 +1,135 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import lyo_app.core.database  # noqa: F401  (registers the cursor hooks)
+from lyo_app.core.query_accounting import (
+    QueryAccounting,
+    QueryBudgetExceeded,
+    assert_max_queries,
+    current_query_stats,
+    fingerprint,
+    query_budget,
+    track_queries,
+)
+from lyo_app.middleware.asgi import QueryAccountingMiddleware
+
+
+@pytest.fixture
+async def engine():
+    eng = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with eng.begin() as conn:
+        await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(10):
+            await conn.execute(text("INSERT INTO items (id, name) VALUES (:id, :name)"), {"id": i, "name": f"n{i}"})
+    yield eng
+    await eng.dispose()
+
+
+def test_fingerprint_collapses_literals_and_binds():
+    a = fingerprint("SELECT * FROM users WHERE id = 5 AND name = 'bob'")
+    b = fingerprint("SELECT *  FROM users\nWHERE id = 17 AND name = 'alice'")
+    c = fingerprint("SELECT * FROM users WHERE id IN (?, ?, ?)")
+    assert a == b == "SELECT * FROM users WHERE id = ? AND name = ?"
+    assert c == "SELECT * FROM users WHERE id IN (?)"
+
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_statements_and_repeats(engine):
+    with track_queries() as stats:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT count(*) FROM items"))
+            for i in range(6):
+                await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i})
+
+    assert stats.count == 7
+    assert stats.total_ms > 0
+    repeated = stats.repeated(5)
+    assert len(repeated) == 1
+    assert repeated[0][0] == "SELECT name FROM items WHERE id = ?"
+    assert repeated[0][1] == 6
+
+    # Outside the block nothing is recorded
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    assert stats.count == 7
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries_fails_on_overrun(engine):
+    with pytest.raises(QueryBudgetExceeded, match="repeated 3x"):
+        with assert_max_queries(10, max_repeats=2):
+            async with engine.connect() as conn:
+                for i in range(3):
+                    await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i})
+
+
+def _app(engine, accounting: QueryAccounting) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @query_budget(max_queries=2)
+    async def one(item_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+        return {"ok": True}
+
+    @app.get("/loop")
+    @query_budget(max_queries=3)
+    async def loop():
+        async with engine.connect() as conn:
+            for i in range(8):
+                await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i})
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT name FROM items WHERE id = 1"))
+        raise RuntimeError("handler failed")
+
+    app.add_middleware(QueryAccountingMiddleware, accounting=accounting)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_aggregates_per_route_and_flags_n_plus_one(engine):
+    accounting = QueryAccounting(n_plus_one_threshold=5, strict=False)
+    app = _app(engine, accounting)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        for i in range(3):
+            assert (await c.get(f"/items/{i}")).status_code == 200
+        assert (await c.get("/loop")).status_code == 200
+
+    snapshot = accounting.snapshot()
+    assert snapshot["GET /items/{item_id}"]["requests"] == 3
+    assert snapshot["GET /items/{item_id}"]["max_queries"] == 1
+    assert snapshot["GET /items/{item_id}"]["budget_violations"] == 0
+    loop = snapshot["GET /loop"]
+    assert loop["n_plus_one_requests"] == 1
+    assert loop["budget_violations"] == 1
+    assert loop["top_repeats"] == {"SELECT name FROM items WHERE id = ?": 8}
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_raises_into_the_test_client(engine):
+    app = _app(engine, QueryAccounting(strict=True))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        await c.get("/items/1")
+        with pytest.raises(QueryBudgetExceeded, match="8 queries > budget 3"):
+            await c.get("/loop")
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_accounted_and_leave_no_context(engine):
+    accounting = QueryAccounting()
+    app = _app(engine, accounting)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        with pytest.raises(RuntimeError, match="handler failed"):
+            await c.get("/boom")
+    boom = accounting.snapshot()["GET /boom"]
+    assert (boom["requests"], boom["max_queries"]) == (1, 1)
+    assert current_query_stats() is None
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from lyo_app.core.rate_limiter import LocalGCRA, RedisRateLimiter
+
+
+class _FakeScriptRedis:
+    """Stands in for redis.asyncio: register_script runs the GCRA in Python."""
+
+    def __init__(self):
+        self.gcra = LocalGCRA()
+        self.calls = 0
+        self.fail = False
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.calls += 1
+            if self.fail:
+                raise ConnectionError("redis down")
+            return list(self.gcra.take(keys[0], *args))
+        return script
+
+    async def get(self, key):
+        return self.gcra._tat.get(key)
+
+
+def _limiter(**kwargs):
+    fake = _FakeScriptRedis()
+    kwargs.setdefault("block_duration", 0)
+    return RedisRateLimiter(redis_client=fake, **kwargs), fake
+
+
+def test_gcra_allows_burst_then_denies():
+    gcra = LocalGCRA()
+    results = [gcra.take("k", 5, 60_000, now_ms=1_000)[0] for _ in range(6)]
+    assert results == [1, 1, 1, 1, 1, 0]
+    # One emission interval later exactly one more request fits
+    assert gcra.take("k", 5, 60_000, now_ms=1_000 + 12_000)[0] == 1
+    assert gcra.take("k", 5, 60_000, now_ms=1_000 + 12_000)[0] == 0
+
+
+def test_gcra_same_instant_requests_are_all_counted():
+    # The old ZSET used second-resolution members, so a same-second burst
+    # collapsed into one entry and was undercounted.
+    gcra = LocalGCRA()
+    granted = sum(gcra.take("k", 10, 60_000, now_ms=5_000)[0] for _ in range(50))
+    assert granted == 10
+
+
+def test_gcra_block_extends_denial():
+    gcra = LocalGCRA()
+    gcra.take("k", 1, 1_000, now_ms=0)
+    granted, _, retry_ms, _ = gcra.take("k", 1, 1_000, block_ms=5_000, now_ms=10)
+    assert granted == 0 and retry_ms >= 5_000
+    assert gcra.take("k", 1, 1_000, now_ms=3_000)[0] == 0
+    assert gcra.take("k", 1, 1_000, now_ms=6_100)[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_round_trip_per_check_and_limit_override():
+    limiter, fake = _limiter(max_requests=100)
+    allowed = [(await limiter.is_allowed("org:1", "api", limit_override=3))[0] for _ in range(4)]
+    assert allowed == [True, True, True, False]
+    assert fake.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_hot_client_spends_leased_tokens_locally():
+    limiter, fake = _limiter(max_requests=100, lease_size=5)
+    for _ in range(20):
+        assert (await limiter.is_allowed("hot", "global"))[0]
+    # first call is cold, afterwards each round trip leases 5 tokens
+    assert fake.calls <= 5
+    assert limiter.stats["lease_hits"] >= 15
+    # leased tokens still count against the shared limit
+    assert fake.gcra.take("rate_limit:hot:global", 100, 60_000)[1] <= 80
+
+
+@pytest.mark.asyncio
+async def test_lease_never_exceeds_tenth_of_limit():
+    limiter, fake = _limiter(max_requests=20, lease_size=50)
+    for _ in range(3):
+        await limiter.is_allowed("c", "global")
+    assert all(len(v) == 4 and v[0] <= 1 for v in limiter._leases.values())
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_local_limits():
+    limiter, fake = _limiter(max_requests=2)
+    fake.fail = True
+    allowed = [(await limiter.is_allowed("c"))[0] for _ in range(3)]
+    assert allowed == [True, True, False]
+    assert fake.calls == 1  # backed off after the first failure
+    assert limiter.stats["local_fallbacks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_denied_info_and_status():
+    limiter, _ = _limiter(max_requests=1, window_seconds=60, block_duration=300)
+    await limiter.is_allowed("c")
+    allowed, info = await limiter.is_allowed("c")
+    assert not allowed and info["remaining"] == 0
+    assert info["blocked_until"] - time.time() >= 299
+    status = await limiter.get_rate_limit_status("c")
+    assert status["remaining"] == 0
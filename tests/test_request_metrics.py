@@ -0,0 +1,144 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from lyo_app.core.enhanced_monitoring import PerformanceMonitor
+from lyo_app.core.prometheus_metrics import PROMETHEUS_AVAILABLE, metrics_endpoint_handler
+from lyo_app.core.request_metrics import (
+    UNMATCHED_ROUTE,
+    LatencyHistogram,
+    ProcessSampler,
+    RequestMetrics,
+)
+from lyo_app.middleware.asgi import TimingMiddleware
+
+
+def test_histogram_quantiles_track_distribution():
+    h = LatencyHistogram()
+    for ms in range(1, 1001):
+        h.record(float(ms))
+
+    assert h.count == 1000
+    assert h.min == 1 and h.max == 1000
+    # Bucket interpolation keeps estimates within one bucket width
+    assert 400 <= h.quantile(0.50) <= 600
+    assert 900 <= h.quantile(0.95) <= 1000
+    assert 950 <= h.quantile(0.99) <= 1000
+    assert LatencyHistogram().quantile(0.99) == 0.0
+
+
+def test_histogram_overflow_bucket_reports_max():
+    h = LatencyHistogram(bounds=(10, 100))
+    for ms in (5, 500, 900):
+        h.record(ms)
+    assert h.quantile(1.0) == 900
+    assert h.counts == [1, 0, 2]
+
+
+@pytest.mark.asyncio
+async def test_timing_middleware_keys_by_route_template():
+    app = FastAPI()
+    router = APIRouter(prefix="/api/v1")
+
+    @router.get("/users/{user_id}")
+    async def get_user(user_id: int):
+        return {"id": user_id}
+
+    app.include_router(router)
+    sub = FastAPI()
+
+    @sub.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.mount("/sub", sub)
+    monitor = PerformanceMonitor(metrics=RequestMetrics())
+    app.add_middleware(TimingMiddleware, monitor=monitor)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        for user_id in range(25):
+            await c.get(f"/api/v1/users/{user_id}")
+        await c.get("/sub/items/3")
+        await c.get("/nope/1")
+        await c.get("/nope/2")
+
+    stats = monitor.endpoint_stats
+    assert set(stats) == {
+        "GET /api/v1/users/{user_id}",
+        "GET /sub/items/{item_id}",
+        f"GET {UNMATCHED_ROUTE}",
+    }
+    users = stats["GET /api/v1/users/{user_id}"]
+    assert users["total_requests"] == 25
+    assert users["status_counts"] == {200: 25}
+    assert users["p50_response_time"] <= users["p99_response_time"]
+    assert stats[f"GET {UNMATCHED_ROUTE}"]["status_counts"] == {404: 2}
+
+    summary = monitor.get_performance_summary()
+    assert summary["total_requests"] == 28
+
+
+def test_track_performance_does_not_call_psutil_per_request():
+    monitor = PerformanceMonitor(max_recent=3, metrics=RequestMetrics())
+    with patch("psutil.Process.memory_info") as memory_info, patch("psutil.cpu_percent") as cpu:
+        for _ in range(5):
+            with monitor.track_performance("/x", "GET"):
+                pass
+    memory_info.assert_not_called()
+    cpu.assert_not_called()
+    assert len(monitor.metrics) == 3
+    assert monitor.endpoint_stats["GET /x"]["total_requests"] == 5
+
+
+def test_track_performance_records_errors():
+    monitor = PerformanceMonitor(metrics=RequestMetrics())
+    with pytest.raises(ValueError):
+        with monitor.track_performance("/x", "POST"):
+            raise ValueError("boom")
+    assert monitor.endpoint_stats["POST /x"]["error_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_sampler_runs_in_background():
+    sampler = ProcessSampler(interval=0.01)
+    sampler.start()
+    first = sampler.snapshot()["sampled_at"]
+    await asyncio.sleep(0.05)
+    snapshot = sampler.snapshot()
+    await sampler.stop()
+
+    assert snapshot["sampled_at"] > first
+    assert snapshot["process_rss_mb"] > 0
+    assert "python_version" in snapshot
+
+
+def test_error_handler_system_info_does_not_block():
+    from lyo_app.core.enhanced_monitoring import EnhancedErrorHandler
+
+    with patch("psutil.cpu_percent") as cpu:
+        info = EnhancedErrorHandler()._collect_system_info()
+    for call in cpu.call_args_list:
+        assert call.kwargs.get("interval") is None
+    assert "memory_usage" in info
+
+
+@pytest.mark.skipif(not PROMETHEUS_AVAILABLE, reason="prometheus_client not installed")
+def test_prometheus_export_aggregates_multiprocess_dir(tmp_path, monkeypatch):
+    from prometheus_client import values
+    from prometheus_client import Counter, CollectorRegistry
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    # Emulate two workers writing into the shared directory
+    original = values.ValueClass
+    try:
+        for pid in (101, 202):
+            values.ValueClass = values.MultiProcessValue(process_identifier=lambda pid=pid: pid)
+            Counter("lyo_test_worker_hits", "test", registry=CollectorRegistry()).inc(2)
+    finally:
+        values.ValueClass = original
+
+    output = metrics_endpoint_handler().decode()
+    assert "lyo_test_worker_hits_total 4.0" in output
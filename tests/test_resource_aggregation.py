@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from lyo_app.core.query_accounting import assert_max_queries
+from lyo_app.resources import service as resource_service
+from lyo_app.resources.models import EducationalResource, ResourceProvider, ResourceTag, ResourceType
+from lyo_app.resources.providers.base import ResourceData
+from lyo_app.resources.service import ResourceAggregationService, normalize_url
+
+
+class FakeProvider:
+    def __init__(self, provider, items, delay=0.0, gauge=None):
+        self.provider = provider
+        self.items = items
+        self.delay = delay
+        self.calls = []
+        self.gauge = gauge if gauge is not None else {"running": 0, "peak": 0}
+
+    async def search_resources(self, query, resource_type=None, limit=50):
+        self.calls.append((query, resource_type))
+        self.gauge["running"] += 1
+        self.gauge["peak"] = max(self.gauge["peak"], self.gauge["running"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.gauge["running"] -= 1
+        return [
+            ResourceData(
+                title=title, description="d", external_url=url, resource_type=ResourceType.VIDEO,
+                provider=self.provider, external_id=external_id, tags=["algebra", "algebra", "x" * 80],
+                author=author,
+            )
+            for external_id, url, title, author in self.items
+        ]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_provider_cache():
+    resource_service.provider_cache.clear()
+    yield
+    resource_service.provider_cache.clear()
+
+
+def test_normalize_url_ignores_presentation_differences():
+    assert normalize_url("https://www.Example.com/watch/?v=1&utm_source=x#t=3") == "example.com/watch?v=1"
+    assert normalize_url("http://example.com/watch?v=1") == "example.com/watch?v=1"
+    assert normalize_url("http://example.com/watch?v=2") != normalize_url("http://example.com/watch?v=1")
+
+
+async def test_results_are_deduplicated_and_stored_in_one_batch(db_session):
+    db_session.add(EducationalResource(
+        title="stored", resource_type=ResourceType.VIDEO, provider=ResourceProvider.YOUTUBE,
+        external_id="yt-3", external_url="https://youtube.com/watch?v=3",
+    ))
+    await db_session.commit()
+
+    youtube = FakeProvider(ResourceProvider.YOUTUBE, [
+        ("yt-1", "https://www.youtube.com/watch?v=1", "Algebra 1", None),
+        ("yt-2", "https://youtube.com/watch?v=2", "Algebra 2", None),
+        ("yt-3", "https://youtube.com/watch?v=3", "Algebra 3", None),
+    ])
+    khan = FakeProvider(ResourceProvider.KHAN_ACADEMY, [
+        # The same video as yt-1, listed by Khan Academy: the better-scored copy wins
+        ("ka-1", "http://youtube.com/watch?v=1&utm_source=khan", "Algebra 1 (KA)", "Sal"),
+        ("ka-2", "https://khanacademy.org/algebra", "Algebra basics", "Sal"),
+    ])
+    service = ResourceAggregationService(db_session, providers={
+        ResourceProvider.YOUTUBE: youtube, ResourceProvider.KHAN_ACADEMY: khan,
+    })
+
+    # lookup, resource insert, tag insert, reload + tags
+    with assert_max_queries(5):
+        created = await service.search_and_aggregate_resources("algebra", resource_types=[ResourceType.VIDEO])
+
+    assert sorted(r.external_id for r in created) == ["ka-1", "ka-2", "yt-2"]
+    assert created[0].provider == ResourceProvider.KHAN_ACADEMY
+    assert all(sorted(t.tag for t in r.tags) == ["algebra", "x" * 50] for r in created)
+    total = await db_session.scalar(select(func.count()).select_from(EducationalResource))
+    assert total == 4
+    assert await db_session.scalar(select(func.count()).select_from(ResourceTag)) == 6
+
+    # Same search again: answered from the response cache, nothing new to store
+    with assert_max_queries(1):
+        assert await service.search_and_aggregate_resources("Algebra ", resource_types=[ResourceType.VIDEO]) == []
+    assert (len(youtube.calls), len(khan.calls)) == (1, 1)
+    assert resource_service.provider_cache.stats()["hits"] == 2
+
+
+async def test_a_cancelled_caller_does_not_abort_coalesced_waiters():
+    cache = resource_service.ProviderResponseCache()
+    provider = FakeProvider(ResourceProvider.YOUTUBE, [("yt-1", "https://youtube.com/watch?v=1", "Algebra 1", None)],
+                            delay=0.01)
+    key = cache.key(ResourceProvider.YOUTUBE, "algebra", None, 10)
+
+    def load():
+        return provider.search_resources("algebra")
+
+    first = asyncio.ensure_future(cache.fetch(key, load))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(cache.fetch(key, load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert [r.external_id for r in await second] == ["yt-1"]
+    assert first.cancelled()
+    assert len(provider.calls) == 1
+    assert cache.stats()["entries"] == 1  # the load finished and was cached
+
+
+async def test_curation_searches_objectives_concurrently_within_budget(db_session, monkeypatch):
+    monkeypatch.setattr(resource_service, "provider_budget", resource_service._ProviderBudget(2))
+    items = [("shared", "https://example.org/shared", "Shared", "A")]
+    gauge = {"running": 0, "peak": 0}
+    fakes = {
+        provider: FakeProvider(provider, [(f"{provider.value}-{i}", f"https://{provider.value}.org/{i}", "T", None)
+                                          for i in range(2)] + items, delay=0.02, gauge=gauge)
+        for provider in (ResourceProvider.YOUTUBE, ResourceProvider.INTERNET_ARCHIVE)
+    }
+    service = ResourceAggregationService(db_session, providers=fakes)
+
+    curated = await service.curate_resources_for_course(
+        "algebra", ["equations", "inequalities", "functions", "ignored"], max_resources=10
+    )
+
+    # 3 objectives x 3 resource types per provider, never more than 2 in flight overall
+    assert all(len(fake.calls) == 9 for fake in fakes.values())
+    assert gauge["peak"] == 2
+    assert len({r.id for r in curated}) == len(curated)
+    # Every objective found the same five resources; only the first one gets them
+    assert len(curated) == 3
+    assert await db_session.scalar(select(func.count()).select_from(EducationalResource)) == 5
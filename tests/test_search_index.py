@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from lyo_app.auth.models import User
+from lyo_app.community.models import CommunityEvent, CommunityPost, StudyGroup, StudyGroupPrivacy
+from lyo_app.services.search_index import PrefixIndex, TextIndex, search_index
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    search_index.reset()
+    yield
+    search_index.reset()
+
+
+def test_text_index_matches_word_prefixes_and_ranks_exact_words_first():
+    index = TextIndex()
+    index.bulk_load([
+        (1, "Ada Lovelace", {"id": 1}, "ada"),
+        (2, "Adam Smith", {"id": 2}, "adam"),
+        (3, "Grace Hopper", {"id": 3}, "grace"),
+    ])
+    assert index.search("ada", 10) == [(1, 1.0), (2, 0.5)]
+    assert index.search("lov ada", 10) == [(1, 0.75)]
+    assert index.search("ace", 10) == []  # word prefixes, not substrings
+
+    index.add(4, "Ada Yonath", {"id": 4}, "ada yonath")
+    index.remove(1)
+    assert [key for key, _ in index.search("ada", 10)] == [4, 2]
+    assert index.search("lovelace", 10) == []
+
+
+def test_prefix_index_completes_case_insensitively_in_name_order():
+    index = PrefixIndex()
+    index.bulk_load([(1, "bob"), (2, "Bobby"), (3, "alice"), (4, "bobcat")])
+    assert index.complete("BOB", 5) == ["bob", "Bobby", "bobcat"]
+    index.add(2, "robert")
+    index.remove(4)
+    assert index.complete("bob", 5) == ["bob"]
+    assert index.complete("bob", 0) == []
+
+
+async def _seed(db):
+    db.add_all([
+        User(id=101, email="ada@example.com", username="ada", hashed_password="x",
+             first_name="Ada", last_name="Lovelace"),
+        User(id=102, email="grace@example.com", username="grace", hashed_password="x", first_name="Grace"),
+        StudyGroup(id=1, name="Calculus Crew", description="Limits and derivatives", creator_id=101),
+        StudyGroup(id=2, name="Calculus Secret Society", privacy=StudyGroupPrivacy.PRIVATE, creator_id=101),
+        CommunityEvent(title="Calculus cram session", description="Before finals", organizer_id=102,
+                       start_time=NOW + timedelta(days=1), end_time=NOW + timedelta(days=1, hours=2)),
+        CommunityPost(author_id=102, author_name="Grace", content="Anyone up for calculus practice?",
+                      created_at=NOW),
+        CommunityPost(author_id=102, author_name="Grace", content="Old calculus notes", created_at=NOW,
+                      is_deleted=True),
+    ])
+    await db.commit()
+
+
+async def test_search_route_groups_and_ranks_results(async_client, db_session, auth_headers):
+    await _seed(db_session)
+
+    response = await async_client.get("/api/v1/search", params={"q": "calculus"}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [g["name"] for g in body["groups"]] == ["Calculus Crew"]  # private groups stay hidden
+    assert [e["title"] for e in body["events"]] == ["Calculus cram session"]
+    assert [p["content"] for p in body["posts"]] == ["Anyone up for calculus practice?"]
+    assert body["users"] == [] and body["total"] == 3
+    assert [(r["type"], r["relevance"]) for r in body["results"]] == [
+        ("groups", 1.0), ("events", 1.0), ("posts", 1.0),
+    ]
+
+    response = await async_client.get("/api/v1/search", params={"q": "love", "type": "users"},
+                                      headers=auth_headers)
+    assert [u["name"] for u in response.json()["users"]] == ["Ada Lovelace"]
+
+    response = await async_client.get("/api/v1/search/suggestions", params={"q": "Ca"}, headers=auth_headers)
+    assert response.json() == {"suggestions": ["Calculus Crew"]}
+
+
+async def test_writes_update_the_built_index_incrementally(db_session):
+    await _seed(db_session)
+    assert (await search_index.search(db_session, "linear", ["groups"], 10))["groups"] == []
+
+    group = StudyGroup(name="Linear Algebra Lab", creator_id=101)
+    db_session.add(group)
+    await db_session.commit()
+    hits = await search_index.search(db_session, "linear", ["groups"], 10)
+    assert [hit.document["name"] for hit in hits["groups"]] == ["Linear Algebra Lab"]
+
+    group.name = "Matrix Methods"
+    await db_session.commit()
+    assert (await search_index.search(db_session, "linear", ["groups"], 10))["groups"] == []
+    assert await search_index.suggest(db_session, "mat") == ["Matrix Methods"]
+
+    group.privacy = StudyGroupPrivacy.PRIVATE
+    await db_session.commit()
+    assert await search_index.suggest(db_session, "mat") == []
+
+    db_session.add(User(id=9, email="tmp@example.com", username="tempuser", hashed_password="x"))
+    await db_session.flush()
+    await db_session.rollback()
+    assert await search_index.suggest(db_session, "temp") == []
+
+    user = await db_session.get(User, 102)
+    await db_session.delete(user)
+    await db_session.commit()
+    assert (await search_index.search(db_session, "grace", ["users"], 10))["users"] == []
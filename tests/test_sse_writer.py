@@ -0,0 +1,118 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from lyo_app.ai.schemas.lyo2 import UIBlock, UIBlockType
+from lyo_app.streaming.sse_writer import DONE_FRAME, SSEWriter, encode_event, sse_frame
+
+
+def _triple_pass(data):
+    """The previous safe_json_serialize: dumps, loads, dumps."""
+    return json.dumps(json.loads(json.dumps(data, default=str)))
+
+
+@pytest.mark.parametrize("payload", [
+    {"type": "skeleton", "blocks": ["answer", "artifact"]},
+    {"type": "answer", "block": {"content": {"text": "Ça va? 日本語 \"quoted\"\nnew line"}, "priority": 0}},
+    {"at": datetime(2026, 1, 2, 3, 4, 5), "id": uuid.UUID(int=7), "score": Decimal("0.5"), 3: {1.5, 2.5}},
+    {"type": "artifact", "block": UIBlock(type=UIBlockType.QUIZ, content={"q": 1}).model_dump()},
+    [float("inf"), None, True, 10**30],
+])
+def test_single_pass_encoding_is_byte_identical_to_the_old_round_trip(payload):
+    assert encode_event(payload) == _triple_pass(payload)
+    assert sse_frame(payload) == f"data: {_triple_pass(payload)}\n\n".encode()
+
+
+def test_unencodable_payload_becomes_a_serialization_error_event():
+    looped = {"type": "answer"}
+    looped["self"] = looped
+    decoded = json.loads(encode_event(looped, "answer"))
+    assert decoded["type"] == "serialization_error"
+    assert decoded["message"] == "Data serialization failed for answer"
+
+
+def test_token_deltas_coalesce_on_the_flush_interval():
+    now = [0.0]
+    writer = SSEWriter(flush_interval=0.05, max_delta_chars=1000, capacity=16, clock=lambda: now[0])
+    writer.write("skeleton", {"type": "skeleton"})
+    assert writer.delta("Photo") is False
+    now[0] = 0.02
+    assert writer.delta("synthesis ") is False
+    now[0] = 0.06
+    assert writer.delta("turns") is True
+    writer.write("answer", {"type": "answer"})
+    writer.done()
+
+    chunk = writer.drain()
+    assert chunk.split(b"\n\n") == [
+        b'data: {"type": "skeleton"}',
+        b'data: {"type": "token", "text": "Photosynthesis turns"}',
+        b'data: {"type": "answer"}',
+        DONE_FRAME.strip(),
+        b"",
+    ]
+    assert (writer.events, writer.frames) == (5, 4)
+    # the buffer outgrew its 16 byte start and is reused after draining
+    assert len(writer) == 0 and writer.emit("x", {"n": 1}) == b'data: {"n": 1}\n\n'
+
+
+def test_large_pending_deltas_flush_early():
+    writer = SSEWriter(flush_interval=60, max_delta_chars=8, clock=lambda: 0.0)
+    assert writer.delta("four") is False
+    assert writer.delta("more") is True
+    assert writer.drain() == b'data: {"type": "token", "text": "fourmore"}\n\n'
+    assert writer.drain() == b""
+
+
+@pytest.fixture
+def guest_stream_client():
+    os.environ.setdefault("LYO_LIGHTWEIGHT_STARTUP", "1")
+    from lyo_app.app_factory import create_app
+    from lyo_app.auth.dependencies import get_current_user_or_guest, get_db
+
+    app = create_app()
+    guest = MagicMock()
+    guest.id = 0
+    db = AsyncMock()
+    db.add = MagicMock()
+    app.dependency_overrides[get_current_user_or_guest] = lambda: guest
+    app.dependency_overrides[get_db] = lambda: db
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides = {}
+
+
+async def test_guest_responses_are_streamed_fresh_every_time(guest_stream_client):
+    text = "hello there"
+
+    async def stream():
+        async with guest_stream_client.stream("POST", "/api/v1/lyo2/chat/stream", json={"text": text}) as response:
+            assert response.status_code == 200
+            return await response.aread()
+
+    with patch("lyo_app.api.v1.stream_lyo2.router_agent") as router_agent, \
+            patch("lyo_app.api.v1.stream_lyo2.proactive_engagement_service") as nudges, \
+            patch("lyo_app.api.v1.stream_lyo2.LyoExecutor") as executor_cls:
+        nudges.get_pending_nudges_for_user = AsyncMock(return_value=[])
+        execution = MagicMock()
+        execution.answer_block.content = {"text": "Hi! What shall we learn?"}
+        execution.artifact_block = None
+        execution.open_classroom_payload = None
+        execution.next_actions = []
+        executor_cls.return_value.execute = AsyncMock(return_value=execution)
+        first = await stream()
+        second = await stream()
+
+    # No full-response cache: both requests run the executor and stream the same frames
+    assert executor_cls.return_value.execute.await_count == 2
+    router_agent.route.assert_not_called()
+    skeleton = sse_frame({"type": "skeleton", "blocks": ["answer", "artifact"]})
+    answer = sse_frame({"type": "answer", "block": {
+        "type": "TutorMessageBlock", "content": {"text": "Hi! What shall we learn?"}, "priority": 0}})
+    for body in (first, second):
+        assert body.startswith(skeleton + answer) and body.endswith(DONE_FRAME)